@@ -0,0 +1,271 @@
+"""Message lists stored as deltas against the parent checkpoint.
+
+A chat thread's message list grows by a few messages per step, yet every
+checkpoint stores it in full. ``MessageDeltaSaver`` wraps a saver and, when
+a list channel such as ``messages`` extends its value in the parent
+checkpoint, stores only the new items and the id of the checkpoint they
+extend. Reads rebuild the list by walking back to the last full copy, which
+is stored every ``delta_snapshot_interval`` checkpoints so walks stay short.
+
+Deltas are only written against the checkpoint this process last wrote for
+a thread, whose lists it keeps in memory for ``delta_cache_threads``
+threads. After a restart, on a fork, or when earlier items changed, the
+list is stored in full. Reading that latest checkpoint back uses the same
+lists, so only reads of older checkpoints walk the chain.
+
+Rows written without deltas stay readable. A delta needs every checkpoint
+back to the last full copy, so deltas can't be combined with ``keep_last``
+or retention, which delete them.
+"""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from collections.abc import AsyncIterator, Generator, Iterator, Sequence
+from dataclasses import dataclass
+from typing import Any
+
+from idun_agent_schema.engine.langgraph import CheckpointSerializerConfig
+from langgraph.checkpoint.base import BaseCheckpointSaver
+
+# Marks a stored list delta; no channel value of a graph has this key
+_DELTA_KEY = "__idun_list_delta__"
+
+
+def _is_delta(value: Any) -> bool:
+    return isinstance(value, dict) and _DELTA_KEY in value
+
+
+@dataclass
+class _LastWrite:
+    """Lists of the checkpoint last written for one thread and namespace."""
+
+    checkpoint_id: str
+    values: dict[str, list]
+    # Deltas stored for each list since its last full copy
+    depths: dict[str, int]
+
+
+class MessageDeltaSaver(BaseCheckpointSaver):
+    """Saver that stores list channels as deltas against the parent checkpoint."""
+
+    def __init__(self, saver: BaseCheckpointSaver, config: CheckpointSerializerConfig):
+        super().__init__(serde=saver.serde)
+        self._saver = saver
+        self._config = config
+        self._last: OrderedDict[str, dict[str, _LastWrite]] = OrderedDict()
+        self.delta_writes_total = 0
+        self.full_writes_total = 0
+
+    @property
+    def config_specs(self) -> list:
+        return self._saver.config_specs
+
+    def get_next_version(self, current: Any, channel: Any) -> Any:
+        return self._saver.get_next_version(current, channel)
+
+    def get_tuple(self, config: Any) -> Any:
+        saved = self._saver.get_tuple(config)
+        return self._resolve(saved) if saved is not None else None
+
+    async def aget_tuple(self, config: Any) -> Any:
+        saved = await self._saver.aget_tuple(config)
+        return await self._aresolve(saved) if saved is not None else None
+
+    def list(
+        self,
+        config: Any,
+        *,
+        filter: dict[str, Any] | None = None,
+        before: Any = None,
+        limit: int | None = None,
+    ) -> Iterator[Any]:
+        # Read in full first: savers may hold their lock while listing, and
+        # rebuilding a delta reads other checkpoints
+        listed = [
+            *self._saver.list(config, filter=filter, before=before, limit=limit)
+        ]
+        for saved in listed:
+            yield self._resolve(saved)
+
+    async def alist(
+        self,
+        config: Any,
+        *,
+        filter: dict[str, Any] | None = None,
+        before: Any = None,
+        limit: int | None = None,
+    ) -> AsyncIterator[Any]:
+        listed = [
+            saved
+            async for saved in self._saver.alist(
+                config, filter=filter, before=before, limit=limit
+            )
+        ]
+        for saved in listed:
+            yield await self._aresolve(saved)
+
+    def put(
+        self, config: Any, checkpoint: Any, metadata: Any, new_versions: Any
+    ) -> Any:
+        encoded, last = self._encode(config, checkpoint)
+        saved = self._saver.put(config, encoded, metadata, new_versions)
+        self._remember(config, last)
+        return saved
+
+    async def aput(
+        self, config: Any, checkpoint: Any, metadata: Any, new_versions: Any
+    ) -> Any:
+        encoded, last = self._encode(config, checkpoint)
+        saved = await self._saver.aput(config, encoded, metadata, new_versions)
+        self._remember(config, last)
+        return saved
+
+    def put_writes(
+        self,
+        config: Any,
+        writes: Sequence[tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        self._saver.put_writes(config, writes, task_id, task_path)
+
+    async def aput_writes(
+        self,
+        config: Any,
+        writes: Sequence[tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        await self._saver.aput_writes(config, writes, task_id, task_path)
+
+    def delete_thread(self, thread_id: str) -> None:
+        self._last.pop(thread_id, None)
+        self._saver.delete_thread(thread_id)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        self._last.pop(thread_id, None)
+        await self._saver.adelete_thread(thread_id)
+
+    def _encode(self, config: Any, checkpoint: Any) -> tuple[Any, _LastWrite]:
+        """Replace lists that extend the parent's with deltas."""
+        configurable = config["configurable"]
+        parent_id = configurable.get("checkpoint_id")
+        parent = self._last.get(configurable["thread_id"], {}).get(
+            configurable.get("checkpoint_ns", "")
+        )
+        if parent is not None and parent.checkpoint_id != parent_id:
+            parent = None
+        values = dict(checkpoint["channel_values"])
+        last = _LastWrite(checkpoint["id"], {}, {})
+        for channel, value in checkpoint["channel_values"].items():
+            if not isinstance(value, list):
+                continue
+            # Copied: the graph may hand the same list object to later steps
+            last.values[channel] = list(value)
+            base = parent.values.get(channel) if parent is not None else None
+            depth = parent.depths.get(channel, 0) + 1 if parent is not None else 0
+            if (
+                base is None
+                or depth >= self._config.delta_snapshot_interval
+                or value[: len(base)] != base
+            ):
+                last.depths[channel] = 0
+                self.full_writes_total += 1
+                continue
+            values[channel] = {
+                _DELTA_KEY: 1,
+                "base": parent_id,
+                "start": len(base),
+                "items": value[len(base) :],
+            }
+            last.depths[channel] = depth
+            self.delta_writes_total += 1
+        return {**checkpoint, "channel_values": values}, last
+
+    def _remember(self, config: Any, last: _LastWrite) -> None:
+        thread_id = config["configurable"]["thread_id"]
+        namespaces = self._last.setdefault(thread_id, {})
+        self._last.move_to_end(thread_id)
+        namespaces[config["configurable"].get("checkpoint_ns", "")] = last
+        while len(self._last) > self._config.delta_cache_threads:
+            self._last.popitem(last=False)
+
+    def _rebuild(self, saved: Any) -> Generator[Any, Any, Any]:
+        """Return ``saved`` with its deltas replaced by full lists.
+
+        Yields the config of every older checkpoint it needs and is sent
+        back its stored tuple, so sync and async reads share the walk.
+        """
+        values = saved.checkpoint["channel_values"]
+        channels = [channel for channel, value in values.items() if _is_delta(value)]
+        if not channels:
+            return saved
+        configurable = saved.config["configurable"]
+        thread_id = configurable["thread_id"]
+        checkpoint_ns = configurable.get("checkpoint_ns", "")
+        last = self._last.get(thread_id, {}).get(checkpoint_ns)
+        rebuilt: dict[str, list] = {}
+        for channel in channels:
+            if last is not None and last.checkpoint_id == saved.checkpoint["id"]:
+                rebuilt[channel] = list(last.values[channel])
+                continue
+            chain = [values[channel]]
+            while True:
+                base_id = chain[-1]["base"]
+                base = yield {
+                    "configurable": {
+                        "thread_id": thread_id,
+                        "checkpoint_ns": checkpoint_ns,
+                        "checkpoint_id": base_id,
+                    }
+                }
+                value = (
+                    base.checkpoint["channel_values"].get(channel)
+                    if base is not None
+                    else None
+                )
+                if value is None:
+                    raise ValueError(
+                        f"Checkpoint {base_id} of thread {thread_id} is gone, but "
+                        f"checkpoint {saved.checkpoint['id']} stores '{channel}' "
+                        "as a delta against it"
+                    )
+                if not _is_delta(value):
+                    break
+                chain.append(value)
+            for delta in reversed(chain):
+                value = [*value[: delta["start"]], *delta["items"]]
+            rebuilt[channel] = value
+        return saved._replace(
+            checkpoint={**saved.checkpoint, "channel_values": {**values, **rebuilt}}
+        )
+
+    def _resolve(self, saved: Any) -> Any:
+        rebuild = self._rebuild(saved)
+        try:
+            config = next(rebuild)
+            while True:
+                config = rebuild.send(self._saver.get_tuple(config))
+        except StopIteration as done:
+            return done.value
+
+    async def _aresolve(self, saved: Any) -> Any:
+        rebuild = self._rebuild(saved)
+        try:
+            config = next(rebuild)
+            while True:
+                config = rebuild.send(await self._saver.aget_tuple(config))
+        except StopIteration as done:
+            return done.value
+
+    def stats(self) -> dict[str, Any]:
+        """Return the wrapped saver's counters and how many lists were deltas."""
+        saver_stats = getattr(self._saver, "stats", None)
+        stats = dict(saver_stats()) if callable(saver_stats) else {}
+        stats["message_deltas"] = {
+            "delta_writes_total": self.delta_writes_total,
+            "full_writes_total": self.full_writes_total,
+            "cached_threads": len(self._last),
+        }
+        return stats
@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import asyncio
 import importlib
 import importlib.util
 import logging
@@ -14,7 +15,6 @@ if TYPE_CHECKING:
     from ag_ui.core.types import RunAgentInput
     from idun_agent_schema.engine.capabilities import AgentCapabilities
 
-import aiosqlite
 from ag_ui.core import events as ag_events
 from ag_ui.core import types as ag_types
 from copilotkit import LangGraphAGUIAgent
@@ -26,8 +26,6 @@ from idun_agent_schema.engine.langgraph import (
 )
 from idun_agent_schema.engine.observability_v2 import ObservabilityConfig
 from langgraph.checkpoint.memory import InMemorySaver
-from langgraph.checkpoint.postgres.aio import AsyncPostgresSaver
-from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
 from langgraph.graph import StateGraph
 from langgraph.graph.state import CompiledStateGraph
 
@@ -58,6 +56,45 @@ def _extract_text_content(content: Any) -> str:
     return "".join(parts) if parts else str(content)
 
 
+async def _open_postgres_pool(config: PostgresCheckpointConfig) -> Any:
+    """Open the connection pool the Postgres checkpointer runs on.
+
+    Connections are set up the way ``AsyncPostgresSaver.from_conn_string``
+    sets up its own: autocommit with dict rows.
+    """
+    from psycopg.rows import dict_row
+    from psycopg_pool import AsyncConnectionPool
+
+    pool_config = config.pool
+    kwargs: dict[str, Any] = {
+        "autocommit": True,
+        "row_factory": dict_row,
+        # 0 prepares every statement on first use; None disables preparing
+        "prepare_threshold": 0 if pool_config.prepared_statements else None,
+    }
+    if pool_config.statement_timeout_ms is not None:
+        kwargs["options"] = f"-c statement_timeout={pool_config.statement_timeout_ms}"
+    pool = AsyncConnectionPool(
+        conninfo=config.db_url,
+        min_size=pool_config.min_size,
+        max_size=pool_config.max_size,
+        max_idle=pool_config.max_idle_seconds,
+        kwargs=kwargs,
+        open=False,
+    )
+    try:
+        # Fails fast on a wrong URL or unreachable database
+        await pool.open(wait=True)
+    except Exception:
+        await pool.close()
+        raise
+    logger.info(
+        f"Postgres checkpointer pool opened — min_size={pool_config.min_size}, "
+        f"max_size={pool_config.max_size}"
+    )
+    return pool
+
+
 class LanggraphAgent(agent_base.BaseAgent):
     """LangGraph agent adapter implementing the BaseAgent protocol."""
 
@@ -72,6 +109,10 @@ class LanggraphAgent(agent_base.BaseAgent):
         self._checkpointer: Any = None
         self._store: Any = None
         self._connection: Any = None
+        self._pg_pool: Any = None
+        self._serializer: Any = None
+        self._retention: Any = None
+        self._retention_task: asyncio.Task | None = None
         self._configuration: LangGraphAgentConfig | None = None
         self._name: str = "Unnamed LangGraph Agent"
         self._infos: dict[str, Any] = {
@@ -252,12 +293,7 @@ class LanggraphAgent(agent_base.BaseAgent):
 
             self._agent_instance = graph_builder.compile(**compile_kwargs)
 
-        self._copilotkit_agent_instance = LangGraphAGUIAgent(
-            name=self._name,
-            description="Agent description",  # TODO: add agent description
-            graph=self._agent_instance,
-            config={"callbacks": self._obs_callbacks} if self._obs_callbacks else None,
-        )
+        self._copilotkit_agent_instance = self._create_agui_agent()
 
         if self._agent_instance:
             try:
@@ -273,14 +309,35 @@ class LanggraphAgent(agent_base.BaseAgent):
         self._infos["status"] = "Initialized"
         self._infos["config_used"] = self._configuration.model_dump()
 
+    def _create_agui_agent(self) -> LangGraphAGUIAgent:
+        """Build an AG-UI adapter around the shared compiled graph.
+
+        ``LangGraphAGUIAgent`` keeps per-run bookkeeping (``active_run``,
+        ``messages_in_process``) on the instance, so overlapping runs on a
+        shared adapter overwrite each other's state. The adapter holds no
+        expensive resources of its own (graph, checkpointer and callbacks are
+        shared), which makes it cheap to create one per run.
+        """
+        return LangGraphAGUIAgent(
+            name=self._name,
+            description="Agent description",  # TODO: add agent description
+            graph=self._agent_instance,
+            config={"callbacks": self._obs_callbacks} if self._obs_callbacks else None,
+        )
+
     async def close(self):
         """Closes any open resources, like database connections."""
-        # Exit the Postgres context manager if we entered one
-        pg_cm = getattr(self, "_pg_cm", None)
-        if pg_cm is not None:
-            await pg_cm.__aexit__(None, None, None)
-            self._pg_cm = None
-            logger.debug("Postgres checkpointer connection closed.")
+        if self._retention_task is not None:
+            self._retention_task.cancel()
+            try:
+                await self._retention_task
+            except asyncio.CancelledError:
+                pass
+            self._retention_task = None
+        if self._pg_pool is not None:
+            await self._pg_pool.close()
+            self._pg_pool = None
+            logger.debug("Postgres checkpointer connection pool closed.")
         if self._connection:
             await self._connection.close()
             self._connection = None
@@ -291,29 +348,81 @@ class LanggraphAgent(agent_base.BaseAgent):
         if not self._configuration:
             return
 
+        # Checkpointer backends are imported only for the configured type
         if self._configuration.checkpointer:
+            from .serde import CompressingSerializer
+
+            # Always wrapped: with compression "none" or no serializer block
+            # rows compressed earlier must still be read
+            self._serializer = CompressingSerializer(
+                self._configuration.checkpointer.serializer
+            )
             if isinstance(self._configuration.checkpointer, SqliteCheckpointConfig):
+                import aiosqlite
+                from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+
                 db_path = self._configuration.checkpointer.db_url.replace(
                     "sqlite:///", ""
                 )
-                self._connection = await aiosqlite.connect(db_path)
-                self._checkpointer = AsyncSqliteSaver(conn=self._connection)
+                concurrency = self._configuration.checkpointer.concurrency
+                if concurrency.enabled:
+                    from .sqlite import ConcurrentSqliteSaver
+
+                    # Owns its writer and reader connections; closed like one
+                    self._connection = await ConcurrentSqliteSaver.open(
+                        db_path, concurrency, serde=self._serializer
+                    )
+                    self._checkpointer = self._connection
+                else:
+                    self._connection = await aiosqlite.connect(db_path)
+                    self._checkpointer = AsyncSqliteSaver(
+                        conn=self._connection, serde=self._serializer
+                    )
+                if self._configuration.checkpointer.retention.enabled:
+                    from .retention import SqliteCheckpointRetention
+
+                    self._start_retention(
+                        SqliteCheckpointRetention(
+                            self._checkpointer,
+                            self._configuration.checkpointer.retention,
+                        )
+                    )
                 self._infos["checkpointer"] = (
                     self._configuration.checkpointer.model_dump()
                 )
             elif isinstance(self._configuration.checkpointer, InMemoryCheckpointConfig):
-                self._checkpointer = InMemorySaver()
+                if self._configuration.checkpointer.bounded:
+                    from .memory import BoundedInMemorySaver
+
+                    self._checkpointer = BoundedInMemorySaver(
+                        self._configuration.checkpointer, serde=self._serializer
+                    )
+                else:
+                    self._checkpointer = InMemorySaver(serde=self._serializer)
                 self._infos["checkpointer"] = (
                     self._configuration.checkpointer.model_dump()
                 )
             elif isinstance(self._configuration.checkpointer, PostgresCheckpointConfig):
-                # from_conn_string is an async context manager; enter it and
-                # keep a reference so we can clean up on shutdown.
-                self._pg_cm = AsyncPostgresSaver.from_conn_string(
-                    self._configuration.checkpointer.db_url
+                from langgraph.checkpoint.postgres.aio import AsyncPostgresSaver
+
+                # A pool rather than from_conn_string's single connection, so
+                # concurrent runs don't queue on one socket for checkpoint I/O
+                self._pg_pool = await _open_postgres_pool(
+                    self._configuration.checkpointer
+                )
+                self._checkpointer = AsyncPostgresSaver(
+                    conn=self._pg_pool, serde=self._serializer
                 )
-                self._checkpointer = await self._pg_cm.__aenter__()
                 await self._checkpointer.setup()
+                if self._configuration.checkpointer.retention.enabled:
+                    from .retention import PostgresCheckpointRetention
+
+                    self._start_retention(
+                        PostgresCheckpointRetention(
+                            self._checkpointer,
+                            self._configuration.checkpointer.retention,
+                        )
+                    )
                 self._infos["checkpointer"] = (
                     self._configuration.checkpointer.model_dump()
                 )
@@ -321,10 +430,37 @@ class LanggraphAgent(agent_base.BaseAgent):
                 raise NotImplementedError(
                     f"Checkpointer type {type(self._configuration.checkpointer)} is not supported."
                 )
+            if self._configuration.checkpointer.serializer.message_deltas:
+                from .deltas import MessageDeltaSaver
+
+                self._checkpointer = MessageDeltaSaver(
+                    self._checkpointer, self._configuration.checkpointer.serializer
+                )
 
         if self._configuration.store:
             raise NotImplementedError("Store functionality is not yet implemented.")
 
+    def _start_retention(self, retention: Any) -> None:
+        """Run checkpoint cleanup in the background until the agent is closed."""
+        self._retention = retention
+        self._retention_task = asyncio.create_task(retention.run_forever())
+
+    def checkpointer_stats(self) -> dict[str, Any] | None:
+        """Return runtime counters of the checkpointer, if it keeps any."""
+        if self._checkpointer is None:
+            return None
+        stats: dict[str, Any] = {"type": type(self._checkpointer).__name__}
+        saver_stats = getattr(self._checkpointer, "stats", None)
+        if callable(saver_stats):
+            stats.update(saver_stats())
+        if self._pg_pool is not None:
+            stats["pool"] = self._pg_pool.get_stats()
+        if self._serializer is not None:
+            stats["serializer"] = self._serializer.stats()
+        if self._retention is not None:
+            stats["retention"] = self._retention.stats()
+        return stats
+
     def _load_graph_builder(self, graph_definition: str) -> StateGraph:
         """Loads a StateGraph instance from a specified path."""
         try:
@@ -768,8 +904,9 @@ class LanggraphAgent(agent_base.BaseAgent):
     async def run(self, input_data: RunAgentInput) -> AsyncGenerator[BaseEvent, None]:
         """Canonical AG-UI interaction entry point.
 
-        Delegates to LangGraphAGUIAgent for event generation. For structured
-        agents, validates input against the discovered input schema first.
+        Delegates to a per-run LangGraphAGUIAgent for event generation. For
+        structured agents, validates input against the discovered input schema
+        first.
         """
         import json as json_module
 
@@ -791,7 +928,11 @@ class LanggraphAgent(agent_base.BaseAgent):
                 )
                 return
 
-        # Delegate to the AG-UI wrapper
-        copilotkit_agent = self.copilotkit_agent_instance
+        # Delegate to a per-run AG-UI wrapper so concurrent runs stay isolated
+        if self._copilotkit_agent_instance is None:
+            raise RuntimeError(
+                "CopilotKit agent not initialized. Call initialize() first."
+            )
+        copilotkit_agent = self._create_agui_agent()
         async for event in copilotkit_agent.run(input_data):
             yield event
@@ -0,0 +1,227 @@
+"""In-memory checkpointer with a bounded footprint.
+
+``InMemorySaver`` keeps every checkpoint of every thread until the process
+exits. ``BoundedInMemorySaver`` stores the same data but:
+
+- counts the serialized size of each thread's checkpoints, blobs and writes;
+- keeps threads in least recently used order, where any read or write of a
+  thread counts as a use;
+- evicts the least recently used threads once ``max_threads`` or
+  ``max_size_mb`` is exceeded. The thread being written is never evicted;
+- with ``keep_last``, drops older checkpoints of a thread after each write,
+  together with their pending writes and the blobs only they referred to.
+
+Sizes are those of the serialized payloads, not the Python objects holding
+them, so actual memory use is somewhat higher.
+"""
+
+from __future__ import annotations
+
+import logging
+from collections import OrderedDict
+from collections.abc import Iterator, Sequence
+from dataclasses import dataclass, field
+from typing import Any
+
+from idun_agent_schema.engine.langgraph import InMemoryCheckpointConfig
+from langgraph.checkpoint.memory import InMemorySaver
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _ThreadUsage:
+    """Serialized bytes of one thread and the keys they are stored under."""
+
+    size: int = 0
+    blobs: set[tuple] = field(default_factory=set)
+    writes: set[tuple] = field(default_factory=set)
+
+
+def _writes_size(writes: dict | None) -> int:
+    return sum(len(value[2][1]) for value in writes.values()) if writes else 0
+
+
+class BoundedInMemorySaver(InMemorySaver):
+    """``InMemorySaver`` with LRU eviction of threads and history trimming."""
+
+    def __init__(self, config: InMemoryCheckpointConfig, *, serde: Any = None):
+        super().__init__(serde=serde)
+        self._config = config
+        self._max_bytes = (
+            int(config.max_size_mb * 1024 * 1024)
+            if config.max_size_mb is not None
+            else None
+        )
+        self._threads: OrderedDict[str, _ThreadUsage] = OrderedDict()
+        self.resident_bytes = 0
+        self.evictions_total = 0
+        self.trimmed_checkpoints_total = 0
+
+    def get_tuple(self, config: Any) -> Any:
+        # ``storage`` is a defaultdict: reading an untracked thread through it
+        # would leave behind an entry eviction never removes
+        if not self._touch(config["configurable"].get("thread_id")):
+            return None
+        return super().get_tuple(config)
+
+    def list(
+        self,
+        config: Any,
+        *,
+        filter: dict[str, Any] | None = None,
+        before: Any = None,
+        limit: int | None = None,
+    ) -> Iterator[Any]:
+        if config is not None and not self._touch(
+            config["configurable"].get("thread_id")
+        ):
+            return iter(())
+        return super().list(config, filter=filter, before=before, limit=limit)
+
+    def put(
+        self, config: Any, checkpoint: Any, metadata: Any, new_versions: Any
+    ) -> Any:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"]["checkpoint_ns"]
+        usage = self._usage(thread_id)
+        before = self._checkpoint_size(thread_id, checkpoint_ns, checkpoint["id"])
+        for channel, version in new_versions.items():
+            key = (thread_id, checkpoint_ns, channel, version)
+            if key in self.blobs:
+                before += len(self.blobs[key][1])
+        saved = super().put(config, checkpoint, metadata, new_versions)
+        after = self._checkpoint_size(thread_id, checkpoint_ns, checkpoint["id"])
+        for channel, version in new_versions.items():
+            key = (thread_id, checkpoint_ns, channel, version)
+            usage.blobs.add(key)
+            after += len(self.blobs[key][1])
+        self._grow(usage, after - before)
+        if self._config.keep_last is not None:
+            self._trim(thread_id, checkpoint_ns, usage, self._config.keep_last)
+        self._evict(thread_id)
+        return saved
+
+    def put_writes(
+        self,
+        config: Any,
+        writes: Sequence[tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        thread_id = config["configurable"]["thread_id"]
+        key = (
+            thread_id,
+            config["configurable"].get("checkpoint_ns", ""),
+            config["configurable"]["checkpoint_id"],
+        )
+        usage = self._usage(thread_id)
+        before = _writes_size(self.writes.get(key))
+        super().put_writes(config, writes, task_id, task_path)
+        usage.writes.add(key)
+        self._grow(usage, _writes_size(self.writes.get(key)) - before)
+        self._evict(thread_id)
+
+    def delete_thread(self, thread_id: str) -> None:
+        usage = self._threads.pop(thread_id, None)
+        if usage is None:
+            super().delete_thread(thread_id)
+            return
+        # The thread's keys are known, so no scan over every thread's data
+        self.storage.pop(thread_id, None)
+        for key in usage.writes:
+            self.writes.pop(key, None)
+        for key in usage.blobs:
+            self.blobs.pop(key, None)
+        self.resident_bytes -= usage.size
+
+    def _touch(self, thread_id: str | None) -> bool:
+        """Mark a thread as used; return whether it holds any checkpoint data."""
+        if thread_id is None or thread_id not in self._threads:
+            return False
+        self._threads.move_to_end(thread_id)
+        return True
+
+    def _usage(self, thread_id: str) -> _ThreadUsage:
+        usage = self._threads.get(thread_id)
+        if usage is None:
+            usage = self._threads[thread_id] = _ThreadUsage()
+        else:
+            self._threads.move_to_end(thread_id)
+        return usage
+
+    def _grow(self, usage: _ThreadUsage, delta: int) -> None:
+        usage.size += delta
+        self.resident_bytes += delta
+
+    def _checkpoint_size(
+        self, thread_id: str, checkpoint_ns: str, checkpoint_id: str
+    ) -> int:
+        saved = self.storage.get(thread_id, {}).get(checkpoint_ns, {})
+        entry = saved.get(checkpoint_id)
+        return len(entry[0][1]) + len(entry[1][1]) if entry else 0
+
+    def _trim(
+        self,
+        thread_id: str,
+        checkpoint_ns: str,
+        usage: _ThreadUsage,
+        keep_last: int,
+    ) -> None:
+        """Drop checkpoints of one namespace beyond the last ``keep_last``."""
+        saved = self.storage[thread_id][checkpoint_ns]
+        if len(saved) <= keep_last:
+            return
+        checkpoint_ids = sorted(saved, reverse=True)
+        kept, dropped = checkpoint_ids[:keep_last], checkpoint_ids[keep_last:]
+        # Channel versions only grow, so a blob a newer checkpoint refers to
+        # is also referred to by the oldest kept one
+        oldest = self.serde.loads_typed(saved[kept[-1]][0])["channel_versions"]
+        freed = 0
+        for checkpoint_id in dropped:
+            entry = saved.pop(checkpoint_id)
+            freed += len(entry[0][1]) + len(entry[1][1])
+            writes_key = (thread_id, checkpoint_ns, checkpoint_id)
+            freed += _writes_size(self.writes.pop(writes_key, None))
+            usage.writes.discard(writes_key)
+            versions = self.serde.loads_typed(entry[0])["channel_versions"]
+            for channel, version in versions.items():
+                if oldest.get(channel) == version:
+                    continue
+                blob_key = (thread_id, checkpoint_ns, channel, version)
+                blob = self.blobs.pop(blob_key, None)
+                if blob is not None:
+                    freed += len(blob[1])
+                    usage.blobs.discard(blob_key)
+        self._grow(usage, -freed)
+        self.trimmed_checkpoints_total += len(dropped)
+
+    def _evict(self, current_thread_id: str) -> None:
+        """Evict least recently used threads until every limit is met."""
+        while self._over_limit():
+            thread_id = next(iter(self._threads))
+            if thread_id == current_thread_id:
+                # Only the thread being written is left
+                return
+            self.delete_thread(thread_id)
+            self.evictions_total += 1
+            logger.debug(f"Evicted in-memory checkpoints of thread {thread_id}")
+
+    def _over_limit(self) -> bool:
+        if (
+            self._config.max_threads is not None
+            and len(self._threads) > self._config.max_threads
+        ):
+            return True
+        return self._max_bytes is not None and self.resident_bytes > self._max_bytes
+
+    def stats(self) -> dict[str, Any]:
+        """Return what is held in memory and how much was evicted."""
+        return {
+            "resident_threads": len(self._threads),
+            "resident_bytes": self.resident_bytes,
+            "max_threads": self._config.max_threads,
+            "max_bytes": self._max_bytes,
+            "evictions_total": self.evictions_total,
+            "trimmed_checkpoints_total": self.trimmed_checkpoints_total,
+        }
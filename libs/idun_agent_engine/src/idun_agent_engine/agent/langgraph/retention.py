@@ -0,0 +1,389 @@
+"""Background cleanup of LangGraph checkpoints.
+
+LangGraph writes a checkpoint on every super-step and never deletes one, so
+checkpoint tables grow without limit and lookups on busy threads slow down.
+``CheckpointRetention`` runs in the background for as long as the agent is
+loaded. Each pass:
+
+1. deletes threads whose last checkpoint is older than ``thread_ttl_seconds``;
+2. deletes checkpoints beyond the last ``keep_last`` of each thread;
+3. deletes pending writes that no run can resume from: those of checkpoints
+   that are gone and, with ``compact_writes``, those of checkpoints that are
+   not the latest of their thread;
+4. on Postgres, deletes channel blobs no remaining checkpoint refers to.
+
+Deletes run ``batch_size`` rows at a time, with ``batch_pause_ms`` between
+batches, so a pass never holds long locks or saturates the database.
+
+Checkpoint ids are UUIDv6, ordered by creation time. A thread's age is read
+from its newest checkpoint id, without decoding any checkpoint.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+import logging
+import time
+from abc import ABC, abstractmethod
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from idun_agent_schema.engine.langgraph import CheckpointRetentionConfig
+
+logger = logging.getLogger(__name__)
+
+# 100 ns intervals between the UUID epoch (1582-10-15) and the Unix epoch
+_UUID_EPOCH_OFFSET = 0x01B21DD213814000
+
+
+def checkpoint_id_before(unix_seconds: float) -> str:
+    """Return the smallest UUIDv6 checkpoint id created at ``unix_seconds``.
+
+    Every checkpoint id that sorts below it was created earlier.
+    """
+    timestamp = int(unix_seconds * 10_000_000) + _UUID_EPOCH_OFFSET
+    high = f"{timestamp >> 12:012x}"
+    return f"{high[:8]}-{high[8:]}-6{timestamp & 0xFFF:03x}-0000-000000000000"
+
+
+class CheckpointRetention(ABC):
+    """Periodic cleanup of one checkpointer's tables."""
+
+    def __init__(self, saver: Any, config: CheckpointRetentionConfig):
+        self._saver = saver
+        self._config = config
+        self.runs_total = 0
+        self.failures_total = 0
+        self.threads_deleted_total = 0
+        self.checkpoints_deleted_total = 0
+        self.writes_deleted_total = 0
+        self.blobs_deleted_total = 0
+        self.last_run_seconds: float | None = None
+
+    async def run_forever(self) -> None:
+        """Run a pass every ``interval_seconds`` until cancelled."""
+        while True:
+            try:
+                await self.run_once()
+            except Exception as e:  # noqa: BLE001
+                self.failures_total += 1
+                logger.error(f"Checkpoint retention pass failed: {e}", exc_info=True)
+            await asyncio.sleep(self._config.interval_seconds)
+
+    async def run_once(self) -> None:
+        """Apply the retention policy once."""
+        start = time.monotonic()
+        config = self._config
+        if config.thread_ttl_seconds is not None:
+            cutoff = checkpoint_id_before(time.time() - config.thread_ttl_seconds)
+            while True:
+                threads = await self._idle_threads(cutoff, config.batch_size)
+                for thread_id in threads:
+                    await self._saver.adelete_thread(thread_id)
+                self.threads_deleted_total += len(threads)
+                if len(threads) < config.batch_size:
+                    break
+                await self._pause()
+        if config.keep_last is not None:
+            self.checkpoints_deleted_total += await self._trim_threads(config.keep_last)
+        self.writes_deleted_total += await self._delete_stale_writes()
+        self.blobs_deleted_total += await self._delete_unused_blobs()
+        self.runs_total += 1
+        self.last_run_seconds = time.monotonic() - start
+        logger.info(
+            f"Checkpoint retention pass done in {self.last_run_seconds:.1f}s — "
+            f"threads_deleted={self.threads_deleted_total}, "
+            f"checkpoints_deleted={self.checkpoints_deleted_total}"
+        )
+
+    async def _trim_threads(self, keep_last: int) -> int:
+        """Delete checkpoints beyond the last ``keep_last`` of every thread.
+
+        Threads over the limit are paged through by key, so a pass reads the
+        checkpoint index once, and every delete stays within one thread.
+        """
+        deleted = 0
+        after: tuple[str, str] | None = None
+        while True:
+            threads = await self._threads_over_limit(
+                after, keep_last, self._config.batch_size
+            )
+            for thread_id, checkpoint_ns in threads:
+                oldest_kept = await self._oldest_kept(
+                    thread_id, checkpoint_ns, keep_last
+                )
+                if oldest_kept is None:
+                    continue
+                deleted += await self._in_batches(
+                    functools.partial(
+                        self._delete_checkpoints_before,
+                        thread_id,
+                        checkpoint_ns,
+                        oldest_kept,
+                    )
+                )
+            if len(threads) < self._config.batch_size:
+                return deleted
+            after = threads[-1]
+            await self._pause()
+
+    async def _in_batches(self, delete_batch: Callable[[int], Awaitable[int]]) -> int:
+        deleted = 0
+        while True:
+            count = await delete_batch(self._config.batch_size)
+            deleted += count
+            if count < self._config.batch_size:
+                return deleted
+            await self._pause()
+
+    async def _pause(self) -> None:
+        await asyncio.sleep(self._config.batch_pause_ms / 1000)
+
+    @abstractmethod
+    async def _idle_threads(self, cutoff: str, limit: int) -> list[str]:
+        """Return up to ``limit`` threads with no checkpoint since ``cutoff``."""
+
+    @abstractmethod
+    async def _threads_over_limit(
+        self, after: tuple[str, str] | None, keep_last: int, limit: int
+    ) -> list[tuple[str, str]]:
+        """Return up to ``limit`` threads past ``after`` over ``keep_last``.
+
+        Threads are (thread_id, checkpoint_ns) keys, returned in key order.
+        """
+
+    @abstractmethod
+    async def _oldest_kept(
+        self, thread_id: str, checkpoint_ns: str, keep_last: int
+    ) -> str | None:
+        """Return the id of the oldest checkpoint ``keep_last`` keeps."""
+
+    @abstractmethod
+    async def _delete_checkpoints_before(
+        self, thread_id: str, checkpoint_ns: str, checkpoint_id: str, limit: int
+    ) -> int:
+        """Delete up to ``limit`` checkpoints of one thread older than an id."""
+
+    @abstractmethod
+    async def _delete_stale_writes(self) -> int:
+        """Delete pending writes no run can resume from."""
+
+    async def _delete_unused_blobs(self) -> int:
+        return 0
+
+    def stats(self) -> dict[str, Any]:
+        """Return what the cleanup passes deleted so far."""
+        return {
+            "runs_total": self.runs_total,
+            "failures_total": self.failures_total,
+            "threads_deleted_total": self.threads_deleted_total,
+            "checkpoints_deleted_total": self.checkpoints_deleted_total,
+            "writes_deleted_total": self.writes_deleted_total,
+            "blobs_deleted_total": self.blobs_deleted_total,
+            "last_run_seconds": self.last_run_seconds,
+        }
+
+
+class SqliteCheckpointRetention(CheckpointRetention):
+    """Retention for ``AsyncSqliteSaver`` tables (``checkpoints``, ``writes``).
+
+    Rows to delete are looked up without the saver's lock. The lock is only
+    held for each short ``DELETE``, since live runs need it for every
+    checkpoint they read or write.
+    """
+
+    async def _select(self, sql: str, params: tuple) -> list[Any]:
+        async with self._saver.conn.execute(sql, params) as cursor:
+            return list(await cursor.fetchall())
+
+    async def _delete(self, sql: str, params: tuple) -> int:
+        async with self._saver.lock:
+            async with self._saver.conn.execute(sql, params) as cursor:
+                count: int = cursor.rowcount
+            await self._saver.conn.commit()
+        return count
+
+    async def _idle_threads(self, cutoff: str, limit: int) -> list[str]:
+        rows = await self._select(
+            "SELECT thread_id FROM checkpoints GROUP BY thread_id "
+            "HAVING MAX(checkpoint_id) < ? LIMIT ?",
+            (cutoff, limit),
+        )
+        return [row[0] for row in rows]
+
+    async def _threads_over_limit(
+        self, after: tuple[str, str] | None, keep_last: int, limit: int
+    ) -> list[tuple[str, str]]:
+        where = "WHERE (thread_id, checkpoint_ns) > (?, ?) " if after else ""
+        rows = await self._select(
+            f"SELECT thread_id, checkpoint_ns FROM checkpoints {where}"
+            "GROUP BY thread_id, checkpoint_ns HAVING COUNT(*) > ? "
+            "ORDER BY thread_id, checkpoint_ns LIMIT ?",
+            (*(after or ()), keep_last, limit),
+        )
+        return [(row[0], row[1]) for row in rows]
+
+    async def _oldest_kept(
+        self, thread_id: str, checkpoint_ns: str, keep_last: int
+    ) -> str | None:
+        rows = await self._select(
+            "SELECT checkpoint_id FROM checkpoints "
+            "WHERE thread_id = ? AND checkpoint_ns = ? "
+            "ORDER BY checkpoint_id DESC LIMIT 1 OFFSET ?",
+            (thread_id, checkpoint_ns, keep_last - 1),
+        )
+        return rows[0][0] if rows else None
+
+    async def _delete_checkpoints_before(
+        self, thread_id: str, checkpoint_ns: str, checkpoint_id: str, limit: int
+    ) -> int:
+        return await self._delete(
+            """DELETE FROM checkpoints WHERE rowid IN (
+                SELECT rowid FROM checkpoints
+                WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id < ?
+                LIMIT ?
+            )""",
+            (thread_id, checkpoint_ns, checkpoint_id, limit),
+        )
+
+    async def _delete_stale_writes(self) -> int:
+        stale = (
+            "w.checkpoint_id < (SELECT MAX(c.checkpoint_id) FROM checkpoints c "
+            "WHERE c.thread_id = w.thread_id AND c.checkpoint_ns = w.checkpoint_ns)"
+            if self._config.compact_writes
+            else "0"
+        )
+        deleted = 0
+        after = 0
+        while True:
+            # Paged by rowid, so each lookup resumes where the last one ended
+            rows = await self._select(
+                f"""SELECT w.rowid FROM writes w
+                WHERE w.rowid > ? AND (
+                    NOT EXISTS (
+                        SELECT 1 FROM checkpoints c
+                        WHERE c.thread_id = w.thread_id
+                        AND c.checkpoint_ns = w.checkpoint_ns
+                        AND c.checkpoint_id = w.checkpoint_id
+                    ) OR {stale}
+                )
+                ORDER BY w.rowid LIMIT ?""",
+                (after, self._config.batch_size),
+            )
+            if rows:
+                rowids = [row[0] for row in rows]
+                placeholders = ", ".join("?" * len(rowids))
+                deleted += await self._delete(
+                    f"DELETE FROM writes WHERE rowid IN ({placeholders})",
+                    tuple(rowids),
+                )
+                after = rowids[-1]
+            if len(rows) < self._config.batch_size:
+                return deleted
+            await self._pause()
+
+
+class PostgresCheckpointRetention(CheckpointRetention):
+    """Retention for ``AsyncPostgresSaver`` tables, run on its connection pool."""
+
+    async def _execute(self, sql: str, params: tuple) -> tuple[list[Any], int]:
+        async with self._saver.conn.connection() as conn:
+            cursor = await conn.execute(sql, params)
+            rows = await cursor.fetchall() if cursor.description else []
+            return rows, cursor.rowcount
+
+    async def _idle_threads(self, cutoff: str, limit: int) -> list[str]:
+        rows, _ = await self._execute(
+            "SELECT thread_id FROM checkpoints GROUP BY thread_id "
+            "HAVING MAX(checkpoint_id) < %s LIMIT %s",
+            (cutoff, limit),
+        )
+        return [row["thread_id"] for row in rows]
+
+    async def _threads_over_limit(
+        self, after: tuple[str, str] | None, keep_last: int, limit: int
+    ) -> list[tuple[str, str]]:
+        where = "WHERE (thread_id, checkpoint_ns) > (%s, %s) " if after else ""
+        rows, _ = await self._execute(
+            f"SELECT thread_id, checkpoint_ns FROM checkpoints {where}"
+            "GROUP BY thread_id, checkpoint_ns HAVING COUNT(*) > %s "
+            "ORDER BY thread_id, checkpoint_ns LIMIT %s",
+            (*(after or ()), keep_last, limit),
+        )
+        return [(row["thread_id"], row["checkpoint_ns"]) for row in rows]
+
+    async def _oldest_kept(
+        self, thread_id: str, checkpoint_ns: str, keep_last: int
+    ) -> str | None:
+        rows, _ = await self._execute(
+            "SELECT checkpoint_id FROM checkpoints "
+            "WHERE thread_id = %s AND checkpoint_ns = %s "
+            "ORDER BY checkpoint_id DESC LIMIT 1 OFFSET %s",
+            (thread_id, checkpoint_ns, keep_last - 1),
+        )
+        return rows[0]["checkpoint_id"] if rows else None
+
+    async def _delete_checkpoints_before(
+        self, thread_id: str, checkpoint_ns: str, checkpoint_id: str, limit: int
+    ) -> int:
+        _, count = await self._execute(
+            """DELETE FROM checkpoints WHERE ctid = ANY(ARRAY(
+                SELECT ctid FROM checkpoints
+                WHERE thread_id = %s AND checkpoint_ns = %s AND checkpoint_id < %s
+                LIMIT %s
+            ))""",
+            (thread_id, checkpoint_ns, checkpoint_id, limit),
+        )
+        return count
+
+    async def _delete_stale_writes(self) -> int:
+        return await self._in_batches(self._delete_stale_writes_batch)
+
+    async def _delete_stale_writes_batch(self, limit: int) -> int:
+        stale = (
+            "w.checkpoint_id < (SELECT MAX(c.checkpoint_id) FROM checkpoints c "
+            "WHERE c.thread_id = w.thread_id AND c.checkpoint_ns = w.checkpoint_ns)"
+            if self._config.compact_writes
+            else "FALSE"
+        )
+        _, count = await self._execute(
+            f"""DELETE FROM checkpoint_writes WHERE ctid = ANY(ARRAY(
+                SELECT w.ctid FROM checkpoint_writes w
+                WHERE NOT EXISTS (
+                    SELECT 1 FROM checkpoints c
+                    WHERE c.thread_id = w.thread_id
+                    AND c.checkpoint_ns = w.checkpoint_ns
+                    AND c.checkpoint_id = w.checkpoint_id
+                ) OR {stale}
+                LIMIT %s
+            ))""",
+            (limit,),
+        )
+        return count
+
+    async def _delete_unused_blobs(self) -> int:
+        return await self._in_batches(self._delete_unused_blobs_batch)
+
+    async def _delete_unused_blobs_batch(self, limit: int) -> int:
+        # Only blobs superseded by a newer version a checkpoint refers to:
+        # a run writes its blobs just before the checkpoint that uses them
+        _, count = await self._execute(
+            """DELETE FROM checkpoint_blobs WHERE ctid = ANY(ARRAY(
+                SELECT b.ctid FROM checkpoint_blobs b
+                WHERE NOT EXISTS (
+                    SELECT 1 FROM checkpoints c
+                    WHERE c.thread_id = b.thread_id
+                    AND c.checkpoint_ns = b.checkpoint_ns
+                    AND c.checkpoint -> 'channel_versions' ->> b.channel = b.version
+                ) AND b.version < (
+                    SELECT MAX(c.checkpoint -> 'channel_versions' ->> b.channel)
+                    FROM checkpoints c
+                    WHERE c.thread_id = b.thread_id
+                    AND c.checkpoint_ns = b.checkpoint_ns
+                )
+                LIMIT %s
+            ))""",
+            (limit,),
+        )
+        return count
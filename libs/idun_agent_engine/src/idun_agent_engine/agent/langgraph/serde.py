@@ -0,0 +1,132 @@
+"""Compressing serializer for LangGraph checkpoints.
+
+Chat checkpoints are mostly message lists that grow by a few messages each
+step, serialized in full every time. ``CompressingSerializer`` wraps the
+saver's serializer and compresses what it produces with zstd or zlib before
+it is stored. That covers checkpoints and pending writes on SQLite and
+channel blobs and pending writes on PostgreSQL, so the database stores,
+and the network carries, the compressed bytes.
+
+A compressed value keeps its original type with the codec appended
+(``msgpack+zstd``). Untagged values are passed straight to the wrapped
+serializer, so existing rows stay readable, and tagged rows stay readable
+after compression is turned off or switched to another codec.
+
+zstd can use a dictionary trained on sample checkpoints (``zstd --train``).
+It pays off for the many small values that share prompts, tool schemas and
+message structure. Every frame records the id of its dictionary, and reading
+it with another dictionary fails loudly instead of returning garbage.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import zlib
+from typing import Any
+
+from idun_agent_schema.engine.langgraph import CheckpointSerializerConfig
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+
+logger = logging.getLogger(__name__)
+
+_CODECS = ("zstd", "zlib")
+
+
+class CompressingSerializer:
+    """Serializer that compresses the output of another one."""
+
+    def __init__(self, config: CheckpointSerializerConfig, serde: Any = None):
+        self._serde = serde or JsonPlusSerializer()
+        self._config = config
+        self._dictionary: Any = None
+        # zstandard (de)compressors must not be shared between threads, and
+        # async savers deserialize in worker threads
+        self._local = threading.local()
+        self.values_total = 0
+        self.compressed_total = 0
+        self.raw_bytes_total = 0
+        self.stored_bytes_total = 0
+        if config.compression == "zstd":
+            zstd = _import_zstd()
+            if config.dictionary_path is not None:
+                with open(config.dictionary_path, "rb") as f:
+                    self._dictionary = zstd.ZstdCompressionDict(f.read())
+                logger.info(
+                    f"Loaded zstd checkpoint dictionary "
+                    f"{self._dictionary.dict_id()} from {config.dictionary_path}"
+                )
+
+    def dumps_typed(self, obj: Any) -> tuple[str, bytes]:
+        type_, data = self._serde.dumps_typed(obj)
+        self.values_total += 1
+        self.raw_bytes_total += len(data)
+        codec = self._config.compression
+        if codec == "none" or len(data) < self._config.min_size_bytes:
+            self.stored_bytes_total += len(data)
+            return type_, data
+        compressed = self._compress(codec, data)
+        if len(compressed) >= len(data):
+            self.stored_bytes_total += len(data)
+            return type_, data
+        self.compressed_total += 1
+        self.stored_bytes_total += len(compressed)
+        return f"{type_}+{codec}", compressed
+
+    def loads_typed(self, data: tuple[str, bytes]) -> Any:
+        type_, payload = data
+        inner_type, _, codec = type_.rpartition("+")
+        # Other wrappers tag types the same way (msgpack+aes): leave them be
+        if codec not in _CODECS:
+            return self._serde.loads_typed(data)
+        return self._serde.loads_typed((inner_type, self._decompress(codec, payload)))
+
+    def _compress(self, codec: str, data: bytes) -> bytes:
+        if codec == "zlib":
+            return zlib.compress(data, self._config.level)
+        compressor = getattr(self._local, "compressor", None)
+        if compressor is None:
+            compressor = self._local.compressor = _import_zstd().ZstdCompressor(
+                level=self._config.level, dict_data=self._dictionary
+            )
+        compressed: bytes = compressor.compress(data)
+        return compressed
+
+    def _decompress(self, codec: str, payload: bytes) -> bytes:
+        if codec == "zlib":
+            return zlib.decompress(payload)
+        zstd = _import_zstd()
+        dict_id = zstd.get_frame_parameters(payload).dict_id
+        current_id = self._dictionary.dict_id() if self._dictionary else 0
+        if dict_id != current_id:
+            raise ValueError(
+                f"Checkpoint was compressed with zstd dictionary {dict_id}, "
+                f"but the configured dictionary is {current_id or 'none'}"
+            )
+        decompressor = getattr(self._local, "decompressor", None)
+        if decompressor is None:
+            decompressor = self._local.decompressor = zstd.ZstdDecompressor(
+                dict_data=self._dictionary
+            )
+        decompressed: bytes = decompressor.decompress(payload)
+        return decompressed
+
+    def stats(self) -> dict[str, Any]:
+        """Return how much the serialized checkpoint data was compressed."""
+        return {
+            "compression": self._config.compression,
+            "values_total": self.values_total,
+            "compressed_total": self.compressed_total,
+            "raw_bytes_total": self.raw_bytes_total,
+            "stored_bytes_total": self.stored_bytes_total,
+        }
+
+
+def _import_zstd() -> Any:
+    try:
+        import zstandard
+    except ImportError as e:
+        raise ImportError(
+            "Please install 'zstandard' to use zstd checkpoint compression."
+        ) from e
+    return zstandard
@@ -0,0 +1,250 @@
+"""SQLite checkpointer tuned for concurrent runs.
+
+``AsyncSqliteSaver`` sends every read and write through one connection, and
+each write commits on its own. With ``concurrency.enabled`` the engine uses
+``ConcurrentSqliteSaver`` instead:
+
+- Reads (``aget_tuple``, ``alist``) go to a small pool of read-only
+  connections. Under WAL journaling they never wait for the writer.
+- Writes from concurrent runs are queued to a single writer connection. They
+  run back to back in one shared transaction, with one commit per batch
+  instead of one per write.
+- The ``synchronous``, ``mmap_size`` and ``busy_timeout`` pragmas come from
+  the config.
+
+Each caller still waits until its own write is committed, so a run reads back
+what it wrote.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+from collections.abc import AsyncIterator, Awaitable, Callable
+from typing import Any
+
+import aiosqlite
+from idun_agent_schema.engine.langgraph import SqliteConcurrencyConfig
+from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+
+logger = logging.getLogger(__name__)
+
+# A queued write and the future its caller awaits
+_Write = tuple[Callable[[], Awaitable[Any]], asyncio.Future]
+
+
+class _DeferredCommitConnection:
+    """Writer connection whose commits are held back while a batch runs.
+
+    ``AsyncSqliteSaver`` commits after every write. Inside a batch those
+    commits are skipped, and the batch commits once at the end.
+    """
+
+    def __init__(self, conn: aiosqlite.Connection):
+        self._conn = conn
+        self.deferring = False
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._conn, name)
+
+    def __await__(self):
+        return self._conn.__await__()
+
+    async def commit(self) -> None:
+        if not self.deferring:
+            await self._conn.commit()
+
+
+class ConcurrentSqliteSaver(AsyncSqliteSaver):
+    """``AsyncSqliteSaver`` with a reader pool and group-committed writes."""
+
+    def __init__(
+        self,
+        writer: aiosqlite.Connection,
+        readers: list[aiosqlite.Connection],
+        config: SqliteConcurrencyConfig,
+        *,
+        serde: Any = None,
+    ):
+        self._writer = _DeferredCommitConnection(writer)
+        super().__init__(self._writer, serde=serde)  # type: ignore[arg-type]
+        self._config = config
+        self._reader_conns = readers
+        self._readers: asyncio.Queue[AsyncSqliteSaver] = asyncio.Queue()
+        for reader in readers:
+            saver = AsyncSqliteSaver(reader, serde=self.serde)
+            # Tables are created through the writer
+            saver.is_setup = True
+            self._readers.put_nowait(saver)
+        self._writes: asyncio.Queue[_Write] = asyncio.Queue()
+        self._write_task: asyncio.Task | None = None
+        self._batch: list[_Write] = []
+        self.batches_total = 0
+        self.writes_total = 0
+
+    @classmethod
+    async def open(
+        cls, db_path: str, config: SqliteConcurrencyConfig, *, serde: Any = None
+    ) -> ConcurrentSqliteSaver:
+        """Connect the writer and readers to ``db_path`` and create the tables."""
+        writer = await _connect(db_path, config, read_only=False)
+        readers = [
+            await _connect(db_path, config, read_only=True)
+            for _ in range(config.read_connections)
+        ]
+        saver = cls(writer, readers, config, serde=serde)
+        await saver.setup()
+        saver._write_task = asyncio.create_task(saver._run_writes())
+        logger.info(
+            f"SQLite checkpointer opened in concurrent mode — "
+            f"readers={config.read_connections}, "
+            f"max_write_batch={config.max_write_batch}"
+        )
+        return saver
+
+    @contextlib.asynccontextmanager
+    async def _reader(self) -> AsyncIterator[AsyncSqliteSaver]:
+        reader = await self._readers.get()
+        try:
+            yield reader
+        finally:
+            self._readers.put_nowait(reader)
+
+    async def aget_tuple(self, config: Any) -> Any:
+        async with self._reader() as reader:
+            return await reader.aget_tuple(config)
+
+    async def alist(
+        self,
+        config: Any,
+        *,
+        filter: dict[str, Any] | None = None,
+        before: Any = None,
+        limit: int | None = None,
+    ) -> AsyncIterator[Any]:
+        async with self._reader() as reader:
+            async for item in reader.alist(
+                config, filter=filter, before=before, limit=limit
+            ):
+                yield item
+
+    async def aput(
+        self, config: Any, checkpoint: Any, metadata: Any, new_versions: Any
+    ) -> Any:
+        return await self._write(
+            lambda: super(ConcurrentSqliteSaver, self).aput(
+                config, checkpoint, metadata, new_versions
+            )
+        )
+
+    async def aput_writes(
+        self, config: Any, writes: Any, task_id: str, task_path: str = ""
+    ) -> None:
+        await self._write(
+            lambda: super(ConcurrentSqliteSaver, self).aput_writes(
+                config, writes, task_id, task_path
+            )
+        )
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        await self._write(
+            lambda: super(ConcurrentSqliteSaver, self).adelete_thread(thread_id)
+        )
+
+    async def _write(self, operation: Callable[[], Awaitable[Any]]) -> Any:
+        if self._write_task is None or self._write_task.done():
+            raise RuntimeError("SQLite checkpointer is closed")
+        future = asyncio.get_running_loop().create_future()
+        self._writes.put_nowait((operation, future))
+        return await future
+
+    async def _run_writes(self) -> None:
+        """Run queued writes in batches, committing once per batch."""
+        loop = asyncio.get_running_loop()
+        max_delay = self._config.max_write_delay_ms / 1000
+        while True:
+            batch = [await self._writes.get()]
+            deadline = loop.time() + max_delay
+            while len(batch) < self._config.max_write_batch:
+                if not self._writes.empty():
+                    batch.append(self._writes.get_nowait())
+                    continue
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._writes.get(), remaining))
+                except TimeoutError:
+                    break
+            self._batch = batch
+            await self._commit_batch(batch)
+            self._batch = []
+
+    async def _commit_batch(self, batch: list[_Write]) -> None:
+        results: list[tuple[asyncio.Future, Any, BaseException | None]] = []
+        self._writer.deferring = True
+        try:
+            for operation, future in batch:
+                try:
+                    results.append((future, await operation(), None))
+                except Exception as e:  # noqa: BLE001
+                    # SQLite undoes just the failed statement; the rest commit
+                    results.append((future, None, e))
+        finally:
+            self._writer.deferring = False
+        try:
+            await self._writer.commit()
+        except Exception as e:  # noqa: BLE001
+            logger.error(f"SQLite checkpoint batch commit failed: {e}", exc_info=True)
+            with contextlib.suppress(Exception):
+                await self._writer.rollback()
+            results = [(future, None, e) for future, _, _ in results]
+        self.batches_total += 1
+        self.writes_total += len(batch)
+        for future, result, error in results:
+            if future.done():
+                continue
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+
+    async def close(self) -> None:
+        """Stop the writer loop and close every connection."""
+        if self._write_task is not None:
+            self._write_task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._write_task
+        unfinished = [future for _, future in self._batch]
+        while not self._writes.empty():
+            unfinished.append(self._writes.get_nowait()[1])
+        for future in unfinished:
+            if not future.done():
+                future.set_exception(RuntimeError("SQLite checkpointer is closed"))
+        for conn in [self._writer._conn, *self._reader_conns]:
+            await conn.close()
+
+    def stats(self) -> dict[str, Any]:
+        """Return how many writes were committed and in how many batches."""
+        return {
+            "readers": len(self._reader_conns),
+            "pending_writes": self._writes.qsize(),
+            "writes_total": self.writes_total,
+            "batches_total": self.batches_total,
+        }
+
+
+async def _connect(
+    db_path: str, config: SqliteConcurrencyConfig, *, read_only: bool
+) -> aiosqlite.Connection:
+    conn = await aiosqlite.connect(db_path)
+    pragmas = [
+        f"PRAGMA busy_timeout={config.busy_timeout_ms};",
+        f"PRAGMA synchronous={config.synchronous};",
+        f"PRAGMA mmap_size={config.mmap_size_mb * 1024 * 1024};",
+        "PRAGMA query_only=ON;" if read_only else "PRAGMA journal_mode=WAL;",
+    ]
+    # executescript leaves no open statement behind to hold a lock
+    await conn.executescript("\n".join(pragmas))
+    return conn
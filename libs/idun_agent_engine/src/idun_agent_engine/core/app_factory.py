@@ -5,6 +5,7 @@ application with their agent integrated. It handles all the complexity of
 setting up routes, dependencies, and lifecycle management behind the scenes.
 """
 
+import os
 from collections.abc import Awaitable, Callable
 from typing import Any
 
@@ -14,12 +15,17 @@ from starlette.requests import Request
 from starlette.responses import Response
 
 from .._version import __version__
+from ..server.generations import GenerationLeaseMiddleware
 from ..server.lifespan import lifespan
 from ..server.routers.agent import agent_router, register_invoke_route
 from ..server.routers.base import base_router
 from .config_builder import ConfigBuilder
 from .engine_config import EngineConfig
 
+# Environment variable used to hand the resolved EngineConfig (as JSON) from
+# the server runner to uvicorn worker processes.
+ENGINE_CONFIG_ENV_VAR = "IDUN_ENGINE_CONFIG"
+
 
 def create_app(
     config_path: str | None = None,
@@ -75,6 +81,10 @@ def create_app(
         allow_headers=["*"],
     )
 
+    # Keep the agent generation a request started on open until its response
+    # is fully sent, so /reload can drain the previous agent safely
+    app.add_middleware(GenerationLeaseMiddleware)
+
     @app.middleware("http")
     async def allow_private_network_access(
         request: Request, call_next: Callable[[Request], Awaitable[Response]]
@@ -125,3 +135,36 @@ def create_app(
                     pass
 
     return app
+
+
+def create_app_from_env() -> FastAPI:
+    """Create a FastAPI application from the config stored in the environment.
+
+    This is the importable factory used by uvicorn worker processes in
+    multi-worker mode (``uvicorn.run(..., factory=True, workers=N)``). The
+    parent process serializes its EngineConfig into ``IDUN_ENGINE_CONFIG`` so
+    every worker builds the same app without re-reading files or re-fetching
+    the config from the manager. Each worker then runs its own lifespan and
+    initializes its own agent, MCP registry and guardrails.
+
+    Returns:
+        FastAPI: A configured FastAPI application.
+
+    Raises:
+        ValueError: If the environment variable is missing or invalid.
+    """
+    raw_config = os.getenv(ENGINE_CONFIG_ENV_VAR)
+    if not raw_config:
+        raise ValueError(
+            f"Environment variable {ENGINE_CONFIG_ENV_VAR} is not set. "
+            "Start worker processes through run_server()."
+        )
+
+    try:
+        engine_config = EngineConfig.model_validate_json(raw_config)
+    except Exception as e:
+        raise ValueError(
+            f"Invalid engine config in {ENGINE_CONFIG_ENV_VAR}: {e}"
+        ) from e
+
+    return create_app(engine_config=engine_config)
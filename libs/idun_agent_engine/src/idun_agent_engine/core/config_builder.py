@@ -4,6 +4,7 @@ This module provides a fluent API for building configuration objects using Pydan
 This approach ensures type safety, validation, and consistency with the rest of the codebase.
 """
 
+import inspect
 import logging
 import os
 from pathlib import Path
@@ -423,10 +424,23 @@ class ConfigBuilder:
             raise ValueError(f"Unsupported agent type: {agent_type}")
 
         # Initialize the agent with its configuration
-        await agent_instance.initialize(
-            validated_config,
-            observability_config,  # , mcp_registry=mcp_registry
-        )  # type: ignore[arg-type]
+        try:
+            await agent_instance.initialize(
+                validated_config,
+                observability_config,  # , mcp_registry=mcp_registry
+            )  # type: ignore[arg-type]
+        except Exception:
+            # Release whatever was opened before the failure (e.g. checkpointer
+            # connections) so a failed reload does not leak it
+            close_fn = getattr(agent_instance, "close", None)
+            if callable(close_fn):
+                try:
+                    result = close_fn()
+                    if inspect.isawaitable(result):
+                        await result
+                except Exception:
+                    logger.warning("Failed to close partially initialized agent")
+            raise
         return agent_instance
 
     @staticmethod
@@ -0,0 +1,45 @@
+"""Per-section comparison of engine configurations.
+
+Used by ``/reload`` to rebuild only the components whose configuration
+changed.
+"""
+
+from typing import Any
+
+from pydantic import BaseModel
+
+from .engine_config import EngineConfig
+
+ENGINE_CONFIG_SECTIONS: tuple[str, ...] = (
+    "server",
+    "agent",
+    "mcp_servers",
+    "guardrails",
+    "observability",
+    "sso",
+    "integrations",
+    "prompts",
+)
+
+
+def _normalize(value: Any) -> Any:
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    if isinstance(value, list | tuple):
+        return [_normalize(item) for item in value]
+    return value
+
+
+def changed_sections(old: EngineConfig | None, new: EngineConfig) -> set[str]:
+    """Return the names of the top-level sections that differ between two configs.
+
+    Every section counts as changed when there is no previous config.
+    """
+    if old is None:
+        return set(ENGINE_CONFIG_SECTIONS)
+    return {
+        section
+        for section in ENGINE_CONFIG_SECTIONS
+        if _normalize(getattr(old, section, None))
+        != _normalize(getattr(new, section, None))
+    }
@@ -4,6 +4,9 @@ This module provides convenient functions to run FastAPI applications created wi
 the Idun Agent Engine. It handles common deployment scenarios and provides sensible defaults.
 """
 
+import os
+from typing import Any
+
 import uvicorn
 from fastapi import FastAPI
 
@@ -19,12 +22,19 @@ def run_server(
     reload: bool = False,
     log_level: str = "info",
     workers: int | None = None,
+    timeout_graceful_shutdown: int | None = None,
 ) -> None:
     """Run a FastAPI application created with Idun Agent Engine.
 
     This is a convenience function that wraps uvicorn.run() with sensible defaults
     for serving agent applications. It automatically handles common deployment scenarios.
 
+    With ``workers > 1`` the engine runs in pre-fork mode: the app's EngineConfig
+    is handed to uvicorn worker processes, each of which rebuilds the app through
+    ``create_app_from_env`` and runs its own lifespan (agent, MCP registry,
+    guardrails). Routes or middleware added to ``app`` after ``create_app()`` are
+    not carried over to the workers.
+
     Args:
         app: The FastAPI application created with create_app()
         host: Host to bind the server to. Defaults to "0.0.0.0" (all interfaces)
@@ -32,6 +42,8 @@ def run_server(
         reload: Enable auto-reload for development. Defaults to False
         log_level: Logging level. Defaults to "info"
         workers: Number of worker processes. If None, uses single process
+        timeout_graceful_shutdown: Seconds to wait for in-flight requests
+            before workers are stopped. If None, waits until they complete
 
     Example:
         from idun_agent_engine import create_app, run_server
@@ -50,18 +62,66 @@ def run_server(
     logger.info(f"🌐 Starting Idun Agent Engine server on http://{host}:{port}...")
     logger.info(f"📚 API documentation available at http://{host}:{port}/docs")
 
-    if reload and workers:
+    if reload and workers and workers > 1:
         logger.warning(
             "⚠️ reload=True is incompatible with workers > 1. Disabling reload."
         )
         reload = False
 
+    extra_kwargs: dict[str, Any] = {}
+    if timeout_graceful_shutdown is not None:
+        extra_kwargs["timeout_graceful_shutdown"] = timeout_graceful_shutdown
+
     logger.debug(f"Engine config: {app.state.engine_config}")
+
+    if workers and workers > 1:
+        _run_workers(app, host, port, log_level, workers, **extra_kwargs)
+        return
+
     uvicorn.run(
         app,
         host=host,
         port=port,
         log_level=log_level,
+        **extra_kwargs,
+    )
+
+
+def _run_workers(
+    app: FastAPI,
+    host: str,
+    port: int,
+    log_level: str,
+    workers: int,
+    **kwargs: Any,
+) -> None:
+    """Serve the app's config with several uvicorn worker processes.
+
+    uvicorn needs an import string to spawn workers, so the EngineConfig is
+    serialized into the environment (inherited by the children) and each worker
+    builds its own app via the ``create_app_from_env`` factory. uvicorn's
+    supervisor forwards SIGINT/SIGTERM to the workers, which run their lifespan
+    shutdown before exiting.
+    """
+    from .app_factory import ENGINE_CONFIG_ENV_VAR
+
+    engine_config = getattr(app.state, "engine_config", None)
+    if engine_config is None:
+        raise ValueError(
+            "Multi-worker mode requires an app created with create_app()."
+        )
+
+    os.environ[ENGINE_CONFIG_ENV_VAR] = engine_config.model_dump_json()
+    logger.info(f"👷 Starting {workers} worker processes...")
+
+    uvicorn.run(
+        "idun_agent_engine.core.app_factory:create_app_from_env",
+        factory=True,
+        host=host,
+        port=port,
+        log_level=log_level,
+        workers=workers,
+        **kwargs,
     )
 
 
@@ -91,6 +151,8 @@ def run_server_from_config(config_path: str = "config.yaml", **kwargs) -> None:
     # Extract port from config if not overridden
     if "port" not in kwargs:
         kwargs["port"] = engine_config.server.api.port
+    if "workers" not in kwargs:
+        kwargs["workers"] = engine_config.server.api.workers
 
     # Show configuration info
     agent_name = (
@@ -137,6 +199,8 @@ def run_server_from_builder(config_builder, **kwargs) -> None:
     # Extract port from config if not overridden
     if "port" not in kwargs:
         kwargs["port"] = engine_config.server.api.port
+    if "workers" not in kwargs:
+        kwargs["workers"] = engine_config.server.api.workers
 
     # Show configuration info
     agent_name = (
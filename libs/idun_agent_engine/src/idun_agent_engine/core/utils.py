@@ -1,5 +1,8 @@
 """Engine utility functions."""
 
+import sys
+from typing import Any
+
 from .._version import __version__
 
 _ART = r"""    ____    __               ___                    __     ____  __      __  ____
@@ -58,3 +61,14 @@ def print_banner() -> None:
     output += f"{border_color}╚{'═' * _WIDTH}╝{_RESET}"
 
     print(output)  # noqa: T201
+
+
+def is_loaded_instance(obj: Any, module: str, name: str) -> bool:
+    """Return ``isinstance(obj, module.name)`` without importing ``module``.
+
+    Framework packages are only imported for the configured agent type. If
+    ``module`` has never been loaded, ``obj`` cannot be one of its instances.
+    """
+    loaded = sys.modules.get(module)
+    cls = getattr(loaded, name, None) if loaded is not None else None
+    return isinstance(cls, type) and isinstance(obj, cls)
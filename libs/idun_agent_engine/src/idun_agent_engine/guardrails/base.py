@@ -1,9 +1,21 @@
 from abc import ABC, abstractmethod
-from typing import Any
+from typing import Any, Protocol
 
 from idun_agent_schema.engine.guardrails_v2 import GuardrailConfig as Guardrail
 
 
+class Guard(Protocol):
+    """What the engine needs of a guard: hub guards, fast tiers and worker proxies."""
+
+    @property
+    def position(self) -> str: ...
+
+    @property
+    def reject_message(self) -> str | None: ...
+
+    def validate(self, input: str, /) -> bool: ...
+
+
 class BaseGuardrail(ABC):
     """Base class for different guardrail providers."""
 
@@ -0,0 +1,101 @@
+"""Micro-batching of guardrail checks across concurrent requests.
+
+Under load, a ``GuardrailBatcher`` collects the texts that concurrent
+requests send to the same guard for a few milliseconds, or until the batch
+is full, and validates them with one batched inference call on the worker
+pool. Each request then gets its own verdict back, and identical texts in a
+batch are validated once.
+
+Only guards that implement ``validate_batch(texts)``, returning one verdict
+per text, are batched. Guards without it, which includes every guardrails-ai
+hub guard, keep one pool job per text: running their texts one after another
+in a single job would give up the pool's parallelism.
+"""
+
+import asyncio
+from collections.abc import Awaitable, Callable, Sequence
+from typing import Any
+
+from idun_agent_schema.engine.server import GuardrailBatchingConfig
+
+
+def supports_batching(guard: Any) -> bool:
+    """Whether ``guard`` validates several texts in one call."""
+    return callable(getattr(guard, "validate_batch", None))
+
+
+def validate_batch(guard: Any, texts: Sequence[str]) -> list[bool]:
+    """Validate ``texts`` with one call to ``guard.validate_batch``."""
+    verdicts = [bool(verdict) for verdict in guard.validate_batch(list(texts))]
+    if len(verdicts) != len(texts):
+        raise ValueError(
+            f"Guardrail '{getattr(guard, 'guard_id', guard)}' returned "
+            f"{len(verdicts)} verdicts for {len(texts)} texts"
+        )
+    return verdicts
+
+
+class GuardrailBatcher:
+    """Collects texts for one guard and validates them in batches.
+
+    ``run_batch`` runs the blocking ``validate_batch`` call (on the worker
+    pool) and returns the verdicts for the distinct texts it was given.
+    ``on_batch`` is called with the size of every batch that is validated.
+    """
+
+    def __init__(
+        self,
+        guard: Any,
+        config: GuardrailBatchingConfig,
+        run_batch: Callable[[Any, list[str]], Awaitable[list[bool]]],
+        on_batch: Callable[[int], None] | None = None,
+    ):
+        self.guard = guard
+        self.config = config
+        self._run_batch = run_batch
+        self._on_batch = on_batch
+        self._waiting: list[tuple[str, asyncio.Future[bool]]] = []
+        self._timer: asyncio.TimerHandle | None = None
+        self._tasks: set[asyncio.Task] = set()
+
+    async def submit(self, text: str) -> bool:
+        """Queue ``text`` for the next batch and wait for its verdict."""
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future[bool] = loop.create_future()
+        self._waiting.append((text, future))
+        if len(self._waiting) >= self.config.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.config.max_wait_ms / 1000, self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        # Requests that gave up (deadline, short-circuit) no longer need a verdict
+        batch = [(text, future) for text, future in self._waiting if not future.done()]
+        self._waiting = []
+        if not batch:
+            return
+        task = asyncio.get_running_loop().create_task(self._run(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: list[tuple[str, asyncio.Future[bool]]]) -> None:
+        # Identical texts (retries, shared system prompts) are validated once
+        texts = list(dict.fromkeys(text for text, _ in batch))
+        if self._on_batch is not None:
+            self._on_batch(len(texts))
+        try:
+            verdicts = dict(
+                zip(texts, await self._run_batch(self.guard, texts), strict=True)
+            )
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for text, future in batch:
+            if not future.done():
+                future.set_result(verdicts[text])
@@ -0,0 +1,234 @@
+"""Guardrail evaluation off the event loop.
+
+Hub validators such as ToxicLanguage or DetectPII run model inference inside
+``validate``. Called from a route, that blocks the event loop and stalls every
+stream in flight. The ``GuardrailExecutor`` runs validators in a dedicated
+worker pool instead. The guards for one position run concurrently, each with
+its own deadline, and the check returns as soon as one of them rejects.
+Guards hosted in worker processes (see ``worker_pool``) are awaited directly.
+With batching enabled, concurrent checks against the same guard are grouped
+into one worker pool job (see ``batching``). Fast tiers (see ``fast_tier``)
+are checked inline before any of that, since they take microseconds, and
+texts a guard has already judged are answered from the ``VerdictCache``.
+"""
+
+import asyncio
+import logging
+import time
+import weakref
+from collections.abc import Sequence
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+from idun_agent_schema.engine.server import GuardrailExecutionConfig
+
+from .batching import GuardrailBatcher, supports_batching, validate_batch
+from .fast_tier import FastTier
+from .verdict_cache import VerdictCache, text_hash
+from .worker_pool import RemoteGuard
+
+logger = logging.getLogger(__name__)
+
+
+class GuardrailExecutor:
+    """Runs guardrail validators concurrently in a bounded worker pool."""
+
+    def __init__(self, config: GuardrailExecutionConfig | None = None):
+        self._config = config or GuardrailExecutionConfig()
+        # Created on first use, so engines without guardrails start no threads
+        self._pool: ThreadPoolExecutor | None = None
+        self._batchers: weakref.WeakKeyDictionary[Any, GuardrailBatcher] = (
+            weakref.WeakKeyDictionary()
+        )
+        self._checks_total = 0
+        self._rejections_total = 0
+        self._timeouts_total = 0
+        self._errors_total = 0
+        self._in_flight = 0
+        self._validate_seconds_total = 0.0
+        self._validate_seconds_max = 0.0
+        self._batches_total = 0
+        self._batched_texts_total = 0
+        self._batch_size_max = 0
+        self._fast_rejections_total = 0
+        self._hub_skipped_total = 0
+        self._verdicts = VerdictCache(self._config.verdict_cache)
+
+    @property
+    def config(self) -> GuardrailExecutionConfig:
+        return self._config
+
+    def _get_pool(self) -> ThreadPoolExecutor:
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(
+                max_workers=self._config.max_workers, thread_name_prefix="guardrail"
+            )
+        return self._pool
+
+    def configure(self, config: GuardrailExecutionConfig) -> None:
+        """Apply new limits. Validations already running finish on the old pool."""
+        resize = config.max_workers != self._config.max_workers
+        self._config = config
+        # Batches already collected finish with the settings they started with
+        self._batchers = weakref.WeakKeyDictionary()
+        self._verdicts.configure(config.verdict_cache)
+        if resize and self._pool is not None:
+            old_pool, self._pool = self._pool, None
+            old_pool.shutdown(wait=False)
+
+    def clear_verdicts(self) -> None:
+        """Forget cached verdicts, e.g. after the guardrails were rebuilt."""
+        self._verdicts.clear()
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    @staticmethod
+    def _timed_validate(guard: Any, text: str) -> tuple[bool, float]:
+        started = time.perf_counter()
+        allowed = guard.validate(text)
+        return allowed, time.perf_counter() - started
+
+    def _batcher(self, guard: Any) -> GuardrailBatcher:
+        batcher = self._batchers.get(guard)
+        if batcher is None:
+            batcher = self._batchers[guard] = GuardrailBatcher(
+                guard, self._config.batching, self._run_batch, self._record_batch
+            )
+        return batcher
+
+    async def _run_batch(self, guard: Any, texts: list[str]) -> list[bool]:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._get_pool(), validate_batch, guard, texts
+        )
+
+    def _record_batch(self, size: int) -> None:
+        self._batches_total += 1
+        self._batched_texts_total += size
+        self._batch_size_max = max(self._batch_size_max, size)
+
+    async def _validate(self, guard: Any, text: str) -> tuple[Any, bool | None]:
+        """Run one guard. Errors and timeouts return None, which rejects (fail-closed)."""
+        loop = asyncio.get_running_loop()
+        self._in_flight += 1
+        try:
+            async with asyncio.timeout(self._config.timeout_seconds):
+                if isinstance(guard, RemoteGuard):
+                    # Validated in a worker process; no thread needed to wait
+                    started = time.perf_counter()
+                    allowed = await asyncio.wrap_future(guard.submit(text))
+                    elapsed = time.perf_counter() - started
+                elif self._config.batching.enabled and supports_batching(guard):
+                    started = time.perf_counter()
+                    allowed = await self._batcher(guard).submit(text)
+                    elapsed = time.perf_counter() - started
+                else:
+                    allowed, elapsed = await loop.run_in_executor(
+                        self._get_pool(), self._timed_validate, guard, text
+                    )
+        except TimeoutError:
+            self._timeouts_total += 1
+            logger.warning(
+                f"Guardrail '{getattr(guard, 'guard_id', guard)}' did not finish "
+                f"within {self._config.timeout_seconds}s; rejecting (fail-closed)."
+            )
+            return guard, None
+        except Exception:
+            self._errors_total += 1
+            logger.exception(
+                f"Guardrail '{getattr(guard, 'guard_id', guard)}' raised during "
+                "validation; rejecting (fail-closed)."
+            )
+            return guard, None
+        finally:
+            self._in_flight -= 1
+        self._validate_seconds_total += elapsed
+        self._validate_seconds_max = max(self._validate_seconds_max, elapsed)
+        return guard, bool(allowed)
+
+    async def first_rejection(self, guards: Sequence[Any], text: str) -> Any | None:
+        """Validate ``text`` against ``guards`` concurrently.
+
+        Returns the first guard to reject, or None if all of them allow the
+        text. Guards still running when one rejects are abandoned. A hit in a
+        fast tier returns the ``FastRule`` that matched, and no hub guard runs.
+        """
+        if not guards:
+            return None
+        self._checks_total += 1
+        hub_guards = []
+        skip_hub = False
+        for guard in guards:
+            if not isinstance(guard, FastTier):
+                hub_guards.append(guard)
+                continue
+            hit = guard.first_hit(text)
+            if hit is not None:
+                self._rejections_total += 1
+                self._fast_rejections_total += 1
+                return hit
+            skip_hub = skip_hub or guard.skips_hub(text)
+        if not hub_guards:
+            return None
+        if skip_hub:
+            self._hub_skipped_total += 1
+            return None
+
+        cache_keys: dict[int, tuple[str, str, str]] = {}
+        if self._verdicts.enabled:
+            digest = text_hash(text)
+            uncached = []
+            for guard in hub_guards:
+                key = self._verdicts.key_for(guard, digest)
+                verdict = self._verdicts.get(key) if key is not None else None
+                if verdict is False:
+                    self._rejections_total += 1
+                    return guard
+                if verdict is None:
+                    uncached.append(guard)
+                    if key is not None:
+                        cache_keys[id(guard)] = key
+            hub_guards = uncached
+            if not hub_guards:
+                return None
+
+        tasks = [
+            asyncio.ensure_future(self._validate(guard, text)) for guard in hub_guards
+        ]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                guard, allowed = await next_done
+                key = cache_keys.get(id(guard))
+                if key is not None and allowed is not None:
+                    self._verdicts.put(key, allowed)
+                if not allowed:
+                    self._rejections_total += 1
+                    return guard
+            return None
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    def stats(self) -> dict[str, Any]:
+        """Return counters for ``/metrics``."""
+        return {
+            "max_workers": self._config.max_workers,
+            "timeout_seconds": self._config.timeout_seconds,
+            "in_flight": self._in_flight,
+            "checks_total": self._checks_total,
+            "rejections_total": self._rejections_total,
+            "timeouts_total": self._timeouts_total,
+            "errors_total": self._errors_total,
+            "validate_seconds_total": round(self._validate_seconds_total, 6),
+            "validate_seconds_max": round(self._validate_seconds_max, 6),
+            "batching": self._config.batching.enabled,
+            "batches_total": self._batches_total,
+            "batched_texts_total": self._batched_texts_total,
+            "batch_size_max": self._batch_size_max,
+            "fast_tier_rejections_total": self._fast_rejections_total,
+            "hub_skipped_total": self._hub_skipped_total,
+            "verdict_cache": self._verdicts.stats(),
+        }
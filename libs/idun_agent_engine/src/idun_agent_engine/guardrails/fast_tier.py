@@ -0,0 +1,203 @@
+"""In-process pre-filter for keyword and pattern guardrails.
+
+BanList and CompetitorCheck block texts that contain a configured word, and
+DetectPII catches emails, phone and card numbers with patterns. Running them
+through the hub validator stack costs a model or NLP pipeline call per
+request. The ``FastTier`` of a position checks the same words and patterns
+in-process first:
+
+* Each ban list or competitor list is compiled into a single regex built from
+  a trie of its words. Like an Aho-Corasick automaton, it scans the text once
+  without backtracking between alternatives, however many words there are.
+* Supported PII entities use precompiled regexes, with digit-count and Luhn
+  checks to keep false positives down.
+
+A hit rejects the text with the reject message of the guard that defined the
+word or entity. Clean texts still go through the hub validators, unless
+``skip_hub_when_clean`` lets short clean texts skip them.
+"""
+
+import re
+from collections.abc import Callable, Iterable, Sequence
+from typing import Any
+
+from idun_agent_schema.engine.guardrails_v2 import (
+    GuardrailConfigId,
+    GuardrailFastTierConfig,
+)
+
+
+def compile_keywords(words: Iterable[str]) -> re.Pattern[str] | None:
+    """Compile ``words`` into one case-insensitive, whole-word pattern.
+
+    Returns None if there is nothing to match.
+    """
+    trie: dict[str, Any] = {}
+    for word in words:
+        word = word.strip().casefold()
+        if not word:
+            continue
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = {}
+    if not trie:
+        return None
+    return re.compile(rf"(?<!\w){_trie_pattern(trie)}(?!\w)", re.IGNORECASE)
+
+
+def _trie_pattern(node: dict[str, Any]) -> str:
+    ends_here = "" in node
+    branches = [
+        re.escape(char) + _trie_pattern(child)
+        for char, child in sorted(node.items())
+        if char
+    ]
+    if not branches:
+        return ""
+    pattern = branches[0] if len(branches) == 1 else f"(?:{'|'.join(branches)})"
+    if ends_here:
+        return f"(?:{pattern})?"
+    return pattern
+
+
+def _luhn_valid(number: str) -> bool:
+    digits = [int(d) for d in number if d.isdigit()]
+    checksum = 0
+    for i, digit in enumerate(reversed(digits)):
+        if i % 2:
+            digit *= 2
+            if digit > 9:
+                digit -= 9
+        checksum += digit
+    return checksum % 10 == 0
+
+
+def _digit_count_between(low: int, high: int) -> Callable[[str], bool]:
+    def check(match: str) -> bool:
+        return low <= sum(char.isdigit() for char in match) <= high
+
+    return check
+
+
+# Entity name (as accepted by DetectPII) -> pattern and an optional check of
+# the matched text
+PII_PATTERNS: dict[str, tuple[re.Pattern[str], Callable[[str], bool] | None]] = {
+    "EMAIL_ADDRESS": (
+        re.compile(r"[\w.+-]+@[\w-]+(?:\.[\w-]+)*\.[A-Za-z]{2,}"),
+        None,
+    ),
+    "PHONE_NUMBER": (
+        re.compile(
+            r"(?<![\w+])\+?(?:\(\d{1,4}\)|\d)(?:[\s.-]?(?:\(\d{1,4}\)|\d)){7,16}(?!\w)"
+        ),
+        _digit_count_between(9, 15),
+    ),
+    "CREDIT_CARD": (
+        re.compile(r"(?<!\d)\d(?:[ -]?\d){12,18}(?!\d)"),
+        _luhn_valid,
+    ),
+    "SSN": (re.compile(r"(?<!\d)\d{3}-\d{2}-\d{4}(?!\d)"), None),
+    "IP_ADDRESS": (
+        re.compile(
+            r"(?<![\d.])(?:(?:25[0-5]|2[0-4]\d|1?\d?\d)\.){3}(?:25[0-5]|2[0-4]\d|1?\d?\d)(?![\d.])"
+        ),
+        None,
+    ),
+}
+PII_ALIASES = {
+    "Email": "EMAIL_ADDRESS",
+    "Phone Number": "PHONE_NUMBER",
+    "Credit Card": "CREDIT_CARD",
+    "US_SSN": "SSN",
+}
+
+
+class FastRule:
+    """One compiled check, rejecting with the message of the guard it came from."""
+
+    def __init__(
+        self,
+        guard_id: Any,
+        reject_message: str | None,
+        patterns: Sequence[tuple[re.Pattern[str], Callable[[str], bool] | None]],
+    ):
+        self.guard_id = guard_id
+        self.reject_message = reject_message
+        self._patterns = patterns
+
+    def matches(self, text: str) -> bool:
+        for pattern, check in self._patterns:
+            for match in pattern.finditer(text):
+                if check is None or check(match.group()):
+                    return True
+        return False
+
+    def __repr__(self) -> str:
+        return f"FastRule({self.guard_id!r})"
+
+
+def rule_for(config: Any) -> FastRule | None:
+    """Build the fast rule for a guard config, or None if it has no fast form."""
+    config_id = getattr(config, "config_id", None)
+    reject_message = getattr(config, "reject_message", None)
+    if config_id == GuardrailConfigId.BAN_LIST:
+        words = config.banned_words
+    elif config_id == GuardrailConfigId.COMPETITION_CHECK:
+        words = config.competitors
+    elif config_id == GuardrailConfigId.DETECT_PII:
+        entities = {PII_ALIASES.get(e, e) for e in config.pii_entities}
+        patterns = [PII_PATTERNS[e] for e in sorted(entities) if e in PII_PATTERNS]
+        return FastRule(config_id, reject_message, patterns) if patterns else None
+    else:
+        return None
+    pattern = compile_keywords(words)
+    return FastRule(config_id, reject_message, [(pattern, None)]) if pattern else None
+
+
+class FastTier:
+    """The fast rules of one position, checked inline before the hub validators."""
+
+    # A rejection carries the message of the rule that matched
+    reject_message: str | None = None
+
+    def __init__(
+        self, position: str, rules: Sequence[FastRule], config: GuardrailFastTierConfig
+    ):
+        self.position = position
+        self.rules = list(rules)
+        self.config = config
+
+    def first_hit(self, text: str) -> FastRule | None:
+        """Return the first rule that matches ``text``."""
+        return next((rule for rule in self.rules if rule.matches(text)), None)
+
+    def validate(self, text: str) -> bool:
+        """Return True if no rule matches ``text``."""
+        return self.first_hit(text) is None
+
+    def skips_hub(self, text: str) -> bool:
+        """Whether a text without hits may skip the hub validators."""
+        return (
+            self.config.skip_hub_when_clean and len(text) <= self.config.clean_max_chars
+        )
+
+    def __repr__(self) -> str:
+        return f"FastTier({self.position!r}, {self.rules})"
+
+
+def build_fast_tiers(guardrails_obj: Any) -> list[FastTier]:
+    """Build the fast tier of each position from the configured guards."""
+    config = getattr(guardrails_obj, "fast_tier", None)
+    if config is None or not config.enabled:
+        return []
+    tiers = []
+    for position in ("input", "output"):
+        rules = [
+            rule
+            for guard in getattr(guardrails_obj, position)
+            if (rule := rule_for(guard))
+        ]
+        if rules:
+            tiers.append(FastTier(position, rules, config))
+    return tiers
@@ -0,0 +1,218 @@
+"""On-disk cache of installed Guardrails Hub validators.
+
+Installing a hub validator runs ``guardrails configure``, pip-installs the
+validator package and downloads its local models, which takes minutes. The
+cache records each completed install in a manifest addressed by the validator
+id, the requested version specifier and the installed package version, so a
+restart finds the validator already in place and skips the install. Local
+models are downloaded under the same directory, which can therefore be baked
+into container images. The manifest lists the model directories the install
+downloaded, and an install whose package or models have since gone missing
+is a miss.
+"""
+
+import hashlib
+import importlib
+import importlib.metadata
+import importlib.util
+import json
+import logging
+import os
+import time
+from collections.abc import Iterable
+from pathlib import Path
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+CACHE_DIR_ENV = "IDUN_GUARDRAILS_CACHE_DIR"
+DEFAULT_CACHE_DIR = Path.home() / ".cache" / "idun" / "guardrails"
+
+
+def resolve_cache_dir(cache_dir: str | os.PathLike[str] | None = None) -> Path:
+    """Return the cache directory: explicit value, then env var, then default."""
+    if cache_dir:
+        return Path(cache_dir).expanduser()
+    env_dir = os.getenv(CACHE_DIR_ENV)
+    if env_dir:
+        return Path(env_dir).expanduser()
+    return DEFAULT_CACHE_DIR
+
+
+def parse_guard_url(guard_url: str) -> tuple[str, str]:
+    """Split ``hub://org/name<specifier>`` into the validator id and specifier."""
+    from guardrails.hub.validator_package_service import ValidatorPackageService
+
+    validator_id, specifier = ValidatorPackageService.get_validator_id(guard_url)
+    return validator_id, specifier or ""
+
+
+def _package_name(validator_id: str) -> str:
+    from guardrails.hub.validator_package_service import ValidatorPackageService
+
+    name: str = ValidatorPackageService.get_normalized_package_name(validator_id)
+    return name
+
+
+def _installed_version(package_name: str) -> str | None:
+    try:
+        return importlib.metadata.version(package_name)
+    except importlib.metadata.PackageNotFoundError:
+        return None
+
+
+def _satisfies(version: str, specifier: str) -> bool:
+    if not specifier:
+        return True
+    from packaging.specifiers import InvalidSpecifier, SpecifierSet
+
+    try:
+        return SpecifierSet(specifier).contains(version, prereleases=True)
+    except InvalidSpecifier:
+        return False
+
+
+class ValidatorCache:
+    """Tracks which hub validators are installed, keyed by content."""
+
+    def __init__(self, cache_dir: str | os.PathLike[str] | None = None):
+        self.root = resolve_cache_dir(cache_dir)
+
+    @property
+    def manifests_dir(self) -> Path:
+        return self.root / "validators"
+
+    @property
+    def models_dir(self) -> Path:
+        return self.root / "models"
+
+    @property
+    def huggingface_dir(self) -> Path:
+        return self.models_dir / "huggingface"
+
+    def prepare_environment(self) -> None:
+        """Point model downloads at the cache.
+
+        Affects the post-install scripts, which run in subprocesses, and model
+        libraries imported after this call. An ``HF_HOME`` set elsewhere is
+        replaced, since models downloaded outside the cache would be missing
+        from images built from it.
+        """
+        self.models_dir.mkdir(parents=True, exist_ok=True)
+        hf_home = str(self.huggingface_dir)
+        previous = os.environ.get("HF_HOME")
+        if previous and previous != hf_home:
+            logger.warning(
+                f"HF_HOME={previous} replaced by {hf_home} so that guardrail "
+                f"models are stored in the validator cache"
+            )
+        os.environ["HF_HOME"] = hf_home
+
+    def model_dirs(self) -> set[str]:
+        """Return the Hugging Face model directories in the cache."""
+        hub = self.huggingface_dir / "hub"
+        if not hub.is_dir():
+            return set()
+        return {path.name for path in hub.iterdir() if path.is_dir()}
+
+    @staticmethod
+    def cache_key(validator_id: str, specifier: str, version: str) -> str:
+        """Return the content address of one installed validator version."""
+        payload = json.dumps(
+            {"validator": validator_id, "specifier": specifier, "version": version},
+            sort_keys=True,
+        )
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def _manifest_path(self, key: str) -> Path:
+        return self.manifests_dir / f"{key}.json"
+
+    def _installed(self, guard_url: str) -> dict[str, Any] | None:
+        """Describe the installed package satisfying ``guard_url``, if any."""
+        validator_id, specifier = parse_guard_url(guard_url)
+        package = _package_name(validator_id)
+        version = _installed_version(package)
+        if version is None or not _satisfies(version, specifier):
+            return None
+        if importlib.util.find_spec(package.replace("-", "_")) is None:
+            return None
+        return {
+            "guard_url": guard_url,
+            "validator_id": validator_id,
+            "specifier": specifier,
+            "package": package,
+            "version": version,
+        }
+
+    def _key_for(self, installed: dict[str, Any]) -> str:
+        return self.cache_key(
+            installed["validator_id"], installed["specifier"], installed["version"]
+        )
+
+    def lookup(self, guard_url: str) -> dict[str, Any] | None:
+        """Return the manifest of a valid cached install of ``guard_url``."""
+        installed = self._installed(guard_url)
+        if installed is None:
+            return None
+        try:
+            manifest: dict[str, Any] = json.loads(
+                self._manifest_path(self._key_for(installed)).read_text()
+            )
+        except (OSError, ValueError):
+            return None
+        if not manifest.get("local_models"):
+            return None
+        missing = set(manifest.get("models", [])) - self.model_dirs()
+        if missing:
+            logger.info(
+                f"Models {sorted(missing)} of {guard_url} are missing from the "
+                "cache; reinstalling"
+            )
+            return None
+        return manifest
+
+    def is_installed(self, guard_url: str) -> bool:
+        """Return True if ``guard_url`` can be used without reinstalling."""
+        return self.lookup(guard_url) is not None
+
+    def record(
+        self, guard_url: str, models: Iterable[str] = ()
+    ) -> dict[str, Any] | None:
+        """Record a completed install of ``guard_url``.
+
+        ``models`` are the model directories the install downloaded. Manifests
+        of other versions of the same validator are removed.
+        """
+        importlib.invalidate_caches()
+        installed = self._installed(guard_url)
+        if installed is None:
+            logger.warning(
+                f"Installed validator for {guard_url} not found on the import path; "
+                "it will be reinstalled on the next start."
+            )
+            return None
+
+        key = self._key_for(installed)
+        validator_id = installed["validator_id"]
+        manifest = {
+            **installed,
+            "local_models": True,
+            "models": sorted(models),
+            "installed_at": time.time(),
+        }
+
+        self.manifests_dir.mkdir(parents=True, exist_ok=True)
+        for path in self.manifests_dir.glob("*.json"):
+            if path.stem == key:
+                continue
+            try:
+                if json.loads(path.read_text()).get("validator_id") == validator_id:
+                    path.unlink()
+            except (OSError, ValueError):
+                continue
+
+        target = self._manifest_path(key)
+        tmp = target.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(manifest, indent=2))
+        os.replace(tmp, target)
+        return manifest
@@ -8,6 +8,8 @@ from idun_agent_schema.engine.guardrails import Guardrail as GuardrailSchema
 from idun_agent_schema.engine.guardrails_v2 import GuardrailConfigId
 
 from ..base import BaseGuardrail
+from ..verdict_cache import config_hash
+from .cache import ValidatorCache
 
 PII_ENTITY_MAP = {
     "Email": "EMAIL_ADDRESS",
@@ -74,13 +76,27 @@ def get_guard_instance(name: GuardrailConfigId) -> type[Validator]:
 class GuardrailsHubGuard(BaseGuardrail):
     """Class for managing guardrails from `guardrailsai`'s hub."""
 
-    def __init__(self, config: GuardrailSchema, position: str) -> None:
+    def __init__(
+        self,
+        config: GuardrailSchema,
+        position: str,
+        cache: ValidatorCache | None = None,
+        load: bool = True,
+    ) -> None:
         super().__init__(config)
 
+        self._cache = cache or ValidatorCache()
         self.guard_id = self._guardrail_config.config_id
         self._guard_url = self._guardrail_config.guard_url
         self.reject_message: str = self._guardrail_config.reject_message
-        self._guard: Validator | None = self.setup_guard()
+        # Part of the verdict cache key: changing any setting changes the hash
+        self.config_hash: str = config_hash(self._guardrail_config)
+        if load:
+            self._guard: Validator | None = self.setup_guard()
+        else:
+            # Install only; the model is loaded by a guardrail worker process
+            self._ensure_installed()
+            self._guard = None
         self.position: str = position
 
     def _install_model(self) -> None:
@@ -126,9 +142,21 @@ class GuardrailsHubGuard(BaseGuardrail):
         except Exception as e:
             raise e
 
+    def _ensure_installed(self) -> None:
+        """Install the validator unless a valid install is already cached."""
+        self._cache.prepare_environment()
+        if self._cache.is_installed(self._guard_url):
+            logger.info(f"Using cached validator: {self._guard_url}")
+            return
+        models_before = self._cache.model_dirs()
+        self._install_model()
+        self._cache.record(
+            self._guard_url, models=self._cache.model_dirs() - models_before
+        )
+
     def setup_guard(self) -> Validator | None:
         """Installs and configures the guard based on its yaml config."""
-        self._install_model()
+        self._ensure_installed()
         guard_name = self.guard_id
         guard = get_guard_instance(guard_name)
         if guard is None:
@@ -183,3 +211,10 @@ class GuardrailsHubGuard(BaseGuardrail):
                 self.guard_id,
             )
             return False
+
+
+def build_hub_guard(
+    config: GuardrailSchema, position: str, cache_dir: str | None = None
+) -> GuardrailsHubGuard:
+    """Load a hub guard inside a guardrail worker process."""
+    return GuardrailsHubGuard(config, position=position, cache=ValidatorCache(cache_dir))
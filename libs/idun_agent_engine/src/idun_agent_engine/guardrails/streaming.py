@@ -0,0 +1,254 @@
+"""Output guardrails on streamed agent responses.
+
+Checking output only once the response is complete would mean holding back
+the whole stream. ``guard_output_stream`` instead holds back text deltas in
+small windows. A window closes at a sentence end once it has
+``window_chars`` characters, or at ``max_window_chars`` regardless. It is
+then validated in the background while the agent keeps streaming, and its
+events are released once it passes. Each window is validated together with
+the tail of the previous one (``context_chars``), so content that straddles
+a boundary is still seen.
+
+Events are released in their original order: any event queued behind a
+window waits for that window's verdict. RAW and CUSTOM events may carry the
+text that follows them, so they are held and go out with the window of the
+next text delta. Any other non-text event (tool call, state snapshot, run
+end) closes the open windows and waits for their verdicts, so nothing that
+reflects unchecked text goes out first. When a window fails, the windows
+before it still go out once they pass; the rest of the held events are
+dropped, the agent stream is closed and the run ends with a ``RUN_ERROR``
+event carrying the guard's reject message.
+"""
+
+import asyncio
+import logging
+import re
+from collections import deque
+from collections.abc import AsyncIterator, Sequence
+from typing import Any
+
+from ag_ui.core import EventType, RunErrorEvent
+from idun_agent_schema.engine.server import OutputStreamGuardrailConfig
+
+from .executor import GuardrailExecutor
+
+logger = logging.getLogger(__name__)
+
+_TEXT_EVENTS = frozenset({EventType.TEXT_MESSAGE_CONTENT, EventType.TEXT_MESSAGE_CHUNK})
+# Events that may carry the text that follows them, e.g. the model chunk
+# ag_ui_langgraph sends as RAW before each text delta
+_PASSTHROUGH_EVENTS = frozenset({EventType.RAW, EventType.CUSTOM})
+# Boundary at which a window may close once it is long enough
+_SENTENCE_END = re.compile(r"[.!?;:\n]\s*$")
+
+OUTPUT_GUARDRAIL_ERROR_CODE = "OUTPUT_GUARDRAIL"
+
+
+class _Window:
+    """Text deltas of one message awaiting a single verdict."""
+
+    def __init__(self, seq: int) -> None:
+        self.seq = seq
+        self.parts: list[str] = []
+        self.size = 0
+        self.verdict: asyncio.Future[Any] | None = None
+
+    def add(self, delta: str) -> None:
+        self.parts.append(delta)
+        self.size += len(delta)
+
+    @property
+    def passed(self) -> bool:
+        return (
+            self.verdict is not None
+            and self.verdict.done()
+            and self.verdict.result() is None
+        )
+
+
+class _Held:
+    """A held event and the window whose verdict releases it."""
+
+    __slots__ = ("event", "placed", "window")
+
+    def __init__(
+        self, event: Any, window: _Window | None = None, placed: bool = True
+    ) -> None:
+        self.event = event
+        self.window = window
+        # False for a RAW or CUSTOM event until the text after it arrives
+        self.placed = placed
+
+
+class _StreamGuard:
+    def __init__(
+        self,
+        guards: Sequence[Any],
+        executor: GuardrailExecutor,
+        config: OutputStreamGuardrailConfig,
+    ):
+        self._guards = guards
+        self._executor = executor
+        self._config = config
+        self._held: deque[_Held] = deque()
+        self._unplaced: list[_Held] = []
+        self._open: dict[str, _Window] = {}
+        self._validating: list[tuple[_Window, asyncio.Future[Any]]] = []
+        self._context: dict[str, str] = {}
+        self._windows = 0
+        self._failed: _Window | None = None
+        self.rejected: Any = None
+
+    def accept(self, event: Any) -> int | None:
+        """Hold ``event``.
+
+        Returns how many windows may still await a verdict before the next
+        event is read, or None if there is no need to wait.
+        """
+        event_type = getattr(event, "type", None)
+        delta = getattr(event, "delta", None)
+        if event_type in _TEXT_EVENTS and delta:
+            message_id = getattr(event, "message_id", None) or ""
+            window = self._open.get(message_id)
+            if window is None:
+                window = self._open[message_id] = _Window(self._windows)
+                self._windows += 1
+            window.add(delta)
+            self._place(window)
+            self._held.append(_Held(event, window))
+            if window.size >= self._config.max_window_chars or (
+                window.size >= self._config.window_chars and _SENTENCE_END.search(delta)
+            ):
+                self._close(message_id)
+            if len(self._validating) >= self._config.max_pending_windows:
+                return self._config.max_pending_windows - 1
+            return None
+        if event_type in _PASSTHROUGH_EVENTS:
+            held = _Held(event, placed=False)
+            self._unplaced.append(held)
+            self._held.append(held)
+            return None
+        # Nothing behind unchecked text may go out before it
+        self.close_all()
+        self._held.append(_Held(event))
+        return 0 if self._validating else None
+
+    def _place(self, window: _Window | None) -> None:
+        """Release held RAW and CUSTOM events with ``window``."""
+        for held in self._unplaced:
+            held.window = window
+            held.placed = True
+        self._unplaced = []
+
+    def _close(self, message_id: str) -> None:
+        window = self._open.pop(message_id)
+        text = "".join(window.parts)
+        context = self._context.get(message_id, "")
+        if self._config.context_chars:
+            self._context[message_id] = (context + text)[-self._config.context_chars :]
+        verdict = asyncio.ensure_future(
+            self._executor.first_rejection(self._guards, context + text)
+        )
+        window.verdict = verdict
+        self._validating.append((window, verdict))
+
+    def close_all(self) -> None:
+        self._place(None)
+        for message_id in list(self._open):
+            self._close(message_id)
+
+    async def wait(self, pending: int = 0) -> None:
+        """Wait until at most ``pending`` windows await a verdict, or one fails."""
+        while len(self._validating) > pending and self.rejected is None:
+            verdicts = [verdict for _, verdict in self._validating]
+            await asyncio.wait(verdicts, return_when=asyncio.FIRST_COMPLETED)
+            self._collect()
+
+    async def settle(self) -> None:
+        """Wait for the verdicts of windows before the failed one.
+
+        Verdicts arrive in any order, so a window can fail while earlier ones
+        are still being validated; those that pass still go out.
+        """
+        while True:
+            earlier = [
+                verdict
+                for window, verdict in self._validating
+                if self._failed is not None and window.seq < self._failed.seq
+            ]
+            if not earlier:
+                return
+            await asyncio.wait(earlier, return_when=asyncio.FIRST_COMPLETED)
+            self._collect()
+
+    def _collect(self) -> None:
+        still_validating = []
+        for window, verdict in self._validating:
+            if not verdict.done():
+                still_validating.append((window, verdict))
+            elif verdict.result() is not None and (
+                self._failed is None or window.seq < self._failed.seq
+            ):
+                self._failed = window
+                self.rejected = verdict.result()
+        self._validating = still_validating
+
+    def releasable(self) -> list[Any]:
+        """Pop the held events whose windows have passed, in order."""
+        self._collect()
+        released = []
+        while self._held:
+            held = self._held[0]
+            if not held.placed or (held.window is not None and not held.window.passed):
+                break
+            released.append(self._held.popleft().event)
+        return released
+
+    def cancel(self) -> None:
+        for _, verdict in self._validating:
+            verdict.cancel()
+        self._validating = []
+        self._unplaced = []
+        self._held.clear()
+
+
+async def guard_output_stream(
+    events: AsyncIterator[Any],
+    guards: Sequence[Any],
+    executor: GuardrailExecutor,
+    config: OutputStreamGuardrailConfig,
+) -> AsyncIterator[Any]:
+    """Yield ``events``, releasing text only after ``guards`` have passed it."""
+    state = _StreamGuard(guards, executor, config)
+    try:
+        async for event in events:
+            pending = state.accept(event)
+            if pending is not None:
+                await state.wait(pending)
+            for released in state.releasable():
+                yield released
+            if state.rejected is not None:
+                await state.settle()
+                for released in state.releasable():
+                    yield released
+                break
+        else:
+            state.close_all()
+            await state.wait()
+            for released in state.releasable():
+                yield released
+
+        if state.rejected is not None:
+            guard_id = getattr(state.rejected, "guard_id", state.rejected)
+            logger.info(f"Output guardrail '{guard_id}' stopped the response stream")
+            yield RunErrorEvent(
+                type=EventType.RUN_ERROR,
+                message=getattr(state.rejected, "reject_message", None)
+                or "Response blocked by an output guardrail",
+                code=OUTPUT_GUARDRAIL_ERROR_CODE,
+            )
+    finally:
+        state.cancel()
+        aclose = getattr(events, "aclose", None)
+        if aclose is not None:
+            await aclose()
@@ -0,0 +1,113 @@
+"""Cache of guardrail verdicts for repeated texts.
+
+Traffic repeats itself: greetings, canned commands, client retries. A
+``VerdictCache`` remembers what each guard decided for a text, keyed by the
+guard id, a hash of the guard's config and a hash of the normalized text, so
+a repeat is answered without running the validator again. Only the hashes
+are kept, never the text. Entries expire after a TTL and the least recently
+used ones are evicted once the cache is full.
+
+Only real verdicts are cached. Timeouts and errors, which reject
+fail-closed, are not.
+"""
+
+import hashlib
+import json
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Any
+
+from idun_agent_schema.engine.server import GuardrailVerdictCacheConfig
+
+
+def config_hash(config: Any) -> str:
+    """Hash a guard config, so that changing any of its settings changes the key."""
+    if hasattr(config, "model_dump"):
+        data = config.model_dump(mode="json")
+    else:
+        data = vars(config)
+    encoded = json.dumps(data, sort_keys=True, default=str).encode()
+    return hashlib.sha256(encoded).hexdigest()[:16]
+
+
+def text_hash(text: str) -> str:
+    """Hash ``text`` after Unicode normalization and whitespace folding."""
+    normalized = " ".join(unicodedata.normalize("NFC", text).split())
+    return hashlib.blake2b(normalized.encode(), digest_size=16).hexdigest()
+
+
+class VerdictCache:
+    """Bounded LRU cache of verdicts with a per-entry TTL."""
+
+    def __init__(self, config: GuardrailVerdictCacheConfig | None = None):
+        self._config = config or GuardrailVerdictCacheConfig()
+        self._entries: OrderedDict[tuple[str, str, str], tuple[bool, float]] = (
+            OrderedDict()
+        )
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self._config.enabled
+
+    def configure(self, config: GuardrailVerdictCacheConfig) -> None:
+        """Apply new limits, dropping entries that no longer fit."""
+        self._config = config
+        if not config.enabled:
+            self._entries.clear()
+        self._evict()
+
+    @staticmethod
+    def key_for(guard: Any, digest: str) -> tuple[str, str, str] | None:
+        """Return the cache key of ``guard`` for a text hash, or None if uncacheable."""
+        guard_hash = getattr(guard, "config_hash", None)
+        if guard_hash is None:
+            return None
+        return (str(getattr(guard, "guard_id", "")), guard_hash, digest)
+
+    def get(self, key: tuple[str, str, str]) -> bool | None:
+        """Return the cached verdict for ``key``, or None on a miss."""
+        entry = self._entries.get(key)
+        if entry is None or entry[1] <= time.monotonic():
+            if entry is not None:
+                del self._entries[key]
+            self._misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self._hits += 1
+        return entry[0]
+
+    def put(self, key: tuple[str, str, str], allowed: bool) -> None:
+        if not self._config.enabled:
+            return
+        self._entries[key] = (allowed, time.monotonic() + self._config.ttl_seconds)
+        self._entries.move_to_end(key)
+        self._evict()
+
+    def clear(self) -> None:
+        """Drop every entry, e.g. after the guardrails were rebuilt."""
+        self._entries.clear()
+        self._invalidations += 1
+
+    def _evict(self) -> None:
+        while len(self._entries) > self._config.max_entries:
+            self._entries.popitem(last=False)
+            self._evictions += 1
+
+    def stats(self) -> dict[str, Any]:
+        lookups = self._hits + self._misses
+        return {
+            "enabled": self._config.enabled,
+            "entries": len(self._entries),
+            "max_entries": self._config.max_entries,
+            "ttl_seconds": self._config.ttl_seconds,
+            "hits_total": self._hits,
+            "misses_total": self._misses,
+            "hit_ratio": round(self._hits / lookups, 4) if lookups else None,
+            "evictions_total": self._evictions,
+            "invalidations_total": self._invalidations,
+        }
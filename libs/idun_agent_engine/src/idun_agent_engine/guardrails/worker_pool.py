@@ -0,0 +1,320 @@
+"""Guardrail validators hosted in child worker processes.
+
+Hub validators hold transformer models. Loaded in the engine process, their
+inference competes with request handling for the GIL, and every uvicorn
+worker holds its own copy of every model. The ``GuardrailWorkerPool`` starts
+a few child processes instead and loads each guard in exactly one of them,
+chosen by the configured routing. The engine keeps a ``RemoteGuard`` proxy
+per guard and exchanges ``(request_id, guard_key, text)`` and
+``(request_id, allowed)`` tuples with the worker over a pipe.
+
+A worker validates one text at a time. Guards routed to different workers
+run in parallel across cores.
+"""
+
+import logging
+import multiprocessing
+import threading
+import traceback
+from collections.abc import Callable, Sequence
+from concurrent.futures import Future
+from dataclasses import dataclass
+from itertools import count
+from multiprocessing.connection import Connection
+from typing import Any
+
+from idun_agent_schema.engine.guardrails_v2 import GuardrailWorkerPoolConfig
+
+from .verdict_cache import config_hash
+
+logger = logging.getLogger(__name__)
+
+# Builds a guard inside a worker process. Must be picklable (a module-level
+# function or a ``functools.partial`` of one).
+GuardFactory = Callable[[Any, str], Any]
+
+
+@dataclass
+class GuardSpec:
+    """A guard to load in a worker: its config and its position."""
+
+    config: Any
+    position: str
+
+
+def _worker_main(
+    conn: Connection, specs: dict[str, GuardSpec], factory: GuardFactory
+) -> None:
+    """Entry point of a worker process: load the guards, then serve verdicts."""
+    try:
+        guards = {key: factory(spec.config, spec.position) for key, spec in specs.items()}
+    except BaseException:
+        conn.send(("error", traceback.format_exc()))
+        conn.close()
+        return
+    conn.send(("ready", None))
+
+    while True:
+        try:
+            message = conn.recv()
+        except (EOFError, KeyboardInterrupt):
+            break
+        if message is None:
+            break
+        request_id, key, text = message
+        try:
+            allowed = bool(guards[key].validate(text))
+        except Exception:
+            # Guards are expected to fail closed themselves; be defensive anyway
+            allowed = False
+        conn.send((request_id, allowed))
+    conn.close()
+
+
+def _config_id(config: Any) -> str:
+    config_id = getattr(config, "config_id", "")
+    return getattr(config_id, "value", config_id)
+
+
+class _Worker:
+    """Engine-side handle on one worker process."""
+
+    def __init__(self, index: int, process: Any, conn: Connection, keys: list[str]):
+        self.index = index
+        self.process = process
+        self.conn = conn
+        self.keys = keys
+        self.requests_total = 0
+        self._pending: dict[int, Future] = {}
+        self._ids = count()
+        self._send_lock = threading.Lock()
+        self._closed = False
+        self._reader: threading.Thread | None = None
+
+    @property
+    def alive(self) -> bool:
+        return not self._closed and self.process.is_alive()
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def start_reader(self) -> None:
+        self._reader = threading.Thread(
+            target=self._read_loop,
+            name=f"guardrail-worker-{self.index}",
+            daemon=True,
+        )
+        self._reader.start()
+
+    def _read_loop(self) -> None:
+        while True:
+            try:
+                request_id, allowed = self.conn.recv()
+            except (EOFError, OSError):
+                break
+            future = self._pending.pop(request_id, None)
+            if future is not None and not future.done():
+                future.set_result(allowed)
+        self._fail_pending()
+
+    def _fail_pending(self) -> None:
+        if not self._closed:
+            logger.error(
+                f"Guardrail worker {self.index} (pid {self.process.pid}) exited; "
+                f"its guards now reject every request: {self.keys}"
+            )
+        self._closed = True
+        pending, self._pending = self._pending, {}
+        for future in pending.values():
+            if not future.done():
+                future.set_exception(RuntimeError("Guardrail worker exited"))
+
+    def submit(self, key: str, text: str) -> Future:
+        future: Future = Future()
+        if self._closed:
+            future.set_exception(RuntimeError("Guardrail worker is not running"))
+            return future
+        request_id = next(self._ids)
+        self._pending[request_id] = future
+        self.requests_total += 1
+        if self._closed:
+            # The reader failed the pending requests while this one was added
+            self._pending.pop(request_id, None)
+            future.set_exception(RuntimeError("Guardrail worker is not running"))
+            return future
+        try:
+            with self._send_lock:
+                self.conn.send((request_id, key, text))
+        except (OSError, ValueError) as e:
+            self._pending.pop(request_id, None)
+            future.set_exception(RuntimeError(f"Guardrail worker unreachable: {e}"))
+        return future
+
+    def close(self, timeout: float) -> None:
+        self._closed = True
+        try:
+            with self._send_lock:
+                self.conn.send(None)
+        except (OSError, ValueError):
+            pass
+        self.process.join(timeout)
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join(timeout)
+        self.conn.close()
+
+
+class RemoteGuard:
+    """Engine-side proxy for a guard loaded in a worker process."""
+
+    def __init__(self, key: str, spec: GuardSpec, worker: _Worker, pool: "GuardrailWorkerPool"):
+        self.key = key
+        self.pool = pool
+        self.worker = worker
+        self.position = spec.position
+        self.guard_id = getattr(spec.config, "config_id", key)
+        self.reject_message = getattr(spec.config, "reject_message", None)
+        self.config_hash = config_hash(spec.config)
+
+    def submit(self, text: str) -> Future:
+        """Send ``text`` to the worker; the future resolves to the verdict."""
+        return self.worker.submit(self.key, str(text))
+
+    def validate(self, input: str) -> bool:
+        """Blocking validation. Returns True if content is allowed."""
+        try:
+            return bool(self.submit(input).result())
+        except Exception:
+            logger.exception(
+                f"Guardrail '{self.guard_id}' could not be evaluated by worker "
+                f"{self.worker.index}; blocking request (fail-closed)."
+            )
+            return False
+
+    def __repr__(self) -> str:
+        return f"RemoteGuard({self.key!r}, worker={self.worker.index})"
+
+
+class GuardrailWorkerPool:
+    """A fixed set of worker processes, each hosting the guards routed to it."""
+
+    def __init__(self, config: GuardrailWorkerPoolConfig, factory: GuardFactory):
+        self._config = config
+        self._factory = factory
+        self._workers: list[_Worker] = []
+
+    def assign(self, specs: Sequence[GuardSpec]) -> list[int]:
+        """Return the worker index for each spec.
+
+        Guards listed in ``routing`` go to their configured worker, the others
+        to the worker hosting the fewest guards so far.
+        """
+        loads = [0] * self._config.workers
+        assignments = []
+        for spec in specs:
+            index = self._config.routing.get(_config_id(spec.config))
+            if index is None:
+                index = loads.index(min(loads))
+            loads[index] += 1
+            assignments.append(index)
+        return assignments
+
+    def start(self, specs: Sequence[GuardSpec]) -> list[RemoteGuard]:
+        """Start the workers, wait until they have loaded their guards, return proxies.
+
+        Workers load their models in parallel. Raises ``RuntimeError`` and
+        stops every worker if one of them fails to start.
+        """
+        if self._workers:
+            raise RuntimeError("Guardrail worker pool is already started")
+        assignments = self.assign(specs)
+        keys = [f"{spec.position}:{i}" for i, spec in enumerate(specs)]
+        # Spawn rather than fork: the engine process runs an event loop and threads
+        context = multiprocessing.get_context("spawn")
+
+        for index in range(self._config.workers):
+            worker_specs = {
+                key: spec
+                for key, spec, assigned in zip(keys, specs, assignments, strict=True)
+                if assigned == index
+            }
+            if not worker_specs:
+                continue
+            parent_conn, child_conn = context.Pipe()
+            process = context.Process(
+                target=_worker_main,
+                args=(child_conn, worker_specs, self._factory),
+                name=f"idun-guardrail-worker-{index}",
+                daemon=True,
+            )
+            process.start()
+            child_conn.close()
+            self._workers.append(_Worker(index, process, parent_conn, list(worker_specs)))
+
+        try:
+            for worker in self._workers:
+                self._wait_ready(worker)
+        except BaseException:
+            self.close()
+            raise
+
+        by_index = {worker.index: worker for worker in self._workers}
+        for worker in self._workers:
+            worker.start_reader()
+            logger.info(
+                f"🛡️ Guardrail worker {worker.index} (pid {worker.process.pid}) "
+                f"hosts {worker.keys}"
+            )
+        return [
+            RemoteGuard(key, spec, by_index[assigned], self)
+            for key, spec, assigned in zip(keys, specs, assignments, strict=True)
+        ]
+
+    def _wait_ready(self, worker: _Worker) -> None:
+        if not worker.conn.poll(self._config.start_timeout_seconds):
+            raise RuntimeError(
+                f"Guardrail worker {worker.index} did not load its validators within "
+                f"{self._config.start_timeout_seconds}s"
+            )
+        try:
+            status, detail = worker.conn.recv()
+        except EOFError as e:
+            raise RuntimeError(
+                f"Guardrail worker {worker.index} exited while loading its validators "
+                f"(exit code {worker.process.exitcode})"
+            ) from e
+        if status != "ready":
+            raise RuntimeError(
+                f"Guardrail worker {worker.index} failed to load its validators:\n{detail}"
+            )
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Stop every worker process."""
+        workers, self._workers = self._workers, []
+        for worker in workers:
+            worker.close(timeout)
+
+    def stats(self) -> list[dict[str, Any]]:
+        """Return per-worker state for ``/metrics``."""
+        return [
+            {
+                "index": worker.index,
+                "pid": worker.process.pid,
+                "alive": worker.alive,
+                "guards": worker.keys,
+                "pending": worker.pending,
+                "requests_total": worker.requests_total,
+            }
+            for worker in self._workers
+        ]
+
+
+def worker_pools_of(guardrails: Sequence[Any]) -> list[GuardrailWorkerPool]:
+    """Return the distinct worker pools behind ``guardrails``."""
+    pools: list[GuardrailWorkerPool] = []
+    for guard in guardrails or ():
+        pool = guard.pool if isinstance(guard, RemoteGuard) else None
+        if pool is not None and all(pool is not other for other in pools):
+            pools.append(pool)
+    return pools
@@ -14,6 +14,9 @@ from idun_agent_schema.engine.integrations.discord_webhook import (
 )
 
 from ...agent.base import BaseAgent
+from ...server.admission import AdmissionController, AdmissionRejectedError
+from ...server.dependencies import get_admission
+from ...server.generations import AgentGeneration
 from .client import DiscordClient
 from .verify import verify_discord_signature
 
@@ -28,6 +31,7 @@ async def _handle_application_command(
     interaction: DiscordInteraction,
     agent: BaseAgent,
     client: DiscordClient,
+    admission: AdmissionController,
 ) -> None:
     """Invoke the agent with the command text and edit the deferred response."""
     session_id = interaction.resolve_user_id()
@@ -36,13 +40,24 @@ async def _handle_application_command(
     logger.debug(f"Discord command from user {session_id}: {text}")
 
     try:
-        result = await agent.invoke({"query": text, "session_id": session_id})
+        async with admission.slot():
+            result = await agent.invoke({"query": text, "session_id": session_id})
         reply = result if isinstance(result, str) else str(result)
 
         if len(reply) > DISCORD_MAX_MESSAGE_LENGTH:
             reply = reply[: DISCORD_MAX_MESSAGE_LENGTH - 3] + "…"
 
         await client.edit_interaction_response(interaction.token, reply)
+    except AdmissionRejectedError as e:
+        # The interaction is already deferred, so reply instead of returning 429/503
+        logger.warning(f"Discord command from {session_id} rejected: {e}")
+        try:
+            await client.edit_interaction_response(
+                interaction.token,
+                f"The agent is busy right now. Please try again in {e.retry_after}s.",
+            )
+        except Exception:
+            logger.exception("Failed to send busy response to Discord")
     except Exception:
         logger.exception(f"Error processing Discord command from {session_id}")
         try:
@@ -89,7 +104,15 @@ async def discord_webhook(request: Request) -> Response:
         if not agent or not client:
             return Response(status_code=503, content="Discord integration not ready")
 
-        asyncio.create_task(_handle_application_command(interaction, agent, client))
+        task = asyncio.create_task(
+            _handle_application_command(
+                interaction, agent, client, get_admission(request)
+            )
+        )
+        # The command outlives this response; keep its agent open until it ends
+        generation = getattr(request.app.state, "generation", None)
+        if isinstance(generation, AgentGeneration):
+            generation.track(task)
         return _json_response(
             {"type": InteractionResponseType.DEFERRED_CHANNEL_MESSAGE_WITH_SOURCE}
         )
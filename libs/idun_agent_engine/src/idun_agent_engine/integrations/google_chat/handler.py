@@ -10,6 +10,8 @@ from idun_agent_schema.engine.integrations.google_chat_webhook import (
 )
 
 from ...agent.base import BaseAgent
+from ...server.admission import AdmissionRejectedError
+from ...server.dependencies import get_admission
 from ..utils import extract_text_content
 from .client import GoogleChatClient
 from .verify import verify_google_chat_token
@@ -112,6 +114,11 @@ async def google_chat_webhook(request: Request) -> Response:
         logger.warning("Google Chat message missing space name, skipping")
         return Response(status_code=200)
 
-    await _handle_message(user_name, space_name, text, agent, client)
+    try:
+        async with get_admission(request).slot():
+            await _handle_message(user_name, space_name, text, agent, client)
+    except AdmissionRejectedError as e:
+        logger.warning("Google Chat message from %s rejected: %s", user_name, e)
+        return Response(status_code=e.status_code, content=str(e), headers=e.headers)
 
     return Response(status_code=200)
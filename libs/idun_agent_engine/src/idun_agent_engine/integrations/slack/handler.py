@@ -9,6 +9,8 @@ from fastapi.responses import PlainTextResponse
 from idun_agent_schema.engine.integrations.slack_webhook import SlackEventPayload
 
 from ...agent.base import BaseAgent
+from ...server.admission import AdmissionRejectedError
+from ...server.dependencies import get_admission
 from ..utils import extract_text_content
 from .client import SlackClient
 from .verify import verify_slack_signature
@@ -82,6 +84,11 @@ async def slack_webhook(request: Request) -> Response:
         logger.error("Slack webhook received but agent or client not initialized")
         return Response(status_code=503, content="Slack integration not ready")
 
-    await _handle_message(event.user, event.channel, event.text, agent, client)
+    try:
+        async with get_admission(request).slot():
+            await _handle_message(event.user, event.channel, event.text, agent, client)
+    except AdmissionRejectedError as e:
+        logger.warning("Slack message from %s rejected: %s", event.user, e)
+        return Response(status_code=e.status_code, content=str(e), headers=e.headers)
 
     return Response(status_code=200)
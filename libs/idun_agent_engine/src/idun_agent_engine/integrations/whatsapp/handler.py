@@ -11,6 +11,8 @@ from idun_agent_schema.engine.integrations.whatsapp_webhook import (
 )
 
 from ...agent.base import BaseAgent
+from ...server.admission import AdmissionRejectedError
+from ...server.dependencies import get_admission
 from .client import WhatsAppClient
 
 logger = logging.getLogger(__name__)
@@ -68,19 +70,29 @@ async def receive_webhook(request: Request, payload: WhatsAppWebhookPayload) ->
 
     logger.debug(f"Received webhook payload with {len(payload.entry)} entries")
 
-    for entry in payload.entry:
-        for change in entry.changes:
-            if not change.value.messages:
-                continue
-            for message in change.value.messages:
-                if message.type != "text" or not message.text:
-                    logger.debug(f"Skipping non-text message type: {message.type}")
-                    continue
-                await _handle_text_message(
-                    sender=message.sender,
-                    text=message.text.body,
-                    agent=agent,
-                    client=client,
-                )
+    try:
+        # Admit the whole payload at once so a rejection never leaves it half-processed
+        async with get_admission(request).slot():
+            for entry in payload.entry:
+                for change in entry.changes:
+                    if not change.value.messages:
+                        continue
+                    for message in change.value.messages:
+                        if message.type != "text" or not message.text:
+                            logger.debug(
+                                f"Skipping non-text message type: {message.type}"
+                            )
+                            continue
+                        await _handle_text_message(
+                            sender=message.sender,
+                            text=message.text.body,
+                            agent=agent,
+                            client=client,
+                        )
+    except AdmissionRejectedError as e:
+        logger.warning(f"WhatsApp webhook rejected: {e}")
+        raise HTTPException(
+            status_code=e.status_code, detail=str(e), headers=e.headers
+        ) from e
 
     return {"status": "ok"}
@@ -7,32 +7,56 @@ import sys
 from typing import TYPE_CHECKING, Any, cast
 
 from idun_agent_schema.engine.mcp_server import MCPServer
-from langchain_mcp_adapters.client import MultiServerMCPClient
-from langchain_mcp_adapters.sessions import Connection
 
 if TYPE_CHECKING:
-    from google.adk.tools import McpToolset
-    from google.adk.tools.mcp_tool.mcp_session_manager import (
-        SseConnectionParams,
-        StdioConnectionParams,
-        StreamableHTTPConnectionParams,
-    )
-    from mcp import StdioServerParameters
-
-try:
-    from google.adk.tools import McpToolset
-    from google.adk.tools.mcp_tool.mcp_session_manager import (
-        SseConnectionParams,
-        StdioConnectionParams,
-        StreamableHTTPConnectionParams,
-    )
-    from mcp import StdioServerParameters
-except ImportError:
-    McpToolset = None  # type: ignore
-    StdioConnectionParams = None  # type: ignore
-    StdioServerParameters = None  # type: ignore
-    SseConnectionParams = None  # type: ignore
-    StreamableHTTPConnectionParams = None  # type: ignore
+    from langchain_mcp_adapters.client import MultiServerMCPClient
+    from langchain_mcp_adapters.sessions import Connection
+
+# google-adk and mcp are only needed by ADK agents and take seconds to import,
+# so their classes are resolved on first use of ``get_adk_toolsets``. Until
+# then they hold ``_NOT_LOADED``; ``None`` means the packages are missing.
+_NOT_LOADED: Any = object()
+McpToolset: Any = _NOT_LOADED
+StdioConnectionParams: Any = _NOT_LOADED
+StdioServerParameters: Any = _NOT_LOADED
+SseConnectionParams: Any = _NOT_LOADED
+StreamableHTTPConnectionParams: Any = _NOT_LOADED
+
+_ADK_SYMBOLS = (
+    "McpToolset",
+    "StdioConnectionParams",
+    "StdioServerParameters",
+    "SseConnectionParams",
+    "StreamableHTTPConnectionParams",
+)
+
+
+def _load_adk_symbols() -> None:
+    """Import the ADK toolset classes the first time they are needed."""
+    module = globals()
+    if all(module[name] is not _NOT_LOADED for name in _ADK_SYMBOLS):
+        return
+    try:
+        from google.adk.tools import McpToolset
+        from google.adk.tools.mcp_tool.mcp_session_manager import (
+            SseConnectionParams,
+            StdioConnectionParams,
+            StreamableHTTPConnectionParams,
+        )
+        from mcp import StdioServerParameters
+
+        loaded: dict[str, Any] = {
+            "McpToolset": McpToolset,
+            "StdioConnectionParams": StdioConnectionParams,
+            "StdioServerParameters": StdioServerParameters,
+            "SseConnectionParams": SseConnectionParams,
+            "StreamableHTTPConnectionParams": StreamableHTTPConnectionParams,
+        }
+    except ImportError:
+        loaded = dict.fromkeys(_ADK_SYMBOLS)
+    for name in _ADK_SYMBOLS:
+        if module[name] is _NOT_LOADED:
+            module[name] = loaded[name]
 
 
 class _DeepcopySafeStderr:
@@ -114,11 +138,13 @@ class MCPClientRegistry:
         self._client: MultiServerMCPClient | None = None
 
         if self._configs:
+            from langchain_mcp_adapters.client import MultiServerMCPClient
+
             connections: dict[str, Connection] = {}
             for config in self._configs:
                 try:
                     connections[config.name] = cast(
-                        Connection, config.as_connection_dict()
+                        "Connection", config.as_connection_dict()
                     )
                 except Exception:
                     logger.exception(
@@ -209,6 +235,7 @@ class MCPClientRegistry:
 
     def get_adk_toolsets(self) -> list[Any]:
         """Return a list of Google ADK McpToolset instances for configured servers."""
+        _load_adk_symbols()
         if McpToolset is None or StdioServerParameters is None:
             raise ImportError(
                 "google-adk and mcp packages are required for ADK toolsets."
@@ -0,0 +1,209 @@
+"""Global admission control for agent executions.
+
+Bursts of traffic would otherwise start every graph execution at once and
+hit the LLM provider's rate limits together. The ``AdmissionController``
+caps concurrent executions, parks the excess in a bounded FIFO queue, and
+rejects quickly once the queue is full (429) or a request's wait exceeds its
+deadline (503). Both rejections carry a ``Retry-After`` estimate derived from
+the recent average run duration.
+"""
+
+import asyncio
+import logging
+import math
+import time
+from collections import deque
+from collections.abc import AsyncIterator, Awaitable, Callable
+from contextlib import asynccontextmanager, suppress
+from typing import Any
+
+from fastapi.responses import StreamingResponse
+from idun_agent_schema.engine.server import AdmissionConfig
+from starlette.types import Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+# Weight of the newest sample in the moving average of run durations
+_SERVICE_TIME_SMOOTHING = 0.2
+_MAX_RETRY_AFTER_SECONDS = 60
+
+
+class AdmissionRejectedError(Exception):
+    """Raised when a request is not admitted: queue full (429) or wait timed out (503)."""
+
+    def __init__(self, status_code: int, message: str, retry_after: int):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+    @property
+    def headers(self) -> dict[str, str]:
+        return {"Retry-After": str(self.retry_after)}
+
+
+class AdmissionTicket:
+    """An admitted execution slot. ``release`` is idempotent."""
+
+    def __init__(self, controller: "AdmissionController", waited: float):
+        self.waited = waited
+        self._controller = controller
+        self._admitted_at = time.monotonic()
+        self._released = False
+
+    def release(self) -> None:
+        if self._released:
+            return
+        self._released = True
+        self._controller._finish(time.monotonic() - self._admitted_at)
+
+
+class AdmissionController:
+    """Limits concurrent agent executions with a bounded, deadline-aware queue."""
+
+    def __init__(self, config: AdmissionConfig | None = None):
+        self._config = config or AdmissionConfig()
+        self._in_flight = 0
+        self._waiters: deque[asyncio.Future[None]] = deque()
+        self._admitted_total = 0
+        self._rejected_total = 0
+        self._timed_out_total = 0
+        self._wait_seconds_total = 0.0
+        self._wait_seconds_max = 0.0
+        self._avg_service_seconds = 0.0
+
+    @property
+    def config(self) -> AdmissionConfig:
+        return self._config
+
+    def configure(self, config: AdmissionConfig) -> None:
+        """Apply new limits. In-flight executions keep their slots."""
+        self._config = config
+        self._wake_waiters()
+
+    def _has_capacity(self) -> bool:
+        limit = self._config.max_in_flight
+        return limit is None or self._in_flight < limit
+
+    def _retry_after(self) -> int:
+        limit = self._config.max_in_flight or 1
+        estimate = self._avg_service_seconds * (len(self._waiters) + 1) / limit
+        return max(1, min(_MAX_RETRY_AFTER_SECONDS, math.ceil(estimate)))
+
+    def _admit(self, started: float) -> AdmissionTicket:
+        waited = time.monotonic() - started
+        self._admitted_total += 1
+        self._wait_seconds_total += waited
+        self._wait_seconds_max = max(self._wait_seconds_max, waited)
+        return AdmissionTicket(self, waited)
+
+    def _wake_waiters(self) -> None:
+        while self._waiters and self._has_capacity():
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self._in_flight += 1
+                waiter.set_result(None)
+
+    def _release(self) -> None:
+        self._in_flight -= 1
+        self._wake_waiters()
+
+    def _finish(self, service_seconds: float) -> None:
+        self._avg_service_seconds += _SERVICE_TIME_SMOOTHING * (
+            service_seconds - self._avg_service_seconds
+        )
+        self._release()
+
+    async def acquire(self) -> AdmissionTicket:
+        """Wait for an execution slot and return its ticket.
+
+        The caller must call ``ticket.release()`` once the execution ends.
+
+        Raises:
+            AdmissionRejectedError: With status 429 if the queue is full, or
+                503 if the slot did not free up within the queue deadline.
+        """
+        started = time.monotonic()
+        if self._has_capacity() and not self._waiters:
+            self._in_flight += 1
+            return self._admit(started)
+
+        if len(self._waiters) >= self._config.max_queue:
+            self._rejected_total += 1
+            raise AdmissionRejectedError(
+                429,
+                "Server is at capacity and its queue is full; retry later.",
+                self._retry_after(),
+            )
+
+        waiter: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            async with asyncio.timeout(self._config.queue_timeout_seconds):
+                await waiter
+        except BaseException as exc:
+            if waiter.done() and not waiter.cancelled():
+                # A slot was handed over just as we gave up; pass it on
+                self._release()
+            else:
+                waiter.cancel()
+                with suppress(ValueError):
+                    self._waiters.remove(waiter)
+            if isinstance(exc, TimeoutError):
+                self._timed_out_total += 1
+                raise AdmissionRejectedError(
+                    503,
+                    f"No execution slot freed up within "
+                    f"{self._config.queue_timeout_seconds}s; retry later.",
+                    self._retry_after(),
+                ) from None
+            raise
+
+        ticket = self._admit(started)
+        logger.debug(f"Admitted after waiting {ticket.waited:.2f}s")
+        return ticket
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[AdmissionTicket]:
+        """Hold an execution slot for the duration of the block."""
+        ticket = await self.acquire()
+        try:
+            yield ticket
+        finally:
+            ticket.release()
+
+    def stats(self) -> dict[str, Any]:
+        """Return queue depth, wait times and rejection counters."""
+        return {
+            "enabled": self._config.max_in_flight is not None,
+            "in_flight": self._in_flight,
+            "queued": len(self._waiters),
+            "max_in_flight": self._config.max_in_flight,
+            "max_queue": self._config.max_queue,
+            "admitted_total": self._admitted_total,
+            "rejected_total": self._rejected_total,
+            "timed_out_total": self._timed_out_total,
+            "wait_seconds_total": round(self._wait_seconds_total, 6),
+            "wait_seconds_max": round(self._wait_seconds_max, 6),
+            "avg_run_seconds": round(self._avg_service_seconds, 6),
+        }
+
+
+class AdmittedStreamingResponse(StreamingResponse):
+    """Streaming response that releases its execution slot once sent.
+
+    Releasing here rather than in the body generator also covers clients that
+    disconnect before the generator is first iterated. ``release`` frees the
+    slot and anything held with it, such as the run's thread.
+    """
+
+    def __init__(
+        self, content: Any, release: Callable[[], Awaitable[None]], **kwargs: Any
+    ):
+        super().__init__(content, **kwargs)
+        self.release = release
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            await self.release()
@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import asyncio
 import logging
 import time
 from typing import Any
@@ -68,6 +69,24 @@ class OIDCValidator:
         logger.info("OIDC JWKS fetched from %s", jwks_uri)
         return self._jwks_client
 
+    async def prefetch(self) -> bool:
+        """Fetch the OIDC discovery document and signing keys ahead of the first request.
+
+        Returns False if they could not be fetched; validation then retries
+        on the first request.
+        """
+        try:
+            jwks_client = await self._ensure_jwks()
+            await asyncio.to_thread(jwks_client.get_jwk_set)
+        except Exception as e:
+            logger.warning(
+                "OIDC prefetch from %s failed, retrying on first request: %s",
+                self._issuer,
+                e,
+            )
+            return False
+        return True
+
     async def validate_token(self, token: str) -> dict[str, Any]:
         """Decode and validate a JWT. Returns claims on success."""
         try:
@@ -0,0 +1,289 @@
+"""Background runs decoupled from the HTTP connection.
+
+Long, tool-heavy runs would otherwise hold an ``/agent/run`` connection open
+for minutes, where load balancers time them out. ``POST /agent/runs`` hands
+the run to the ``BackgroundRunManager`` and returns at once. The run executes
+in a task of its own, writes its encoded events to a ``RunEventLog`` and
+records its outcome, which clients poll with ``GET /agent/runs/{run_id}`` or
+follow with ``GET /agent/runs/{run_id}/events``.
+
+Background runs get their own pool of ``max_concurrent`` slots, so they
+can't take every execution slot from interactive requests. Runs beyond it
+wait in a FIFO queue of up to ``max_queued`` entries. Before a run takes a
+slot it enters the ``hold`` given at submission, which the router uses to
+wait for the run's thread and for global admission, so runs waiting on a
+busy thread hold no slot. Finished runs are kept for ``result_ttl_seconds``.
+"""
+
+import asyncio
+import contextlib
+import logging
+import time
+from collections import deque
+from collections.abc import AsyncIterator, Callable
+from contextlib import AbstractAsyncContextManager
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from typing import Any
+
+from ag_ui.core import EventType
+from idun_agent_schema.engine.api import BackgroundRunStatus
+from idun_agent_schema.engine.server import BackgroundRunsConfig
+
+from .run_log import RunEventLog
+
+logger = logging.getLogger(__name__)
+
+
+async def _aclose(events: AsyncIterator[Any]) -> None:
+    aclose = getattr(events, "aclose", None)
+    if aclose is not None:
+        await aclose()
+
+
+class BackgroundRunRejectedError(Exception):
+    """Raised when a run cannot be accepted: queue full or duplicate run id."""
+
+    def __init__(self, status_code: int, message: str):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+@dataclass(eq=False)
+class BackgroundRun:
+    """One submitted run and what is known about its outcome."""
+
+    run_id: str
+    thread_id: str
+    log: RunEventLog
+    owner: str | None = None
+    status: str = "queued"
+    created_at: datetime = field(default_factory=lambda: datetime.now(UTC))
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
+    state: Any = None
+    error: str | None = None
+    error_code: str | None = None
+    # Monotonic end time, for expiry
+    ended: float | None = None
+    task: asyncio.Task | None = field(default=None, repr=False)
+    _texts: dict[str, list[str]] = field(default_factory=dict, repr=False)
+    _last_message: str | None = field(default=None, repr=False)
+
+    async def observe(self, events: AsyncIterator[Any]) -> AsyncIterator[Any]:
+        """Pass ``events`` through, recording the run's output and errors."""
+        try:
+            async for event in events:
+                event_type = getattr(event, "type", None)
+                if event_type == EventType.TEXT_MESSAGE_CONTENT:
+                    self._texts.setdefault(event.message_id, []).append(event.delta)
+                    self._last_message = event.message_id
+                elif event_type == EventType.STATE_SNAPSHOT:
+                    self.state = event.snapshot
+                elif event_type == EventType.RUN_ERROR:
+                    self.record_error(event.message, event.code)
+                yield event
+        finally:
+            await _aclose(events)
+
+    def record_error(self, message: str, code: str | None = None) -> None:
+        """Mark the run failed with ``message``; the first error is kept."""
+        if self.error is None:
+            self.error = message
+            self.error_code = code
+
+    @property
+    def output(self) -> str | None:
+        if self._last_message is None:
+            return None
+        return "".join(self._texts[self._last_message])
+
+    def as_status(self) -> BackgroundRunStatus:
+        finished = self.status not in ("queued", "running")
+        return BackgroundRunStatus(
+            run_id=self.run_id,
+            thread_id=self.thread_id,
+            status=self.status,  # type: ignore[arg-type]
+            created_at=self.created_at,
+            started_at=self.started_at,
+            finished_at=self.finished_at,
+            output=self.output if finished else None,
+            state=self.state,
+            error=self.error,
+            error_code=self.error_code,
+        )
+
+
+class BackgroundRunManager:
+    """Executes background runs within their own concurrency limit."""
+
+    def __init__(self, config: BackgroundRunsConfig | None = None):
+        self._config = config or BackgroundRunsConfig()
+        self._runs: dict[str, BackgroundRun] = {}
+        self._tasks: set[asyncio.Task] = set()
+        self._waiters: deque[asyncio.Future] = deque()
+        self._running = 0
+        self._pending = 0  # submitted, not yet holding a slot
+        self._submitted_total = 0
+        self._rejected_total = 0
+        self._succeeded_total = 0
+        self._failed_total = 0
+
+    @property
+    def config(self) -> BackgroundRunsConfig:
+        return self._config
+
+    def configure(self, config: BackgroundRunsConfig) -> None:
+        """Apply new limits; runs already started or queued are kept."""
+        self._config = config
+        self._wake_waiters()
+
+    def get(self, run_id: str) -> BackgroundRun | None:
+        """Return a run that is in progress or whose result is still kept."""
+        self._prune()
+        return self._runs.get(run_id)
+
+    def submit(
+        self,
+        run_id: str,
+        thread_id: str,
+        frames: Callable[[BackgroundRun], AsyncIterator[str]],
+        owner: str | None = None,
+        hold: Callable[[BackgroundRun], AbstractAsyncContextManager[Any]] | None = None,
+    ) -> BackgroundRun:
+        """Queue a run whose encoded frames are produced by ``frames(run)``.
+
+        ``hold(run)`` is entered before the run takes a slot and left after
+        it ends.
+
+        Raises:
+            BackgroundRunRejectedError: If ``run_id`` is already known (409) or
+                the queue is full (429).
+        """
+        self._prune()
+        if run_id in self._runs:
+            self._rejected_total += 1
+            raise BackgroundRunRejectedError(
+                409, f"Run '{run_id}' already exists; use a new runId"
+            )
+        capacity = self._config.max_concurrent + self._config.max_queued
+        if self._running + self._pending >= capacity:
+            self._rejected_total += 1
+            raise BackgroundRunRejectedError(
+                429,
+                f"{self._config.max_queued} background runs are already queued; "
+                "retry later",
+            )
+        run = BackgroundRun(
+            run_id=run_id,
+            thread_id=thread_id,
+            log=RunEventLog(self._config.max_buffered_events),
+            owner=owner,
+        )
+        self._runs[run_id] = run
+        self._pending += 1
+        self._submitted_total += 1
+        run.task = asyncio.create_task(self._execute(run, frames, hold))
+        self._tasks.add(run.task)
+        run.task.add_done_callback(self._tasks.discard)
+        return run
+
+    async def _execute(
+        self,
+        run: BackgroundRun,
+        frames: Callable[[BackgroundRun], AsyncIterator[str]],
+        hold: Callable[[BackgroundRun], AbstractAsyncContextManager[Any]] | None,
+    ) -> None:
+        try:
+            async with contextlib.AsyncExitStack() as held:
+                try:
+                    if hold is not None:
+                        await held.enter_async_context(hold(run))
+                    await self._acquire()
+                finally:
+                    self._pending -= 1
+                held.callback(self._release)
+                run.status = "running"
+                run.started_at = datetime.now(UTC)
+                logger.info(f"Background run '{run.run_id}' started")
+                stream = frames(run)
+                try:
+                    async for frame in stream:
+                        run.log.append(frame)
+                finally:
+                    await _aclose(stream)
+            run.status = "failed" if run.error is not None else "succeeded"
+        except asyncio.CancelledError:
+            run.status = "cancelled"
+            raise
+        except Exception as e:  # noqa: BLE001
+            logger.error(f"Background run '{run.run_id}' failed: {e}", exc_info=True)
+            run.status = "failed"
+            run.error = run.error or str(e)
+        finally:
+            if run.status == "succeeded":
+                self._succeeded_total += 1
+            elif run.status == "failed":
+                self._failed_total += 1
+            run.finished_at = datetime.now(UTC)
+            run.ended = time.monotonic()
+            run.log.close()
+            logger.info(f"Background run '{run.run_id}' ended: {run.status}")
+
+    async def _acquire(self) -> None:
+        if self._running < self._config.max_concurrent and not self._waiters:
+            self._running += 1
+            return
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+            elif waiter.done() and not waiter.cancelled():
+                # Slot handed over just as we were cancelled: pass it on
+                self._release()
+            raise
+
+    def _release(self) -> None:
+        self._running -= 1
+        self._wake_waiters()
+
+    def _wake_waiters(self) -> None:
+        while self._waiters and self._running < self._config.max_concurrent:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self._running += 1
+                waiter.set_result(None)
+
+    def _prune(self) -> None:
+        cutoff = time.monotonic() - self._config.result_ttl_seconds
+        expired = [
+            run_id
+            for run_id, run in self._runs.items()
+            if run.ended is not None and run.ended < cutoff
+        ]
+        for run_id in expired:
+            self._runs.pop(run_id).log.discard()
+
+    async def close(self) -> None:
+        """Cancel every run still queued or executing."""
+        tasks = list(self._tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def stats(self) -> dict[str, Any]:
+        """Return how many runs are executing, queued and kept."""
+        return {
+            "running": self._running,
+            "queued": self._pending,
+            "kept": len(self._runs),
+            "max_concurrent": self._config.max_concurrent,
+            "max_queued": self._config.max_queued,
+            "submitted_total": self._submitted_total,
+            "rejected_total": self._rejected_total,
+            "succeeded_total": self._succeeded_total,
+            "failed_total": self._failed_total,
+        }
@@ -0,0 +1,135 @@
+"""Coalescing of text deltas in the /agent/run event stream.
+
+Fast models emit one ``TEXT_MESSAGE_CONTENT`` event per token, and each one
+costs its own serialization and socket write. ``coalesce_deltas`` merges
+consecutive deltas of the same message into a single event. The merged event
+is flushed once it holds ``max_chars`` characters, ``max_delay_ms`` after its
+first delta arrived, or as soon as any other event (or a delta of another
+message) comes in. RAW and CUSTOM events don't flush: ag_ui_langgraph sends a
+RAW event before every delta, so they are held and sent right after the
+merged delta instead. Apart from those, event order is unchanged.
+
+The time limit has to hold while the agent is silent, for example during a
+tool call. The source stream is therefore read by one background task that
+feeds a small queue, and the consumer waits on the queue with a deadline.
+The agent keeps running in that single task for the whole stream, so context
+variables it sets survive between events.
+"""
+
+import asyncio
+import logging
+from collections.abc import AsyncIterator
+from typing import Any
+
+from ag_ui.core import EventType
+from idun_agent_schema.engine.server import DeltaCoalescingConfig
+
+logger = logging.getLogger(__name__)
+
+# Events read ahead of the consumer; keeps backpressure on the agent
+_QUEUE_SIZE = 16
+_END = object()
+
+
+class _SourceError:
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+async def _pump(events: AsyncIterator[Any], queue: asyncio.Queue) -> None:
+    try:
+        async for event in events:
+            await queue.put(event)
+    except Exception as e:  # noqa: BLE001 - re-raised by the consumer
+        await queue.put(_SourceError(e))
+    else:
+        await queue.put(_END)
+
+
+# Sent after the merged delta they arrived with instead of flushing it
+_DEFERRED_EVENTS = frozenset({EventType.RAW, EventType.CUSTOM})
+
+
+def _merge(parts: list[Any]) -> Any:
+    if len(parts) == 1:
+        return parts[0]
+    # The parts' raw_event payloads describe single chunks, not the merged delta
+    return parts[0].model_copy(
+        update={"delta": "".join(p.delta for p in parts), "raw_event": None}
+    )
+
+
+def _flush(buffered: list[Any], deferred: list[Any]) -> list[Any]:
+    flushed = [_merge(buffered), *deferred]
+    buffered.clear()
+    deferred.clear()
+    return flushed
+
+
+async def coalesce_deltas(
+    events: AsyncIterator[Any], config: DeltaCoalescingConfig
+) -> AsyncIterator[Any]:
+    """Yield ``events`` with consecutive text deltas of one message merged."""
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue(maxsize=_QUEUE_SIZE)
+    pump = asyncio.ensure_future(_pump(events, queue))
+    max_delay = config.max_delay_ms / 1000
+    buffered: list[Any] = []
+    deferred: list[Any] = []
+    buffered_chars = 0
+    deadline = 0.0
+    try:
+        while True:
+            if buffered:
+                try:
+                    item = await asyncio.wait_for(
+                        queue.get(), timeout=max(deadline - loop.time(), 0)
+                    )
+                except TimeoutError:
+                    for flushed in _flush(buffered, deferred):
+                        yield flushed
+                    buffered_chars = 0
+                    continue
+            else:
+                item = await queue.get()
+
+            if item is _END or isinstance(item, _SourceError):
+                if buffered:
+                    for flushed in _flush(buffered, deferred):
+                        yield flushed
+                if isinstance(item, _SourceError):
+                    raise item.error
+                return
+
+            item_type = getattr(item, "type", None)
+            if item_type == EventType.TEXT_MESSAGE_CONTENT:
+                if buffered and buffered[0].message_id != item.message_id:
+                    for flushed in _flush(buffered, deferred):
+                        yield flushed
+                    buffered_chars = 0
+                if not buffered:
+                    deadline = loop.time() + max_delay
+                buffered.append(item)
+                buffered_chars += len(item.delta)
+                if buffered_chars >= config.max_chars:
+                    for flushed in _flush(buffered, deferred):
+                        yield flushed
+                    buffered_chars = 0
+                continue
+
+            if buffered and item_type in _DEFERRED_EVENTS:
+                deferred.append(item)
+                continue
+
+            if buffered:
+                for flushed in _flush(buffered, deferred):
+                    yield flushed
+                buffered_chars = 0
+            yield item
+    finally:
+        if not pump.done():
+            pump.cancel()
+        await asyncio.gather(pump, return_exceptions=True)
+        aclose = getattr(events, "aclose", None)
+        if aclose is not None:
+            await aclose()
@@ -6,7 +6,12 @@ from fastapi import HTTPException, Request, status
 from idun_agent_schema.engine.capabilities import AgentCapabilities
 
 from ..core.config_builder import ConfigBuilder
+from ..guardrails.executor import GuardrailExecutor
 from ..mcp import MCPClientRegistry
+from .admission import AdmissionController
+from .background_runs import BackgroundRunManager
+from .run_log import RunLogRegistry
+from .thread_locks import ThreadLockManager
 
 logger = logging.getLogger(__name__)
 
@@ -71,3 +76,56 @@ def get_mcp_registry(request: Request) -> MCPClientRegistry:
             detail="MCP servers are not configured for this engine.",
         )
     return registry
+
+
+def get_thread_locks(request: Request) -> ThreadLockManager:
+    """Return the app's per-thread run lock manager, creating one if missing."""
+    manager: ThreadLockManager | None = getattr(
+        request.app.state, "thread_locks", None
+    )
+    if manager is None:
+        manager = ThreadLockManager()
+        request.app.state.thread_locks = manager
+    return manager
+
+
+def get_admission(request: Request) -> AdmissionController:
+    """Return the app's admission controller, creating an unlimited one if missing."""
+    controller: AdmissionController | None = getattr(
+        request.app.state, "admission", None
+    )
+    if controller is None:
+        controller = AdmissionController()
+        request.app.state.admission = controller
+    return controller
+
+
+def get_guardrail_executor(request: Request) -> GuardrailExecutor:
+    """Return the app's guardrail executor, creating one with defaults if missing."""
+    executor: GuardrailExecutor | None = getattr(
+        request.app.state, "guardrail_executor", None
+    )
+    if executor is None:
+        executor = GuardrailExecutor()
+        request.app.state.guardrail_executor = executor
+    return executor
+
+
+def get_run_logs(request: Request) -> RunLogRegistry:
+    """Return the app's run event logs, creating a disabled registry if missing."""
+    registry: RunLogRegistry | None = getattr(request.app.state, "run_logs", None)
+    if registry is None:
+        registry = RunLogRegistry()
+        request.app.state.run_logs = registry
+    return registry
+
+
+def get_background_runs(request: Request) -> BackgroundRunManager:
+    """Return the app's background run manager, creating one if missing."""
+    manager: BackgroundRunManager | None = getattr(
+        request.app.state, "background_runs", None
+    )
+    if manager is None:
+        manager = BackgroundRunManager()
+        request.app.state.background_runs = manager
+    return manager
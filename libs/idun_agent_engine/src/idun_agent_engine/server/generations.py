@@ -0,0 +1,124 @@
+"""Agent generations for zero-downtime reloads.
+
+Everything built from one ``EngineConfig`` (agent, MCP registry, guardrails,
+SSO validator, integrations) forms an ``AgentGeneration``. A reload builds
+the next generation next to the current one, swaps it onto ``app.state`` in
+a single step, and closes the previous generation in the background once the
+requests that started on it have finished.
+
+Every HTTP request holds a lease on the generation that was current when it
+arrived (see ``GenerationLeaseMiddleware``). Leases last until the response,
+including a streamed one, has been fully sent.
+"""
+
+import asyncio
+from collections.abc import Iterator, Sequence
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any
+
+from starlette.datastructures import State
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from ..guardrails.base import Guard
+from ..mcp.registry import MCPClientRegistry
+
+
+@dataclass(eq=False)
+class AgentGeneration:
+    """One set of agent resources built from a single engine config."""
+
+    number: int
+    engine_config: Any
+    agent: Any = None
+    mcp_registry: MCPClientRegistry | None = None
+    guardrails: Sequence[Guard] = ()
+    sso_validator: Any = None
+    copilotkit_agent: Any = None
+    capabilities: Any = None
+    integrations: list[Any] = field(default_factory=list)
+    # app.state attributes written by integrations during setup
+    integration_state: dict[str, Any] = field(default_factory=dict)
+    # Config sections that differed from the generation it was built from, and
+    # the components carried over from that generation unchanged
+    changed_sections: list[str] = field(default_factory=list)
+    reused: list[str] = field(default_factory=list)
+    # Per-phase timings of the build, see ``StartupProfile.as_dict``
+    startup_profile: dict[str, Any] = field(default_factory=dict)
+    _in_flight: int = field(default=0, init=False, repr=False)
+    _idle: asyncio.Event = field(default_factory=asyncio.Event, init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self._idle.set()
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    @contextmanager
+    def lease(self) -> Iterator["AgentGeneration"]:
+        """Keep this generation open for the duration of the block."""
+        self._in_flight += 1
+        self._idle.clear()
+        try:
+            yield self
+        finally:
+            self._in_flight -= 1
+            if self._in_flight == 0:
+                self._idle.set()
+
+    def track(self, task: asyncio.Task) -> asyncio.Task:
+        """Keep this generation open until a background ``task`` finishes."""
+        lease = self.lease()
+        lease.__enter__()
+        task.add_done_callback(lambda _task: lease.__exit__(None, None, None))
+        return task
+
+    async def wait_idle(self, timeout: float | None = None) -> bool:
+        """Wait until no lease is held. Returns False if the timeout expired."""
+        try:
+            async with asyncio.timeout(timeout):
+                await self._idle.wait()
+        except TimeoutError:
+            return False
+        return True
+
+
+class StagedApp:
+    """Stand-in for the FastAPI app while a generation is being built.
+
+    Integrations write their clients to ``state`` here instead of the live
+    ``app.state``, so nothing user-visible changes until the swap. Routers are
+    included on the live app, once per prefix, since handlers only read
+    ``app.state`` at request time.
+    """
+
+    def __init__(self, app: Any):
+        self._app = app
+        self.state = State()
+
+    def include_router(self, router: Any, prefix: str = "", **kwargs: Any) -> None:
+        routes = getattr(getattr(self._app, "router", None), "routes", None) or []
+        paths = {getattr(route, "path", None) for route in routes}
+        if any(f"{prefix}{route.path}" in paths for route in router.routes):
+            return
+        self._app.include_router(router, prefix=prefix, **kwargs)
+
+    def staged_attributes(self) -> dict[str, Any]:
+        return dict(self.state._state)
+
+
+class GenerationLeaseMiddleware:
+    """ASGI middleware that leases the current generation for each HTTP request."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        app = scope.get("app")
+        generation = getattr(getattr(app, "state", None), "generation", None)
+        if scope["type"] != "http" or not isinstance(generation, AgentGeneration):
+            await self.app(scope, receive, send)
+            return
+        with generation.lease():
+            await self.app(scope, receive, send)
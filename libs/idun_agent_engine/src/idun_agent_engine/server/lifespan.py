@@ -2,6 +2,8 @@
 
 Initializes the agent at startup and cleans up resources on shutdown.
 """
+import asyncio
+import functools
 import inspect
 import logging
 from collections.abc import Sequence
@@ -10,25 +12,77 @@ from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from idun_agent_schema.engine.guardrails import Guardrails
 
-from idun_agent_engine.mcp.registry import MCPClientRegistry, set_active_registry
+from idun_agent_engine.mcp.registry import (
+    MCPClientRegistry,
+    get_active_registry,
+    set_active_registry,
+)
 
 from ..core.config_builder import ConfigBuilder
-from ..guardrails.base import BaseGuardrail
+from ..core.config_diff import changed_sections
+from ..core.utils import is_loaded_instance
+from ..guardrails.base import Guard
+from ..guardrails.executor import GuardrailExecutor
+from ..guardrails.worker_pool import worker_pools_of
 from ..telemetry import get_telemetry, sanitize_telemetry_config
+from .admission import AdmissionController
+from .background_runs import BackgroundRunManager
+from .generations import AgentGeneration, StagedApp
+from .run_log import RunLogRegistry
+from .startup import StartupOrchestrator
+from .thread_locks import ThreadLockManager
 
 logger = logging.getLogger(__name__)
 
 
-def _parse_guardrails(guardrails_obj: Guardrails) -> Sequence[BaseGuardrail]:
+def _parse_guardrails(guardrails_obj: Guardrails) -> Sequence[Guard]:
     """Adds the position of the guardrails (input/output) and returns the lift of updated guardrails."""
-    from ..guardrails.guardrails_hub.guardrails_hub import GuardrailsHubGuard as GHGuard
+    from ..guardrails.fast_tier import build_fast_tiers
 
     if not guardrails_obj:
         return []
 
-    return [GHGuard(guard, position="input") for guard in guardrails_obj.input] + [
-        GHGuard(guard, position="output") for guard in guardrails_obj.output
+    # Fast tiers come first so the executor checks them before the hub guards
+    return [*build_fast_tiers(guardrails_obj), *_build_hub_guards(guardrails_obj)]
+
+
+def _build_hub_guards(guardrails_obj: Guardrails) -> Sequence[Guard]:
+    from ..guardrails.guardrails_hub.cache import ValidatorCache
+    from ..guardrails.guardrails_hub.guardrails_hub import GuardrailsHubGuard as GHGuard
+
+    cache_dir = getattr(guardrails_obj, "cache_dir", None)
+    cache = ValidatorCache(cache_dir)
+    worker_pool = getattr(guardrails_obj, "worker_pool", None)
+    if worker_pool is None:
+        return [
+            GHGuard(guard, position="input", cache=cache)
+            for guard in guardrails_obj.input
+        ] + [
+            GHGuard(guard, position="output", cache=cache)
+            for guard in guardrails_obj.output
+        ]
+
+    from ..guardrails.guardrails_hub.guardrails_hub import build_hub_guard
+    from ..guardrails.worker_pool import GuardrailWorkerPool, GuardSpec
+
+    specs = [GuardSpec(guard, "input") for guard in guardrails_obj.input] + [
+        GuardSpec(guard, "output") for guard in guardrails_obj.output
     ]
+    # Install here, one at a time, so workers only load models from the cache
+    for spec in specs:
+        GHGuard(spec.config, position=spec.position, cache=cache, load=False)
+    pool = GuardrailWorkerPool(
+        worker_pool, functools.partial(build_hub_guard, cache_dir=cache_dir)
+    )
+    return pool.start(specs)
+
+
+async def _close_agent(agent) -> None:
+    close_fn = getattr(agent, "close", None)
+    if callable(close_fn):
+        result = close_fn()
+        if inspect.isawaitable(result):
+            await result
 
 
 async def cleanup_agent(app: FastAPI):
@@ -36,79 +90,227 @@ async def cleanup_agent(app: FastAPI):
     set_active_registry(None)
     agent = getattr(app.state, "agent", None)
     if agent is not None:
-        close_fn = getattr(agent, "close", None)
-        if callable(close_fn):
-            result = close_fn()
-            if inspect.isawaitable(result):
-                await result
+        await _close_agent(agent)
 
 
-async def configure_app(app: FastAPI, engine_config):
-    """Initialize the agent, MCP registry, guardrails, and app state with the given engine config."""
-    guardrails_obj = engine_config.guardrails
-    try:
-        guardrails = _parse_guardrails(guardrails_obj) if guardrails_obj else []
-        logger.debug(f"Guardrails: {guardrails}")
-    except Exception as e:
-        logger.exception(f"Failed to parse guardrails: {e}, continuing without them")
-        guardrails = []
+def _configure_runtime_controls(app: FastAPI, engine_config) -> None:
+    """Create or update the app-wide run controls, guardrail executor and run logs."""
+    # Keep existing managers across reloads so in-flight runs keep their locks and slots
+    thread_lock_config = engine_config.server.thread_lock
+    thread_locks = getattr(app.state, "thread_locks", None)
+    if isinstance(thread_locks, ThreadLockManager):
+        thread_locks.configure(thread_lock_config)
+    else:
+        app.state.thread_locks = ThreadLockManager(thread_lock_config)
 
-    # Use ConfigBuilder's centralized agent initialization, passing the registry
-    try:
-        mcp_registry = MCPClientRegistry(engine_config.mcp_servers or [])
-    except Exception as e:
-        logger.exception(f"⚠️ Failed to initialize MCP registry: {e}, continuing without MCP servers")
-        mcp_registry = MCPClientRegistry()
-    set_active_registry(mcp_registry)
-    app.state.mcp_registry = mcp_registry
-    try:
-        agent_instance = await ConfigBuilder.initialize_agent_from_config(engine_config, mcp_registry)
-    except Exception as e:
-        raise ValueError(
-            f"Error retrieving agent instance from ConfigBuilder: {e}"
-        ) from e
+    admission_config = engine_config.server.admission
+    admission = getattr(app.state, "admission", None)
+    if isinstance(admission, AdmissionController):
+        admission.configure(admission_config)
+    else:
+        app.state.admission = AdmissionController(admission_config)
 
-    app.state.agent = agent_instance
-    app.state.config = engine_config
-    app.state.engine_config = engine_config
+    execution_config = engine_config.server.guardrail_execution
+    executor = getattr(app.state, "guardrail_executor", None)
+    if isinstance(executor, GuardrailExecutor):
+        executor.configure(execution_config)
+    else:
+        app.state.guardrail_executor = GuardrailExecutor(execution_config)
 
-    app.state.guardrails = guardrails
-    mcp_servers = engine_config.mcp_servers
-    if mcp_servers:
-        try:
-            app.state.mcp_servers = mcp_servers
-            for s in mcp_servers:
-                logger.info(
-                    f"🔧 MCP Server {s.name}: [{s.transport.upper()}] {s.url or s.command}"
+    replay_config = engine_config.server.streaming.replay
+    run_logs = getattr(app.state, "run_logs", None)
+    if isinstance(run_logs, RunLogRegistry):
+        run_logs.configure(replay_config)
+    else:
+        app.state.run_logs = RunLogRegistry(replay_config)
+
+    background_config = engine_config.server.background_runs
+    background_runs = getattr(app.state, "background_runs", None)
+    if isinstance(background_runs, BackgroundRunManager):
+        background_runs.configure(background_config)
+    else:
+        app.state.background_runs = BackgroundRunManager(background_config)
+
+
+# Sections whose change requires the agent (graph module, checkpointer,
+# callbacks) to be rebuilt. Graph code may read prompts and MCP tools while
+# it is being built.
+AGENT_SECTIONS = frozenset({"agent", "observability", "mcp_servers", "prompts"})
+
+
+async def build_generation(
+    app: FastAPI, engine_config, reuse_from: AgentGeneration | None = None
+) -> AgentGeneration:
+    """Build the agent, MCP registry, guardrails, SSO and integrations for a config.
+
+    Components whose config sections are unchanged from ``reuse_from`` are
+    carried over instead of rebuilt. Nothing on ``app.state`` is replaced;
+    call ``activate_generation`` to start serving the result.
+    """
+    previous = getattr(app.state, "generation", None)
+    number = previous.number + 1 if isinstance(previous, AgentGeneration) else 1
+    generation = AgentGeneration(number=number, engine_config=engine_config)
+
+    changed = changed_sections(
+        reuse_from.engine_config if reuse_from is not None else None, engine_config
+    )
+    generation.changed_sections = sorted(changed)
+
+    def _reuse(component: str) -> bool:
+        if reuse_from is None:
+            return False
+        generation.reused.append(component)
+        return True
+
+    orchestrator = StartupOrchestrator()
+
+    if "guardrails" not in changed and _reuse("guardrails"):
+        generation.guardrails = reuse_from.guardrails
+        orchestrator.mark("guardrails", "reused")
+    elif engine_config.guardrails:
+
+        async def load_guardrails() -> None:
+            try:
+                # Hub validators install and load their models synchronously
+                generation.guardrails = await asyncio.to_thread(
+                    _parse_guardrails, engine_config.guardrails
                 )
-        except Exception as e:
-            logger.exception(f"Failed to assign mcp servers to agent: {e}, continuing without them")
-            mcp_servers = []
+                logger.debug(f"Guardrails: {generation.guardrails}")
+            except Exception as e:
+                logger.exception(f"Failed to parse guardrails: {e}, continuing without them")
+                generation.guardrails = []
+
+        orchestrator.add("guardrails", load_guardrails)
+
+    if "mcp_servers" not in changed and _reuse("mcp_registry"):
+        generation.mcp_registry = reuse_from.mcp_registry
+        orchestrator.mark("mcp_registry", "reused")
+    else:
+
+        async def create_mcp_registry() -> None:
+            # Use ConfigBuilder's centralized agent initialization, passing the registry
+            try:
+                mcp_registry = MCPClientRegistry(engine_config.mcp_servers or [])
+            except Exception as e:
+                logger.exception(f"⚠️ Failed to initialize MCP registry: {e}, continuing without MCP servers")
+                mcp_registry = MCPClientRegistry()
+            mcp_servers = engine_config.mcp_servers
+            if mcp_servers:
+                for s in mcp_servers:
+                    logger.info(
+                        f"🔧 MCP Server {s.name}: [{s.transport.upper()}] {s.url or s.command}"
+                    )
+            generation.mcp_registry = mcp_registry
+
+        orchestrator.add("mcp_registry", create_mcp_registry)
+
+    if not (changed & AGENT_SECTIONS) and _reuse("agent"):
+        generation.agent = reuse_from.agent
+        generation.copilotkit_agent = reuse_from.copilotkit_agent
+        generation.capabilities = reuse_from.capabilities
+        orchestrator.mark("agent", "reused")
+    else:
+
+        async def build_agent() -> None:
+            await _build_agent(generation, engine_config)
+
+        orchestrator.add("agent", build_agent, depends_on=["mcp_registry"])
 
     # SSO / OIDC setup
     sso_config = engine_config.sso
-    if sso_config and sso_config.enabled:
-        from ..server.auth import OIDCValidator
+    if "sso" not in changed and _reuse("sso"):
+        generation.sso_validator = reuse_from.sso_validator
+        orchestrator.mark("sso", "reused")
+    elif sso_config and sso_config.enabled:
+
+        async def setup_sso() -> None:
+            from ..server.auth import OIDCValidator
+
+            try:
+                generation.sso_validator = OIDCValidator(sso_config)
+                logger.info(f"🔒 SSO enabled — issuer: {sso_config.issuer}")
+            except Exception as e:
+                logger.exception(f"Failed to add SSO: {e}, continuing without them")
+                return
+            # Fetch the signing keys now instead of on the first request
+            await generation.sso_validator.prefetch()
+
+        orchestrator.add("sso", setup_sso)
+
+    # Setup integrations (WhatsApp, etc.) against a staged app state
+    if "integrations" not in changed and _reuse("integrations"):
+        generation.integrations = reuse_from.integrations
+        generation.integration_state = reuse_from.integration_state
+        orchestrator.mark("integrations", "reused")
+    elif engine_config.integrations:
+
+        async def setup_integrations_phase() -> None:
+            from ..integrations import setup_integrations
+
+            staged_app = StagedApp(app)
+            generation.integrations = await setup_integrations(
+                staged_app, engine_config.integrations, generation.agent
+            )
+            generation.integration_state = staged_app.staged_attributes()
+
+        orchestrator.add("integrations", setup_integrations_phase, depends_on=["agent"])
 
+    try:
+        profile = await orchestrator.run()
+    except BaseException:
+        # Worker processes outlive a failed build unless stopped here
+        if "guardrails" not in generation.reused:
+            _close_guardrail_workers(generation.guardrails)
+        raise
+    generation.startup_profile = profile.as_dict()
+    return generation
+
+
+def _close_guardrail_workers(guardrails: Sequence[object]) -> None:
+    for pool in worker_pools_of(guardrails):
         try:
-            app.state.sso_validator = OIDCValidator(sso_config)
-            logger.info(f"🔒 SSO enabled — issuer: {sso_config.issuer}")
+            pool.close()
         except Exception as e:
-            logger.exception(f"Failed to add SSO: {e}, continuing without them")
-            app.state.sso_validator = None
-    else:
-        app.state.sso_validator = None
+            logger.warning(f"⚠️ Failed to stop guardrail workers: {e}")
+
+
+async def _build_agent(generation: AgentGeneration, engine_config) -> None:
+    """Initialize the agent and its derived AG-UI adapter and capabilities."""
+    # Agent code may load its MCP tools through the active registry while it is
+    # being built, so the new registry has to be active from here on.
+    previous_registry = get_active_registry()
+    set_active_registry(generation.mcp_registry)
+    try:
+        agent_instance = await ConfigBuilder.initialize_agent_from_config(
+            engine_config, generation.mcp_registry
+        )
+    except Exception as e:
+        set_active_registry(previous_registry)
+        raise ValueError(
+            f"Error retrieving agent instance from ConfigBuilder: {e}"
+        ) from e
+    generation.agent = agent_instance
 
     agent_name = getattr(agent_instance, "name", "Unknown")
     logger.info(f"✅ Agent '{agent_name}' initialized and ready to serve!")
 
-    # Setup AGUI routes if the agent is a LangGraph agent
-    from ..agent.adk.adk import AdkAgent
-    from ..agent.langgraph.langgraph import LanggraphAgent
-
-    if isinstance(agent_instance, (LanggraphAgent, AdkAgent)):
+    # Setup AGUI routes if the agent is a LangGraph or ADK agent. Only the
+    # adapter for the configured framework has been imported at this point.
+    is_langgraph = is_loaded_instance(
+        agent_instance, "idun_agent_engine.agent.langgraph.langgraph", "LanggraphAgent"
+    )
+    is_adk = is_loaded_instance(
+        agent_instance, "idun_agent_engine.agent.adk.adk", "AdkAgent"
+    )
+    if is_langgraph:
+        # Apply monkey patches for upstream ag-ui bugs (safe to remove once fixed upstream)
+        from .patches import apply_all as _apply_ag_ui_patches
+
+        _apply_ag_ui_patches()
+
+    if is_langgraph or is_adk:
         try:
-            app.state.copilotkit_agent = agent_instance.copilotkit_agent_instance
+            generation.copilotkit_agent = agent_instance.copilotkit_agent_instance
         except Exception as e:
             logger.warning(f"⚠️ Failed to setup AGUI routes: {e}")
             # Continue even if AGUI setup fails
@@ -116,35 +318,132 @@ async def configure_app(app: FastAPI, engine_config):
     # Cache agent capabilities for discovery endpoint
     if hasattr(agent_instance, "discover_capabilities"):
         try:
-            app.state.capabilities = agent_instance.discover_capabilities()
+            generation.capabilities = agent_instance.discover_capabilities()
             logger.info(
                 f"📋 Agent capabilities discovered: "
-                f"input={app.state.capabilities.input.mode}, "
-                f"output={app.state.capabilities.output.mode}"
+                f"input={generation.capabilities.input.mode}, "
+                f"output={generation.capabilities.output.mode}"
             )
         except Exception as e:
             logger.warning(f"⚠️ Failed to discover agent capabilities: {e}")
-            app.state.capabilities = None
 
-    # Setup integrations (WhatsApp, etc.)
-    if engine_config.integrations:
-        from ..integrations import setup_integrations
 
-        app.state.integrations = await setup_integrations(
-            app, engine_config.integrations, agent_instance
+def activate_generation(app: FastAPI, generation: AgentGeneration) -> AgentGeneration | None:
+    """Swap ``generation`` onto ``app.state`` and return the one it replaces.
+
+    Runs without awaiting, so requests see either the old or the new
+    generation, never a mix.
+    """
+    previous = getattr(app.state, "generation", None)
+    engine_config = generation.engine_config
+
+    set_active_registry(generation.mcp_registry)
+    app.state.mcp_registry = generation.mcp_registry
+    app.state.agent = generation.agent
+    app.state.config = engine_config
+    app.state.engine_config = engine_config
+    app.state.guardrails = generation.guardrails
+    if engine_config.mcp_servers:
+        app.state.mcp_servers = engine_config.mcp_servers
+    app.state.sso_validator = generation.sso_validator
+    if generation.copilotkit_agent is not None:
+        app.state.copilotkit_agent = generation.copilotkit_agent
+    if hasattr(generation.agent, "discover_capabilities"):
+        app.state.capabilities = generation.capabilities
+    for name, value in generation.integration_state.items():
+        setattr(app.state, name, value)
+    app.state.integrations = generation.integrations
+    _configure_runtime_controls(app, engine_config)
+    if "guardrails" not in generation.reused:
+        # The guards were rebuilt (or removed); their old verdicts must not be served
+        app.state.guardrail_executor.clear_verdicts()
+    app.state.generation = generation
+
+    return previous if isinstance(previous, AgentGeneration) else None
+
+
+async def close_generation(
+    generation: AgentGeneration, successor: AgentGeneration | None = None
+) -> None:
+    """Shut down a generation's integrations and close its agent.
+
+    Components that ``successor`` carried over are left open.
+    """
+    kept = successor.integrations if successor is not None else []
+    for integration in generation.integrations:
+        if any(integration is other for other in kept):
+            continue
+        try:
+            await integration.shutdown()
+        except Exception as e:
+            logger.warning(f"⚠️ Failed to shutdown integration: {e}")
+    if generation.agent is not None and (
+        successor is None or successor.agent is not generation.agent
+    ):
+        await _close_agent(generation.agent)
+    if successor is None or successor.guardrails is not generation.guardrails:
+        await asyncio.to_thread(_close_guardrail_workers, generation.guardrails)
+
+
+async def _drain_and_close(
+    generation: AgentGeneration, successor: AgentGeneration, timeout: float
+) -> None:
+    # Cancelled on shutdown: skip the wait but still close the generation
+    try:
+        if not await generation.wait_idle(timeout):
+            logger.warning(
+                f"⚠️ Generation {generation.number} still had {generation.in_flight} "
+                f"request(s) in flight after {timeout}s, closing it anyway"
+            )
+    finally:
+        try:
+            await close_generation(generation, successor)
+            logger.info(f"♻️ Generation {generation.number} closed")
+        except Exception as e:
+            logger.exception(f"Failed to close generation {generation.number}: {e}")
+
+
+async def swap_generation(
+    app: FastAPI, engine_config, full: bool = False
+) -> AgentGeneration:
+    """Build a new generation, swap it in, and drain the old one in the background.
+
+    Only components whose config sections changed are rebuilt, unless
+    ``full`` is set. If building fails, the current generation keeps serving
+    and the error is raised.
+    """
+    current = getattr(app.state, "generation", None)
+    reuse_from = current if isinstance(current, AgentGeneration) and not full else None
+    generation = await build_generation(app, engine_config, reuse_from=reuse_from)
+    logger.info(
+        f"🔧 Generation {generation.number}: changed sections "
+        f"{generation.changed_sections or 'none'}, reused {generation.reused or 'nothing'}"
+    )
+    previous = activate_generation(app, generation)
+    if previous is not None:
+        timeout = engine_config.server.reload.drain_timeout_seconds
+        logger.info(
+            f"🔀 Generation {generation.number} is live, draining generation "
+            f"{previous.number} ({previous.in_flight} request(s) in flight)"
         )
-    else:
-        app.state.integrations = []
+        draining = getattr(app.state, "draining_tasks", None)
+        if not isinstance(draining, set):
+            draining = app.state.draining_tasks = set()
+        task = asyncio.create_task(_drain_and_close(previous, generation, timeout))
+        draining.add(task)
+        task.add_done_callback(draining.discard)
+    return generation
+
+
+async def configure_app(app: FastAPI, engine_config):
+    """Initialize the agent, MCP registry, guardrails, and app state with the given engine config."""
+    generation = await build_generation(app, engine_config)
+    activate_generation(app, generation)
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """FastAPI lifespan context to initialize and teardown the agent."""
-    # Apply monkey patches for upstream ag-ui bugs (safe to remove once fixed upstream)
-    from .patches import apply_all as _apply_ag_ui_patches
-
-    _apply_ag_ui_patches()
-
     # Load config and initialize agent on startup
     logger.info("🚀 Server starting up...")
     if not app.state.engine_config:
@@ -173,6 +472,14 @@ async def lifespan(app: FastAPI):
     # Clean up on shutdown
     logger.info("🔄 Idun Agent Engine shutting down...")
 
+    # Close generations still draining after a reload without waiting further
+    draining = getattr(app.state, "draining_tasks", None)
+    if isinstance(draining, set) and draining:
+        tasks = list(draining)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
     # Shutdown integrations
     for integration in getattr(app.state, "integrations", []):
         try:
@@ -180,6 +487,18 @@ async def lifespan(app: FastAPI):
         except Exception as e:
             logger.warning(f"⚠️ Failed to shutdown integration: {e}")
 
+    # Runs kept going for resumable streams and background runs still use the agent
+    run_logs = getattr(app.state, "run_logs", None)
+    if isinstance(run_logs, RunLogRegistry):
+        await run_logs.close()
+    background_runs = getattr(app.state, "background_runs", None)
+    if isinstance(background_runs, BackgroundRunManager):
+        await background_runs.close()
+
+    executor = getattr(app.state, "guardrail_executor", None)
+    if isinstance(executor, GuardrailExecutor):
+        executor.shutdown()
+
     telemetry = getattr(app.state, "telemetry", None)
     if telemetry is not None:
         telemetry.capture("engine stopped")
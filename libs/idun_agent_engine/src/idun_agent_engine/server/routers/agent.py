@@ -1,27 +1,73 @@
 """Agent routes for invoking and streaming agent responses."""
 
+import asyncio
+import contextlib
+import copy
 import logging
 import time
+from collections.abc import AsyncIterator, Awaitable, Callable, Sequence
 from typing import Annotated, Any
 
+from ag_ui.core import EventType, RunErrorEvent
 from ag_ui.core.types import RunAgentInput
 from ag_ui.encoder import EventEncoder
-from ag_ui_adk import ADKAgent as ADKAGUIAgent
-from copilotkit import LangGraphAGUIAgent
-from fastapi import APIRouter, Depends, FastAPI, HTTPException, Request, status
+from fastapi import (
+    APIRouter,
+    Depends,
+    FastAPI,
+    Header,
+    HTTPException,
+    Query,
+    Request,
+    status,
+)
 from fastapi.responses import StreamingResponse
-from idun_agent_schema.engine.api import ChatRequest, ChatResponse
+from idun_agent_schema.engine.api import (
+    BackgroundRunStatus,
+    BatchInvokeRequest,
+    BatchInvokeResult,
+    ChatRequest,
+    ChatResponse,
+)
 from idun_agent_schema.engine.capabilities import AgentCapabilities
-from idun_agent_schema.engine.guardrails import Guardrail
+from idun_agent_schema.engine.server import (
+    BatchInvokeConfig,
+    DeltaCoalescingConfig,
+    StreamingConfig,
+)
 from pydantic import BaseModel
 
 from idun_agent_engine.agent.base import BaseAgent
+from idun_agent_engine.core.utils import is_loaded_instance
+from idun_agent_engine.guardrails.base import Guard
+from idun_agent_engine.guardrails.executor import GuardrailExecutor
+from idun_agent_engine.guardrails.streaming import guard_output_stream
+from idun_agent_engine.server.admission import (
+    AdmissionController,
+    AdmissionRejectedError,
+    AdmittedStreamingResponse,
+)
 from idun_agent_engine.server.auth import get_verified_user
+from idun_agent_engine.server.background_runs import (
+    BackgroundRun,
+    BackgroundRunManager,
+    BackgroundRunRejectedError,
+)
+from idun_agent_engine.server.coalescing import coalesce_deltas
 from idun_agent_engine.server.dependencies import (
+    get_admission,
     get_agent,
+    get_background_runs,
     get_capabilities,
     get_copilotkit_agent,
+    get_guardrail_executor,
+    get_run_logs,
+    get_thread_locks,
 )
+from idun_agent_engine.server.event_filter import filter_events, parse_event_types
+from idun_agent_engine.server.generations import AgentGeneration
+from idun_agent_engine.server.run_log import RunEventLog, RunLogGapError, RunLogRegistry
+from idun_agent_engine.server.thread_locks import ThreadBusyError, ThreadLockManager
 
 logger = logging.getLogger(__name__)
 agent_router = APIRouter()
@@ -55,15 +101,177 @@ def _guardrail_input_from(input_data: RunAgentInput) -> str | None:
     return None
 
 
-def _run_guardrails(
-    guardrails: list[Guardrail], text: str, position: str
+def _coalescing_for(
+    request: Request,
+    coalesce: bool | None,
+    coalesce_ms: float | None,
+    coalesce_chars: int | None,
+) -> DeltaCoalescingConfig | None:
+    """Return the delta coalescing settings for this request, or None if off.
+
+    The server config gives the defaults. Passing ``coalesce_ms`` or
+    ``coalesce_chars`` turns coalescing on unless ``coalesce`` is false.
+    """
+    engine_config = getattr(request.app.state, "engine_config", None)
+    streaming = (
+        engine_config.server.streaming
+        if engine_config is not None
+        else StreamingConfig()
+    )
+    config = streaming.coalescing
+    if coalesce is None:
+        coalesce = (
+            config.enabled or coalesce_ms is not None or coalesce_chars is not None
+        )
+    if not coalesce:
+        return None
+    overrides: dict[str, Any] = {"enabled": True}
+    if coalesce_ms is not None:
+        overrides["max_delay_ms"] = coalesce_ms
+    if coalesce_chars is not None:
+        overrides["max_chars"] = coalesce_chars
+    return config.model_copy(update=overrides)
+
+
+def _owner_of(user: dict | None) -> str | None:
+    """Return the SSO subject a run belongs to, if any."""
+    return user.get("sub") if user else None
+
+
+async def _record_run(
+    frames: Any, log: RunEventLog, release: Callable[[], Awaitable[None]]
+) -> None:
+    """Append a run's encoded frames to its log, independently of any client."""
+    try:
+        async with contextlib.aclosing(frames):
+            async for frame in frames:
+                log.append(frame)
+    finally:
+        log.close()
+        await release()
+
+
+async def _follow_run(log: RunEventLog, after: int):
+    """Stream a run's frames from its log, each with its SSE id."""
+    try:
+        async for seq, frame in log.follow(after):
+            yield f"id: {seq}\n{frame}"
+    except RunLogGapError as gap:
+        logger.warning(f"Run stream ended early — {gap}")
+        yield EventEncoder().encode(
+            RunErrorEvent(type=EventType.RUN_ERROR, message=str(gap), code="REPLAY_GAP")
+        )
+
+
+def _resume_run(
+    run_logs: RunLogRegistry,
+    input_data: RunAgentInput,
+    last_event_id: str,
+    user: dict | None,
+) -> StreamingResponse:
+    """Resume the stream of a logged run after ``last_event_id``."""
+    try:
+        after = int(last_event_id)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Last-Event-ID must be an event id sent by this run",
+        ) from e
+    log = run_logs.get(input_data.thread_id, input_data.run_id)
+    if log is None or log.owner != _owner_of(user):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Run '{input_data.run_id}' cannot be resumed; start a new run",
+        )
+    if not log.can_resume(after):
+        raise HTTPException(
+            status_code=status.HTTP_410_GONE,
+            detail=f"Events after {after} are no longer available; start a new run",
+        )
+    run_logs.record_resume()
+    logger.info(
+        f"Run resumed — thread_id={input_data.thread_id}, "
+        f"run_id={input_data.run_id}, after={after}"
+    )
+    return StreamingResponse(_follow_run(log, after), media_type="text/event-stream")
+
+
+async def _encoded_events(
+    make_events: Callable[[], AsyncIterator[Any]],
+    hold: contextlib.AbstractAsyncContextManager[Any],
+    encoder: EventEncoder,
+    on_error: Callable[[str, str], None] | None = None,
+) -> AsyncIterator[str]:
+    """Run ``make_events()`` inside ``hold`` and encode what it yields.
+
+    Failures end the stream with a RUN_ERROR event rather than an exception;
+    ``on_error`` is called with its message and code.
+    """
+    try:
+        async with hold:
+            async for event in make_events():
+                try:
+                    yield encoder.encode(event)
+                except Exception as encoding_error:
+                    logger.error(
+                        f"Event encoding error: {encoding_error}", exc_info=True
+                    )
+                    from ag_ui.core import EventType, RunErrorEvent
+
+                    error_event = RunErrorEvent(
+                        type=EventType.RUN_ERROR,
+                        message=f"Event encoding failed: {encoding_error}",
+                        code="ENCODING_ERROR",
+                    )
+                    if on_error is not None:
+                        on_error(error_event.message, "ENCODING_ERROR")
+                    try:
+                        yield encoder.encode(error_event)
+                    except Exception:
+                        yield 'event: error\ndata: {"error": "Event encoding failed"}\n\n'
+                    break
+    except ThreadBusyError as busy:
+        logger.warning(f"Run rejected — {busy}")
+        from ag_ui.core import EventType, RunErrorEvent
+
+        if on_error is not None:
+            on_error(str(busy), "THREAD_BUSY")
+        yield encoder.encode(
+            RunErrorEvent(
+                type=EventType.RUN_ERROR, message=str(busy), code="THREAD_BUSY"
+            )
+        )
+    except Exception as agent_error:
+        logger.error(f"Agent run error: {agent_error}", exc_info=True)
+        from ag_ui.core import EventType, RunErrorEvent
+
+        error_event = RunErrorEvent(
+            type=EventType.RUN_ERROR,
+            message=f"Agent execution failed: {agent_error}",
+            code="FRAMEWORK_ERROR",
+        )
+        if on_error is not None:
+            on_error(error_event.message, "FRAMEWORK_ERROR")
+        try:
+            yield encoder.encode(error_event)
+        except Exception:
+            yield 'event: error\ndata: {"error": "Agent execution failed"}\n\n'
+
+
+async def _run_guardrails(
+    guardrails: Sequence[Guard],
+    text: str,
+    position: str,
+    executor: GuardrailExecutor,
 ) -> None:
-    """Validate text against guardrails matching the given position."""
-    for guard in guardrails:
-        if guard.position != position:  # type: ignore[attr-defined]
-            continue
-        if not guard.validate(text):  # type: ignore[attr-defined]
-            raise HTTPException(status_code=429, detail=guard.reject_message)  # type: ignore[attr-defined]
+    """Validate text against guardrails matching the given position.
+
+    Guards run concurrently in the executor's worker pool, off the event loop.
+    """
+    guards = [g for g in guardrails if g.position == position]
+    rejected = await executor.first_rejection(guards, text)
+    if rejected is not None:
+        raise HTTPException(status_code=429, detail=rejected.reject_message)
 
 
 @agent_router.get("/capabilities")
@@ -80,61 +288,427 @@ async def run(
     input_data: RunAgentInput,
     request: Request,
     agent: Annotated[BaseAgent, Depends(get_agent)],
+    thread_locks: Annotated[ThreadLockManager, Depends(get_thread_locks)],
+    admission: Annotated[AdmissionController, Depends(get_admission)],
+    guardrail_executor: Annotated[GuardrailExecutor, Depends(get_guardrail_executor)],
+    run_logs: Annotated[RunLogRegistry, Depends(get_run_logs)],
     _user: Annotated[dict | None, Depends(get_verified_user)],
+    coalesce: Annotated[
+        bool | None,
+        Query(description="Merge consecutive text deltas into fewer events."),
+    ] = None,
+    coalesce_ms: Annotated[
+        float | None,
+        Query(gt=0, le=1000, description="Longest a delta is held for merging."),
+    ] = None,
+    coalesce_chars: Annotated[
+        int | None,
+        Query(ge=1, description="Merged delta size at which it is sent."),
+    ] = None,
+    include_events: Annotated[
+        str | None,
+        Header(
+            alias="X-Idun-Include-Events",
+            description="Comma-separated AG-UI event types to send. Others are dropped.",
+        ),
+    ] = None,
+    exclude_events: Annotated[
+        str | None,
+        Header(
+            alias="X-Idun-Exclude-Events",
+            description="Comma-separated AG-UI event types not to send.",
+        ),
+    ] = None,
+    state_snapshots: Annotated[
+        str | None,
+        Header(
+            alias="X-Idun-State-Snapshots",
+            description="'delta' sends state snapshots as STATE_DELTA patches.",
+        ),
+    ] = None,
+    last_event_id: Annotated[
+        str | None,
+        Header(
+            alias="Last-Event-ID",
+            description="Resume this run's stream after the given event id.",
+        ),
+    ] = None,
 ):
     """Canonical AG-UI interaction endpoint.
 
-    Accepts RunAgentInput, returns SSE stream of AG-UI events.
+    Accepts RunAgentInput, returns SSE stream of AG-UI events. Runs on the
+    same thread_id are serialized; a run that cannot get its thread, because
+    its queue is full or the wait timed out, is rejected with 409. Once it
+    holds its thread, a run waits for an execution slot when the engine is at
+    capacity and is rejected with 429/503 and Retry-After. Output
+    guardrails check the streamed text window by window; a failing window
+    ends the stream with an OUTPUT_GUARDRAIL error event. With ``coalesce``
+    consecutive text deltas of a message are merged into fewer events. The
+    X-Idun-Include-Events / X-Idun-Exclude-Events headers select the event
+    types sent, and ``X-Idun-State-Snapshots: delta`` turns state snapshots
+    into patches. With replay enabled the run continues if the client
+    disconnects, and a request for the same thread and run with
+    ``Last-Event-ID`` resumes its stream instead of starting it again.
     """
+    if run_logs.enabled and last_event_id is not None:
+        return _resume_run(run_logs, input_data, last_event_id, _user)
+
     last_msg = input_data.messages[-1] if input_data.messages else None
     last_content = str(last_msg.content)[:120] if last_msg else "<empty>"
     logger.info(f"Run — thread_id={input_data.thread_id}, message={last_content}")
 
+    try:
+        include = parse_event_types(include_events)
+        exclude = parse_event_types(exclude_events)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail=str(e)
+        ) from e
+    if state_snapshots not in (None, "full", "delta"):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="X-Idun-State-Snapshots must be 'full' or 'delta'",
+        )
+    state_deltas = state_snapshots == "delta"
+    # Taken before the run starts: the agent may update the input state in place
+    client_state = copy.deepcopy(input_data.state) if state_deltas else None
+
     guardrails = getattr(request.app.state, "guardrails", [])
     if guardrails:
         guardrail_input = _guardrail_input_from(input_data)
         if guardrail_input is not None:
-            _run_guardrails(guardrails, text=guardrail_input, position="input")
+            await _run_guardrails(
+                guardrails,
+                text=guardrail_input,
+                position="input",
+                executor=guardrail_executor,
+            )
+
+    output_guards = [g for g in guardrails if g.position == "output"]
+    coalescing = _coalescing_for(request, coalesce, coalesce_ms, coalesce_chars)
 
     accept_header = request.headers.get("accept")
     encoder = EventEncoder(accept=accept_header or "")
 
-    async def event_generator():
-        try:
-            async for event in agent.run(input_data):
-                try:
-                    yield encoder.encode(event)
-                except Exception as encoding_error:
-                    logger.error(
-                        f"Event encoding error: {encoding_error}", exc_info=True
-                    )
-                    from ag_ui.core import EventType, RunErrorEvent
+    def make_events() -> AsyncIterator[Any]:
+        events: AsyncIterator[Any] = agent.run(input_data)
+        if include is not None or exclude is not None or state_deltas:
+            events = filter_events(
+                events,
+                include=include,
+                exclude=exclude,
+                state_deltas=state_deltas,
+                client_state=client_state,
+            )
+        if output_guards:
+            events = guard_output_stream(
+                events,
+                output_guards,
+                guardrail_executor,
+                guardrail_executor.config.output_stream,
+            )
+        if coalescing is not None:
+            events = coalesce_deltas(events, coalescing)
+        return events
 
-                    error_event = RunErrorEvent(
-                        type=EventType.RUN_ERROR,
-                        message=f"Event encoding failed: {encoding_error}",
-                        code="ENCODING_ERROR",
-                    )
-                    try:
-                        yield encoder.encode(error_event)
-                    except Exception:
-                        yield 'event: error\ndata: {"error": "Event encoding failed"}\n\n'
-                    break
-        except Exception as agent_error:
-            logger.error(f"Agent run error: {agent_error}", exc_info=True)
-            from ag_ui.core import EventType, RunErrorEvent
-
-            error_event = RunErrorEvent(
-                type=EventType.RUN_ERROR,
-                message=f"Agent execution failed: {agent_error}",
-                code="FRAMEWORK_ERROR",
+    def event_generator():
+        # The thread and the execution slot are already held by ``held``
+        return _encoded_events(make_events, contextlib.nullcontext(), encoder)
+
+    held = await _hold_thread_then_slot(thread_locks, admission, input_data.thread_id)
+
+    # Replay needs SSE ids, so other encodings stream directly
+    if run_logs.enabled and encoder.get_content_type() == "text/event-stream":
+        log = run_logs.create(
+            input_data.thread_id, input_data.run_id, owner=_owner_of(_user)
+        )
+        task = asyncio.create_task(_record_run(event_generator(), log, held.aclose))
+        run_logs.track(task)
+        generation = getattr(request.app.state, "generation", None)
+        if isinstance(generation, AgentGeneration):
+            generation.track(task)
+        return StreamingResponse(
+            _follow_run(log, after=0), media_type=encoder.get_content_type()
+        )
+
+    return AdmittedStreamingResponse(
+        event_generator(), release=held.aclose, media_type=encoder.get_content_type()
+    )
+
+
+async def _hold_thread_then_slot(
+    thread_locks: ThreadLockManager,
+    admission: AdmissionController,
+    thread_id: str,
+) -> contextlib.AsyncExitStack:
+    """Wait for the thread, then for an execution slot, and hold both.
+
+    The slot is only taken once the thread is free, so runs queued behind a
+    busy thread don't keep other threads from running. Both are released by
+    closing the returned stack.
+
+    Raises:
+        HTTPException: 409 if the thread is busy, 429/503 if not admitted.
+    """
+    held = contextlib.AsyncExitStack()
+    try:
+        await held.enter_async_context(thread_locks.hold(thread_id))
+        held.callback((await admission.acquire()).release)
+    except ThreadBusyError as e:
+        await held.aclose()
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e)) from e
+    except AdmissionRejectedError as e:
+        await held.aclose()
+        raise HTTPException(
+            status_code=e.status_code, detail=str(e), headers=e.headers
+        ) from e
+    except BaseException:
+        await held.aclose()
+        raise
+    return held
+
+
+@agent_router.post(
+    "/runs",
+    status_code=status.HTTP_202_ACCEPTED,
+    response_model=BackgroundRunStatus,
+)
+async def submit_background_run(
+    input_data: RunAgentInput,
+    request: Request,
+    agent: Annotated[BaseAgent, Depends(get_agent)],
+    thread_locks: Annotated[ThreadLockManager, Depends(get_thread_locks)],
+    admission: Annotated[AdmissionController, Depends(get_admission)],
+    guardrail_executor: Annotated[GuardrailExecutor, Depends(get_guardrail_executor)],
+    background_runs: Annotated[BackgroundRunManager, Depends(get_background_runs)],
+    _user: Annotated[dict | None, Depends(get_verified_user)],
+):
+    """Start a run that continues without the client and return at once.
+
+    The run is queued behind the configured number of background runs and
+    executes like ``/agent/run``. Poll ``/agent/runs/{run_id}`` for its status
+    and result, or follow its events at ``/agent/runs/{run_id}/events``.
+    """
+    logger.info(
+        f"Background run — thread_id={input_data.thread_id}, run_id={input_data.run_id}"
+    )
+    guardrails = getattr(request.app.state, "guardrails", [])
+    if guardrails:
+        guardrail_input = _guardrail_input_from(input_data)
+        if guardrail_input is not None:
+            await _run_guardrails(
+                guardrails,
+                text=guardrail_input,
+                position="input",
+                executor=guardrail_executor,
             )
+    output_guards = [g for g in guardrails if g.position == "output"]
+
+    try:
+        thread_locks.check_capacity(input_data.thread_id)
+    except ThreadBusyError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e)) from e
+
+    def frames(background_run: BackgroundRun) -> AsyncIterator[str]:
+        def make_events() -> AsyncIterator[Any]:
+            events: AsyncIterator[Any] = agent.run(input_data)
+            if output_guards:
+                events = guard_output_stream(
+                    events,
+                    output_guards,
+                    guardrail_executor,
+                    guardrail_executor.config.output_stream,
+                )
+            return background_run.observe(events)
+
+        # The thread and the execution slot are already held by ``hold``
+        return _encoded_events(
+            make_events,
+            contextlib.nullcontext(),
+            EventEncoder(),
+            on_error=background_run.record_error,
+        )
+
+    def hold(
+        background_run: BackgroundRun,
+    ) -> contextlib.AbstractAsyncContextManager[None]:
+        return _hold_background_run(thread_locks, admission, background_run)
+
+    try:
+        background_run = background_runs.submit(
+            input_data.run_id,
+            input_data.thread_id,
+            frames,
+            owner=_owner_of(_user),
+            hold=hold,
+        )
+    except BackgroundRunRejectedError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e)) from e
+
+    generation = getattr(request.app.state, "generation", None)
+    if isinstance(generation, AgentGeneration) and background_run.task is not None:
+        generation.track(background_run.task)
+    return background_run.as_status()
+
+
+@contextlib.asynccontextmanager
+async def _hold_background_run(
+    thread_locks: ThreadLockManager,
+    admission: AdmissionController,
+    background_run: BackgroundRun,
+) -> AsyncIterator[None]:
+    """Hold a background run's thread, then a global execution slot.
+
+    A run that gets neither fails with the reason recorded on it.
+    """
+    try:
+        async with (
+            thread_locks.hold(background_run.thread_id),
+            admission.slot(),
+        ):
+            yield
+    except ThreadBusyError as e:
+        background_run.record_error(str(e), "THREAD_BUSY")
+        raise
+    except AdmissionRejectedError as e:
+        background_run.record_error(str(e), "AT_CAPACITY")
+        raise
+
+
+def _background_run_for(
+    background_runs: BackgroundRunManager, run_id: str, user: dict | None
+) -> BackgroundRun:
+    background_run = background_runs.get(run_id)
+    if background_run is None or background_run.owner != _owner_of(user):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Run '{run_id}' not found or its result has expired",
+        )
+    return background_run
+
+
+@agent_router.get("/runs/{run_id}", response_model=BackgroundRunStatus)
+async def get_background_run(
+    run_id: str,
+    background_runs: Annotated[BackgroundRunManager, Depends(get_background_runs)],
+    _user: Annotated[dict | None, Depends(get_verified_user)],
+):
+    """Return the status of a background run, with its result once finished."""
+    return _background_run_for(background_runs, run_id, _user).as_status()
+
+
+@agent_router.get("/runs/{run_id}/events")
+async def get_background_run_events(
+    run_id: str,
+    background_runs: Annotated[BackgroundRunManager, Depends(get_background_runs)],
+    _user: Annotated[dict | None, Depends(get_verified_user)],
+    last_event_id: Annotated[
+        str | None,
+        Header(
+            alias="Last-Event-ID",
+            description="Continue the stream after the given event id.",
+        ),
+    ] = None,
+):
+    """Stream a background run's AG-UI events, from the start or ``Last-Event-ID``.
+
+    Events already produced are replayed first; the stream ends with the run.
+    """
+    background_run = _background_run_for(background_runs, run_id, _user)
+    try:
+        after = int(last_event_id) if last_event_id is not None else 0
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Last-Event-ID must be an event id sent by this run",
+        ) from e
+    if not background_run.log.can_resume(after):
+        raise HTTPException(
+            status_code=status.HTTP_410_GONE,
+            detail=f"Events after {after} are no longer available",
+        )
+    return StreamingResponse(
+        _follow_run(background_run.log, after), media_type="text/event-stream"
+    )
+
+
+@agent_router.post("/batch")
+async def batch_invoke(
+    batch: BatchInvokeRequest,
+    request: Request,
+    agent: Annotated[BaseAgent, Depends(get_agent)],
+    thread_locks: Annotated[ThreadLockManager, Depends(get_thread_locks)],
+    admission: Annotated[AdmissionController, Depends(get_admission)],
+    guardrail_executor: Annotated[GuardrailExecutor, Depends(get_guardrail_executor)],
+    _user: Annotated[dict | None, Depends(get_verified_user)],
+):
+    """Invoke the agent with many chat requests and stream the results as NDJSON.
+
+    Items run like ``/agent/invoke``, at most ``max_concurrency`` at a time,
+    and each result line is sent as soon as its item completes. A failed item
+    gets a line with its status code and error; the other items carry on.
+    """
+    engine_config = getattr(request.app.state, "engine_config", None)
+    config = (
+        engine_config.server.batch if engine_config is not None else BatchInvokeConfig()
+    )
+    if len(batch.items) > config.max_items:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"A batch may contain at most {config.max_items} items",
+        )
+    concurrency = min(
+        batch.max_concurrency or config.max_concurrency, config.max_concurrency
+    )
+    guardrails = getattr(request.app.state, "guardrails", [])
+    logger.info(f"Batch — items={len(batch.items)}, concurrency={concurrency}")
+
+    def invoke_one(item: ChatRequest) -> Awaitable[ChatResponse]:
+        return _invoke_chat(
+            item, agent, thread_locks, admission, guardrail_executor, guardrails
+        )
+
+    return StreamingResponse(
+        _batch_results(batch.items, concurrency, invoke_one),
+        media_type="application/x-ndjson",
+    )
+
+
+async def _batch_results(
+    items: list[ChatRequest],
+    concurrency: int,
+    invoke_one: Callable[[ChatRequest], Awaitable[ChatResponse]],
+) -> AsyncIterator[str]:
+    """Yield one NDJSON line per item, in completion order."""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run_item(index: int, item: ChatRequest) -> BatchInvokeResult:
+        async with semaphore:
             try:
-                yield encoder.encode(error_event)
-            except Exception:
-                yield 'event: error\ndata: {"error": "Agent execution failed"}\n\n'
+                result = await invoke_one(item)
+            except HTTPException as e:
+                return BatchInvokeResult(
+                    index=index,
+                    session_id=item.session_id,
+                    status_code=e.status_code,
+                    error=str(e.detail),
+                )
+        return BatchInvokeResult(
+            index=index, session_id=item.session_id, response=result.response
+        )
 
-    return StreamingResponse(event_generator(), media_type=encoder.get_content_type())
+    tasks = [
+        asyncio.create_task(run_item(index, item)) for index, item in enumerate(items)
+    ]
+    try:
+        for next_result in asyncio.as_completed(tasks):
+            result = await next_result
+            yield result.model_dump_json(exclude_none=True) + "\n"
+    finally:
+        # The client went away: stop the items that have not completed
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
 
 
 @agent_router.get("/graph")
@@ -204,9 +778,8 @@ async def stream(
 async def copilotkit_stream(
     input_data: RunAgentInput,
     request: Request,
-    copilotkit_agent: Annotated[
-        LangGraphAGUIAgent | ADKAGUIAgent, Depends(get_copilotkit_agent)
-    ],
+    copilotkit_agent: Annotated[Any, Depends(get_copilotkit_agent)],
+    guardrail_executor: Annotated[GuardrailExecutor, Depends(get_guardrail_executor)],
     _user: Annotated[dict | None, Depends(get_verified_user)],
 ):
     """Process a message with the agent, streaming ag-ui events."""
@@ -224,10 +797,13 @@ async def copilotkit_stream(
     guardrails = getattr(request.app.state, "guardrails", [])
     if guardrails:
         logger.debug(f"Running {len(guardrails)} input guardrails")
-        _run_guardrails(
-            guardrails, text=str(input_data.messages[-1].content), position="input"
+        await _run_guardrails(
+            guardrails,
+            text=str(input_data.messages[-1].content),
+            position="input",
+            executor=guardrail_executor,
         )
-    if isinstance(copilotkit_agent, LangGraphAGUIAgent):
+    if is_loaded_instance(copilotkit_agent, "copilotkit", "LangGraphAGUIAgent"):
         try:
             # Get the accept header from the request
             accept_header = request.headers.get("accept")
@@ -245,7 +821,7 @@ async def copilotkit_stream(
             )
         except Exception as e:  # noqa: BLE001
             raise HTTPException(status_code=500, detail=str(e)) from e
-    elif isinstance(copilotkit_agent, ADKAGUIAgent):
+    elif is_loaded_instance(copilotkit_agent, "ag_ui_adk", "ADKAgent"):
         try:
             # Get the accept header from the request
             accept_header = request.headers.get("accept")
@@ -316,6 +892,79 @@ async def copilotkit_stream(
         raise HTTPException(status_code=400, detail="Invalid agent type")
 
 
+async def _invoke_chat(
+    input_data: ChatRequest,
+    agent: BaseAgent,
+    thread_locks: ThreadLockManager,
+    admission: AdmissionController,
+    guardrail_executor: GuardrailExecutor,
+    guardrails: Sequence[Guard],
+) -> ChatResponse:
+    """Invoke the agent with one chat request, as ``/agent/invoke`` does.
+
+    Raises:
+        HTTPException: With the status ``/agent/invoke`` responds with.
+    """
+    if guardrails:
+        await _run_guardrails(
+            guardrails,
+            text=input_data.query,
+            position="input",
+            executor=guardrail_executor,
+        )
+
+    try:
+        query = input_data.query[:120]
+        logger.info(f"Invoke session={input_data.session_id} query={query}")
+        message = {
+            "query": input_data.query,
+            "session_id": input_data.session_id,
+        }
+        try:
+            # The slot is taken once the thread is free, so runs queued on a
+            # busy thread don't hold one while they wait
+            async with (
+                thread_locks.hold(input_data.session_id),
+                admission.slot(),
+            ):
+                start = time.monotonic()
+                response = await agent.invoke(message)
+            logger.info(
+                f"Invoke session={input_data.session_id} completed in {time.monotonic() - start:.2f}s response={str(response)[:200]}"
+            )
+            if guardrails:
+                await _run_guardrails(
+                    guardrails,
+                    text=str(response),
+                    position="output",
+                    executor=guardrail_executor,
+                )
+            return ChatResponse(session_id=input_data.session_id, response=response)
+        except ThreadBusyError as e:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT, detail=str(e)
+            ) from e
+        except AdmissionRejectedError as e:
+            raise HTTPException(
+                status_code=e.status_code, detail=str(e), headers=e.headers
+            ) from e
+        except HTTPException:
+            raise
+        except Exception as e:
+            logger.error(
+                f"Invoke session={input_data.session_id} failed: {e}", exc_info=True
+            )
+            raise HTTPException(
+                status_code=400,
+                detail="Make sure your input schema is {'query': 'your input', 'session_id': 'your-session-id'",
+            ) from e
+    except HTTPException:
+        raise
+    except Exception as e:  # noqa: BLE001
+        logger.error(f"Invoke failed: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e)) from e
+
+
 def register_invoke_route(app: FastAPI, input_model: type[BaseModel]) -> None:
     """Register the /invoke route dynamically with the given input model.
 
@@ -327,42 +976,22 @@ def register_invoke_route(app: FastAPI, input_model: type[BaseModel]) -> None:
         request: Request,
         input_data: input_model,  # type: ignore[valid-type]
         agent: Annotated[BaseAgent, Depends(get_agent)],
+        thread_locks: Annotated[ThreadLockManager, Depends(get_thread_locks)],
+        admission: Annotated[AdmissionController, Depends(get_admission)],
+        guardrail_executor: Annotated[
+            GuardrailExecutor, Depends(get_guardrail_executor)
+        ],
         _user: Annotated[dict | None, Depends(get_verified_user)],
     ) -> ChatResponse:
         """Invoke the agent with a message and get a response."""
-        guardrails = getattr(request.app.state, "guardrails", [])
-        if guardrails:
-            _run_guardrails(
-                guardrails, text=input_data.query, position="input"
-            )
-
-        try:
-            query = input_data.query[:120]
-            logger.info(f"Invoke session={input_data.session_id} query={query}")
-            message = {
-                "query": input_data.query,
-                "session_id": input_data.session_id,
-            }
-            try:
-                start = time.monotonic()
-                response = await agent.invoke(message)
-                logger.info(
-                    f"Invoke session={input_data.session_id} completed in {time.monotonic() - start:.2f}s response={str(response)[:200]}"
-                )
-                return ChatResponse(session_id=input_data.session_id, response=response)
-            except Exception as e:
-                logger.error(
-                    f"Invoke session={input_data.session_id} failed: {e}", exc_info=True
-                )
-                raise HTTPException(
-                    status_code=400,
-                    detail="Make sure your input schema is {'query': 'your input', 'session_id': 'your-session-id'",
-                ) from e
-        except HTTPException:
-            raise
-        except Exception as e:  # noqa: BLE001
-            logger.error(f"Invoke failed: {e}", exc_info=True)
-            raise HTTPException(status_code=500, detail=str(e)) from e
+        return await _invoke_chat(
+            input_data,
+            agent,
+            thread_locks,
+            admission,
+            guardrail_executor,
+            getattr(request.app.state, "guardrails", []),
+        )
 
     # TODO: DEPRECATED — remove when /agent/run migration is complete
     app.add_api_route(
@@ -8,7 +8,8 @@ from pydantic import BaseModel
 
 from ..._version import __version__
 from ...core.config_builder import ConfigBuilder
-from ..lifespan import cleanup_agent, configure_app
+from ...guardrails.worker_pool import worker_pools_of
+from ..lifespan import swap_generation
 
 logger = logging.getLogger(__name__)
 
@@ -19,6 +20,7 @@ class ReloadRequest(BaseModel):
     """Request body for reload endpoint."""
 
     path: str | None = None
+    full: bool = False
 
 
 @base_router.get("/health")
@@ -37,6 +39,36 @@ def health_check(request: Request):
     }
 
 
+@base_router.get("/metrics")
+def runtime_metrics(request: Request):
+    """Runtime counters for dashboards and autoscalers, as JSON."""
+    thread_locks = getattr(request.app.state, "thread_locks", None)
+    admission = getattr(request.app.state, "admission", None)
+    guardrail_executor = getattr(request.app.state, "guardrail_executor", None)
+    run_logs = getattr(request.app.state, "run_logs", None)
+    background_runs = getattr(request.app.state, "background_runs", None)
+    checkpointer_stats = getattr(
+        getattr(request.app.state, "agent", None), "checkpointer_stats", None
+    )
+    return {
+        "thread_locks": thread_locks.stats() if thread_locks is not None else None,
+        "admission": admission.stats() if admission is not None else None,
+        "guardrails": (
+            guardrail_executor.stats() if guardrail_executor is not None else None
+        ),
+        "guardrail_workers": [
+            worker
+            for pool in worker_pools_of(getattr(request.app.state, "guardrails", ()))
+            for worker in pool.stats()
+        ],
+        "run_logs": run_logs.stats() if run_logs is not None else None,
+        "background_runs": (
+            background_runs.stats() if background_runs is not None else None
+        ),
+        "checkpointer": checkpointer_stats() if callable(checkpointer_stats) else None,
+    }
+
+
 @base_router.post("/reload")
 async def reload_config(request: Request, body: ReloadRequest | None = None):
     # TODO: This endpoint is not SSO-protected. Add require_auth dependency
@@ -63,15 +95,20 @@ async def reload_config(request: Request, body: ReloadRequest | None = None):
             )
             new_config = config_builder.build()
 
-        # Cleanup old agent
-        await cleanup_agent(request.app)
-
-        # Initialize new agent
-        await configure_app(request.app, new_config)
+        # Build the new agent next to the current one and swap it in; the old
+        # one keeps serving its in-flight requests until they finish. Only
+        # sections that changed are rebuilt unless a full reload is requested.
+        generation = await swap_generation(
+            request.app, new_config, full=bool(body and body.full)
+        )
 
         return {
             "status": "success",
             "message": "Agent configuration reloaded successfully",
+            "generation": generation.number,
+            "changed_sections": generation.changed_sections,
+            "reused": generation.reused,
+            "startup_profile": generation.startup_profile,
         }
 
     except HTTPException:
@@ -92,6 +129,7 @@ def read_root():
         "message": "Welcome to your Idun Agent Engine server!",
         "docs": "/docs",
         "health": "/health",
+        "metrics": "/metrics",
         "agent_endpoints": {"invoke": "/agent/invoke", "stream": "/agent/stream"},
     }
 
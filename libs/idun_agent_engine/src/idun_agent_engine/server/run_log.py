@@ -0,0 +1,319 @@
+"""Replayable event logs for resumable /agent/run streams.
+
+Without a log, a dropped connection loses the rest of the run and the client
+has to start a new one, paying for the LLM calls again. With replay enabled,
+each run is driven by a background task that appends its encoded SSE frames
+to a ``RunEventLog``. The response follows the log, and every frame carries an
+``id:``. A client that reconnects with ``Last-Event-ID`` follows the same log
+from the next frame on, while the run keeps going.
+
+The last ``max_buffered_events`` frames of a run are kept in memory. Older
+frames are appended to a file under ``spill_dir`` when one is configured, so
+a reconnect can still replay them. Without one they are dropped, except those
+a connected client has not read yet, which stay in memory until it has.
+Finished runs stay resumable for ``retention_seconds``.
+"""
+
+import asyncio
+import json
+import logging
+import time
+import uuid
+from collections import deque
+from collections.abc import AsyncIterator
+from pathlib import Path
+from typing import Any
+
+from idun_agent_schema.engine.server import RunReplayConfig
+
+logger = logging.getLogger(__name__)
+
+
+class RunLogGapError(Exception):
+    """Raised when frames a client asks for were dropped from the log."""
+
+
+class RunEventLog:
+    """Encoded frames of one run, numbered from 1."""
+
+    def __init__(
+        self,
+        max_buffered: int,
+        spill_path: Path | None = None,
+        owner: str | None = None,
+    ):
+        self._frames: deque[tuple[int, str]] = deque()
+        self._max_buffered = max_buffered
+        self._spill_path = spill_path
+        self._last_seq = 0
+        self._first_buffered = 1
+        self._changed = asyncio.Event()
+        # Read positions of the connected followers
+        self._followers: dict[object, int] = {}
+        # Spilled frames are written in batches by one task, off the event loop
+        self._spill_file: Any = None
+        self._spill_pending: list[tuple[int, str]] = []
+        self._spill_writing: list[tuple[int, str]] = []
+        self._spill_task: asyncio.Task | None = None
+        self._spill_discarded: Path | None = None
+        self.owner = owner
+        self.done = False
+        self.finished_at: float | None = None
+        self.spilled = 0
+
+    @property
+    def last_id(self) -> int:
+        return self._last_seq
+
+    def append(self, frame: str) -> int:
+        """Add ``frame`` and return its id."""
+        self._last_seq += 1
+        self._frames.append((self._last_seq, frame))
+        if len(self._frames) > self._max_buffered:
+            self._evict()
+        self._notify()
+        return self._last_seq
+
+    def close(self) -> None:
+        """Mark the run finished; followers stop after the last frame."""
+        self.done = True
+        self.finished_at = time.monotonic()
+        if self._spill_task is None:
+            self._release_spill()
+        self._notify()
+
+    def can_resume(self, after: int) -> bool:
+        """Whether every frame after id ``after`` can still be replayed."""
+        return after >= self._first_buffered - 1 or self._spill_path is not None
+
+    async def follow(self, after: int = 0) -> AsyncIterator[tuple[int, str]]:
+        """Yield ``(id, frame)`` for frames after ``after``, then new ones as they come.
+
+        Raises:
+            RunLogGapError: If frames after ``after`` were dropped from memory
+                and not spilled, e.g. because this follower fell too far behind.
+        """
+        follower = object()
+        self._followers[follower] = after
+        try:
+            while True:
+                changed = self._changed
+                if after < self._first_buffered - 1:
+                    spilled = await self._replay_spilled(after)
+                    if not spilled:
+                        raise RunLogGapError(
+                            f"Events {after + 1} to {self._first_buffered - 1} "
+                            "are no longer available"
+                        )
+                    for seq, frame in spilled:
+                        yield seq, frame
+                        after = self._followers[follower] = seq
+                    continue
+                # Copy: the deque may change while the caller consumes a frame
+                for seq, frame in [e for e in self._frames if e[0] > after]:
+                    yield seq, frame
+                    after = self._followers[follower] = seq
+                if after >= self._last_seq:
+                    if self.done:
+                        return
+                    await changed.wait()
+        finally:
+            del self._followers[follower]
+
+    async def drain(self) -> None:
+        """Wait until spilled frames are written, or removed if discarded."""
+        if self._spill_task is not None:
+            await asyncio.shield(self._spill_task)
+
+    def discard(self) -> None:
+        """Drop the buffered frames and the spill file.
+
+        Followers still reading get ``RunLogGapError``.
+        """
+        self._frames.clear()
+        self._first_buffered = self._last_seq + 1
+        if self._spill_path is not None:
+            self._spill_discarded = self._spill_path
+            self._spill_path = None
+            self._spill_pending = []
+            if self._spill_task is None:
+                self._release_spill()
+        self._notify()
+
+    def _notify(self) -> None:
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    def _evict(self) -> None:
+        read = self._last_seq
+        if self._spill_path is None:
+            # Nothing to replay them from, so keep frames a follower has not read
+            read = min(self._followers.values(), default=read)
+        while len(self._frames) > self._max_buffered and self._frames[0][0] <= read:
+            evicted = self._frames.popleft()
+            self._first_buffered = evicted[0] + 1
+            if self._spill_path is not None:
+                self._spill(evicted)
+
+    def _spill(self, entry: tuple[int, str]) -> None:
+        self._spill_pending.append(entry)
+        self.spilled += 1
+        if self._spill_task is None:
+            self._spill_task = asyncio.create_task(self._flush_spill())
+
+    async def _flush_spill(self) -> None:
+        try:
+            while self._spill_pending and self._spill_path is not None:
+                self._spill_writing, self._spill_pending = self._spill_pending, []
+                try:
+                    await asyncio.to_thread(
+                        self._write_spill, self._spill_path, self._spill_writing
+                    )
+                except OSError as e:
+                    # Followers that need the lost frames get RunLogGapError
+                    logger.error(f"Could not spill run events: {e}")
+                self._spill_writing = []
+        finally:
+            self._spill_task = None
+            if self.done or self._spill_path is None:
+                self._release_spill()
+
+    def _write_spill(self, path: Path, entries: list[tuple[int, str]]) -> None:
+        if self._spill_file is None:
+            self._spill_file = path.open("a", encoding="utf-8")
+        self._spill_file.writelines(
+            json.dumps({"id": seq, "frame": frame}) + "\n" for seq, frame in entries
+        )
+        # Followers replay from their own handle
+        self._spill_file.flush()
+
+    def _release_spill(self) -> None:
+        if self._spill_file is not None:
+            self._spill_file.close()
+            self._spill_file = None
+        if self._spill_discarded is not None:
+            self._spill_discarded.unlink(missing_ok=True)
+            self._spill_discarded = None
+
+    async def _replay_spilled(self, after: int) -> list[tuple[int, str]]:
+        """Return the evicted frames after ``after``, written out or not."""
+        if self._spill_path is None:
+            return []
+        before = self._first_buffered
+        # Taken before reading: a frame gone from here is already in the file
+        pending = {
+            seq: frame
+            for seq, frame in (*self._spill_writing, *self._spill_pending)
+            if after < seq < before
+        }
+        written = await asyncio.to_thread(self._read_spill, after, before)
+        frames = sorted({**dict(written), **pending}.items())
+        if [seq for seq, _ in frames] != list(range(after + 1, before)):
+            return []
+        return frames
+
+    def _read_spill(self, after: int, before: int) -> list[tuple[int, str]]:
+        path = self._spill_path
+        frames: list[tuple[int, str]] = []
+        if path is None or not path.exists():
+            return frames
+        with path.open(encoding="utf-8") as f:
+            for line in f:
+                entry = json.loads(line)
+                if after < entry["id"] < before:
+                    frames.append((entry["id"], entry["frame"]))
+        return frames
+
+
+class RunLogRegistry:
+    """Event logs of the runs that can currently be resumed."""
+
+    def __init__(self, config: RunReplayConfig | None = None):
+        self._config = config or RunReplayConfig()
+        self._logs: dict[tuple[str, str], RunEventLog] = {}
+        self._tasks: set[asyncio.Task] = set()
+        self._started_total = 0
+        self._resumed_total = 0
+        self._spilled_total = 0
+
+    @property
+    def config(self) -> RunReplayConfig:
+        return self._config
+
+    @property
+    def enabled(self) -> bool:
+        return self._config.enabled
+
+    def configure(self, config: RunReplayConfig) -> None:
+        """Apply new settings; logs of runs in progress are kept."""
+        self._config = config
+
+    def create(
+        self, thread_id: str, run_id: str, owner: str | None = None
+    ) -> RunEventLog:
+        """Start the log of a new run, replacing any earlier one with the same ids."""
+        self._prune()
+        spill_path = None
+        if self._config.spill_dir:
+            spill_dir = Path(self._config.spill_dir)
+            spill_dir.mkdir(parents=True, exist_ok=True)
+            spill_path = spill_dir / f"{uuid.uuid4().hex}.jsonl"
+        previous = self._logs.pop((thread_id, run_id), None)
+        if previous is not None:
+            self._drop(previous)
+        log = RunEventLog(self._config.max_buffered_events, spill_path, owner=owner)
+        self._logs[(thread_id, run_id)] = log
+        self._started_total += 1
+        return log
+
+    def get(self, thread_id: str, run_id: str) -> RunEventLog | None:
+        """Return the log of a run that can still be resumed."""
+        self._prune()
+        return self._logs.get((thread_id, run_id))
+
+    def record_resume(self) -> None:
+        self._resumed_total += 1
+
+    def track(self, task: asyncio.Task) -> asyncio.Task:
+        """Keep a reference to the task producing a run until it finishes."""
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    async def close(self) -> None:
+        """Cancel the runs still producing and drop every log."""
+        tasks = list(self._tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        logs = list(self._logs.values())
+        for log in logs:
+            self._drop(log)
+        self._logs.clear()
+        await asyncio.gather(*(log.drain() for log in logs))
+
+    def _drop(self, log: RunEventLog) -> None:
+        self._spilled_total += log.spilled
+        log.discard()
+
+    def _prune(self) -> None:
+        cutoff = time.monotonic() - self._config.retention_seconds
+        expired = [
+            key
+            for key, log in self._logs.items()
+            if log.finished_at is not None and log.finished_at < cutoff
+        ]
+        for key in expired:
+            self._drop(self._logs.pop(key))
+
+    def stats(self) -> dict[str, Any]:
+        """Return how many runs are logged and how often clients resumed."""
+        return {
+            "enabled": self._config.enabled,
+            "runs": len(self._logs),
+            "live_runs": sum(1 for log in self._logs.values() if not log.done),
+            "started_total": self._started_total,
+            "resumed_total": self._resumed_total,
+            "spilled_events_total": self._spilled_total
+            + sum(log.spilled for log in self._logs.values()),
+        }
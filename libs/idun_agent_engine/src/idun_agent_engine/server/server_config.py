@@ -1,8 +1,35 @@
 """Compatibility re-exports for server configuration models."""
 
 from idun_agent_schema.engine.server import (  # noqa: F401
+    AdmissionConfig,
+    BackgroundRunsConfig,
+    BatchInvokeConfig,
+    DeltaCoalescingConfig,
+    GuardrailBatchingConfig,
+    GuardrailExecutionConfig,
+    GuardrailVerdictCacheConfig,
+    OutputStreamGuardrailConfig,
+    ReloadConfig,
+    RunReplayConfig,
     ServerAPIConfig,
     ServerConfig,
+    StreamingConfig,
+    ThreadLockConfig,
 )
 
-__all__ = ["ServerAPIConfig", "ServerConfig"]
+__all__ = [
+    "AdmissionConfig",
+    "BackgroundRunsConfig",
+    "BatchInvokeConfig",
+    "DeltaCoalescingConfig",
+    "GuardrailBatchingConfig",
+    "GuardrailExecutionConfig",
+    "GuardrailVerdictCacheConfig",
+    "OutputStreamGuardrailConfig",
+    "ReloadConfig",
+    "RunReplayConfig",
+    "ServerAPIConfig",
+    "ServerConfig",
+    "StreamingConfig",
+    "ThreadLockConfig",
+]
@@ -0,0 +1,188 @@
+"""Concurrent startup of the components of an agent generation.
+
+Guardrail model loads, MCP registry creation, agent initialization, OIDC
+discovery and integration setup are mostly independent of each other. The
+``StartupOrchestrator`` runs them as a small task graph: each phase starts as
+soon as the phases it depends on have finished, so startup takes about as
+long as the slowest chain rather than the sum of all phases. Every phase is
+timed and the resulting ``StartupProfile`` is logged.
+"""
+
+import asyncio
+import logging
+import time
+from collections.abc import Awaitable, Callable, Iterable
+from dataclasses import dataclass
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PhaseTiming:
+    """Timing of one startup phase, relative to the start of the run."""
+
+    name: str
+    status: str
+    started: float = 0.0
+    duration: float = 0.0
+
+
+class StartupProfile:
+    """Per-phase timings of one startup run."""
+
+    def __init__(self, phases: list[PhaseTiming], total: float):
+        self.phases = phases
+        self.total = total
+
+    @property
+    def sequential(self) -> float:
+        """Time the phases would have taken one after another."""
+        return sum(phase.duration for phase in self.phases)
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "total_seconds": round(self.total, 3),
+            "sequential_seconds": round(self.sequential, 3),
+            "phases": [
+                {
+                    "name": phase.name,
+                    "status": phase.status,
+                    "started_seconds": round(phase.started, 3),
+                    "duration_seconds": round(phase.duration, 3),
+                }
+                for phase in self.phases
+            ],
+        }
+
+    def summary(self) -> str:
+        parts = []
+        for phase in self.phases:
+            if phase.status in ("reused", "skipped"):
+                parts.append(f"{phase.name} {phase.status}")
+                continue
+            part = f"{phase.name} {phase.duration:.2f}s"
+            if phase.started >= 0.01:
+                part += f" (from +{phase.started:.2f}s)"
+            if phase.status != "ok":
+                part += f" {phase.status}"
+            parts.append(part)
+        return (
+            f"{self.total:.2f}s total, {self.sequential:.2f}s if sequential: "
+            + ", ".join(parts)
+        )
+
+
+class StartupOrchestrator:
+    """Runs startup phases concurrently, respecting their dependencies.
+
+    Phases must be added after the phases they depend on, which rules out
+    cycles. If a phase raises, the phases still running are cancelled and the
+    error is re-raised from ``run``; phases that depend on it never start.
+    Blocking work inside a phase belongs in ``asyncio.to_thread``.
+    """
+
+    def __init__(self) -> None:
+        self._phases: dict[str, tuple[Callable[[], Awaitable[Any]], tuple[str, ...]]] = {}
+        self._timings: dict[str, PhaseTiming] = {}
+        self._order: list[str] = []
+        self.profile: StartupProfile | None = None
+
+    def add(
+        self,
+        name: str,
+        fn: Callable[[], Awaitable[Any]],
+        depends_on: Iterable[str] = (),
+    ) -> None:
+        """Register a phase that runs ``fn`` once ``depends_on`` have finished."""
+        depends_on = tuple(depends_on)
+        if name in self._order:
+            raise ValueError(f"Startup phase '{name}' is already registered")
+        unknown = [dep for dep in depends_on if dep not in self._order]
+        if unknown:
+            raise ValueError(
+                f"Startup phase '{name}' depends on unregistered phases: {unknown}"
+            )
+        self._phases[name] = (fn, depends_on)
+        self._order.append(name)
+
+    def mark(self, name: str, status: str) -> None:
+        """Record a phase that does not run (e.g. ``reused`` or ``skipped``)."""
+        if name in self._order:
+            raise ValueError(f"Startup phase '{name}' is already registered")
+        self._timings[name] = PhaseTiming(name=name, status=status)
+        self._order.append(name)
+
+    async def run(self) -> StartupProfile:
+        """Run all phases and return their profile."""
+        started = time.perf_counter()
+        tasks: dict[str, asyncio.Task] = {}
+
+        async def run_phase(name: str) -> None:
+            fn, depends_on = self._phases[name]
+            timing = self._timings[name] = PhaseTiming(name=name, status="waiting")
+            try:
+                await asyncio.gather(*(tasks[dep] for dep in depends_on if dep in tasks))
+            except asyncio.CancelledError:
+                timing.status = "cancelled"
+                raise
+            except BaseException:
+                timing.status = "skipped"
+                raise
+            timing.started = time.perf_counter() - started
+            timing.status = "running"
+            try:
+                await fn()
+            except asyncio.CancelledError:
+                timing.status = "cancelled"
+                raise
+            except BaseException:
+                timing.status = "failed"
+                raise
+            else:
+                timing.status = "ok"
+            finally:
+                timing.duration = time.perf_counter() - started - timing.started
+
+        for name in self._order:
+            if name in self._phases:
+                tasks[name] = asyncio.create_task(run_phase(name), name=f"startup:{name}")
+
+        try:
+            if tasks:
+                done, pending = await asyncio.wait(
+                    tasks.values(), return_when=asyncio.FIRST_EXCEPTION
+                )
+                failed = [
+                    task
+                    for task in done
+                    if not task.cancelled() and task.exception() is not None
+                ]
+                if failed:
+                    for task in pending:
+                        task.cancel()
+                    await asyncio.gather(*pending, return_exceptions=True)
+                    # Report the phase that failed first, not the dependents it skipped
+                    errors = [
+                        task
+                        for name, task in tasks.items()
+                        if task in failed and self._timings[name].status == "failed"
+                    ] or failed
+                    raise errors[0].exception()  # type: ignore[misc]
+        except BaseException:
+            for task in tasks.values():
+                task.cancel()
+            await asyncio.gather(*tasks.values(), return_exceptions=True)
+            self.profile = self._build_profile(started)
+            logger.warning(f"⏱️ Startup failed after {self.profile.summary()}")
+            raise
+
+        self.profile = self._build_profile(started)
+        logger.info(f"⏱️ Startup profile: {self.profile.summary()}")
+        return self.profile
+
+    def _build_profile(self, started: float) -> StartupProfile:
+        return StartupProfile(
+            [self._timings[name] for name in self._order if name in self._timings],
+            time.perf_counter() - started,
+        )
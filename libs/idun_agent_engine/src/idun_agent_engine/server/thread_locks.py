@@ -0,0 +1,151 @@
+"""Per-thread run serialization.
+
+Two runs on the same ``thread_id`` would otherwise read the same checkpoint
+and race to write the next one, silently dropping one of the turns. The
+``ThreadLockManager`` hands out one FIFO lock per thread so overlapping runs
+execute one after the other. Runs on different threads never wait on each
+other.
+
+Locks only exist while a thread has a holder or waiters, so memory stays
+proportional to the number of in-flight threads rather than every thread
+ever seen. Serialization is per process: with several workers, route a
+thread's traffic to a single worker (sticky sessions) for the same guarantee.
+"""
+
+import asyncio
+import logging
+import time
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Any
+
+from idun_agent_schema.engine.server import ThreadLockConfig
+
+logger = logging.getLogger(__name__)
+
+
+class ThreadBusyError(Exception):
+    """Raised when a run cannot get its thread: the queue is full or the wait timed out."""
+
+    def __init__(self, thread_id: str, message: str):
+        super().__init__(message)
+        self.thread_id = thread_id
+
+
+@dataclass
+class _ThreadSlot:
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+    users: int = 0  # current holder plus waiters
+
+
+class ThreadLockManager:
+    """Serializes runs that target the same thread_id."""
+
+    def __init__(self, config: ThreadLockConfig | None = None):
+        self._config = config or ThreadLockConfig()
+        self._slots: dict[str, _ThreadSlot] = {}
+        self._queued = 0
+        self._acquired_total = 0
+        self._rejected_total = 0
+        self._timed_out_total = 0
+        self._wait_seconds_total = 0.0
+        self._wait_seconds_max = 0.0
+
+    @property
+    def config(self) -> ThreadLockConfig:
+        return self._config
+
+    def configure(self, config: ThreadLockConfig) -> None:
+        """Apply new settings without dropping locks held by in-flight runs."""
+        self._config = config
+
+    def queue_length(self, thread_id: str) -> int:
+        """Return how many runs are waiting on ``thread_id``."""
+        slot = self._slots.get(thread_id)
+        if slot is None:
+            return 0
+        return slot.users - (1 if slot.lock.locked() else 0)
+
+    def check_capacity(self, thread_id: str | None) -> None:
+        """Raise ``ThreadBusyError`` if a new run on ``thread_id`` would be rejected.
+
+        Lets routes answer with an HTTP error before a response starts streaming.
+        """
+        if not self._config.enabled or not thread_id:
+            return
+        slot = self._slots.get(thread_id)
+        if slot is None or not slot.lock.locked():
+            return
+        if self.queue_length(thread_id) >= self._config.max_queue_depth:
+            self._rejected_total += 1
+            raise ThreadBusyError(
+                thread_id,
+                f"Thread '{thread_id}' already has a run in progress and "
+                f"{self._config.max_queue_depth} queued; retry later.",
+            )
+
+    @asynccontextmanager
+    async def hold(self, thread_id: str | None) -> AsyncIterator[float]:
+        """Hold the lock for ``thread_id`` for the duration of the block.
+
+        Yields the number of seconds spent waiting. Does nothing when
+        serialization is disabled or no thread_id is given.
+
+        Raises:
+            ThreadBusyError: If the queue is full or the wait times out.
+        """
+        if not self._config.enabled or not thread_id:
+            yield 0.0
+            return
+
+        self.check_capacity(thread_id)
+        slot = self._slots.setdefault(thread_id, _ThreadSlot())
+        slot.users += 1
+        try:
+            started = time.monotonic()
+            self._queued += 1
+            try:
+                async with asyncio.timeout(self._config.wait_timeout_seconds):
+                    await slot.lock.acquire()
+            except TimeoutError:
+                self._timed_out_total += 1
+                raise ThreadBusyError(
+                    thread_id,
+                    f"Timed out after {self._config.wait_timeout_seconds}s waiting "
+                    f"for the run in progress on thread '{thread_id}'.",
+                ) from None
+            finally:
+                self._queued -= 1
+
+            waited = time.monotonic() - started
+            self._acquired_total += 1
+            self._wait_seconds_total += waited
+            self._wait_seconds_max = max(self._wait_seconds_max, waited)
+            if waited >= 0.01:
+                logger.info(
+                    f"Run on thread '{thread_id}' waited {waited:.2f}s for its turn"
+                )
+            try:
+                yield waited
+            finally:
+                slot.lock.release()
+        finally:
+            slot.users -= 1
+            if slot.users == 0 and self._slots.get(thread_id) is slot:
+                del self._slots[thread_id]
+
+    def stats(self) -> dict[str, Any]:
+        """Return counters describing current and past contention."""
+        return {
+            "enabled": self._config.enabled,
+            "active_threads": len(self._slots),
+            "queued_runs": self._queued,
+            "max_queue_depth": self._config.max_queue_depth,
+            "wait_timeout_seconds": self._config.wait_timeout_seconds,
+            "acquired_total": self._acquired_total,
+            "rejected_total": self._rejected_total,
+            "timed_out_total": self._timed_out_total,
+            "wait_seconds_total": round(self._wait_seconds_total, 6),
+            "wait_seconds_max": round(self._wait_seconds_max, 6),
+        }
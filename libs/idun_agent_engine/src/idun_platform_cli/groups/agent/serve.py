@@ -25,12 +25,18 @@ class ServerSource(StrEnum):
 class Serve:
     """Helper class to run the server."""
 
-    def __init__(self, source: ServerSource, path: str | None = None) -> None:
+    def __init__(
+        self,
+        source: ServerSource,
+        path: str | None = None,
+        workers: int | None = None,
+    ) -> None:
         setup_logging()
         print_banner()
 
         self._source: ServerSource = source
         self._path: str | None = path or None
+        self._workers: int | None = workers
 
         if self._source == ServerSource.MANAGER and (
             not os.getenv("IDUN_AGENT_API_KEY") or not os.getenv("IDUN_MANAGER_HOST")
@@ -82,7 +88,13 @@ class Serve:
         """Run the server using the idun engine."""
         try:
             app = create_app(engine_config=self._config)
-            run_server(app, port=self._config.server.api.port, reload=False)  # pyright: ignore
+            workers = self._workers or self._config.server.api.workers  # pyright: ignore
+            run_server(
+                app,
+                port=self._config.server.api.port,  # pyright: ignore
+                reload=False,
+                workers=workers,
+            )
         except Exception as e:
             raise ValueError(f"[ERROR]: Cannot start the agent server: {e}") from e
 
@@ -90,15 +102,21 @@ class Serve:
 @click.command("serve")
 @click.option("--source", required=True)
 @click.option("--path")
+@click.option(
+    "--workers",
+    type=click.IntRange(min=1),
+    default=None,
+    help="Number of worker processes. Overrides server.api.workers from the config.",
+)
 @track_command("agent serve")
-def serve_command(source: str, path: str | None):
+def serve_command(source: str, path: str | None, workers: int | None):
     """Reads a config and exposes it's agent as an API. Config is either fetched from the manager, or from a path.
 
     Note: Fetching from the manager requires env vars: IDUN_AGENT_API_KEY and IDUN_MANAGER_HOST.
     """
     match source:
         case ServerSource.MANAGER:
-            s = Serve(source=source)
+            s = Serve(source=source, workers=workers)
             s.serve()
 
         case ServerSource.FILE:
@@ -107,7 +125,7 @@ def serve_command(source: str, path: str | None):
                     "No config path provided. Specify the path of your config.yaml"
                 )
                 sys.exit(1)
-            s = Serve(source=source, path=path)
+            s = Serve(source=source, path=path, workers=workers)
             s.serve()
         case _:
             logger.error(f"Argument {source} not recognized.")
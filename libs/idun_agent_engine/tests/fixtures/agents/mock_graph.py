@@ -5,8 +5,12 @@ in integration tests to verify the full agent lifecycle without
 needing real LLM calls.
 """
 
+import asyncio
 from typing import Annotated, Any, TypedDict
 
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.runnables import RunnableConfig
 from langgraph.graph import END, StateGraph
 from langgraph.graph.message import add_messages
 from langgraph.graph.state import CompiledStateGraph
@@ -86,6 +90,29 @@ def echo_node(state: SimpleState) -> dict[str, Any]:
     }
 
 
+async def slow_echo_node(state: SimpleState) -> dict[str, Any]:
+    """Echo the last message after yielding to the event loop.
+
+    Useful for testing concurrent runs: the sleep guarantees that
+    overlapping requests interleave inside the graph.
+    """
+    await asyncio.sleep(0.05)
+    return echo_node(state)
+
+
+async def streaming_echo_node(
+    state: SimpleState, config: RunnableConfig
+) -> dict[str, Any]:
+    """Echo the last message through a fake chat model that streams it.
+
+    The reply is streamed word by word, so the AG-UI adapter emits text
+    deltas, each preceded by the RAW event of its chunk, as with a real LLM.
+    """
+    echoed = echo_node(state)["messages"][0]["content"]
+    model = GenericFakeChatModel(messages=iter([AIMessage(content=echoed)]))
+    return {"messages": [await model.ainvoke(state["messages"], config)]}
+
+
 def counter_node(state: StatefulState) -> dict[str, Any]:
     """Increment counter and respond with count.
 
@@ -190,6 +217,36 @@ def create_echo_graph() -> StateGraph:
     return builder
 
 
+def create_slow_echo_graph() -> StateGraph:
+    """Create an echo graph whose node awaits before answering.
+
+    Returns:
+        A StateGraph that echoes messages asynchronously.
+    """
+    builder = StateGraph(SimpleState)
+
+    builder.add_node("echo", slow_echo_node)
+    builder.set_entry_point("echo")
+    builder.add_edge("echo", END)
+
+    return builder
+
+
+def create_streaming_echo_graph() -> StateGraph:
+    """Create an echo graph whose answer is streamed by a chat model.
+
+    Returns:
+        A StateGraph that streams its echo as text deltas.
+    """
+    builder = StateGraph(SimpleState)
+
+    builder.add_node("echo", streaming_echo_node)
+    builder.set_entry_point("echo")
+    builder.add_edge("echo", END)
+
+    return builder
+
+
 def create_stateful_graph() -> StateGraph:
     """Create a stateful graph for testing persistence.
 
@@ -237,6 +294,8 @@ def create_structured_input_graph() -> StateGraph:
 # test TypeError
 compiled_graph = create_compiled_echo_graph()
 graph = create_echo_graph()
+slow_graph = create_slow_echo_graph()
+streaming_graph = create_streaming_echo_graph()
 structured_input_graph = create_structured_input_graph()
 
 
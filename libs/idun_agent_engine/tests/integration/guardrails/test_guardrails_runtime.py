@@ -75,6 +75,7 @@ async def test_ban_list_guardrail_blocks_banned_words(
     langgraph_config_with_ban_list_guardrail,
 ):
     from idun_agent_engine.core.config_builder import ConfigBuilder
+    from idun_agent_engine.guardrails.executor import GuardrailExecutor
     from idun_agent_engine.server.lifespan import _parse_guardrails
     from idun_agent_engine.server.routers.agent import _run_guardrails
 
@@ -88,10 +89,11 @@ async def test_ban_list_guardrail_blocks_banned_words(
     banned_message = "This message contains a badword in it"
 
     with pytest.raises(HTTPException) as exc_info:
-        _run_guardrails(
+        await _run_guardrails(
             guardrails,
             {"query": banned_message, "session_id": "test123"},
             position="input",
+            executor=GuardrailExecutor(),
         )
     assert exc_info.value.status_code == 429
     assert "banned words" in exc_info.value.detail.lower()
@@ -103,6 +105,7 @@ async def test_ban_list_guardrail_allows_clean_messages(
     langgraph_config_with_ban_list_guardrail,
 ):
     from idun_agent_engine.core.config_builder import ConfigBuilder
+    from idun_agent_engine.guardrails.executor import GuardrailExecutor
     from idun_agent_engine.server.lifespan import _parse_guardrails
     from idun_agent_engine.server.routers.agent import _run_guardrails
 
@@ -116,7 +119,9 @@ async def test_ban_list_guardrail_allows_clean_messages(
     clean_message = "This is a perfectly clean message"
     message = {"query": clean_message, "session_id": "test123"}
 
-    _run_guardrails(guardrails, message, position="input")
+    await _run_guardrails(
+        guardrails, message, position="input", executor=GuardrailExecutor()
+    )
     response = await agent.invoke(message)
 
     assert response is not None
@@ -128,6 +133,7 @@ async def test_pii_guardrail_blocks_email_addresses(
     langgraph_config_with_pii_guardrail,
 ):
     from idun_agent_engine.core.config_builder import ConfigBuilder
+    from idun_agent_engine.guardrails.executor import GuardrailExecutor
     from idun_agent_engine.server.lifespan import _parse_guardrails
     from idun_agent_engine.server.routers.agent import _run_guardrails
 
@@ -139,10 +145,11 @@ async def test_pii_guardrail_blocks_email_addresses(
     message_with_email = "Please contact me at user@example.com for more info"
 
     with pytest.raises(HTTPException) as exc_info:
-        _run_guardrails(
+        await _run_guardrails(
             guardrails,
             {"query": message_with_email, "session_id": "test123"},
             position="input",
+            executor=GuardrailExecutor(),
         )
     assert exc_info.value.status_code == 429
 
@@ -153,6 +160,7 @@ async def test_pii_guardrail_allows_messages_without_pii(
     langgraph_config_with_pii_guardrail,
 ):
     from idun_agent_engine.core.config_builder import ConfigBuilder
+    from idun_agent_engine.guardrails.executor import GuardrailExecutor
     from idun_agent_engine.server.lifespan import _parse_guardrails
     from idun_agent_engine.server.routers.agent import _run_guardrails
 
@@ -164,7 +172,9 @@ async def test_pii_guardrail_allows_messages_without_pii(
     clean_message = "This message has no personal information"
     message = {"query": clean_message, "session_id": "test123"}
 
-    _run_guardrails(guardrails, message, position="input")
+    await _run_guardrails(
+        guardrails, message, position="input", executor=GuardrailExecutor()
+    )
     response = await agent.invoke(message)
 
     assert response is not None
@@ -174,6 +184,7 @@ async def test_pii_guardrail_allows_messages_without_pii(
 @pytest.mark.asyncio
 async def test_multiple_guardrails_all_must_pass(skip_if_no_guardrails_api_key):
     from idun_agent_engine.core.config_builder import ConfigBuilder
+    from idun_agent_engine.guardrails.executor import GuardrailExecutor
     from idun_agent_engine.server.lifespan import _parse_guardrails
     from idun_agent_engine.server.routers.agent import _run_guardrails
 
@@ -217,25 +228,29 @@ async def test_multiple_guardrails_all_must_pass(skip_if_no_guardrails_api_key):
 
     # Banned word should be blocked
     with pytest.raises(HTTPException) as exc_info:
-        _run_guardrails(
+        await _run_guardrails(
             guardrails,
             {"query": "This is spam content", "session_id": "test123"},
             position="input",
+            executor=GuardrailExecutor(),
         )
     assert exc_info.value.status_code == 429
 
     # PII should be blocked
     with pytest.raises(HTTPException) as exc_info:
-        _run_guardrails(
+        await _run_guardrails(
             guardrails,
             {"query": "Contact test@example.com", "session_id": "test123"},
             position="input",
+            executor=GuardrailExecutor(),
         )
     assert exc_info.value.status_code == 429
 
     # Clean message should pass
     clean_message = "This is a clean message"
     message = {"query": clean_message, "session_id": "test123"}
-    _run_guardrails(guardrails, message, position="input")
+    await _run_guardrails(
+        guardrails, message, position="input", executor=GuardrailExecutor()
+    )
     response = await agent.invoke(message)
     assert response is not None
@@ -0,0 +1,92 @@
+"""Tests for the bounded in-memory checkpointer."""
+
+import pytest
+from idun_agent_schema.engine.langgraph import InMemoryCheckpointConfig
+from langgraph.checkpoint.base import empty_checkpoint
+
+from idun_agent_engine.agent.langgraph.memory import BoundedInMemorySaver
+
+
+def _config(thread_id: str) -> dict:
+    return {"configurable": {"thread_id": thread_id, "checkpoint_ns": ""}}
+
+
+async def _save(saver: BoundedInMemorySaver, thread_id: str, steps: int) -> dict:
+    config = _config(thread_id)
+    for step in range(steps):
+        checkpoint = empty_checkpoint()
+        checkpoint["channel_values"] = {"messages": ["hello"] * (step + 1)}
+        checkpoint["channel_versions"] = {"messages": step + 1}
+        saved = await saver.aput(
+            config, checkpoint, {"step": step}, {"messages": step + 1}
+        )
+        await saver.aput_writes(saved, [("messages", step)], task_id=f"task-{step}")
+        config = saved
+    return config
+
+
+def _saver(**limits) -> BoundedInMemorySaver:
+    return BoundedInMemorySaver(InMemoryCheckpointConfig(type="memory", **limits))
+
+
+@pytest.mark.unit
+class TestBoundedInMemorySaver:
+    """Test BoundedInMemorySaver."""
+
+    async def test_evicts_least_recently_used_thread(self):
+        saver = _saver(max_threads=2)
+        await _save(saver, "thread-1", steps=1)
+        await _save(saver, "thread-2", steps=1)
+        await saver.aget_tuple(_config("thread-1"))
+
+        await _save(saver, "thread-3", steps=1)
+
+        assert await saver.aget_tuple(_config("thread-2")) is None
+        assert await saver.aget_tuple(_config("thread-1")) is not None
+        assert not any(key[0] == "thread-2" for key in saver.blobs)
+        assert not any(key[0] == "thread-2" for key in saver.writes)
+        assert saver.stats()["resident_threads"] == 2
+        assert saver.stats()["evictions_total"] == 1
+
+    async def test_evicts_by_size_but_keeps_current_thread(self):
+        saver = _saver(max_size_mb=0.0001)
+        await _save(saver, "thread-1", steps=1)
+
+        await _save(saver, "thread-2", steps=3)
+
+        assert await saver.aget_tuple(_config("thread-1")) is None
+        assert await saver.aget_tuple(_config("thread-2")) is not None
+        assert saver.stats()["resident_threads"] == 1
+
+    async def test_keep_last_trims_history_writes_and_blobs(self):
+        saver = _saver(keep_last=2)
+
+        await _save(saver, "thread-1", steps=5)
+
+        history = [item async for item in saver.alist(_config("thread-1"))]
+        assert [item.metadata["step"] for item in history] == [4, 3]
+        assert history[0].checkpoint["channel_values"]["messages"] == ["hello"] * 5
+        assert len(saver.writes) == 2
+        assert sorted(key[3] for key in saver.blobs) == [4, 5]
+        assert saver.stats()["trimmed_checkpoints_total"] == 3
+
+    async def test_resident_bytes_return_to_zero_after_delete(self):
+        saver = _saver(max_threads=10)
+        await _save(saver, "thread-1", steps=3)
+        assert saver.stats()["resident_bytes"] > 0
+
+        await saver.adelete_thread("thread-1")
+
+        assert saver.stats()["resident_bytes"] == 0
+        assert saver.stats()["resident_threads"] == 0
+
+    async def test_reading_unknown_thread_stores_nothing(self):
+        saver = _saver(max_threads=1)
+        await _save(saver, "thread-1", steps=1)
+        await _save(saver, "thread-2", steps=1)
+
+        assert await saver.aget_tuple(_config("thread-1")) is None
+        assert [item async for item in saver.alist(_config("thread-1"))] == []
+        assert await saver.aget_tuple(_config("unknown")) is None
+
+        assert set(saver.storage) == {"thread-2"}
@@ -0,0 +1,152 @@
+"""Tests for message lists stored as deltas."""
+
+import aiosqlite
+import pytest
+from idun_agent_schema.engine.langgraph import (
+    CheckpointRetentionConfig,
+    CheckpointSerializerConfig,
+    InMemoryCheckpointConfig,
+    SqliteCheckpointConfig,
+)
+from langgraph.checkpoint.base import empty_checkpoint
+from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+from pydantic import ValidationError
+
+from idun_agent_engine.agent.langgraph.deltas import MessageDeltaSaver
+
+
+def _config(thread_id: str) -> dict:
+    return {"configurable": {"thread_id": thread_id, "checkpoint_ns": ""}}
+
+
+def _deltas(**config) -> CheckpointSerializerConfig:
+    return CheckpointSerializerConfig(message_deltas=True, **config)
+
+
+async def _save(saver, config: dict, messages: list[str]) -> dict:
+    checkpoint = empty_checkpoint()
+    version = len(messages)
+    checkpoint["channel_values"] = {"messages": messages, "step": version}
+    checkpoint["channel_versions"] = {"messages": version, "step": version}
+    return await saver.aput(
+        config, checkpoint, {"step": version}, {"messages": version, "step": version}
+    )
+
+
+async def _conversation(saver, turns: int) -> dict:
+    config = _config("thread-1")
+    for turn in range(1, turns + 1):
+        config = await _save(saver, config, [f"message {i}" for i in range(turn)])
+    return config
+
+
+def _stored_messages(saver: InMemorySaver) -> list:
+    return [
+        saver.serde.loads_typed(blob)
+        for key, blob in sorted(saver.blobs.items(), key=lambda item: item[0][3])
+        if key[2] == "messages"
+    ]
+
+
+@pytest.mark.unit
+class TestMessageDeltaSaver:
+    """Test MessageDeltaSaver."""
+
+    async def test_stores_new_messages_only(self):
+        inner = InMemorySaver()
+        saver = MessageDeltaSaver(inner, _deltas())
+
+        await _conversation(saver, turns=3)
+
+        stored = _stored_messages(inner)
+        assert stored[0] == ["message 0"]
+        assert stored[1]["items"] == ["message 1"]
+        assert stored[2]["items"] == ["message 2"]
+        assert saver.stats()["message_deltas"]["delta_writes_total"] == 2
+
+    async def test_rebuilds_history_without_cached_lists(self):
+        inner = InMemorySaver()
+        await _conversation(MessageDeltaSaver(inner, _deltas()), turns=4)
+        # A new process has nothing cached and walks the deltas back
+        saver = MessageDeltaSaver(inner, _deltas())
+
+        latest = await saver.aget_tuple(_config("thread-1"))
+        history = [item async for item in saver.alist(_config("thread-1"))]
+
+        assert latest.checkpoint["channel_values"]["messages"] == [
+            f"message {i}" for i in range(4)
+        ]
+        assert [
+            len(item.checkpoint["channel_values"]["messages"]) for item in history
+        ] == [4, 3, 2, 1]
+
+    async def test_stores_full_list_every_snapshot_interval(self):
+        inner = InMemorySaver()
+        saver = MessageDeltaSaver(inner, _deltas(delta_snapshot_interval=2))
+
+        await _conversation(saver, turns=5)
+
+        assert [isinstance(value, list) for value in _stored_messages(inner)] == [
+            True,
+            False,
+            True,
+            False,
+            True,
+        ]
+
+    async def test_stores_full_list_when_earlier_messages_change(self):
+        inner = InMemorySaver()
+        saver = MessageDeltaSaver(inner, _deltas())
+        config = await _save(saver, _config("thread-1"), ["hello"])
+
+        await _save(saver, config, ["edited", "reply"])
+
+        assert _stored_messages(inner)[-1] == ["edited", "reply"]
+
+    async def test_stores_full_list_on_fork(self):
+        inner = InMemorySaver()
+        saver = MessageDeltaSaver(inner, _deltas())
+        first = await _save(saver, _config("thread-1"), ["hello"])
+        await _save(saver, first, ["hello", "reply"])
+
+        forked = await _save(saver, first, ["hello", "other", "reply"])
+
+        assert _stored_messages(inner)[-1] == ["hello", "other", "reply"]
+        assert (await saver.aget_tuple(forked)).checkpoint["channel_values"][
+            "messages"
+        ] == ["hello", "other", "reply"]
+
+    async def test_sqlite_round_trip(self, tmp_path):
+        async with aiosqlite.connect(str(tmp_path / "checkpoints.db")) as conn:
+            inner = AsyncSqliteSaver(conn)
+            await inner.setup()
+            await _conversation(MessageDeltaSaver(inner, _deltas()), turns=3)
+
+            saver = MessageDeltaSaver(inner, _deltas())
+            history = [item async for item in saver.alist(_config("thread-1"))]
+
+        assert history[0].checkpoint["channel_values"]["messages"] == [
+            "message 0",
+            "message 1",
+            "message 2",
+        ]
+        assert history[0].checkpoint["channel_values"]["step"] == 3
+
+
+@pytest.mark.unit
+class TestMessageDeltasConfig:
+    """Test that deltas are refused with settings that delete checkpoints."""
+
+    def test_rejected_with_keep_last(self):
+        with pytest.raises(ValidationError, match="keep_last"):
+            InMemoryCheckpointConfig(type="memory", keep_last=5, serializer=_deltas())
+
+    def test_rejected_with_retention(self):
+        with pytest.raises(ValidationError, match="retention"):
+            SqliteCheckpointConfig(
+                type="sqlite",
+                db_url="sqlite:///checkpoints.db",
+                retention=CheckpointRetentionConfig(enabled=True),
+                serializer=_deltas(),
+            )
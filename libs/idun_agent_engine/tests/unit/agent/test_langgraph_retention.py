@@ -0,0 +1,110 @@
+"""Tests for checkpoint retention."""
+
+import time
+
+import aiosqlite
+import pytest
+from idun_agent_schema.engine.langgraph import CheckpointRetentionConfig
+from langgraph.checkpoint.base import empty_checkpoint
+from langgraph.checkpoint.base.id import uuid6
+from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+
+from idun_agent_engine.agent.langgraph.retention import (
+    SqliteCheckpointRetention,
+    checkpoint_id_before,
+)
+
+
+def _config(thread_id: str) -> dict:
+    return {"configurable": {"thread_id": thread_id, "checkpoint_ns": ""}}
+
+
+async def _save(saver: AsyncSqliteSaver, thread_id: str, steps: int) -> dict:
+    config = _config(thread_id)
+    for step in range(steps):
+        saved = await saver.aput(config, empty_checkpoint(), {"step": step}, {})
+        await saver.aput_writes(saved, [("channel", step)], task_id=f"task-{step}")
+        config = saved
+    return config
+
+
+async def _count(saver: AsyncSqliteSaver, table: str, thread_id: str) -> int:
+    async with saver.conn.execute(
+        f"SELECT COUNT(*) FROM {table} WHERE thread_id = ?", (thread_id,)
+    ) as cursor:
+        (count,) = await cursor.fetchone()
+    return count
+
+
+@pytest.fixture
+async def saver(tmp_path):
+    async with aiosqlite.connect(str(tmp_path / "checkpoints.db")) as conn:
+        saver = AsyncSqliteSaver(conn)
+        await saver.setup()
+        yield saver
+
+
+@pytest.mark.unit
+class TestCheckpointIdBefore:
+    """Test checkpoint_id_before."""
+
+    def test_orders_against_uuid6_checkpoint_ids(self):
+        checkpoint_id = str(uuid6(clock_seq=1))
+
+        assert checkpoint_id_before(time.time() - 60) < checkpoint_id
+        assert checkpoint_id_before(time.time() + 60) > checkpoint_id
+
+
+@pytest.mark.unit
+class TestSqliteCheckpointRetention:
+    """Test SqliteCheckpointRetention."""
+
+    async def test_keeps_last_checkpoints_and_latest_writes(self, saver):
+        await _save(saver, "thread-1", steps=5)
+        await _save(saver, "thread-2", steps=1)
+        retention = SqliteCheckpointRetention(
+            saver, CheckpointRetentionConfig(enabled=True, keep_last=2, batch_size=1)
+        )
+
+        await retention.run_once()
+
+        history = [item async for item in saver.alist(_config("thread-1"))]
+        assert [item.metadata["step"] for item in history] == [4, 3]
+        assert await _count(saver, "checkpoints", "thread-2") == 1
+        assert await _count(saver, "writes", "thread-1") == 1
+        assert retention.stats()["checkpoints_deleted_total"] == 3
+
+    async def test_expires_idle_threads(self, saver, monkeypatch):
+        await _save(saver, "thread-1", steps=2)
+        retention = SqliteCheckpointRetention(
+            saver, CheckpointRetentionConfig(enabled=True, thread_ttl_seconds=3600)
+        )
+
+        await retention.run_once()
+        assert await _count(saver, "checkpoints", "thread-1") == 2
+
+        now = time.time()
+        monkeypatch.setattr(
+            "idun_agent_engine.agent.langgraph.retention.time.time",
+            lambda: now + 7200,
+        )
+        await retention.run_once()
+
+        assert await saver.aget_tuple(_config("thread-1")) is None
+        assert await _count(saver, "writes", "thread-1") == 0
+        assert retention.stats()["threads_deleted_total"] == 1
+
+    async def test_trims_every_thread_over_the_limit(self, saver):
+        for thread_id in ("thread-1", "thread-2", "thread-3"):
+            await _save(saver, thread_id, steps=4)
+        retention = SqliteCheckpointRetention(
+            saver, CheckpointRetentionConfig(enabled=True, keep_last=1, batch_size=2)
+        )
+
+        await retention.run_once()
+
+        for thread_id in ("thread-1", "thread-2", "thread-3"):
+            assert await _count(saver, "checkpoints", thread_id) == 1
+            assert await _count(saver, "writes", thread_id) == 1
+        assert retention.stats()["checkpoints_deleted_total"] == 9
+        assert retention.stats()["writes_deleted_total"] == 9
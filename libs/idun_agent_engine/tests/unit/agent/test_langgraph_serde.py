@@ -0,0 +1,85 @@
+"""Tests for the compressing checkpoint serializer."""
+
+import aiosqlite
+import pytest
+import zstandard
+from idun_agent_schema.engine.langgraph import CheckpointSerializerConfig
+from langgraph.checkpoint.base import empty_checkpoint
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+
+from idun_agent_engine.agent.langgraph.serde import CompressingSerializer
+
+MESSAGES = [{"role": "user", "content": f"message {i} " * 20} for i in range(20)]
+
+
+def _serializer(**config) -> CompressingSerializer:
+    return CompressingSerializer(CheckpointSerializerConfig(**config))
+
+
+def _config(thread_id: str) -> dict:
+    return {"configurable": {"thread_id": thread_id, "checkpoint_ns": ""}}
+
+
+@pytest.mark.unit
+class TestCompressingSerializer:
+    """Test CompressingSerializer."""
+
+    @pytest.mark.parametrize("compression", ["zstd", "zlib"])
+    def test_round_trips_compressed_values(self, compression):
+        serde = _serializer(compression=compression)
+
+        type_, data = serde.dumps_typed(MESSAGES)
+
+        assert type_ == f"msgpack+{compression}"
+        assert len(data) < len(JsonPlusSerializer().dumps_typed(MESSAGES)[1])
+        assert serde.loads_typed((type_, data)) == MESSAGES
+        assert serde.stats()["compressed_total"] == 1
+
+    def test_small_values_stay_uncompressed(self):
+        serde = _serializer(compression="zstd")
+
+        assert serde.dumps_typed("hi") == JsonPlusSerializer().dumps_typed("hi")
+
+    def test_reads_compressed_rows_with_compression_off(self):
+        serde = _serializer(compression="none")
+        zstd_row = _serializer(compression="zstd").dumps_typed(MESSAGES)
+        zlib_row = _serializer(compression="zlib").dumps_typed(MESSAGES)
+
+        assert serde.dumps_typed(MESSAGES) == JsonPlusSerializer().dumps_typed(MESSAGES)
+        assert serde.loads_typed(zstd_row) == MESSAGES
+        assert serde.loads_typed(zlib_row) == MESSAGES
+
+    def test_dictionary_mismatch_fails(self, tmp_path):
+        samples = [
+            JsonPlusSerializer().dumps_typed(MESSAGES[i:])[1] for i in range(20)
+        ] * 10
+        dictionary = zstandard.train_dictionary(1024, samples)
+        path = tmp_path / "checkpoints.dict"
+        path.write_bytes(dictionary.as_bytes())
+        serde = _serializer(compression="zstd", dictionary_path=str(path))
+
+        row = serde.dumps_typed(MESSAGES)
+
+        assert serde.loads_typed(row) == MESSAGES
+        with pytest.raises(ValueError, match="dictionary"):
+            _serializer(compression="zstd").loads_typed(row)
+
+    async def test_sqlite_saver_reads_rows_written_before_compression(self, tmp_path):
+        async with aiosqlite.connect(str(tmp_path / "checkpoints.db")) as conn:
+            checkpoint = empty_checkpoint()
+            checkpoint["channel_values"] = {"messages": MESSAGES}
+            await AsyncSqliteSaver(conn).aput(_config("old"), checkpoint, {}, {})
+            saver = AsyncSqliteSaver(conn, serde=_serializer(compression="zstd"))
+            await saver.aput(_config("new"), checkpoint, {}, {})
+
+            for thread_id in ("old", "new"):
+                saved = await saver.aget_tuple(_config(thread_id))
+                assert saved.checkpoint["channel_values"]["messages"] == MESSAGES
+            async with conn.execute(
+                "SELECT type FROM checkpoints ORDER BY thread_id"
+            ) as cursor:
+                assert [row[0] async for row in cursor] == [
+                    "msgpack+zstd",
+                    "msgpack",
+                ]
@@ -0,0 +1,76 @@
+"""Tests for the high-concurrency SQLite checkpointer."""
+
+import asyncio
+import sqlite3
+
+import pytest
+from idun_agent_schema.engine.langgraph import SqliteConcurrencyConfig
+from langgraph.checkpoint.base import empty_checkpoint
+
+from idun_agent_engine.agent.langgraph.sqlite import ConcurrentSqliteSaver
+
+
+def _config(thread_id: str) -> dict:
+    return {"configurable": {"thread_id": thread_id, "checkpoint_ns": ""}}
+
+
+@pytest.mark.unit
+class TestConcurrentSqliteSaver:
+    """Test ConcurrentSqliteSaver."""
+
+    async def test_concurrent_writes_share_commits(self, tmp_path):
+        db_path = str(tmp_path / "checkpoints.db")
+        saver = await ConcurrentSqliteSaver.open(
+            db_path, SqliteConcurrencyConfig(enabled=True, max_write_delay_ms=20)
+        )
+        try:
+            await asyncio.gather(
+                *(
+                    saver.aput(_config(f"thread-{i}"), empty_checkpoint(), {}, {})
+                    for i in range(20)
+                )
+            )
+
+            assert saver.stats()["writes_total"] == 20
+            assert saver.stats()["batches_total"] < 20
+            for i in range(20):
+                assert await saver.aget_tuple(_config(f"thread-{i}")) is not None
+        finally:
+            await saver.close()
+
+        conn = sqlite3.connect(db_path)
+        try:
+            (journal_mode,) = conn.execute("PRAGMA journal_mode").fetchone()
+            (count,) = conn.execute("SELECT COUNT(*) FROM checkpoints").fetchone()
+        finally:
+            conn.close()
+        assert journal_mode == "wal"
+        assert count == 20
+
+    async def test_reads_see_committed_writes_of_the_same_thread(self, tmp_path):
+        saver = await ConcurrentSqliteSaver.open(
+            str(tmp_path / "checkpoints.db"),
+            SqliteConcurrencyConfig(enabled=True, read_connections=2),
+        )
+        try:
+            first = empty_checkpoint()
+            await saver.aput(_config("thread-1"), first, {"step": 1}, {})
+            second = empty_checkpoint()
+            saved = await saver.aput(_config("thread-1"), second, {"step": 2}, {})
+
+            latest = await saver.aget_tuple(_config("thread-1"))
+            history = [item async for item in saver.alist(_config("thread-1"))]
+
+            assert latest.config == saved
+            assert [item.metadata["step"] for item in history] == [2, 1]
+        finally:
+            await saver.close()
+
+    async def test_writes_after_close_are_rejected(self, tmp_path):
+        saver = await ConcurrentSqliteSaver.open(
+            str(tmp_path / "checkpoints.db"), SqliteConcurrencyConfig(enabled=True)
+        )
+        await saver.close()
+
+        with pytest.raises(RuntimeError):
+            await saver.aput(_config("thread-1"), empty_checkpoint(), {}, {})
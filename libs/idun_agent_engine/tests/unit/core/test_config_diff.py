@@ -0,0 +1,50 @@
+"""Tests for per-section engine config comparison."""
+
+import pytest
+
+from idun_agent_engine.core.config_diff import ENGINE_CONFIG_SECTIONS, changed_sections
+from idun_agent_engine.core.engine_config import EngineConfig
+
+
+def _config(**overrides) -> EngineConfig:
+    data = {
+        "agent": {
+            "type": "LANGGRAPH",
+            "config": {"name": "Agent", "graph_definition": "agent.py:graph"},
+        },
+    }
+    data.update(overrides)
+    return EngineConfig.model_validate(data)
+
+
+@pytest.mark.unit
+class TestChangedSections:
+    """Test changed_sections."""
+
+    def test_no_previous_config_changes_everything(self):
+        """Without a previous config every section is reported as changed."""
+        assert changed_sections(None, _config()) == set(ENGINE_CONFIG_SECTIONS)
+
+    def test_identical_configs(self):
+        """Equal configs built separately have no changed sections."""
+        assert changed_sections(_config(), _config()) == set()
+
+    def test_only_differing_sections_are_reported(self):
+        """Each differing top-level section is reported, and nothing else."""
+        old = _config()
+        new = _config(
+            server={"api": {"port": 9000}},
+            sso={"enabled": False, "issuer": "https://issuer", "client_id": "x"},
+        )
+        assert changed_sections(old, new) == {"server", "sso"}
+
+    def test_nested_agent_change(self):
+        """A change deep inside the agent config marks the agent section."""
+        old = _config()
+        new = _config(
+            agent={
+                "type": "LANGGRAPH",
+                "config": {"name": "Renamed", "graph_definition": "agent.py:graph"},
+            }
+        )
+        assert changed_sections(old, new) == {"agent"}
@@ -0,0 +1,89 @@
+"""Import-time budget for the engine.
+
+Framework adapters and checkpointer backends take seconds to import, so they
+must only be loaded once an agent of that type is configured. Each check runs
+in a fresh interpreter so modules imported by other tests do not interfere.
+"""
+
+import json
+import os
+import subprocess
+import sys
+import textwrap
+
+import pytest
+
+# CPU seconds (unlike wall time, unaffected by tests running in parallel).
+# Generous ceiling for slow machines; eager framework imports take ~10s.
+IMPORT_BUDGET_SECONDS = 5.0
+
+FRAMEWORK_MODULES = [
+    "google.adk",
+    "ag_ui_adk",
+    "copilotkit",
+    "ag_ui_langgraph",
+    "langchain_mcp_adapters",
+    "litellm",
+]
+CHECKPOINTER_MODULES = [
+    "aiosqlite",
+    "langgraph.checkpoint.sqlite",
+    "langgraph.checkpoint.postgres",
+]
+
+
+def _import_in_subprocess(module: str, watched: list[str]) -> dict:
+    """Import ``module`` in a new interpreter; return its import time and which
+    of the ``watched`` modules ended up loaded."""
+    script = textwrap.dedent(
+        f"""
+        import json, sys, time
+        started = time.process_time()
+        import {module}
+        elapsed = time.process_time() - started
+        loaded = [name for name in {watched!r} if name in sys.modules]
+        print(json.dumps({{"elapsed": elapsed, "loaded": loaded}}))
+        """
+    )
+    env = {**os.environ, "IDUN_TELEMETRY_ENABLED": "false"}
+    result = subprocess.run(
+        [sys.executable, "-c", script],
+        capture_output=True,
+        text=True,
+        env=env,
+        timeout=120,
+        check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+@pytest.mark.unit
+class TestImportTime:
+    """Test that engine startup does not import unused frameworks."""
+
+    def test_app_factory_skips_framework_modules(self):
+        """Importing the app factory loads no framework or checkpointer package."""
+        result = _import_in_subprocess(
+            "idun_agent_engine.core.app_factory",
+            FRAMEWORK_MODULES + CHECKPOINTER_MODULES,
+        )
+
+        assert result["loaded"] == []
+
+    def test_app_factory_import_within_budget(self):
+        """Importing the app factory stays within the cold-start budget."""
+        result = _import_in_subprocess("idun_agent_engine.core.app_factory", [])
+
+        assert result["elapsed"] < IMPORT_BUDGET_SECONDS, (
+            f"Importing idun_agent_engine.core.app_factory used "
+            f"{result['elapsed']:.2f}s of CPU (budget {IMPORT_BUDGET_SECONDS}s)"
+        )
+
+    def test_langgraph_adapter_skips_adk_and_checkpointers(self):
+        """The LangGraph adapter does not pull in ADK or unused checkpointers."""
+        result = _import_in_subprocess(
+            "idun_agent_engine.agent.langgraph.langgraph",
+            ["google.adk", "ag_ui_adk", "litellm", *CHECKPOINTER_MODULES],
+        )
+
+        assert result["loaded"] == []
@@ -1,10 +1,15 @@
 """Tests for server runner functions."""
 
+import os
 from unittest.mock import MagicMock, patch
 
 import pytest
 import yaml
 
+from idun_agent_engine.core.app_factory import (
+    ENGINE_CONFIG_ENV_VAR,
+    create_app_from_env,
+)
 from idun_agent_engine.core.config_builder import ConfigBuilder
 from idun_agent_engine.core.server_runner import (
     run_server,
@@ -32,11 +37,13 @@ class TestServerRunner:
             log_level="info",
         )
 
+    @patch.dict(os.environ, {}, clear=False)
     @patch("uvicorn.run")
     def test_run_server_with_reload_and_workers_warning(self, mock_uvicorn):
         """Server disables reload when workers are specified."""
         mock_app = MagicMock()
         mock_app.state.engine_config = MagicMock()
+        mock_app.state.engine_config.model_dump_json.return_value = "{}"
 
         run_server(mock_app, reload=True, workers=4)
 
@@ -44,6 +51,53 @@ class TestServerRunner:
         call_args = mock_uvicorn.call_args[1]
         assert "reload" not in call_args or call_args.get("reload") is False
 
+    @patch.dict(os.environ, {}, clear=False)
+    @patch("uvicorn.run")
+    def test_run_server_with_workers_uses_app_factory(self, mock_uvicorn):
+        """Multi-worker mode hands the config to workers via an import string."""
+        engine_config = (
+            ConfigBuilder()
+            .with_api_port(9100)
+            .with_langgraph_agent(
+                name="Worker Agent", graph_definition="./agent.py:graph"
+            )
+            .build()
+        )
+        mock_app = MagicMock()
+        mock_app.state.engine_config = engine_config
+
+        run_server(mock_app, port=9100, workers=4, timeout_graceful_shutdown=30)
+
+        mock_uvicorn.assert_called_once()
+        call_args, call_kwargs = mock_uvicorn.call_args
+        assert call_args[0] == "idun_agent_engine.core.app_factory:create_app_from_env"
+        assert call_kwargs["factory"] is True
+        assert call_kwargs["workers"] == 4
+        assert call_kwargs["port"] == 9100
+        assert call_kwargs["timeout_graceful_shutdown"] == 30
+
+        app = create_app_from_env()
+        assert app.state.engine_config == engine_config
+
+    @patch("uvicorn.run")
+    def test_run_server_single_worker_serves_app_object(self, mock_uvicorn):
+        """workers=1 keeps serving the app object in-process."""
+        mock_app = MagicMock()
+        mock_app.state.engine_config = MagicMock()
+
+        run_server(mock_app, workers=1)
+
+        assert mock_uvicorn.call_args[0][0] is mock_app
+        assert "workers" not in mock_uvicorn.call_args[1]
+
+    @patch.dict(os.environ, {}, clear=False)
+    def test_create_app_from_env_requires_config(self):
+        """The worker factory fails clearly when no config was handed down."""
+        os.environ.pop(ENGINE_CONFIG_ENV_VAR, None)
+
+        with pytest.raises(ValueError, match=ENGINE_CONFIG_ENV_VAR):
+            create_app_from_env()
+
     @patch("uvicorn.run")
     @patch("idun_agent_engine.core.app_factory.create_app")
     def test_run_server_from_config_uses_yaml_port(
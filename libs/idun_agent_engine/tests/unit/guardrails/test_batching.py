@@ -0,0 +1,170 @@
+"""Tests for micro-batching guardrail checks."""
+
+import asyncio
+import threading
+
+import pytest
+from idun_agent_schema.engine.server import (
+    GuardrailBatchingConfig,
+    GuardrailExecutionConfig,
+)
+
+from idun_agent_engine.guardrails.batching import validate_batch
+from idun_agent_engine.guardrails.executor import GuardrailExecutor
+
+
+class _BatchGuard:
+    """Rejects texts containing a keyword and records every batch call."""
+
+    guard_id = "batch"
+
+    def __init__(self, keyword: str = "bad"):
+        self.keyword = keyword
+        self.batches: list[list[str]] = []
+        self._lock = threading.Lock()
+
+    def validate(self, text: str) -> bool:
+        raise AssertionError("single-text validate should not be called")
+
+    def validate_batch(self, texts: list[str]) -> list[bool]:
+        with self._lock:
+            self.batches.append(list(texts))
+        return [self.keyword not in text for text in texts]
+
+
+class _SingleGuard:
+    """Has no batch support."""
+
+    guard_id = "single"
+
+    def __init__(self):
+        self.calls: list[str] = []
+
+    def validate(self, text: str) -> bool:
+        self.calls.append(text)
+        return "bad" not in text
+
+
+def _executor(max_batch_size: int = 16, max_wait_ms: float = 20.0) -> GuardrailExecutor:
+    return GuardrailExecutor(
+        GuardrailExecutionConfig(
+            timeout_seconds=2.0,
+            batching=GuardrailBatchingConfig(
+                enabled=True, max_batch_size=max_batch_size, max_wait_ms=max_wait_ms
+            ),
+        )
+    )
+
+
+@pytest.mark.unit
+class TestGuardrailBatching:
+    """Test batching in GuardrailExecutor."""
+
+    async def test_concurrent_checks_share_one_call(self):
+        """Texts arriving within the wait window are validated together."""
+        executor = _executor()
+        guard = _BatchGuard()
+        texts = [f"message {i}" for i in range(10)]
+
+        results = await asyncio.gather(
+            *(executor.first_rejection([guard], text) for text in texts)
+        )
+        executor.shutdown()
+
+        assert results == [None] * 10
+        assert guard.batches == [texts]
+        assert executor.stats()["batches_total"] == 1
+        assert executor.stats()["batch_size_max"] == 10
+
+    async def test_verdicts_go_to_their_own_request(self):
+        """Only the request whose text fails the guard is rejected."""
+        executor = _executor()
+        guard = _BatchGuard()
+
+        results = await asyncio.gather(
+            executor.first_rejection([guard], "fine"),
+            executor.first_rejection([guard], "bad words"),
+            executor.first_rejection([guard], "also fine"),
+        )
+        executor.shutdown()
+
+        assert results == [None, guard, None]
+
+    async def test_full_batch_is_sent_without_waiting(self):
+        """Batches are capped at max_batch_size."""
+        executor = _executor(max_batch_size=2, max_wait_ms=10_000)
+        guard = _BatchGuard()
+
+        await asyncio.wait_for(
+            asyncio.gather(
+                *(executor.first_rejection([guard], f"text {i}") for i in range(4))
+            ),
+            timeout=1.0,
+        )
+        executor.shutdown()
+
+        assert sorted(len(batch) for batch in guard.batches) == [2, 2]
+
+    async def test_identical_texts_validated_once(self):
+        """Duplicate texts in a batch share one verdict."""
+        executor = _executor()
+        guard = _BatchGuard()
+
+        results = await asyncio.gather(
+            *(executor.first_rejection([guard], "bad") for _ in range(3))
+        )
+        executor.shutdown()
+
+        assert results == [guard] * 3
+        assert guard.batches == [["bad"]]
+
+    async def test_guard_without_batch_support_is_not_batched(self):
+        """Guards without validate_batch keep one pool job per text."""
+        executor = _executor()
+        guard = _SingleGuard()
+
+        results = await asyncio.gather(
+            executor.first_rejection([guard], "ok"),
+            executor.first_rejection([guard], "bad"),
+        )
+        executor.shutdown()
+
+        assert results == [None, guard]
+        assert sorted(guard.calls) == ["bad", "ok"]
+        assert executor.stats()["batches_total"] == 0
+
+    async def test_batch_error_rejects_every_request(self):
+        """A failing batch rejects all of its requests (fail-closed)."""
+        executor = _executor()
+        guard = _BatchGuard()
+        guard.validate_batch = lambda texts: [True]  # wrong number of verdicts
+
+        results = await asyncio.gather(
+            executor.first_rejection([guard], "one"),
+            executor.first_rejection([guard], "two"),
+        )
+        executor.shutdown()
+
+        assert results == [guard, guard]
+        assert executor.stats()["errors_total"] == 2
+
+    async def test_disabled_by_default(self):
+        """Without batching each check runs on its own."""
+        executor = GuardrailExecutor()
+        guard = _SingleGuard()
+
+        await asyncio.gather(
+            executor.first_rejection([guard], "a"),
+            executor.first_rejection([guard], "b"),
+        )
+        executor.shutdown()
+
+        assert executor.stats()["batches_total"] == 0
+
+    def test_validate_batch_rejects_wrong_verdict_count(self):
+        """validate_batch checks that every text got a verdict."""
+        guard = _BatchGuard()
+        guard.validate_batch = lambda texts: []
+
+        with pytest.raises(ValueError, match="0 verdicts for 1 texts"):
+            validate_batch(guard, ["text"])
@@ -0,0 +1,118 @@
+"""Tests for running guardrails off the event loop."""
+
+import asyncio
+import time
+
+import pytest
+from idun_agent_schema.engine.server import GuardrailExecutionConfig
+
+from idun_agent_engine.guardrails.executor import GuardrailExecutor
+
+
+class _Guard:
+    """Blocking guard that sleeps, then returns a fixed verdict."""
+
+    def __init__(self, name: str, allowed: bool = True, delay: float = 0.0):
+        self.guard_id = name
+        self.allowed = allowed
+        self.delay = delay
+
+    def validate(self, text: str) -> bool:
+        time.sleep(self.delay)
+        return self.allowed
+
+
+class _BrokenGuard:
+    guard_id = "broken"
+
+    def validate(self, text: str) -> bool:
+        raise RuntimeError("model crashed")
+
+
+@pytest.fixture
+def executor():
+    executor = GuardrailExecutor(
+        GuardrailExecutionConfig(max_workers=4, timeout_seconds=1.0)
+    )
+    yield executor
+    executor.shutdown()
+
+
+@pytest.mark.unit
+class TestGuardrailExecutor:
+    """Test GuardrailExecutor."""
+
+    async def test_all_allowing_guards_pass(self, executor):
+        """No guard is returned when every guard allows the text."""
+        guards = [_Guard("a"), _Guard("b")]
+
+        assert await executor.first_rejection(guards, "hello") is None
+
+    async def test_guards_run_concurrently(self, executor):
+        """Blocking guards overlap, so the check takes as long as the slowest."""
+        guards = [_Guard(str(i), delay=0.2) for i in range(3)]
+
+        started = time.perf_counter()
+        await executor.first_rejection(guards, "hello")
+
+        assert time.perf_counter() - started < 0.45
+
+    async def test_event_loop_keeps_running(self, executor):
+        """Other coroutines make progress while a guard is blocking."""
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        task = asyncio.create_task(ticker())
+        await executor.first_rejection([_Guard("slow", delay=0.2)], "hello")
+        task.cancel()
+
+        assert ticks >= 5
+
+    async def test_first_rejection_short_circuits(self, executor):
+        """A fast rejection returns without waiting for slower guards."""
+        reject = _Guard("reject", allowed=False)
+        guards = [_Guard("slow", delay=0.5), reject]
+
+        started = time.perf_counter()
+        rejected = await executor.first_rejection(guards, "hello")
+
+        assert rejected is reject
+        assert time.perf_counter() - started < 0.3
+
+    async def test_timeout_rejects(self):
+        """A guard that misses its deadline rejects the text (fail-closed)."""
+        executor = GuardrailExecutor(
+            GuardrailExecutionConfig(max_workers=1, timeout_seconds=0.05)
+        )
+        slow = _Guard("slow", delay=0.3)
+
+        rejected = await executor.first_rejection([slow], "hello")
+        executor.shutdown()
+
+        assert rejected is slow
+        assert executor.stats()["timeouts_total"] == 1
+
+    async def test_error_rejects(self, executor):
+        """A guard that raises rejects the text (fail-closed)."""
+        broken = _BrokenGuard()
+
+        assert await executor.first_rejection([broken], "hello") is broken
+        assert executor.stats()["errors_total"] == 1
+
+    async def test_configure_resizes_pool(self, executor):
+        """New limits apply to later checks."""
+        executor.configure(
+            GuardrailExecutionConfig(max_workers=1, timeout_seconds=1.0)
+        )
+        guards = [_Guard(str(i), delay=0.1) for i in range(2)]
+
+        started = time.perf_counter()
+        await executor.first_rejection(guards, "hello")
+
+        assert time.perf_counter() - started >= 0.2
+        assert executor.stats()["max_workers"] == 1
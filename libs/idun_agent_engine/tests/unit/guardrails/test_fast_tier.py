@@ -0,0 +1,192 @@
+"""Tests for the in-process guardrail fast tier."""
+
+import pytest
+from idun_agent_schema.engine.guardrails_v2 import GuardrailsV2
+
+from idun_agent_engine.guardrails.executor import GuardrailExecutor
+from idun_agent_engine.guardrails.fast_tier import (
+    PII_PATTERNS,
+    build_fast_tiers,
+    compile_keywords,
+)
+
+
+class _HubGuard:
+    """Stands in for a hub validator and records the texts it sees."""
+
+    guard_id = "toxic_language"
+    reject_message = "toxic"
+    position = "input"
+
+    def __init__(self):
+        self.calls: list[str] = []
+
+    def validate(self, text: str) -> bool:
+        self.calls.append(text)
+        return True
+
+
+def _guardrails(**fast_tier) -> GuardrailsV2:
+    return GuardrailsV2.model_validate(
+        {
+            "fast_tier": fast_tier,
+            "input": [
+                {
+                    "config_id": "ban_list",
+                    "banned_words": ["darn", "heck no"],
+                    "reject_message": "banned word",
+                },
+                {
+                    "config_id": "detect_pii",
+                    "pii_entities": ["Email", "Credit Card", "LOCATION"],
+                    "reject_message": "pii",
+                },
+                {"config_id": "toxic_language", "threshold": 0.5},
+            ],
+            "output": [
+                {
+                    "config_id": "competition_check",
+                    "competitors": ["Acme", "Globex Corp"],
+                    "reject_message": "competitor",
+                }
+            ],
+        }
+    )
+
+
+def _pii(entity: str, text: str) -> bool:
+    pattern, check = PII_PATTERNS[entity]
+    return any(check is None or check(m.group()) for m in pattern.finditer(text))
+
+
+@pytest.mark.unit
+class TestCompileKeywords:
+    """Test compile_keywords."""
+
+    def test_matches_whole_words_case_insensitively(self):
+        pattern = compile_keywords(["darn", "heck no"])
+
+        assert pattern.search("Well, DARN it")
+        assert pattern.search("heck no!")
+        assert not pattern.search("darned")
+        assert not pattern.search("heck, no")
+
+    def test_shared_prefixes(self):
+        """Words that prefix each other are all matched."""
+        pattern = compile_keywords(["ab", "abc", "abd"])
+
+        assert [m.group() for m in pattern.finditer("ab abc abd abe")] == [
+            "ab",
+            "abc",
+            "abd",
+        ]
+
+    def test_large_word_list(self):
+        pattern = compile_keywords(f"word{i}" for i in range(5000))
+
+        assert pattern.search("text with word4321 inside")
+        assert not pattern.search("text with word50000 inside")
+
+    def test_empty_list(self):
+        assert compile_keywords(["", "  "]) is None
+
+
+@pytest.mark.unit
+class TestPIIPatterns:
+    """Test the PII regexes."""
+
+    def test_email(self):
+        assert _pii("EMAIL_ADDRESS", "mail jane.doe+x@example.co.uk today")
+        assert not _pii("EMAIL_ADDRESS", "ping @jane on slack")
+
+    def test_credit_card_requires_luhn(self):
+        assert _pii("CREDIT_CARD", "card 4111 1111 1111 1111 exp")
+        assert not _pii("CREDIT_CARD", "card 4111 1111 1111 1112 exp")
+
+    def test_phone(self):
+        assert _pii("PHONE_NUMBER", "call +33 6 12 34 56 78")
+        assert _pii("PHONE_NUMBER", "call (555) 123-4567")
+        assert not _pii("PHONE_NUMBER", "order 12345 shipped")
+
+    def test_ssn(self):
+        assert _pii("SSN", "ssn 123-45-6789")
+        assert not _pii("SSN", "date 2024-01-15")
+
+
+@pytest.mark.unit
+class TestBuildFastTiers:
+    """Test build_fast_tiers."""
+
+    def test_rules_per_position(self):
+        input_tier, output_tier = build_fast_tiers(_guardrails())
+
+        assert input_tier.position == "input"
+        assert [rule.guard_id for rule in input_tier.rules] == [
+            "ban_list",
+            "detect_pii",
+        ]
+        assert output_tier.position == "output"
+        assert [rule.guard_id for rule in output_tier.rules] == ["competition_check"]
+
+    def test_disabled(self):
+        assert build_fast_tiers(_guardrails(enabled=False)) == []
+        config = _guardrails()
+        config.fast_tier = None
+        assert build_fast_tiers(config) == []
+
+    def test_hit_reports_originating_guard(self):
+        input_tier, output_tier = build_fast_tiers(_guardrails())
+
+        assert input_tier.first_hit("darn").reject_message == "banned word"
+        assert input_tier.first_hit("me@example.com").reject_message == "pii"
+        assert output_tier.first_hit("try globex corp").reject_message == "competitor"
+        assert input_tier.first_hit("hello from Paris") is None
+
+    def test_validate_allows_text_without_hits(self):
+        input_tier, _ = build_fast_tiers(_guardrails())
+
+        assert input_tier.validate("hello from Paris")
+        assert not input_tier.validate("darn")
+
+
+@pytest.mark.unit
+class TestExecutorFastTier:
+    """Fast tiers in GuardrailExecutor.first_rejection."""
+
+    async def test_hit_rejects_without_hub_guards(self):
+        (input_tier, _) = build_fast_tiers(_guardrails())
+        hub = _HubGuard()
+        executor = GuardrailExecutor()
+
+        rejected = await executor.first_rejection([input_tier, hub], "oh darn")
+
+        assert rejected.reject_message == "banned word"
+        assert hub.calls == []
+        assert executor.stats()["fast_tier_rejections_total"] == 1
+
+    async def test_clean_text_reaches_hub_guards(self):
+        (input_tier, _) = build_fast_tiers(_guardrails())
+        hub = _HubGuard()
+        executor = GuardrailExecutor()
+
+        assert await executor.first_rejection([input_tier, hub], "hello") is None
+        executor.shutdown()
+
+        assert hub.calls == ["hello"]
+
+    async def test_short_clean_text_skips_hub_guards(self):
+        (input_tier, _) = build_fast_tiers(
+            _guardrails(skip_hub_when_clean=True, clean_max_chars=10)
+        )
+        hub = _HubGuard()
+        executor = GuardrailExecutor()
+
+        assert await executor.first_rejection([input_tier, hub], "hello") is None
+        assert (
+            await executor.first_rejection([input_tier, hub], "a longer message")
+            is None
+        )
+        executor.shutdown()
+
+        assert hub.calls == ["a longer message"]
+        assert executor.stats()["hub_skipped_total"] == 1
@@ -0,0 +1,183 @@
+"""Tests for the Guardrails Hub validator install cache."""
+
+import json
+import os
+
+import pytest
+from idun_agent_schema.engine.guardrails_v2 import BanListConfig
+
+from idun_agent_engine.guardrails.guardrails_hub import guardrails_hub
+from idun_agent_engine.guardrails.guardrails_hub.cache import (
+    CACHE_DIR_ENV,
+    ValidatorCache,
+    resolve_cache_dir,
+)
+
+GUARD_URL = "hub://guardrails/ban_list"
+
+
+def _install_fake_validator(site_dir, version: str = "0.1.0") -> None:
+    """Lay out an installed ``guardrails-grhub-ban-list`` distribution."""
+    package = site_dir / "guardrails_grhub_ban_list"
+    package.mkdir(parents=True, exist_ok=True)
+    (package / "__init__.py").write_text("")
+    for dist_info in site_dir.glob("guardrails_grhub_ban_list-*.dist-info"):
+        for path in dist_info.iterdir():
+            path.unlink()
+        dist_info.rmdir()
+    dist_info = site_dir / f"guardrails_grhub_ban_list-{version}.dist-info"
+    dist_info.mkdir()
+    (dist_info / "METADATA").write_text(
+        f"Metadata-Version: 2.1\nName: guardrails-grhub-ban-list\nVersion: {version}\n"
+    )
+
+
+@pytest.fixture
+def site_dir(tmp_path, monkeypatch):
+    path = tmp_path / "site"
+    path.mkdir()
+    monkeypatch.syspath_prepend(str(path))
+    monkeypatch.setenv("HF_HOME", str(tmp_path / "hf"))
+    return path
+
+
+@pytest.mark.unit
+class TestValidatorCache:
+    """Test ValidatorCache."""
+
+    def test_resolve_cache_dir_precedence(self, tmp_path, monkeypatch):
+        """Explicit directory wins over the env var, which wins over the default."""
+        monkeypatch.setenv(CACHE_DIR_ENV, str(tmp_path / "env"))
+
+        assert resolve_cache_dir(tmp_path / "explicit") == tmp_path / "explicit"
+        assert resolve_cache_dir() == tmp_path / "env"
+
+    def test_miss_when_package_not_installed(self, tmp_path, site_dir):
+        """A validator that is not installed is never a cache hit."""
+        cache = ValidatorCache(tmp_path / "cache")
+
+        assert cache.record(GUARD_URL) is None
+        assert not cache.is_installed(GUARD_URL)
+
+    def test_installed_package_without_manifest_is_a_miss(self, tmp_path, site_dir):
+        """An install that was never recorded (e.g. interrupted) is reinstalled."""
+        _install_fake_validator(site_dir)
+        cache = ValidatorCache(tmp_path / "cache")
+
+        assert not cache.is_installed(GUARD_URL)
+
+    def test_recorded_install_is_a_hit(self, tmp_path, site_dir):
+        """A recorded install is found by a fresh cache on the same directory."""
+        _install_fake_validator(site_dir)
+        ValidatorCache(tmp_path / "cache").record(GUARD_URL)
+
+        manifest = ValidatorCache(tmp_path / "cache").lookup(GUARD_URL)
+
+        assert manifest is not None
+        assert manifest["package"] == "guardrails-grhub-ban-list"
+        assert manifest["version"] == "0.1.0"
+
+    def test_version_change_invalidates(self, tmp_path, site_dir):
+        """Upgrading the installed package changes the content address."""
+        _install_fake_validator(site_dir, "0.1.0")
+        cache = ValidatorCache(tmp_path / "cache")
+        cache.record(GUARD_URL)
+
+        _install_fake_validator(site_dir, "0.2.0")
+
+        assert not cache.is_installed(GUARD_URL)
+
+    def test_unsatisfied_specifier_is_a_miss(self, tmp_path, site_dir):
+        """A pinned guard_url does not accept an installed version outside the pin."""
+        _install_fake_validator(site_dir, "0.1.0")
+        cache = ValidatorCache(tmp_path / "cache")
+        cache.record(GUARD_URL)
+
+        assert not cache.is_installed(f"{GUARD_URL}>=0.2")
+
+    def test_record_replaces_other_versions(self, tmp_path, site_dir):
+        """Only the manifest of the current version is kept."""
+        cache = ValidatorCache(tmp_path / "cache")
+        _install_fake_validator(site_dir, "0.1.0")
+        cache.record(GUARD_URL)
+        _install_fake_validator(site_dir, "0.2.0")
+        cache.record(GUARD_URL)
+
+        manifests = [
+            json.loads(path.read_text()) for path in cache.manifests_dir.glob("*.json")
+        ]
+
+        assert [m["version"] for m in manifests] == ["0.2.0"]
+
+    def test_prepare_environment_points_hf_home_at_cache(self, tmp_path, site_dir):
+        """Models go to the cache even if HF_HOME was set elsewhere."""
+        cache = ValidatorCache(tmp_path / "cache")
+
+        cache.prepare_environment()
+
+        assert os.environ["HF_HOME"] == str(cache.huggingface_dir)
+
+    def test_missing_models_are_a_miss(self, tmp_path, site_dir):
+        """An install whose downloaded models were deleted is reinstalled."""
+        _install_fake_validator(site_dir)
+        cache = ValidatorCache(tmp_path / "cache")
+        model = cache.huggingface_dir / "hub" / "models--org--ban-list"
+        model.mkdir(parents=True)
+        cache.record(GUARD_URL, models=["models--org--ban-list"])
+        assert cache.is_installed(GUARD_URL)
+
+        model.rmdir()
+
+        assert not cache.is_installed(GUARD_URL)
+
+
+@pytest.mark.unit
+class TestGuardrailsHubGuardCache:
+    """Test that GuardrailsHubGuard skips installs on a warm cache."""
+
+    @pytest.fixture
+    def installs(self, monkeypatch, site_dir):
+        calls = []
+
+        def fake_install(guard):
+            calls.append(guard._guard_url)
+            _install_fake_validator(site_dir)
+
+        class FakeValidator:
+            def __init__(self, on_fail=None, **kwargs):
+                self.kwargs = kwargs
+
+        monkeypatch.setattr(
+            guardrails_hub.GuardrailsHubGuard, "_install_model", fake_install
+        )
+        monkeypatch.setattr(
+            guardrails_hub, "get_guard_instance", lambda name: FakeValidator
+        )
+        return calls
+
+    def test_install_runs_once_per_cache(self, tmp_path, installs):
+        """The second start with the same cache directory skips the install."""
+        config = BanListConfig(banned_words=["x"])
+
+        guardrails_hub.GuardrailsHubGuard(
+            config, position="input", cache=ValidatorCache(tmp_path / "cache")
+        )
+        guard = guardrails_hub.GuardrailsHubGuard(
+            config, position="input", cache=ValidatorCache(tmp_path / "cache")
+        )
+
+        assert installs == [GUARD_URL]
+        assert guard._guard.kwargs == {"banned_words": ["x"]}
+
+    def test_cold_cache_directory_installs(self, tmp_path, installs):
+        """A new cache directory triggers an install even if the package exists."""
+        config = BanListConfig(banned_words=["x"])
+
+        guardrails_hub.GuardrailsHubGuard(
+            config, position="input", cache=ValidatorCache(tmp_path / "a")
+        )
+        guardrails_hub.GuardrailsHubGuard(
+            config, position="input", cache=ValidatorCache(tmp_path / "b")
+        )
+
+        assert installs == [GUARD_URL, GUARD_URL]
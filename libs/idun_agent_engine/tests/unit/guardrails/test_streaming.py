@@ -0,0 +1,247 @@
+"""Tests for output guardrails on streamed responses."""
+
+import asyncio
+import time
+
+import pytest
+from ag_ui.core import (
+    EventType,
+    RawEvent,
+    RunFinishedEvent,
+    RunStartedEvent,
+    TextMessageContentEvent,
+    TextMessageEndEvent,
+    TextMessageStartEvent,
+    ToolCallStartEvent,
+)
+from idun_agent_schema.engine.server import OutputStreamGuardrailConfig
+
+from idun_agent_engine.guardrails.executor import GuardrailExecutor
+from idun_agent_engine.guardrails.streaming import guard_output_stream
+
+
+class _KeywordGuard:
+    guard_id = "keyword"
+    reject_message = "Response blocked"
+    position = "output"
+
+    def __init__(self, keyword: str, delay: float = 0.0):
+        self.keyword = keyword
+        self.delay = delay
+        self.texts: list[str] = []
+
+    def validate(self, text: str) -> bool:
+        time.sleep(self.delay)
+        self.texts.append(text)
+        return self.keyword not in text
+
+
+def _message(*deltas: str, message_id: str = "m1") -> list:
+    return [
+        TextMessageStartEvent(message_id=message_id, role="assistant"),
+        *(TextMessageContentEvent(message_id=message_id, delta=d) for d in deltas),
+        TextMessageEndEvent(message_id=message_id),
+    ]
+
+
+def _run(*events) -> list:
+    return [
+        RunStartedEvent(thread_id="t", run_id="r"),
+        *events,
+        RunFinishedEvent(thread_id="t", run_id="r"),
+    ]
+
+
+class _Agent:
+    """Async iterator over events that records how far it got."""
+
+    def __init__(self, events: list, delay: float = 0.0):
+        self.events = events
+        self.delay = delay
+        self.produced = 0
+        self.closed = False
+
+    async def stream(self):
+        try:
+            for event in self.events:
+                if self.delay:
+                    await asyncio.sleep(self.delay)
+                self.produced += 1
+                yield event
+        finally:
+            self.closed = True
+
+
+async def _collect(agent: _Agent, guard: _KeywordGuard, **config) -> list:
+    executor = GuardrailExecutor()
+    try:
+        return [
+            event
+            async for event in guard_output_stream(
+                agent.stream(),
+                [guard],
+                executor,
+                OutputStreamGuardrailConfig(**config),
+            )
+        ]
+    finally:
+        executor.shutdown()
+
+
+def _text(events: list) -> str:
+    return "".join(e.delta for e in events if e.type == EventType.TEXT_MESSAGE_CONTENT)
+
+
+@pytest.mark.unit
+class TestGuardOutputStream:
+    """Test guard_output_stream."""
+
+    async def test_clean_stream_passes_unchanged(self):
+        events = _run(*_message("Hello ", "there. ", "How are you?"))
+
+        out = await _collect(_Agent(events), _KeywordGuard("forbidden"))
+
+        assert out == events
+
+    async def test_failing_window_ends_run_with_error(self):
+        """Text before the failing window goes out; the rest is replaced by an error."""
+        agent = _Agent(
+            _run(
+                *_message(
+                    "First sentence. ", "Second one. ", "Now forbidden. ", "More."
+                )
+            )
+        )
+
+        out = await _collect(
+            agent, _KeywordGuard("forbidden"), window_chars=5, context_chars=0
+        )
+
+        assert _text(out) == "First sentence. Second one. "
+        assert out[-1].type == EventType.RUN_ERROR
+        assert out[-1].code == "OUTPUT_GUARDRAIL"
+        assert out[-1].message == "Response blocked"
+        assert EventType.RUN_FINISHED not in [e.type for e in out]
+        assert agent.closed
+
+    async def test_clean_windows_before_a_failure_go_out(self):
+        """A window failing before earlier ones are checked doesn't drop them."""
+
+        class SlowCleanGuard(_KeywordGuard):
+            def validate(self, text: str) -> bool:
+                if "slow" in text:
+                    time.sleep(0.1)
+                return super().validate(text)
+
+        out = await _collect(
+            _Agent(_run(*_message("A slow one. ", "Now forbidden. "))),
+            SlowCleanGuard("forbidden"),
+            window_chars=5,
+            context_chars=0,
+        )
+
+        assert _text(out) == "A slow one. "
+        assert out[-1].code == "OUTPUT_GUARDRAIL"
+
+    async def test_raw_events_go_out_with_the_next_text(self):
+        """RAW chunks sent before each delta are released with its window."""
+        deltas = ["Fine. ", "Now forbidden. "]
+        events = [
+            TextMessageStartEvent(message_id="m1", role="assistant"),
+            *(
+                event
+                for delta in deltas
+                for event in (
+                    RawEvent(event={"chunk": delta}),
+                    TextMessageContentEvent(message_id="m1", delta=delta),
+                )
+            ),
+            TextMessageEndEvent(message_id="m1"),
+        ]
+        guard = _KeywordGuard("forbidden")
+
+        out = await _collect(
+            _Agent(_run(*events)), guard, window_chars=5, context_chars=0
+        )
+
+        assert [e.type for e in out] == [
+            EventType.RUN_STARTED,
+            EventType.TEXT_MESSAGE_START,
+            EventType.RAW,
+            EventType.TEXT_MESSAGE_CONTENT,
+            EventType.RUN_ERROR,
+        ]
+        assert out[2].event == {"chunk": "Fine. "}
+        # RAW events don't split windows
+        assert guard.texts == deltas
+
+    async def test_context_catches_text_split_across_windows(self):
+        """The tail of the previous window is validated again with the next one."""
+        guard = _KeywordGuard("forbidden")
+        events = _run(*_message("this is forb", "idden text"))
+
+        out = await _collect(
+            _Agent(events), guard, window_chars=5, max_window_chars=12, context_chars=20
+        )
+
+        assert guard.texts[-1] == "this is forbidden text"
+        assert out[-1].code == "OUTPUT_GUARDRAIL"
+
+    async def test_text_released_while_agent_streams(self):
+        """Validated windows go out before the agent has finished."""
+        agent = _Agent(
+            _run(*_message(*(f"Sentence {i}. " for i in range(10)))), delay=0.01
+        )
+        executor = GuardrailExecutor()
+        produced_at_first_text = None
+
+        async for event in guard_output_stream(
+            agent.stream(),
+            [_KeywordGuard("forbidden")],
+            executor,
+            OutputStreamGuardrailConfig(window_chars=5),
+        ):
+            if event.type == EventType.TEXT_MESSAGE_CONTENT:
+                produced_at_first_text = agent.produced
+                break
+        executor.shutdown()
+
+        assert produced_at_first_text is not None
+        assert produced_at_first_text < len(agent.events) - 3
+
+    async def test_events_keep_order_behind_unchecked_text(self):
+        """A tool call queued after text waits for that text's verdict."""
+        tool_call = ToolCallStartEvent(tool_call_id="c1", tool_call_name="search")
+        events = _run(
+            TextMessageStartEvent(message_id="m1", role="assistant"),
+            TextMessageContentEvent(message_id="m1", delta="Let me check"),
+            tool_call,
+            TextMessageEndEvent(message_id="m1"),
+        )
+        guard = _KeywordGuard("forbidden", delay=0.05)
+
+        out = await _collect(_Agent(events), guard)
+
+        assert out == events
+        assert guard.texts == ["Let me check"]
+
+    async def test_pending_windows_bounded(self):
+        """Reading pauses once max_pending_windows windows await a verdict."""
+        guard = _KeywordGuard("forbidden", delay=0.05)
+        agent = _Agent(_run(*_message(*(f"Part {i}. " for i in range(8)))))
+        executor = GuardrailExecutor()
+        backlog = []
+
+        async for _event in guard_output_stream(
+            agent.stream(),
+            [guard],
+            executor,
+            OutputStreamGuardrailConfig(
+                window_chars=1, context_chars=0, max_pending_windows=2
+            ),
+        ):
+            backlog.append(agent.produced - len(guard.texts))
+        executor.shutdown()
+
+        # Start event, plus at most two windows in flight and the one being read
+        assert max(backlog) <= 4
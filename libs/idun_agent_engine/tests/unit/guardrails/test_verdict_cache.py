@@ -0,0 +1,185 @@
+"""Tests for the guardrail verdict cache."""
+
+from pathlib import Path
+
+import pytest
+from fastapi import FastAPI
+from idun_agent_schema.engine.guardrails_v2 import BanListConfig
+from idun_agent_schema.engine.server import (
+    GuardrailExecutionConfig,
+    GuardrailVerdictCacheConfig,
+)
+
+from idun_agent_engine.core.config_builder import ConfigBuilder
+from idun_agent_engine.guardrails import verdict_cache
+from idun_agent_engine.guardrails.executor import GuardrailExecutor
+from idun_agent_engine.guardrails.verdict_cache import (
+    VerdictCache,
+    config_hash,
+    text_hash,
+)
+from idun_agent_engine.server.generations import AgentGeneration
+from idun_agent_engine.server.lifespan import activate_generation
+
+MOCK_GRAPH_PATH = (
+    Path(__file__).parent.parent.parent / "fixtures" / "agents" / "mock_graph.py"
+)
+
+
+class _CountingGuard:
+    """Rejects texts containing "bad" and counts its calls."""
+
+    guard_id = "ban_list"
+
+    def __init__(self, config_hash: str = "v1"):
+        self.config_hash = config_hash
+        self.calls = 0
+
+    def validate(self, text: str) -> bool:
+        self.calls += 1
+        return "bad" not in text
+
+
+class _FailingGuard(_CountingGuard):
+    def validate(self, text: str) -> bool:
+        self.calls += 1
+        raise RuntimeError("model crashed")
+
+
+def _key(digest: str) -> tuple[str, str, str]:
+    return ("guard", "v1", digest)
+
+
+@pytest.mark.unit
+class TestVerdictCache:
+    """Test VerdictCache."""
+
+    def test_lru_eviction(self):
+        cache = VerdictCache(GuardrailVerdictCacheConfig(max_entries=2))
+        cache.put(_key("a"), True)
+        cache.put(_key("b"), True)
+        cache.get(_key("a"))
+        cache.put(_key("c"), False)
+
+        assert cache.get(_key("a")) is True
+        assert cache.get(_key("b")) is None
+        assert cache.get(_key("c")) is False
+        assert cache.stats()["evictions_total"] == 1
+
+    def test_entries_expire(self, monkeypatch):
+        now = 1000.0
+        monkeypatch.setattr(verdict_cache.time, "monotonic", lambda: now)
+        cache = VerdictCache(GuardrailVerdictCacheConfig(ttl_seconds=10))
+        cache.put(_key("a"), True)
+
+        now = 1009.0
+        assert cache.get(_key("a")) is True
+        now = 1011.0
+        assert cache.get(_key("a")) is None
+        assert cache.stats()["entries"] == 0
+
+    def test_configure_shrinks_and_disables(self):
+        cache = VerdictCache()
+        for name in "abc":
+            cache.put(_key(name), True)
+
+        cache.configure(GuardrailVerdictCacheConfig(max_entries=1))
+        assert cache.stats()["entries"] == 1
+
+        cache.configure(GuardrailVerdictCacheConfig(enabled=False))
+        cache.put(_key("d"), True)
+        assert cache.stats()["entries"] == 0
+
+    def test_text_hash_normalizes_whitespace(self):
+        assert text_hash("hello  there\n") == text_hash(" hello there")
+        assert text_hash("hello there") != text_hash("Hello there")
+
+    def test_config_hash_tracks_settings(self):
+        config = BanListConfig(banned_words=["darn"])
+
+        assert config_hash(config) == config_hash(BanListConfig(banned_words=["darn"]))
+        assert config_hash(config) != config_hash(
+            BanListConfig(banned_words=["darn", "heck"])
+        )
+
+
+@pytest.mark.unit
+class TestExecutorVerdictCache:
+    """Verdict caching in GuardrailExecutor."""
+
+    async def test_repeated_text_served_from_cache(self):
+        executor = GuardrailExecutor()
+        guard = _CountingGuard()
+
+        assert await executor.first_rejection([guard], "hello") is None
+        assert await executor.first_rejection([guard], "hello ") is None
+        assert await executor.first_rejection([guard], "bad") is guard
+        assert await executor.first_rejection([guard], "bad") is guard
+        executor.shutdown()
+
+        assert guard.calls == 2
+        stats = executor.stats()["verdict_cache"]
+        assert (stats["hits_total"], stats["misses_total"]) == (2, 2)
+
+    async def test_changed_config_misses(self):
+        """A guard whose config hash changed never reuses the old verdict."""
+        executor = GuardrailExecutor()
+        old, new = _CountingGuard("v1"), _CountingGuard("v2")
+
+        await executor.first_rejection([old], "hello")
+        await executor.first_rejection([new], "hello")
+        executor.shutdown()
+
+        assert new.calls == 1
+
+    async def test_errors_are_not_cached(self):
+        executor = GuardrailExecutor()
+        guard = _FailingGuard()
+
+        assert await executor.first_rejection([guard], "hello") is guard
+        assert await executor.first_rejection([guard], "hello") is guard
+        executor.shutdown()
+
+        assert guard.calls == 2
+
+    async def test_disabled(self):
+        executor = GuardrailExecutor(
+            GuardrailExecutionConfig(
+                verdict_cache=GuardrailVerdictCacheConfig(enabled=False)
+            )
+        )
+        guard = _CountingGuard()
+
+        await executor.first_rejection([guard], "hello")
+        await executor.first_rejection([guard], "hello")
+        executor.shutdown()
+
+        assert guard.calls == 2
+
+    async def test_reload_clears_verdicts_of_rebuilt_guardrails(self):
+        """Activating a generation with new guardrails drops every cached verdict."""
+        engine_config = ConfigBuilder.from_dict(
+            {
+                "agent": {
+                    "type": "LANGGRAPH",
+                    "config": {
+                        "name": "cache",
+                        "graph_definition": f"{MOCK_GRAPH_PATH}:graph",
+                    },
+                }
+            }
+        ).build()
+        app = FastAPI()
+        activate_generation(app, AgentGeneration(number=1, engine_config=engine_config))
+        executor = app.state.guardrail_executor
+        guard = _CountingGuard()
+        await executor.first_rejection([guard], "hello")
+
+        reused = AgentGeneration(number=2, engine_config=engine_config)
+        reused.reused = ["guardrails"]
+        activate_generation(app, reused)
+        assert executor.stats()["verdict_cache"]["entries"] == 1
+
+        activate_generation(app, AgentGeneration(number=3, engine_config=engine_config))
+        assert executor.stats()["verdict_cache"]["entries"] == 0
+        executor.shutdown()
@@ -0,0 +1,151 @@
+"""Tests for guardrails hosted in worker processes."""
+
+import os
+from dataclasses import dataclass
+
+import pytest
+from idun_agent_schema.engine.guardrails_v2 import GuardrailWorkerPoolConfig
+from idun_agent_schema.engine.server import GuardrailExecutionConfig
+from pydantic import ValidationError
+
+from idun_agent_engine.guardrails.executor import GuardrailExecutor
+from idun_agent_engine.guardrails.worker_pool import (
+    GuardrailWorkerPool,
+    GuardSpec,
+    RemoteGuard,
+    worker_pools_of,
+)
+
+
+@dataclass
+class _KeywordConfig:
+    config_id: str
+    keyword: str
+    reject_message: str = "blocked"
+
+
+class _KeywordGuard:
+    """Rejects text containing a keyword. Built inside the worker."""
+
+    def __init__(self, config: _KeywordConfig, position: str):
+        if config.keyword == "fail-to-load":
+            raise RuntimeError("model download failed")
+        self.keyword = config.keyword
+
+    def validate(self, text: str) -> bool:
+        return self.keyword not in text
+
+
+def _factory(config: _KeywordConfig, position: str) -> _KeywordGuard:
+    return _KeywordGuard(config, position)
+
+
+def _specs() -> list[GuardSpec]:
+    return [
+        GuardSpec(_KeywordConfig("ban_list", "forbidden"), "input"),
+        GuardSpec(_KeywordConfig("toxic_language", "idiot"), "input"),
+        GuardSpec(_KeywordConfig("ban_list", "secret"), "output"),
+    ]
+
+
+@pytest.fixture(scope="module")
+def remote_guards():
+    pool = GuardrailWorkerPool(GuardrailWorkerPoolConfig(workers=2), _factory)
+    guards = pool.start(_specs())
+    yield guards
+    pool.close()
+
+
+@pytest.mark.unit
+class TestGuardrailWorkerPool:
+    """Test GuardrailWorkerPool."""
+
+    def test_guards_load_in_worker_processes(self, remote_guards):
+        """Each guard lives in exactly one child process, not in the engine."""
+        (pool,) = worker_pools_of(remote_guards)
+        stats = pool.stats()
+
+        assert len(stats) == 2
+        assert all(worker["alive"] for worker in stats)
+        assert os.getpid() not in {worker["pid"] for worker in stats}
+        hosted = [key for worker in stats for key in worker["guards"]]
+        assert sorted(hosted) == sorted(guard.key for guard in remote_guards)
+
+    def test_remote_guards_keep_guard_attributes(self, remote_guards):
+        """Proxies expose what the routes read from a guard."""
+        assert [guard.position for guard in remote_guards] == [
+            "input",
+            "input",
+            "output",
+        ]
+        assert remote_guards[1].guard_id == "toxic_language"
+        assert remote_guards[1].reject_message == "blocked"
+
+    def test_validate_returns_worker_verdict(self, remote_guards):
+        """Blocking validate round-trips through the worker."""
+        guard = remote_guards[0]
+
+        assert guard.validate("hello") is True
+        assert guard.validate("this is forbidden") is False
+
+    async def test_executor_awaits_remote_guards(self, remote_guards):
+        """The executor awaits worker verdicts and reports the rejecting guard."""
+        executor = GuardrailExecutor(GuardrailExecutionConfig(timeout_seconds=5.0))
+        inputs = [guard for guard in remote_guards if guard.position == "input"]
+
+        assert await executor.first_rejection(inputs, "hello") is None
+        assert await executor.first_rejection(inputs, "you idiot") is inputs[1]
+        executor.shutdown()
+
+    def test_unlisted_guards_spread_across_workers(self):
+        """Without routing, guards go to the least loaded worker."""
+        pool = GuardrailWorkerPool(GuardrailWorkerPoolConfig(workers=2), _factory)
+
+        assert pool.assign(_specs()) == [0, 1, 0]
+
+    def test_routing_pins_guards(self):
+        """Routed guards go to their worker; others fill the remaining ones."""
+        config = GuardrailWorkerPoolConfig(workers=2, routing={"ban_list": 1})
+        pool = GuardrailWorkerPool(config, _factory)
+
+        assert pool.assign(_specs()) == [1, 0, 1]
+
+    def test_routing_to_missing_worker_rejected(self):
+        """Routing must target an existing worker index."""
+        with pytest.raises(ValidationError, match="do not exist"):
+            GuardrailWorkerPoolConfig(workers=2, routing={"ban_list": 2})
+
+    def test_load_failure_stops_all_workers(self):
+        """A worker that cannot load its guards fails the start with its traceback."""
+        pool = GuardrailWorkerPool(GuardrailWorkerPoolConfig(workers=2), _factory)
+        specs = [
+            GuardSpec(_KeywordConfig("ban_list", "forbidden"), "input"),
+            GuardSpec(_KeywordConfig("toxic_language", "fail-to-load"), "input"),
+        ]
+
+        with pytest.raises(RuntimeError, match="model download failed"):
+            pool.start(specs)
+
+        assert pool.stats() == []
+
+    async def test_dead_worker_fails_closed(self):
+        """Guards of a worker that died reject every request."""
+        pool = GuardrailWorkerPool(GuardrailWorkerPoolConfig(workers=1), _factory)
+        (guard,) = pool.start(_specs()[:1])
+        try:
+            guard.worker.process.kill()
+            guard.worker.process.join(5)
+            executor = GuardrailExecutor(GuardrailExecutionConfig(timeout_seconds=5.0))
+
+            assert await executor.first_rejection([guard], "hello") is guard
+            assert guard.validate("hello") is False
+            assert pool.stats()[0]["alive"] is False
+        finally:
+            pool.close()
+
+    def test_worker_pools_of_ignores_local_guards(self, remote_guards):
+        """Only guards hosted in workers contribute a pool."""
+        guards = [object(), *remote_guards]
+
+        assert len(worker_pools_of(guards)) == 1
+        assert all(isinstance(guard, RemoteGuard) for guard in remote_guards)
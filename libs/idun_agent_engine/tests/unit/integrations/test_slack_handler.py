@@ -1,13 +1,16 @@
 """Tests for Slack webhook handler endpoints."""
 
+import asyncio
 import json
 from unittest.mock import AsyncMock, patch
 
 import pytest
 from fastapi import FastAPI
 from fastapi.testclient import TestClient
+from idun_agent_schema.engine.server import AdmissionConfig
 
 from idun_agent_engine.integrations.slack.handler import router
+from idun_agent_engine.server.admission import AdmissionController
 
 
 def _make_app(signing_secret: str | None = "test-secret") -> FastAPI:
@@ -168,6 +171,41 @@ class TestSlackMessageHandling:
 
         app.state.slack_client.send_message.assert_not_called()
 
+    @patch(
+        "idun_agent_engine.integrations.slack.handler.verify_slack_signature",
+        return_value=True,
+    )
+    def test_engine_at_capacity_returns_429(self, _mock_verify):
+        app = _make_app()
+        app.state.agent = AsyncMock()
+        app.state.slack_client = AsyncMock()
+        app.state.admission = AdmissionController(
+            AdmissionConfig(max_in_flight=1, max_queue=0)
+        )
+        asyncio.run(app.state.admission.acquire())
+
+        with TestClient(app) as client:
+            resp = _post_event(
+                client,
+                {
+                    "type": "event_callback",
+                    "event": {
+                        "type": "message",
+                        "text": "Hello",
+                        "user": "U12345",
+                        "channel": "C67890",
+                        "ts": "1234567890.123456",
+                    },
+                    "token": "test",
+                    "event_id": "Ev06",
+                    "event_time": 1234567890,
+                },
+            )
+            assert resp.status_code == 429
+            assert resp.headers["Retry-After"] == "1"
+
+        app.state.agent.invoke.assert_not_called()
+
     @patch(
         "idun_agent_engine.integrations.slack.handler.verify_slack_signature",
         return_value=True,
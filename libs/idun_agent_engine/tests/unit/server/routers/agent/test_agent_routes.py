@@ -192,6 +192,88 @@ class TestInvokeErrorHandling:
                 assert "detail" in response.json()
 
 
+@pytest.mark.unit
+class TestAgentBatchRoute:
+    """Test /agent/batch endpoint."""
+
+    _config = {
+        "agent": {
+            "type": "LANGGRAPH",
+            "config": {
+                "name": "Test LangGraph Agent",
+                "graph_definition": "tests.fixtures.agents.mock_graph:graph",
+            },
+        },
+    }
+
+    def test_batch_streams_one_result_per_item(self):
+        """Each item gets an NDJSON line; a failing item doesn't stop the rest."""
+        import asyncio
+        import json
+
+        config = ConfigBuilder.from_dict(self._config).build()
+        app = create_app(engine_config=config)
+        running = 0
+        peak = 0
+
+        async def fake_invoke(message):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+            if message["query"] == "fail":
+                raise RuntimeError("boom")
+            return f"echo: {message['query']}"
+
+        with TestClient(app) as client:
+            app.state.agent.invoke = fake_invoke
+            response = client.post(
+                "/agent/batch",
+                json={
+                    "items": [
+                        {"session_id": f"s-{i}", "query": "fail" if i == 2 else f"q{i}"}
+                        for i in range(6)
+                    ],
+                    "max_concurrency": 2,
+                },
+            )
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        results = {
+            line["index"]: line
+            for line in map(json.loads, response.text.strip().splitlines())
+        }
+        assert sorted(results) == list(range(6))
+        assert results[0] == {
+            "index": 0,
+            "session_id": "s-0",
+            "status_code": 200,
+            "response": "echo: q0",
+        }
+        assert results[2]["status_code"] == 400
+        assert "error" in results[2]
+        assert peak <= 2
+
+    def test_batch_larger_than_max_items_is_rejected(self):
+        """Batches above server.batch.max_items get 413."""
+        config = ConfigBuilder.from_dict(
+            {**self._config, "server": {"batch": {"max_items": 2}}}
+        ).build()
+        app = create_app(engine_config=config)
+
+        with TestClient(app) as client:
+            response = client.post(
+                "/agent/batch",
+                json={
+                    "items": [{"session_id": f"s-{i}", "query": "q"} for i in range(3)]
+                },
+            )
+
+        assert response.status_code == 413
+
+
 @pytest.mark.unit
 class TestReloadEndpoint:
     """Test /reload endpoint."""
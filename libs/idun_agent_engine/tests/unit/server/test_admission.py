@@ -0,0 +1,135 @@
+"""Tests for global admission control."""
+
+import asyncio
+
+import pytest
+from idun_agent_schema.engine.server import AdmissionConfig
+
+from idun_agent_engine.server.admission import (
+    AdmissionController,
+    AdmissionRejectedError,
+)
+
+
+@pytest.mark.unit
+class TestAdmissionController:
+    """Test AdmissionController limits, queueing and counters."""
+
+    async def test_unlimited_by_default(self):
+        """Without max_in_flight every request is admitted immediately."""
+        controller = AdmissionController()
+        tickets = [await controller.acquire() for _ in range(50)]
+
+        stats = controller.stats()
+        assert stats["enabled"] is False
+        assert stats["in_flight"] == 50
+        for ticket in tickets:
+            ticket.release()
+        assert controller.stats()["in_flight"] == 0
+
+    async def test_limits_concurrency_in_fifo_order(self):
+        """No more than max_in_flight run at once; waiters go in arrival order."""
+        controller = AdmissionController(AdmissionConfig(max_in_flight=2))
+        running = 0
+        peak = 0
+        order: list[int] = []
+
+        async def _run(i: int):
+            nonlocal running, peak
+            async with controller.slot():
+                order.append(i)
+                running += 1
+                peak = max(peak, running)
+                await asyncio.sleep(0.01)
+                running -= 1
+
+        await asyncio.gather(*(_run(i) for i in range(6)))
+
+        assert peak == 2
+        assert order == list(range(6))
+        stats = controller.stats()
+        assert stats["admitted_total"] == 6
+        assert stats["in_flight"] == 0
+        assert stats["queued"] == 0
+        assert stats["wait_seconds_max"] > 0
+
+    async def test_full_queue_rejects_with_429(self):
+        """A request beyond max_queue is rejected without waiting."""
+        controller = AdmissionController(
+            AdmissionConfig(max_in_flight=1, max_queue=1)
+        )
+        held = await controller.acquire()
+        waiter = asyncio.create_task(controller.acquire())
+        await asyncio.sleep(0)
+
+        with pytest.raises(AdmissionRejectedError) as exc_info:
+            await controller.acquire()
+        assert exc_info.value.status_code == 429
+        assert exc_info.value.headers == {"Retry-After": "1"}
+
+        held.release()
+        (await waiter).release()
+        assert controller.stats()["rejected_total"] == 1
+
+    async def test_queue_deadline_rejects_with_503(self):
+        """A waiter that exceeds queue_timeout_seconds gets 503."""
+        controller = AdmissionController(
+            AdmissionConfig(max_in_flight=1, queue_timeout_seconds=0.05)
+        )
+        async with controller.slot():
+            with pytest.raises(AdmissionRejectedError) as exc_info:
+                await controller.acquire()
+
+        assert exc_info.value.status_code == 503
+        stats = controller.stats()
+        assert stats["timed_out_total"] == 1
+        assert stats["queued"] == 0
+        assert stats["in_flight"] == 0
+
+    async def test_cancelled_waiter_leaves_queue(self):
+        """A waiter cancelled by a client disconnect frees its queue position."""
+        controller = AdmissionController(AdmissionConfig(max_in_flight=1))
+        held = await controller.acquire()
+        waiter = asyncio.create_task(controller.acquire())
+        await asyncio.sleep(0)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+
+        held.release()
+        assert controller.stats()["in_flight"] == 0
+        assert controller.stats()["queued"] == 0
+
+    async def test_release_is_idempotent(self):
+        """Releasing a ticket twice frees only one slot."""
+        controller = AdmissionController(AdmissionConfig(max_in_flight=2))
+        first = await controller.acquire()
+        await controller.acquire()
+        first.release()
+        first.release()
+        assert controller.stats()["in_flight"] == 1
+
+    async def test_raising_limit_wakes_waiters(self):
+        """A reload that raises max_in_flight admits queued requests."""
+        controller = AdmissionController(AdmissionConfig(max_in_flight=1))
+        held = await controller.acquire()
+        waiter = asyncio.create_task(controller.acquire())
+        await asyncio.sleep(0)
+
+        controller.configure(AdmissionConfig(max_in_flight=2))
+        ticket = await asyncio.wait_for(waiter, timeout=1)
+
+        assert controller.stats()["in_flight"] == 2
+        ticket.release()
+        held.release()
+
+    async def test_retry_after_tracks_run_duration(self):
+        """Retry-After grows with the observed average run time."""
+        controller = AdmissionController(
+            AdmissionConfig(max_in_flight=1, max_queue=0)
+        )
+        controller._avg_service_seconds = 4.2
+        async with controller.slot():
+            with pytest.raises(AdmissionRejectedError) as exc_info:
+                await controller.acquire()
+        assert exc_info.value.retry_after == 5
@@ -195,3 +195,28 @@ class TestOIDCValidator:
                 claims = await validator.validate_token("some-token")
 
                 assert claims["sub"] == "user-1"
+
+    @pytest.mark.asyncio
+    async def test_prefetch_loads_signing_keys(self):
+        """prefetch fetches the JWKS so the first request does not have to."""
+        from idun_agent_engine.server.auth import OIDCValidator
+
+        validator = OIDCValidator(self._make_config())
+        mock_jwks_client = MagicMock()
+
+        with patch.object(validator, "_ensure_jwks", return_value=mock_jwks_client):
+            assert await validator.prefetch() is True
+
+        mock_jwks_client.get_jwk_set.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_prefetch_failure_is_not_fatal(self):
+        """An unreachable issuer only logs; validation retries on first request."""
+        from idun_agent_engine.server.auth import OIDCValidator
+
+        validator = OIDCValidator(self._make_config())
+
+        with patch.object(
+            validator, "_ensure_jwks", AsyncMock(side_effect=OSError("unreachable"))
+        ):
+            assert await validator.prefetch() is False
@@ -0,0 +1,209 @@
+"""Tests for background runs."""
+
+import asyncio
+import contextlib
+
+import pytest
+from ag_ui.core import (
+    RunErrorEvent,
+    StateSnapshotEvent,
+    TextMessageContentEvent,
+)
+from idun_agent_schema.engine.server import BackgroundRunsConfig
+
+from idun_agent_engine.server.background_runs import (
+    BackgroundRun,
+    BackgroundRunManager,
+    BackgroundRunRejectedError,
+)
+from idun_agent_engine.server.run_log import RunEventLog
+
+
+def _frames_until(release: asyncio.Event, started: list[str]):
+    def frames(run: BackgroundRun):
+        async def produce():
+            started.append(run.run_id)
+            yield f"frame-{run.run_id}"
+            await release.wait()
+
+        return produce()
+
+    return frames
+
+
+@pytest.mark.unit
+class TestBackgroundRun:
+    """Test BackgroundRun."""
+
+    async def test_observe_records_output_state_and_error(self):
+        run = BackgroundRun(
+            run_id="run-1", thread_id="thread-1", log=RunEventLog(max_buffered=10)
+        )
+
+        async def events():
+            yield TextMessageContentEvent(message_id="m1", delta="Hel")
+            yield TextMessageContentEvent(message_id="m1", delta="lo")
+            yield StateSnapshotEvent(snapshot={"count": 1})
+            yield RunErrorEvent(message="boom", code="OUTPUT_GUARDRAIL")
+
+        seen = [event async for event in run.observe(events())]
+
+        assert len(seen) == 4
+        assert run.output == "Hello"
+        assert run.state == {"count": 1}
+        assert (run.error, run.error_code) == ("boom", "OUTPUT_GUARDRAIL")
+
+
+@pytest.mark.unit
+class TestBackgroundRunManager:
+    """Test BackgroundRunManager."""
+
+    async def test_run_logs_frames_and_succeeds(self):
+        manager = BackgroundRunManager()
+
+        async def produce():
+            yield "frame-1"
+            yield "frame-2"
+
+        run = manager.submit("run-1", "thread-1", lambda _: produce())
+        await run.task
+
+        assert run.status == "succeeded"
+        assert [frame async for _, frame in run.log.follow()] == [
+            "frame-1",
+            "frame-2",
+        ]
+        assert manager.stats()["succeeded_total"] == 1
+
+    async def test_recorded_error_marks_run_failed(self):
+        manager = BackgroundRunManager()
+
+        def frames(run: BackgroundRun):
+            async def produce():
+                run.record_error("Agent execution failed", "FRAMEWORK_ERROR")
+                yield "error-frame"
+
+            return produce()
+
+        run = manager.submit("run-1", "thread-1", frames)
+        await run.task
+
+        assert run.as_status().status == "failed"
+        assert run.as_status().error_code == "FRAMEWORK_ERROR"
+
+    async def test_runs_beyond_max_concurrent_wait_in_order(self):
+        manager = BackgroundRunManager(
+            BackgroundRunsConfig(max_concurrent=1, max_queued=1)
+        )
+        release = asyncio.Event()
+        started: list[str] = []
+        frames = _frames_until(release, started)
+
+        first = manager.submit("run-1", "thread-1", frames)
+        second = manager.submit("run-2", "thread-2", frames)
+        await asyncio.sleep(0.01)
+
+        assert started == ["run-1"]
+        assert second.status == "queued"
+        with pytest.raises(BackgroundRunRejectedError) as exc_info:
+            manager.submit("run-3", "thread-3", frames)
+        assert exc_info.value.status_code == 429
+
+        release.set()
+        await asyncio.gather(first.task, second.task)
+        assert started == ["run-1", "run-2"]
+        assert manager.stats()["rejected_total"] == 1
+
+    async def test_run_waiting_in_hold_takes_no_slot(self):
+        """A run blocked on its hold (a busy thread) doesn't delay other runs."""
+        manager = BackgroundRunManager(
+            BackgroundRunsConfig(max_concurrent=1, max_queued=1)
+        )
+        thread_free = asyncio.Event()
+        release = asyncio.Event()
+        started: list[str] = []
+        frames = _frames_until(release, started)
+
+        @contextlib.asynccontextmanager
+        async def busy_thread(run: BackgroundRun):
+            await thread_free.wait()
+            yield
+
+        waiting = manager.submit("run-1", "thread-1", frames, hold=busy_thread)
+        other = manager.submit("run-2", "thread-2", frames)
+        await asyncio.sleep(0.01)
+
+        assert started == ["run-2"]
+        assert waiting.status == "queued"
+        assert manager.stats()["running"] == 1
+
+        release.set()
+        thread_free.set()
+        await asyncio.gather(waiting.task, other.task)
+        assert started == ["run-2", "run-1"]
+        assert manager.stats()["running"] == 0
+
+    async def test_failed_hold_fails_the_run(self):
+        manager = BackgroundRunManager()
+
+        @contextlib.asynccontextmanager
+        async def rejected(run: BackgroundRun):
+            run.record_error("thread busy", "THREAD_BUSY")
+            raise RuntimeError("thread busy")
+            yield
+
+        run = manager.submit(
+            "run-1", "thread-1", _frames_until(asyncio.Event(), []), hold=rejected
+        )
+        await run.task
+
+        assert run.status == "failed"
+        assert run.error_code == "THREAD_BUSY"
+        assert manager.stats()["queued"] == 0
+        assert manager.stats()["running"] == 0
+
+    async def test_duplicate_run_id_is_rejected(self):
+        manager = BackgroundRunManager()
+        release = asyncio.Event()
+        frames = _frames_until(release, [])
+        manager.submit("run-1", "thread-1", frames)
+
+        with pytest.raises(BackgroundRunRejectedError) as exc_info:
+            manager.submit("run-1", "thread-1", frames)
+
+        assert exc_info.value.status_code == 409
+        await manager.close()
+
+    async def test_finished_runs_expire(self, monkeypatch):
+        manager = BackgroundRunManager(BackgroundRunsConfig(result_ttl_seconds=10))
+
+        async def produce():
+            yield "frame-1"
+
+        run = manager.submit("run-1", "thread-1", lambda _: produce())
+        await run.task
+        assert manager.get("run-1") is run
+
+        ended = run.ended
+        monkeypatch.setattr(
+            "idun_agent_engine.server.background_runs.time.monotonic",
+            lambda: ended + 11,
+        )
+
+        assert manager.get("run-1") is None
+
+    async def test_close_cancels_queued_and_running_runs(self):
+        manager = BackgroundRunManager(
+            BackgroundRunsConfig(max_concurrent=1, max_queued=1)
+        )
+        frames = _frames_until(asyncio.Event(), [])
+        running = manager.submit("run-1", "thread-1", frames)
+        queued = manager.submit("run-2", "thread-2", frames)
+        await asyncio.sleep(0.01)
+
+        await manager.close()
+
+        assert running.status == "cancelled"
+        assert queued.status == "cancelled"
+        assert manager.stats()["running"] == 0
+        assert manager.stats()["queued"] == 0
@@ -0,0 +1,164 @@
+"""Tests for text delta coalescing on streamed responses."""
+
+import asyncio
+
+import pytest
+from ag_ui.core import (
+    EventType,
+    RawEvent,
+    RunFinishedEvent,
+    RunStartedEvent,
+    TextMessageContentEvent,
+    TextMessageEndEvent,
+    TextMessageStartEvent,
+    ToolCallStartEvent,
+)
+from idun_agent_schema.engine.server import DeltaCoalescingConfig
+
+from idun_agent_engine.server.coalescing import coalesce_deltas
+
+
+def _deltas(*deltas: str, message_id: str = "m1") -> list:
+    return [TextMessageContentEvent(message_id=message_id, delta=d) for d in deltas]
+
+
+async def _stream(events: list):
+    for event in events:
+        yield event
+
+
+async def _collect(events, **config) -> list:
+    return [
+        event
+        async for event in coalesce_deltas(events, DeltaCoalescingConfig(**config))
+    ]
+
+
+def _content(events: list) -> list[str]:
+    return [e.delta for e in events if e.type == EventType.TEXT_MESSAGE_CONTENT]
+
+
+@pytest.mark.unit
+class TestCoalesceDeltas:
+    """Test coalesce_deltas."""
+
+    async def test_merges_consecutive_deltas_of_a_message(self):
+        events = [
+            RunStartedEvent(thread_id="t", run_id="r"),
+            TextMessageStartEvent(message_id="m1", role="assistant"),
+            *_deltas("Hel", "lo ", "there"),
+            TextMessageEndEvent(message_id="m1"),
+            RunFinishedEvent(thread_id="t", run_id="r"),
+        ]
+
+        out = await _collect(_stream(events))
+
+        assert [e.type for e in out] == [
+            EventType.RUN_STARTED,
+            EventType.TEXT_MESSAGE_START,
+            EventType.TEXT_MESSAGE_CONTENT,
+            EventType.TEXT_MESSAGE_END,
+            EventType.RUN_FINISHED,
+        ]
+        assert _content(out) == ["Hello there"]
+        assert out[2].message_id == "m1"
+
+    async def test_other_events_and_messages_flush_the_buffer(self):
+        """Order is kept: a tool call or another message id ends the merged delta."""
+        tool_call = ToolCallStartEvent(tool_call_id="c1", tool_call_name="search")
+        events = [
+            *_deltas("a", "b"),
+            tool_call,
+            *_deltas("c", "d"),
+            *_deltas("e", message_id="m2"),
+        ]
+
+        out = await _collect(_stream(events))
+
+        assert _content(out) == ["ab", "cd", "e"]
+        assert out[1] is tool_call
+        assert out[3].message_id == "m2"
+
+    async def test_raw_events_follow_the_merged_delta(self):
+        """RAW events between deltas don't end the merged delta."""
+        events = [
+            event
+            for delta in ("Hel", "lo ", "there")
+            for event in (
+                RawEvent(event={"chunk": delta}),
+                TextMessageContentEvent(
+                    message_id="m1", delta=delta, raw_event={"chunk": delta}
+                ),
+            )
+        ]
+
+        out = await _collect(_stream([*events, TextMessageEndEvent(message_id="m1")]))
+
+        assert [e.type for e in out] == [
+            EventType.RAW,
+            EventType.TEXT_MESSAGE_CONTENT,
+            EventType.RAW,
+            EventType.RAW,
+            EventType.TEXT_MESSAGE_END,
+        ]
+        assert out[1].delta == "Hello there"
+        assert out[1].raw_event is None
+        assert [e.event for e in out if e.type == EventType.RAW] == [
+            {"chunk": "Hel"},
+            {"chunk": "lo "},
+            {"chunk": "there"},
+        ]
+
+    async def test_flushes_at_max_chars(self):
+        out = await _collect(_stream(_deltas("ab", "cd", "ef", "g")), max_chars=4)
+
+        assert _content(out) == ["abcd", "efg"]
+
+    async def test_flushes_after_max_delay_while_agent_is_silent(self):
+        """Buffered text goes out on time even when no further event arrives."""
+        released = asyncio.Event()
+
+        async def agent():
+            yield _deltas("waiting")[0]
+            # Only continues once the buffered delta has reached the client
+            await asyncio.wait_for(released.wait(), timeout=1)
+            yield TextMessageEndEvent(message_id="m1")
+
+        out = []
+        async for event in coalesce_deltas(
+            agent(), DeltaCoalescingConfig(max_delay_ms=10)
+        ):
+            out.append(event)
+            released.set()
+
+        assert _content(out) == ["waiting"]
+        assert out[-1].type == EventType.TEXT_MESSAGE_END
+
+    async def test_agent_error_propagates_after_buffered_text(self):
+        async def agent():
+            yield _deltas("partial")[0]
+            raise RuntimeError("model failed")
+
+        out = []
+        with pytest.raises(RuntimeError, match="model failed"):
+            async for event in coalesce_deltas(agent(), DeltaCoalescingConfig()):
+                out.append(event)
+
+        assert _content(out) == ["partial"]
+
+    async def test_closing_the_stream_closes_the_agent(self):
+        closed = asyncio.Event()
+
+        async def agent():
+            try:
+                while True:
+                    yield TextMessageStartEvent(message_id="m1", role="assistant")
+                    await asyncio.sleep(0)
+            finally:
+                closed.set()
+
+        stream = coalesce_deltas(agent(), DeltaCoalescingConfig())
+        await stream.__anext__()
+        await stream.aclose()
+
+        assert closed.is_set()
@@ -0,0 +1,147 @@
+"""Tests for client-selected filtering of the /agent/run event stream."""
+
+import pytest
+from ag_ui.core import (
+    EventType,
+    RawEvent,
+    RunErrorEvent,
+    RunFinishedEvent,
+    RunStartedEvent,
+    StateDeltaEvent,
+    StateSnapshotEvent,
+    TextMessageContentEvent,
+)
+
+from idun_agent_engine.server.event_filter import (
+    filter_events,
+    parse_event_types,
+    state_patch,
+)
+
+
+async def _stream(events: list):
+    for event in events:
+        yield event
+
+
+async def _collect(events: list, **kwargs) -> list:
+    return [event async for event in filter_events(_stream(events), **kwargs)]
+
+
+def _types(events: list) -> list[EventType]:
+    return [e.type for e in events]
+
+
+@pytest.mark.unit
+class TestParseEventTypes:
+    """Test parse_event_types."""
+
+    def test_parses_names_case_insensitively(self):
+        assert parse_event_types(" raw, MESSAGES_SNAPSHOT ,") == frozenset(
+            {EventType.RAW, EventType.MESSAGES_SNAPSHOT}
+        )
+
+    def test_blank_is_none(self):
+        assert parse_event_types(None) is None
+        assert parse_event_types("  ") is None
+
+    def test_unknown_type_raises(self):
+        with pytest.raises(ValueError, match="NOT_AN_EVENT"):
+            parse_event_types("RAW,not_an_event")
+
+
+@pytest.mark.unit
+class TestStatePatch:
+    """Test state_patch."""
+
+    def test_nested_changes(self):
+        old = {"a": 1, "b": {"c": 2, "d": 3}, "gone": True}
+        new = {"a": 1, "b": {"c": 5, "d": 3}, "added": "x"}
+
+        assert state_patch(old, new) == [
+            {"op": "remove", "path": "/gone"},
+            {"op": "replace", "path": "/b/c", "value": 5},
+            {"op": "add", "path": "/added", "value": "x"},
+        ]
+
+    def test_appended_list_items_only(self):
+        old = {"messages": ["m1", "m2"]}
+        new = {"messages": ["m1", "m2", "m3"]}
+
+        assert state_patch(old, new) == [
+            {"op": "add", "path": "/messages/-", "value": "m3"}
+        ]
+
+    def test_escapes_keys(self):
+        assert state_patch({}, {"a/b~c": 1}) == [
+            {"op": "add", "path": "/a~1b~0c", "value": 1}
+        ]
+
+
+@pytest.mark.unit
+class TestFilterEvents:
+    """Test filter_events."""
+
+    async def test_exclude_drops_listed_types(self):
+        events = [
+            RunStartedEvent(thread_id="t", run_id="r"),
+            RawEvent(event={"big": "payload"}),
+            TextMessageContentEvent(message_id="m1", delta="hi"),
+            RunFinishedEvent(thread_id="t", run_id="r"),
+        ]
+
+        out = await _collect(events, exclude={EventType.RAW})
+
+        assert _types(out) == [
+            EventType.RUN_STARTED,
+            EventType.TEXT_MESSAGE_CONTENT,
+            EventType.RUN_FINISHED,
+        ]
+
+    async def test_include_keeps_lifecycle_events(self):
+        events = [
+            RunStartedEvent(thread_id="t", run_id="r"),
+            RawEvent(event={}),
+            TextMessageContentEvent(message_id="m1", delta="hi"),
+            RunErrorEvent(message="boom"),
+        ]
+
+        out = await _collect(events, include={EventType.TEXT_MESSAGE_CONTENT})
+
+        assert _types(out) == [
+            EventType.RUN_STARTED,
+            EventType.TEXT_MESSAGE_CONTENT,
+            EventType.RUN_ERROR,
+        ]
+
+    async def test_state_snapshots_become_deltas(self):
+        events = [
+            StateSnapshotEvent(snapshot={"messages": ["m1"], "step": 1}),
+            StateSnapshotEvent(snapshot={"messages": ["m1"], "step": 1}),
+            StateSnapshotEvent(snapshot={"messages": ["m1", "m2"], "step": 2}),
+        ]
+
+        out = await _collect(
+            events,
+            state_deltas=True,
+            client_state={"messages": ["m1"]},
+        )
+
+        assert _types(out) == [EventType.STATE_DELTA, EventType.STATE_DELTA]
+        assert out[0].delta == [{"op": "add", "path": "/step", "value": 1}]
+        assert out[1].delta == [
+            {"op": "add", "path": "/messages/-", "value": "m2"},
+            {"op": "replace", "path": "/step", "value": 2},
+        ]
+
+    async def test_snapshot_after_agent_delta_is_sent_in_full(self):
+        agent_delta = StateDeltaEvent(
+            delta=[{"op": "add", "path": "/step", "value": 1}]
+        )
+        snapshot = StateSnapshotEvent(snapshot={"step": 2})
+
+        out = await _collect(
+            [agent_delta, snapshot], state_deltas=True, client_state={}
+        )
+
+        assert out == [agent_delta, snapshot]
@@ -0,0 +1,238 @@
+"""Tests for agent generations and zero-downtime reloads."""
+
+import asyncio
+import json
+from pathlib import Path
+
+import httpx
+import pytest
+import yaml
+from fastapi import APIRouter, FastAPI
+
+from idun_agent_engine.core.app_factory import create_app
+from idun_agent_engine.core.config_builder import ConfigBuilder
+from idun_agent_engine.server.generations import AgentGeneration, StagedApp
+
+MOCK_GRAPH_PATH = (
+    Path(__file__).parent.parent.parent / "fixtures" / "agents" / "mock_graph.py"
+)
+
+
+def _make_config(name: str, db_path: Path) -> dict:
+    return {
+        "agent": {
+            "type": "LANGGRAPH",
+            "config": {
+                "name": name,
+                "graph_definition": f"{MOCK_GRAPH_PATH}:slow_graph",
+                "checkpointer": {"type": "sqlite", "db_url": f"sqlite:///{db_path}"},
+            },
+        },
+    }
+
+
+def _run_payload(thread_id: str) -> dict:
+    return {
+        "threadId": thread_id,
+        "runId": f"run-{thread_id}",
+        "state": {},
+        "messages": [{"id": f"msg-{thread_id}", "role": "user", "content": "hi"}],
+        "tools": [],
+        "context": [],
+        "forwardedProps": {},
+    }
+
+
+def _event_types(body: str) -> list[str]:
+    return [
+        json.loads(line[len("data: ") :])["type"]
+        for line in body.splitlines()
+        if line.startswith("data: ")
+    ]
+
+
+@pytest.mark.unit
+class TestAgentGeneration:
+    """Test generation leases."""
+
+    async def test_wait_idle_after_leases_end(self):
+        """wait_idle returns once every lease has been released."""
+        generation = AgentGeneration(number=1, engine_config=None)
+        assert await generation.wait_idle(0.01)
+
+        with generation.lease():
+            assert generation.in_flight == 1
+            assert not await generation.wait_idle(0.01)
+
+        assert await generation.wait_idle(0.01)
+
+    async def test_track_holds_until_task_done(self):
+        """A tracked background task keeps the generation open."""
+        generation = AgentGeneration(number=1, engine_config=None)
+        release = asyncio.Event()
+        task = generation.track(asyncio.create_task(release.wait()))
+
+        assert generation.in_flight == 1
+        release.set()
+        await task
+        assert await generation.wait_idle(0.1)
+
+    def test_staged_app_includes_router_once(self):
+        """Re-running integration setup on reload does not duplicate routes."""
+        app = FastAPI()
+        router = APIRouter()
+
+        @router.post("/webhook")
+        async def webhook():
+            return {}
+
+        for _ in range(3):
+            staged = StagedApp(app)
+            staged.include_router(router, prefix="/integrations/test")
+            staged.state.test_client = "client"
+
+        paths = [getattr(r, "path", None) for r in app.router.routes]
+        assert paths.count("/integrations/test/webhook") == 1
+        assert staged.staged_attributes() == {"test_client": "client"}
+        assert not hasattr(app.state, "test_client")
+
+
+@pytest.mark.unit
+class TestZeroDowntimeReload:
+    """POST /reload swaps agents without breaking in-flight runs."""
+
+    async def test_reload_during_run_keeps_run_alive(self, tmp_path):
+        """A run in flight during a reload finishes on the old agent."""
+        db_path = tmp_path / "checkpoints.db"
+        config = ConfigBuilder.from_dict(_make_config("Blue", db_path)).build()
+        app = create_app(engine_config=config)
+        new_config_file = tmp_path / "green.yaml"
+        new_config_file.write_text(yaml.dump(_make_config("Green", db_path)))
+
+        async with app.router.lifespan_context(app):
+            blue = app.state.generation
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(
+                transport=transport, base_url="http://test"
+            ) as client:
+                in_flight = asyncio.create_task(
+                    client.post("/agent/run", json=_run_payload("before"))
+                )
+                while blue.in_flight == 0:
+                    await asyncio.sleep(0.001)
+
+                reload = await client.post(
+                    "/reload", json={"path": str(new_config_file)}
+                )
+                assert reload.status_code == 200
+                assert reload.json()["generation"] == 2
+                assert app.state.agent.name == "Green"
+
+                response = await in_flight
+                after = await client.post("/agent/run", json=_run_payload("after"))
+                await asyncio.gather(*app.state.draining_tasks)
+
+        types = _event_types(response.text)
+        assert "RUN_ERROR" not in types, response.text
+        assert types[-1] == "RUN_FINISHED"
+        assert "RUN_ERROR" not in _event_types(after.text)
+        assert blue.agent._connection is None
+
+    async def test_failed_reload_keeps_current_agent(self, tmp_path):
+        """If the new agent cannot be built, the current one keeps serving."""
+        db_path = tmp_path / "checkpoints.db"
+        config = ConfigBuilder.from_dict(_make_config("Blue", db_path)).build()
+        app = create_app(engine_config=config)
+        broken = _make_config("Broken", db_path)
+        broken["agent"]["config"]["graph_definition"] = f"{MOCK_GRAPH_PATH}:missing"
+        config_file = tmp_path / "broken.yaml"
+        config_file.write_text(yaml.dump(broken))
+
+        async with app.router.lifespan_context(app):
+            blue = app.state.generation
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(
+                transport=transport, base_url="http://test"
+            ) as client:
+                reload = await client.post("/reload", json={"path": str(config_file)})
+                assert reload.status_code == 500
+                assert app.state.generation is blue
+
+                response = await client.post("/agent/run", json=_run_payload("t"))
+                assert "RUN_ERROR" not in _event_types(response.text)
+
+
+@pytest.mark.unit
+class TestIncrementalReload:
+    """POST /reload rebuilds only the sections that changed."""
+
+    async def test_unchanged_agent_is_reused(self, tmp_path):
+        """A server-only change keeps the agent, which stays open after the drain."""
+        db_path = tmp_path / "checkpoints.db"
+        raw = _make_config("Blue", db_path)
+        config = ConfigBuilder.from_dict(raw).build()
+        app = create_app(engine_config=config)
+        raw["server"] = {"thread_lock": {"max_queue_depth": 2}}
+        config_file = tmp_path / "server-only.yaml"
+        config_file.write_text(yaml.dump(raw))
+
+        async with app.router.lifespan_context(app):
+            agent = app.state.agent
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(
+                transport=transport, base_url="http://test"
+            ) as client:
+                reload = await client.post("/reload", json={"path": str(config_file)})
+                await asyncio.gather(*app.state.draining_tasks)
+
+                assert reload.status_code == 200
+                data = reload.json()
+                assert data["changed_sections"] == ["server"]
+                assert set(data["reused"]) == {
+                    "agent",
+                    "guardrails",
+                    "integrations",
+                    "mcp_registry",
+                    "sso",
+                }
+                phases = {
+                    phase["name"]: phase["status"]
+                    for phase in data["startup_profile"]["phases"]
+                }
+                assert phases["agent"] == "reused"
+                assert app.state.agent is agent
+                assert app.state.thread_locks.config.max_queue_depth == 2
+                assert agent._connection is not None
+
+                response = await client.post("/agent/run", json=_run_payload("t"))
+                assert "RUN_ERROR" not in _event_types(response.text)
+
+    async def test_full_reload_rebuilds_agent(self, tmp_path):
+        """full=true rebuilds every component even if the config is unchanged."""
+        db_path = tmp_path / "checkpoints.db"
+        raw = _make_config("Blue", db_path)
+        config = ConfigBuilder.from_dict(raw).build()
+        app = create_app(engine_config=config)
+        config_file = tmp_path / "same.yaml"
+        config_file.write_text(yaml.dump(raw))
+
+        async with app.router.lifespan_context(app):
+            agent = app.state.agent
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(
+                transport=transport, base_url="http://test"
+            ) as client:
+                incremental = await client.post(
+                    "/reload", json={"path": str(config_file)}
+                )
+                assert incremental.json()["changed_sections"] == []
+                assert app.state.agent is agent
+
+                full = await client.post(
+                    "/reload", json={"path": str(config_file), "full": True}
+                )
+                await asyncio.gather(*app.state.draining_tasks)
+
+        assert full.json()["reused"] == []
+        assert app.state.agent is not agent
+        assert agent._connection is None
@@ -1,9 +1,18 @@
 """Tests for /agent/run and /agent/capabilities routes."""
 
+import asyncio
 import json
 from pathlib import Path
 
+import httpx
 import pytest
+from ag_ui.core import (
+    RunFinishedEvent,
+    RunStartedEvent,
+    TextMessageContentEvent,
+    TextMessageEndEvent,
+    TextMessageStartEvent,
+)
 from fastapi.testclient import TestClient
 
 from idun_agent_engine.core.app_factory import create_app
@@ -114,7 +123,9 @@ class TestRunRoute:
             )
             assert response.status_code == 200
             body = response.text
-            assert "RUN_STARTED" in body or "RunStarted" in body or "run_started" in body
+            assert (
+                "RUN_STARTED" in body or "RunStarted" in body or "run_started" in body
+            )
 
     def test_run_structured_invalid_json(self):
         """POST /agent/run with invalid JSON structured input returns a validation error event."""
@@ -148,6 +159,626 @@ class TestRunRoute:
             assert "VALIDATION_ERROR" in body
 
 
+def _sse_events(body: str) -> list[dict]:
+    """Parse the JSON payloads out of an SSE response body."""
+    return [
+        json.loads(line[len("data: ") :])
+        for line in body.splitlines()
+        if line.startswith("data: ")
+    ]
+
+
+@pytest.mark.unit
+class TestRunConcurrency:
+    """Overlapping /agent/run streams must not share per-run state."""
+
+    async def test_overlapping_runs_are_isolated(self):
+        """Concurrent runs each see their own run id, thread and answer."""
+        config = ConfigBuilder.from_dict(
+            _make_config("slow_graph", checkpointer=True)
+        ).build()
+        app = create_app(engine_config=config)
+        run_count = 20
+
+        async def _run(client: httpx.AsyncClient, i: int) -> list[dict]:
+            response = await client.post(
+                "/agent/run",
+                json={
+                    "threadId": f"thread-{i}",
+                    "runId": f"run-{i}",
+                    "state": {},
+                    "messages": [
+                        {"id": f"msg-{i}", "role": "user", "content": f"hello {i}"}
+                    ],
+                    "tools": [],
+                    "context": [],
+                    "forwardedProps": {},
+                },
+                headers={"Accept": "text/event-stream"},
+            )
+            assert response.status_code == 200
+            return _sse_events(response.text)
+
+        async with app.router.lifespan_context(app):
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(
+                transport=transport, base_url="http://test"
+            ) as client:
+                reference = await _run(client, -1)
+                results = await asyncio.gather(
+                    *(_run(client, i) for i in range(run_count))
+                )
+
+        reference_types = [e["type"] for e in reference]
+        assert "RUN_ERROR" not in reference_types, reference
+
+        for i, events in enumerate(results):
+            assert [e["type"] for e in events] == reference_types
+            started = next(e for e in events if e["type"] == "RUN_STARTED")
+            finished = next(e for e in events if e["type"] == "RUN_FINISHED")
+            assert started["runId"] == f"run-{i}"
+            assert finished["threadId"] == f"thread-{i}"
+
+            steps = [e for e in events if e["type"].startswith("STEP_")]
+            assert all(step["stepName"] == "echo" for step in steps)
+
+            snapshot = [e for e in events if e["type"] == "MESSAGES_SNAPSHOT"][-1]
+            contents = [m.get("content") for m in snapshot["messages"]]
+            assert contents == [f"hello {i}", f"Echo: hello {i}"]
+
+    async def test_same_thread_runs_are_serialized(self):
+        """Overlapping runs on one thread all land in its history."""
+        run_count = 4
+        raw = _make_config("slow_graph", checkpointer=True)
+        # Waits are bounded by the other runs, not the clock, so a slow
+        # machine must not turn them into rejections
+        raw["server"] = {
+            "thread_lock": {
+                "wait_timeout_seconds": 600,
+                "max_queue_depth": run_count,
+            }
+        }
+        config = ConfigBuilder.from_dict(raw).build()
+        app = create_app(engine_config=config)
+
+        async def _run(client: httpx.AsyncClient, i: int) -> list[dict]:
+            response = await client.post(
+                "/agent/run",
+                json={
+                    "threadId": "shared-thread",
+                    "runId": f"run-{i}",
+                    "state": {},
+                    "messages": [
+                        {"id": f"msg-{i}", "role": "user", "content": f"hello {i}"}
+                    ],
+                    "tools": [],
+                    "context": [],
+                    "forwardedProps": {},
+                },
+                headers={"Accept": "text/event-stream"},
+            )
+            assert response.status_code == 200
+            return _sse_events(response.text)
+
+        async with app.router.lifespan_context(app):
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(
+                transport=transport, base_url="http://test"
+            ) as client:
+                results = await asyncio.gather(
+                    *(_run(client, i) for i in range(run_count))
+                )
+                metrics = (await client.get("/metrics")).json()
+
+        for events in results:
+            assert "RUN_ERROR" not in [e["type"] for e in events], events
+
+        snapshots = [
+            [e for e in events if e["type"] == "MESSAGES_SNAPSHOT"][-1]
+            for events in results
+        ]
+        longest = max(snapshots, key=lambda snap: len(snap["messages"]))
+        contents = [m.get("content") for m in longest["messages"]]
+        assert len(contents) == 2 * run_count
+        for i in range(run_count):
+            assert f"hello {i}" in contents
+            assert f"Echo: hello {i}" in contents
+
+        lock_stats = metrics["thread_locks"]
+        assert lock_stats["acquired_total"] == run_count
+        assert lock_stats["active_threads"] == 0
+        assert lock_stats["wait_seconds_max"] > 0
+
+    async def test_full_thread_queue_returns_409(self):
+        """A run is rejected before streaming when its thread's queue is full."""
+        raw = _make_config("graph")
+        raw["server"] = {"thread_lock": {"max_queue_depth": 0}}
+        config = ConfigBuilder.from_dict(raw).build()
+        app = create_app(engine_config=config)
+
+        async with app.router.lifespan_context(app):
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(
+                transport=transport, base_url="http://test"
+            ) as client:
+                async with app.state.thread_locks.hold("busy-thread"):
+                    response = await client.post(
+                        "/agent/run",
+                        json={
+                            "threadId": "busy-thread",
+                            "runId": "run-1",
+                            "state": {},
+                            "messages": [
+                                {"id": "msg_1", "role": "user", "content": "Hi"}
+                            ],
+                            "tools": [],
+                            "context": [],
+                            "forwardedProps": {},
+                        },
+                    )
+                metrics = (await client.get("/metrics")).json()
+
+        assert response.status_code == 409
+        assert "busy-thread" in response.json()["detail"]
+        assert metrics["thread_locks"]["rejected_total"] == 1
+
+
+@pytest.mark.unit
+class TestRunAdmission:
+    """Admission control on /agent/run."""
+
+    async def test_capacity_limits_and_rejects_run(self):
+        """Runs release their slot after streaming; excess runs get 429."""
+        raw = _make_config("slow_graph")
+        raw["server"] = {"admission": {"max_in_flight": 1, "max_queue": 0}}
+        config = ConfigBuilder.from_dict(raw).build()
+        app = create_app(engine_config=config)
+
+        payload = {
+            "threadId": "thread-1",
+            "runId": "run-1",
+            "state": {},
+            "messages": [{"id": "msg_1", "role": "user", "content": "Hi"}],
+            "tools": [],
+            "context": [],
+            "forwardedProps": {},
+        }
+
+        async with app.router.lifespan_context(app):
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(
+                transport=transport, base_url="http://test"
+            ) as client:
+                first = await client.post("/agent/run", json=payload)
+                assert first.status_code == 200
+
+                async with app.state.admission.slot():
+                    rejected = await client.post(
+                        "/agent/run", json={**payload, "threadId": "thread-2"}
+                    )
+                metrics = (await client.get("/metrics")).json()
+
+        assert rejected.status_code == 429
+        assert int(rejected.headers["Retry-After"]) >= 1
+        admission = metrics["admission"]
+        assert admission["in_flight"] == 0
+        assert admission["admitted_total"] == 2
+        assert admission["rejected_total"] == 1
+
+    async def test_run_waiting_on_busy_thread_holds_no_slot(self):
+        """A run queued behind its thread leaves the slot to other threads."""
+        raw = _make_config("graph")
+        raw["server"] = {"admission": {"max_in_flight": 1, "max_queue": 0}}
+        config = ConfigBuilder.from_dict(raw).build()
+        app = create_app(engine_config=config)
+
+        payload = {
+            "threadId": "busy-thread",
+            "runId": "run-1",
+            "state": {},
+            "messages": [{"id": "msg_1", "role": "user", "content": "Hi"}],
+            "tools": [],
+            "context": [],
+            "forwardedProps": {},
+        }
+
+        async with app.router.lifespan_context(app):
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(
+                transport=transport, base_url="http://test"
+            ) as client:
+                async with app.state.thread_locks.hold("busy-thread"):
+                    waiting = asyncio.create_task(
+                        client.post("/agent/run", json=payload)
+                    )
+                    await asyncio.sleep(0.05)
+                    other = await client.post(
+                        "/agent/run", json={**payload, "threadId": "thread-2"}
+                    )
+                queued = await waiting
+                metrics = (await client.get("/metrics")).json()
+
+        assert other.status_code == 200
+        assert queued.status_code == 200
+        assert metrics["admission"]["rejected_total"] == 0
+        assert metrics["admission"]["in_flight"] == 0
+
+
+class _KeywordGuard:
+    """Guard that rejects texts containing a keyword."""
+
+    reject_message = "Blocked by keyword guard"
+    guard_id = "keyword"
+
+    def __init__(self, keyword: str, position: str = "input"):
+        self.keyword = keyword
+        self.position = position
+
+    def validate(self, text: str) -> bool:
+        return self.keyword not in text
+
+
+@pytest.mark.unit
+class TestRunGuardrails:
+    """Input and output guardrails on /agent/run."""
+
+    async def test_rejected_input_returns_429(self):
+        """A rejecting guard blocks the run; its verdict shows up in /metrics."""
+        config = ConfigBuilder.from_dict(_make_config("graph")).build()
+        app = create_app(engine_config=config)
+
+        def payload(content: str) -> dict:
+            return {
+                "threadId": "thread-1",
+                "runId": "run-1",
+                "state": {},
+                "messages": [{"id": "msg_1", "role": "user", "content": content}],
+                "tools": [],
+                "context": [],
+                "forwardedProps": {},
+            }
+
+        async with app.router.lifespan_context(app):
+            app.state.guardrails = [_KeywordGuard("forbidden")]
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(
+                transport=transport, base_url="http://test"
+            ) as client:
+                rejected = await client.post(
+                    "/agent/run", json=payload("something forbidden")
+                )
+                allowed = await client.post("/agent/run", json=payload("hello"))
+                metrics = (await client.get("/metrics")).json()
+
+        assert rejected.status_code == 429
+        assert rejected.json()["detail"] == "Blocked by keyword guard"
+        assert allowed.status_code == 200
+        assert metrics["guardrails"]["checks_total"] == 2
+        assert metrics["guardrails"]["rejections_total"] == 1
+
+    async def test_rejected_output_ends_stream_with_error(self, monkeypatch):
+        """Text after the failing window never reaches the client."""
+        config = ConfigBuilder.from_dict(_make_config("graph")).build()
+        app = create_app(engine_config=config)
+
+        async def fake_run(input_data):
+            yield RunStartedEvent(thread_id="thread-1", run_id="run-1")
+            yield TextMessageStartEvent(message_id="m1", role="assistant")
+            for delta in ["Sure. ", "The forbidden answer. ", "Anything else?"]:
+                yield TextMessageContentEvent(message_id="m1", delta=delta)
+            yield TextMessageEndEvent(message_id="m1")
+            yield RunFinishedEvent(thread_id="thread-1", run_id="run-1")
+
+        async with app.router.lifespan_context(app):
+            app.state.guardrails = [_KeywordGuard("forbidden", position="output")]
+            monkeypatch.setattr(app.state.agent, "run", fake_run)
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(
+                transport=transport, base_url="http://test"
+            ) as client:
+                response = await client.post(
+                    "/agent/run",
+                    json={
+                        "threadId": "thread-1",
+                        "runId": "run-1",
+                        "state": {},
+                        "messages": [{"id": "msg_1", "role": "user", "content": "hi"}],
+                        "tools": [],
+                        "context": [],
+                        "forwardedProps": {},
+                    },
+                )
+
+        events = [
+            json.loads(line[len("data: ") :])
+            for line in response.text.splitlines()
+            if line.startswith("data: ")
+        ]
+        deltas = [e["delta"] for e in events if e["type"] == "TEXT_MESSAGE_CONTENT"]
+        assert response.status_code == 200
+        assert "forbidden" not in "".join(deltas)
+        assert events[-1]["type"] == "RUN_ERROR"
+        assert events[-1]["code"] == "OUTPUT_GUARDRAIL"
+        assert events[-1]["message"] == "Blocked by keyword guard"
+
+    async def test_rejected_output_from_streaming_graph(self):
+        """Neither text deltas nor the RAW chunks before them leak a failing window."""
+        raw = _make_config("streaming_graph", checkpointer=True)
+        raw["server"] = {"guardrail_execution": {"output_stream": {"window_chars": 5}}}
+        config = ConfigBuilder.from_dict(raw).build()
+        app = create_app(engine_config=config)
+
+        async with app.router.lifespan_context(app):
+            app.state.guardrails = [_KeywordGuard("forbidden", position="output")]
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(
+                transport=transport, base_url="http://test"
+            ) as client:
+                response = await client.post(
+                    "/agent/run",
+                    json={
+                        "threadId": "thread-1",
+                        "runId": "run-1",
+                        "state": {},
+                        "messages": [
+                            {
+                                "id": "msg_1",
+                                "role": "user",
+                                "content": "Fine so far. Now the forbidden part.",
+                            }
+                        ],
+                        "tools": [],
+                        "context": [],
+                        "forwardedProps": {},
+                    },
+                )
+
+        events = _sse_events(response.text)
+        deltas = [e["delta"] for e in events if e["type"] == "TEXT_MESSAGE_CONTENT"]
+        chunks = [
+            e["event"]["data"]["chunk"]["content"]
+            for e in events
+            if e["type"] == "RAW" and e["event"]["event"] == "on_chat_model_stream"
+        ]
+        assert response.status_code == 200
+        assert "".join(deltas).startswith("Echo: Fine so far.")
+        assert "forbidden" not in "".join(deltas)
+        assert chunks == deltas
+        assert events[-1]["type"] == "RUN_ERROR"
+        assert events[-1]["code"] == "OUTPUT_GUARDRAIL"
+
+
+@pytest.mark.unit
+class TestRunCoalescing:
+    """Text delta coalescing on /agent/run."""
+
+    async def _deltas(self, query: str) -> list[str]:
+        """Stream from a real graph, whose deltas each follow a RAW event."""
+        config = ConfigBuilder.from_dict(
+            _make_config("streaming_graph", checkpointer=True)
+        ).build()
+        app = create_app(engine_config=config)
+
+        async with app.router.lifespan_context(app):
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(
+                transport=transport, base_url="http://test"
+            ) as client:
+                response = await client.post(
+                    f"/agent/run{query}",
+                    json={
+                        "threadId": "thread-1",
+                        "runId": "run-1",
+                        "state": {},
+                        "messages": [
+                            {"id": "msg_1", "role": "user", "content": "Hello there"}
+                        ],
+                        "tools": [],
+                        "context": [],
+                        "forwardedProps": {},
+                    },
+                )
+
+        assert response.status_code == 200
+        events = _sse_events(response.text)
+        assert events[-1]["type"] == "RUN_FINISHED"
+        assert [e for e in events if e["type"] == "RAW"]
+        return [e["delta"] for e in events if e["type"] == "TEXT_MESSAGE_CONTENT"]
+
+    async def test_off_by_default(self):
+        assert await self._deltas("") == ["Echo:", " ", "Hello", " ", "there"]
+
+    async def test_client_turns_it_on(self):
+        assert await self._deltas("?coalesce=true") == ["Echo: Hello there"]
+
+    async def test_client_sets_max_chars(self):
+        deltas = await self._deltas("?coalesce_chars=5")
+
+        assert deltas == ["Echo:", " Hello", " there"]
+
+
+@pytest.mark.unit
+class TestRunEventFilter:
+    """Event type selection on /agent/run."""
+
+    async def _types(self, headers: dict[str, str]) -> tuple[int, list[str]]:
+        config = ConfigBuilder.from_dict(
+            _make_config("streaming_graph", checkpointer=True)
+        ).build()
+        app = create_app(engine_config=config)
+
+        async with app.router.lifespan_context(app):
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(
+                transport=transport, base_url="http://test"
+            ) as client:
+                response = await client.post(
+                    "/agent/run",
+                    json={
+                        "threadId": "thread-1",
+                        "runId": "run-1",
+                        "state": {},
+                        "messages": [{"id": "msg_1", "role": "user", "content": "hi"}],
+                        "tools": [],
+                        "context": [],
+                        "forwardedProps": {},
+                    },
+                    headers=headers,
+                )
+
+        if response.status_code != 200:
+            return response.status_code, []
+        return 200, [e["type"] for e in _sse_events(response.text)]
+
+    async def test_excluded_types_are_not_sent(self):
+        """Excluded types are dropped; run lifecycle events are always sent."""
+        _, unfiltered = await self._types({})
+        status_code, types = await self._types(
+            {
+                "X-Idun-Exclude-Events": (
+                    "RAW, MESSAGES_SNAPSHOT, STATE_SNAPSHOT, RUN_FINISHED"
+                )
+            }
+        )
+
+        assert {"RAW", "MESSAGES_SNAPSHOT", "STATE_SNAPSHOT"} <= set(unfiltered)
+        assert status_code == 200
+        assert types == [
+            t
+            for t in unfiltered
+            if t not in ("RAW", "MESSAGES_SNAPSHOT", "STATE_SNAPSHOT")
+        ]
+        assert types[0] == "RUN_STARTED"
+        assert types[-1] == "RUN_FINISHED"
+        assert "TEXT_MESSAGE_CONTENT" in types
+
+    async def test_unknown_type_returns_400(self):
+        status_code, _ = await self._types({"X-Idun-Exclude-Events": "NOT_AN_EVENT"})
+
+        assert status_code == 400
+
+
+@pytest.mark.unit
+class TestRunReplay:
+    """Resuming /agent/run streams with Last-Event-ID."""
+
+    _body = {
+        "threadId": "thread-1",
+        "runId": "run-1",
+        "state": {},
+        "messages": [{"id": "msg_1", "role": "user", "content": "hi"}],
+        "tools": [],
+        "context": [],
+        "forwardedProps": {},
+    }
+
+    @staticmethod
+    def _frames(text: str) -> list[tuple[int, dict]]:
+        frames = []
+        for block in text.strip().split("\n\n"):
+            lines = block.splitlines()
+            event_id = int(lines[0][len("id: ") :])
+            frames.append((event_id, json.loads(lines[1][len("data: ") :])))
+        return frames
+
+    async def test_reconnect_replays_without_rerunning(self, monkeypatch):
+        config_dict = _make_config("graph")
+        config_dict["server"] = {"streaming": {"replay": {"enabled": True}}}
+        config = ConfigBuilder.from_dict(config_dict).build()
+        app = create_app(engine_config=config)
+        calls = 0
+
+        async def fake_run(input_data):
+            nonlocal calls
+            calls += 1
+            yield RunStartedEvent(thread_id="thread-1", run_id="run-1")
+            yield TextMessageStartEvent(message_id="m1", role="assistant")
+            yield TextMessageContentEvent(message_id="m1", delta="Hello")
+            yield TextMessageEndEvent(message_id="m1")
+            yield RunFinishedEvent(thread_id="thread-1", run_id="run-1")
+
+        async with app.router.lifespan_context(app):
+            monkeypatch.setattr(app.state.agent, "run", fake_run)
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(
+                transport=transport, base_url="http://test"
+            ) as client:
+                first = await client.post("/agent/run", json=self._body)
+                resumed = await client.post(
+                    "/agent/run", json=self._body, headers={"Last-Event-ID": "2"}
+                )
+                unknown = await client.post(
+                    "/agent/run",
+                    json={**self._body, "runId": "run-2"},
+                    headers={"Last-Event-ID": "2"},
+                )
+                metrics = (await client.get("/metrics")).json()
+
+        assert first.status_code == 200
+        assert [event_id for event_id, _ in self._frames(first.text)] == [1, 2, 3, 4, 5]
+        assert [
+            (event_id, event["type"]) for event_id, event in self._frames(resumed.text)
+        ] == [(3, "TEXT_MESSAGE_CONTENT"), (4, "TEXT_MESSAGE_END"), (5, "RUN_FINISHED")]
+        assert calls == 1
+        assert unknown.status_code == 404
+        assert metrics["run_logs"]["resumed_total"] == 1
+
+
+@pytest.mark.unit
+class TestBackgroundRunRoutes:
+    """Background runs via /agent/runs."""
+
+    _body = {
+        "threadId": "thread-1",
+        "runId": "run-1",
+        "state": {},
+        "messages": [{"id": "msg_1", "role": "user", "content": "hi"}],
+        "tools": [],
+        "context": [],
+        "forwardedProps": {},
+    }
+
+    async def test_submit_poll_and_follow(self, monkeypatch):
+        config = ConfigBuilder.from_dict(_make_config("graph")).build()
+        app = create_app(engine_config=config)
+
+        async def fake_run(input_data):
+            yield RunStartedEvent(thread_id="thread-1", run_id="run-1")
+            yield TextMessageStartEvent(message_id="m1", role="assistant")
+            yield TextMessageContentEvent(message_id="m1", delta="Hel")
+            yield TextMessageContentEvent(message_id="m1", delta="lo")
+            yield TextMessageEndEvent(message_id="m1")
+            yield RunFinishedEvent(thread_id="thread-1", run_id="run-1")
+
+        async with app.router.lifespan_context(app):
+            monkeypatch.setattr(app.state.agent, "run", fake_run)
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(
+                transport=transport, base_url="http://test"
+            ) as client:
+                submitted = await client.post("/agent/runs", json=self._body)
+                await app.state.background_runs.get("run-1").task
+                status = await client.get("/agent/runs/run-1")
+                events = await client.get(
+                    "/agent/runs/run-1/events", headers={"Last-Event-ID": "4"}
+                )
+                duplicate = await client.post("/agent/runs", json=self._body)
+                unknown = await client.get("/agent/runs/run-2")
+                metrics = (await client.get("/metrics")).json()
+
+        assert submitted.status_code == 202
+        assert submitted.json()["status"] in ("queued", "running")
+        assert status.json()["status"] == "succeeded"
+        assert status.json()["output"] == "Hello"
+        assert [
+            json.loads(block.splitlines()[1][len("data: ") :])["type"]
+            for block in events.text.strip().split("\n\n")
+        ] == ["TEXT_MESSAGE_END", "RUN_FINISHED"]
+        assert duplicate.status_code == 409
+        assert unknown.status_code == 404
+        assert metrics["background_runs"]["succeeded_total"] == 1
+
+
 @pytest.mark.unit
 class TestHealthRoute:
     """Test /health endpoint."""
@@ -0,0 +1,151 @@
+"""Tests for replayable run event logs."""
+
+import asyncio
+
+import pytest
+from idun_agent_schema.engine.server import RunReplayConfig
+
+from idun_agent_engine.server.run_log import (
+    RunEventLog,
+    RunLogGapError,
+    RunLogRegistry,
+)
+
+
+async def _follow(log: RunEventLog, after: int = 0) -> list[tuple[int, str]]:
+    return [entry async for entry in log.follow(after)]
+
+
+async def _follow_until(log: RunEventLog, last: int) -> list[tuple[int, str]]:
+    frames = []
+    async for seq, frame in log.follow():
+        frames.append((seq, frame))
+        if seq == last:
+            return frames
+    return frames
+
+
+@pytest.mark.unit
+class TestRunEventLog:
+    """Test RunEventLog."""
+
+    async def test_follower_gets_frames_as_they_are_appended(self):
+        log = RunEventLog(max_buffered=10)
+
+        async def produce():
+            for i in range(3):
+                log.append(f"frame-{i}")
+                await asyncio.sleep(0.01)
+            log.close()
+
+        producer = asyncio.create_task(produce())
+        frames = await _follow(log)
+        await producer
+
+        assert frames == [(1, "frame-0"), (2, "frame-1"), (3, "frame-2")]
+
+    async def test_resumes_after_last_event_id(self):
+        log = RunEventLog(max_buffered=10)
+        for i in range(4):
+            log.append(f"frame-{i}")
+        log.close()
+
+        assert await _follow(log, after=2) == [(3, "frame-2"), (4, "frame-3")]
+
+    async def test_evicted_frames_cannot_be_resumed_without_spill(self):
+        log = RunEventLog(max_buffered=2)
+        for i in range(4):
+            log.append(f"frame-{i}")
+        log.close()
+
+        assert not log.can_resume(1)
+        assert log.can_resume(2)
+        with pytest.raises(RunLogGapError):
+            await _follow(log, after=0)
+
+    async def test_evicted_frames_replayed_from_spill(self, tmp_path):
+        log = RunEventLog(max_buffered=2, spill_path=tmp_path / "run.jsonl")
+        for i in range(5):
+            log.append(f"frame-{i}")
+        log.close()
+
+        frames = await _follow(log, after=1)
+
+        assert log.can_resume(0)
+        assert [seq for seq, _ in frames] == [2, 3, 4, 5]
+        assert frames[0] == (2, "frame-1")
+
+    async def test_keeps_frames_a_live_follower_has_not_read(self):
+        log = RunEventLog(max_buffered=2)
+        log.append("frame-0")
+        follower = log.follow()
+        assert await anext(follower) == (1, "frame-0")
+
+        for i in range(1, 5):
+            log.append(f"frame-{i}")
+        log.close()
+
+        assert [entry async for entry in follower] == [
+            (2, "frame-1"),
+            (3, "frame-2"),
+            (4, "frame-3"),
+            (5, "frame-4"),
+        ]
+
+    async def test_spilled_frames_written_in_the_background(self, tmp_path):
+        spill_path = tmp_path / "run.jsonl"
+        log = RunEventLog(max_buffered=1, spill_path=spill_path)
+        for i in range(4):
+            log.append(f"frame-{i}")
+
+        # Replayable while still being written
+        assert [seq for seq, _ in await _follow_until(log, 4)] == [1, 2, 3, 4]
+        await log.drain()
+        assert len(spill_path.read_text().splitlines()) == 3
+
+        log.discard()
+        await log.drain()
+        assert not spill_path.exists()
+
+
+@pytest.mark.unit
+class TestRunLogRegistry:
+    """Test RunLogRegistry."""
+
+    def test_finished_runs_expire(self, monkeypatch):
+        registry = RunLogRegistry(RunReplayConfig(enabled=True, retention_seconds=10))
+        log = registry.create("thread-1", "run-1")
+        log.close()
+        assert registry.get("thread-1", "run-1") is log
+
+        finished = log.finished_at
+        monkeypatch.setattr(
+            "idun_agent_engine.server.run_log.time.monotonic", lambda: finished + 11
+        )
+
+        assert registry.get("thread-1", "run-1") is None
+        assert registry.stats()["runs"] == 0
+
+    def test_live_runs_never_expire(self, monkeypatch):
+        registry = RunLogRegistry(RunReplayConfig(enabled=True, retention_seconds=1))
+        log = registry.create("thread-1", "run-1")
+        monkeypatch.setattr(
+            "idun_agent_engine.server.run_log.time.monotonic", lambda: 1e12
+        )
+
+        assert registry.get("thread-1", "run-1") is log
+
+    async def test_close_cancels_runs_and_removes_spill_files(self, tmp_path):
+        config = RunReplayConfig(
+            enabled=True, max_buffered_events=1, spill_dir=str(tmp_path)
+        )
+        registry = RunLogRegistry(config)
+        log = registry.create("thread-1", "run-1")
+        for i in range(3):
+            log.append(f"frame-{i}")
+        task = registry.track(asyncio.create_task(asyncio.sleep(60)))
+
+        await registry.close()
+
+        assert task.cancelled()
+        assert list(tmp_path.iterdir()) == []
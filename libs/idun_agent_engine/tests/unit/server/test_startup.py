@@ -0,0 +1,117 @@
+"""Tests for the concurrent startup orchestrator."""
+
+import asyncio
+import time
+
+import pytest
+
+from idun_agent_engine.server.startup import StartupOrchestrator
+
+
+def _statuses(orchestrator: StartupOrchestrator) -> dict[str, str]:
+    return {phase.name: phase.status for phase in orchestrator.profile.phases}
+
+
+@pytest.mark.unit
+class TestStartupOrchestrator:
+    """Test StartupOrchestrator."""
+
+    async def test_independent_phases_run_concurrently(self):
+        """Total time approaches the slowest phase, not the sum."""
+        orchestrator = StartupOrchestrator()
+
+        async def slow_thread():
+            await asyncio.to_thread(time.sleep, 0.2)
+
+        async def slow_async():
+            await asyncio.sleep(0.2)
+
+        orchestrator.add("models", slow_thread)
+        orchestrator.add("agent", slow_async)
+        orchestrator.add("sso", slow_async)
+
+        profile = await orchestrator.run()
+
+        assert profile.total < 0.35
+        assert profile.sequential >= 0.55
+        assert _statuses(orchestrator) == {"models": "ok", "agent": "ok", "sso": "ok"}
+
+    async def test_dependent_phase_waits_for_dependency(self):
+        """A phase starts only after the phases it depends on have finished."""
+        orchestrator = StartupOrchestrator()
+        events = []
+
+        async def registry():
+            await asyncio.sleep(0.05)
+            events.append("registry")
+
+        async def agent():
+            events.append("agent")
+
+        orchestrator.add("registry", registry)
+        orchestrator.add("agent", agent, depends_on=["registry"])
+
+        profile = await orchestrator.run()
+
+        assert events == ["registry", "agent"]
+        agent_timing = profile.phases[1]
+        assert agent_timing.started >= profile.phases[0].duration
+
+    async def test_failure_cancels_running_phases_and_skips_dependents(self):
+        """The first error is raised; dependents never start and others are cancelled."""
+        orchestrator = StartupOrchestrator()
+        started = []
+
+        async def failing():
+            raise ValueError("agent broke")
+
+        async def slow():
+            await asyncio.sleep(5)
+
+        async def dependent():
+            started.append("integrations")
+
+        orchestrator.add("models", slow)
+        orchestrator.add("agent", failing)
+        orchestrator.add("integrations", dependent, depends_on=["agent"])
+
+        with pytest.raises(ValueError, match="agent broke"):
+            await orchestrator.run()
+
+        assert started == []
+        assert _statuses(orchestrator) == {
+            "models": "cancelled",
+            "agent": "failed",
+            "integrations": "skipped",
+        }
+
+    async def test_marked_phases_satisfy_dependencies(self):
+        """Reused phases appear in the profile and do not block dependents."""
+        orchestrator = StartupOrchestrator()
+        ran = []
+
+        async def integrations():
+            ran.append("integrations")
+
+        orchestrator.mark("agent", "reused")
+        orchestrator.add("integrations", integrations, depends_on=["agent"])
+
+        profile = await orchestrator.run()
+
+        assert ran == ["integrations"]
+        assert profile.as_dict()["phases"][0] == {
+            "name": "agent",
+            "status": "reused",
+            "started_seconds": 0.0,
+            "duration_seconds": 0.0,
+        }
+
+    def test_unknown_dependency_rejected(self):
+        """Dependencies must be registered first, which rules out cycles."""
+        orchestrator = StartupOrchestrator()
+
+        async def noop():
+            return None
+
+        with pytest.raises(ValueError, match="unregistered"):
+            orchestrator.add("agent", noop, depends_on=["registry"])
@@ -0,0 +1,111 @@
+"""Tests for per-thread run serialization."""
+
+import asyncio
+
+import pytest
+from idun_agent_schema.engine.server import ThreadLockConfig
+
+from idun_agent_engine.server.thread_locks import ThreadBusyError, ThreadLockManager
+
+
+@pytest.mark.unit
+class TestThreadLockManager:
+    """Test ThreadLockManager queueing, limits and cleanup."""
+
+    async def test_same_thread_runs_in_order(self):
+        """Holders on one thread never overlap and acquire in FIFO order."""
+        manager = ThreadLockManager()
+        order: list[str] = []
+
+        async def _run(name: str):
+            async with manager.hold("t1"):
+                order.append(f"{name}:start")
+                await asyncio.sleep(0.01)
+                order.append(f"{name}:end")
+
+        await asyncio.gather(_run("a"), _run("b"), _run("c"))
+
+        assert order == ["a:start", "a:end", "b:start", "b:end", "c:start", "c:end"]
+
+    async def test_different_threads_do_not_wait(self):
+        """Runs on different threads proceed concurrently."""
+        manager = ThreadLockManager()
+        async with manager.hold("t1"):
+            async with manager.hold("t2") as waited:
+                assert waited < 0.01
+                assert manager.stats()["active_threads"] == 2
+
+    async def test_queue_depth_limit_rejects(self):
+        """A run beyond max_queue_depth is rejected immediately."""
+        manager = ThreadLockManager(ThreadLockConfig(max_queue_depth=1))
+        release = asyncio.Event()
+
+        async def _holder():
+            async with manager.hold("t1"):
+                await release.wait()
+
+        holder = asyncio.create_task(_holder())
+        waiter = asyncio.create_task(_holder())
+        await asyncio.sleep(0)
+        assert manager.queue_length("t1") == 1
+
+        with pytest.raises(ThreadBusyError):
+            async with manager.hold("t1"):
+                pass
+
+        release.set()
+        await asyncio.gather(holder, waiter)
+        assert manager.stats()["rejected_total"] == 1
+
+    async def test_wait_timeout(self):
+        """A waiter gives up after wait_timeout_seconds."""
+        manager = ThreadLockManager(ThreadLockConfig(wait_timeout_seconds=0.05))
+        async with manager.hold("t1"):
+            with pytest.raises(ThreadBusyError, match="Timed out"):
+                async with manager.hold("t1"):
+                    pass
+
+        stats = manager.stats()
+        assert stats["timed_out_total"] == 1
+        assert stats["queued_runs"] == 0
+
+    async def test_lock_table_is_cleaned_up(self):
+        """Idle threads leave no entries behind, including after errors."""
+        manager = ThreadLockManager()
+        for i in range(100):
+            async with manager.hold(f"thread-{i}"):
+                pass
+        with pytest.raises(RuntimeError):
+            async with manager.hold("failing"):
+                raise RuntimeError("boom")
+
+        assert manager._slots == {}
+        assert manager.stats()["acquired_total"] == 101
+
+    async def test_cancelled_holder_releases(self):
+        """Cancelling a run (e.g. client disconnect) frees the thread."""
+        manager = ThreadLockManager()
+
+        async def _holder():
+            async with manager.hold("t1"):
+                await asyncio.sleep(10)
+
+        task = asyncio.create_task(_holder())
+        await asyncio.sleep(0)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+        async with manager.hold("t1") as waited:
+            assert waited < 0.01
+        assert manager._slots == {}
+
+    async def test_disabled_or_missing_thread_is_noop(self):
+        """No locking happens when disabled or without a thread id."""
+        manager = ThreadLockManager(ThreadLockConfig(enabled=False))
+        async with manager.hold("t1"):
+            async with manager.hold("t1"):
+                pass
+        async with ThreadLockManager().hold(None) as waited:
+            assert waited == 0.0
+        assert manager.stats()["acquired_total"] == 0
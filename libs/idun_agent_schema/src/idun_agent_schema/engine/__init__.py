@@ -2,7 +2,13 @@
 
 from .agent import AgentConfig, BaseAgentConfig  # noqa: F401
 from .agent_framework import AgentFramework  # noqa: F401
-from .api import ChatRequest, ChatResponse  # noqa: F401
+from .api import (  # noqa: F401
+    BackgroundRunStatus,
+    BatchInvokeRequest,
+    BatchInvokeResult,
+    ChatRequest,
+    ChatResponse,
+)
 from .capabilities import (  # noqa: F401
     AgentCapabilities,
     CapabilityFlags,
@@ -18,11 +24,31 @@ from .integrations import (  # noqa: F401
 )
 from .langgraph import (  # noqa: F401
     CheckpointConfig,
+    CheckpointRetentionConfig,
+    CheckpointSerializerConfig,
     LangGraphAgentConfig,
+    PostgresCheckpointConfig,
+    PostgresPoolConfig,
     SqliteCheckpointConfig,
+    SqliteConcurrencyConfig,
 )
 from .observability import ObservabilityConfig  # noqa: F401
 from .observability_v2 import ObservabilityConfig as ObservabilityConfigV2  # noqa: F401
 from .prompt import PromptConfig  # noqa: F401
-from .server import ServerAPIConfig, ServerConfig  # noqa: F401
+from .server import (  # noqa: F401
+    AdmissionConfig,
+    BackgroundRunsConfig,
+    BatchInvokeConfig,
+    DeltaCoalescingConfig,
+    GuardrailBatchingConfig,
+    GuardrailExecutionConfig,
+    GuardrailVerdictCacheConfig,
+    OutputStreamGuardrailConfig,
+    ReloadConfig,
+    RunReplayConfig,
+    ServerAPIConfig,
+    ServerConfig,
+    StreamingConfig,
+    ThreadLockConfig,
+)
 from .sso import SSOConfig  # noqa: F401
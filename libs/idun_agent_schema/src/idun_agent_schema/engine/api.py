@@ -1,6 +1,9 @@
 """Schemas for engine HTTP API request/response payloads."""
 
-from pydantic import BaseModel
+from datetime import datetime
+from typing import Any, Literal
+
+from pydantic import BaseModel, Field
 
 
 class ChatRequest(BaseModel):
@@ -27,3 +30,64 @@ class ChatResponse(BaseModel):
 
     session_id: str
     response: str
+
+
+class BatchInvokeRequest(BaseModel):
+    """Request payload for ``POST /agent/batch``.
+
+    Attributes:
+        items: Invoke requests to run, each with its own session.
+        max_concurrency: Items to invoke at once; capped by the server config.
+
+    """
+
+    items: list[ChatRequest] = Field(min_length=1)
+    max_concurrency: int | None = Field(default=None, ge=1)
+
+
+class BatchInvokeResult(BaseModel):
+    """One NDJSON line of a ``POST /agent/batch`` response.
+
+    Attributes:
+        index: Position of the item in the request.
+        session_id: Session identifier of the item.
+        status_code: HTTP status ``/agent/invoke`` would have returned for it.
+        response: Agent's textual response, if the item succeeded.
+        error: Error detail, if the item failed.
+
+    """
+
+    index: int
+    session_id: str
+    status_code: int = 200
+    response: str | None = None
+    error: str | None = None
+
+
+class BackgroundRunStatus(BaseModel):
+    """Status and result of a run started with ``POST /agent/runs``.
+
+    Attributes:
+        run_id: Run identifier, taken from the submitted ``runId``.
+        thread_id: Thread the run belongs to.
+        status: Where the run is in its lifecycle.
+        created_at: When the run was submitted.
+        started_at: When the run got an execution slot.
+        finished_at: When the run ended.
+        output: Text of the last assistant message, once the run has ended.
+        state: Last state snapshot emitted by the agent, if any.
+        error: Error message of a failed run.
+        error_code: Error code of a failed run, as in its ``RUN_ERROR`` event.
+
+    """
+
+    run_id: str
+    thread_id: str
+    status: Literal["queued", "running", "succeeded", "failed", "cancelled"]
+    created_at: datetime
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
+    output: str | None = None
+    state: Any = None
+    error: str | None = None
+    error_code: str | None = None
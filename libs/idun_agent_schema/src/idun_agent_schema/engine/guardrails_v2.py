@@ -131,9 +131,7 @@ class DetectPIIConfig(GuardrailConfig):
     api_key: str = ""
     reject_message: str = "PII detected"
     guard_url: str = "hub://guardrails/detect_pii"
-    pii_entities: list[str] = Field(
-        description="List of PII entity types to detect"
-    )
+    pii_entities: list[str] = Field(description="List of PII entity types to detect")
     on_fail: str = Field(default="exception")
 
     @model_validator(mode="before")
@@ -269,6 +267,68 @@ GuardrailConfig = Union[
 ]
 
 
+class GuardrailWorkerPoolConfig(BaseModel):
+    """Run hub validators in child worker processes.
+
+    Each guard is loaded in exactly one worker, so its model exists once and
+    inference does not compete with request handling for the engine's GIL.
+    """
+
+    workers: int = Field(
+        default=2, ge=1, description="Number of worker processes hosting validators"
+    )
+    routing: dict[str, int] = Field(
+        default_factory=dict,
+        description=(
+            "Worker index per guard config_id, e.g. {'toxic_language': 0}. "
+            "Unlisted guards are spread across the workers"
+        ),
+    )
+    start_timeout_seconds: float = Field(
+        default=300.0,
+        gt=0,
+        description="How long a worker may take to load its validators",
+    )
+
+    @model_validator(mode="after")
+    def _check_routing(self) -> "GuardrailWorkerPoolConfig":
+        invalid = {
+            config_id: index
+            for config_id, index in self.routing.items()
+            if not 0 <= index < self.workers
+        }
+        if invalid:
+            raise ValueError(
+                f"Guardrail routing targets workers that do not exist: {invalid} "
+                f"(workers: {self.workers})"
+            )
+        return self
+
+
+class GuardrailFastTierConfig(BaseModel):
+    """In-process pre-filter that runs before the hub validators.
+
+    Ban lists and competitor names are matched with one compiled pattern per
+    guard, and PII entities with simple precompiled regexes. A hit rejects the
+    text with the reject message of the guard it came from, without running
+    any hub validator.
+    """
+
+    enabled: bool = True
+    skip_hub_when_clean: bool = Field(
+        default=False,
+        description=(
+            "Skip the hub validators for texts with no fast-tier hit that are at "
+            "most clean_max_chars long"
+        ),
+    )
+    clean_max_chars: int = Field(
+        default=200,
+        ge=0,
+        description="Longest text that may skip the hub validators when clean",
+    )
+
+
 class GuardrailsV2(BaseModel):
     """Guardrails V2 configuration."""
 
@@ -278,3 +338,18 @@ class GuardrailsV2(BaseModel):
     output: list[GuardrailConfig] = Field(
         default_factory=list, description="List of output guardrails"
     )
+    cache_dir: str | None = Field(
+        default=None,
+        description=(
+            "Directory for installed hub validators and their local models. "
+            "Defaults to IDUN_GUARDRAILS_CACHE_DIR, then ~/.cache/idun/guardrails"
+        ),
+    )
+    worker_pool: GuardrailWorkerPoolConfig | None = Field(
+        default=None,
+        description="Run validators in worker processes instead of the engine process",
+    )
+    fast_tier: GuardrailFastTierConfig | None = Field(
+        default=None,
+        description="Keyword and pattern pre-filter that runs before the hub validators",
+    )
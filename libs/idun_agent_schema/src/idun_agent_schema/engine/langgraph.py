@@ -3,16 +3,153 @@
 from typing import Any, Literal
 from urllib.parse import urlparse
 
-from pydantic import BaseModel, field_validator
+from pydantic import BaseModel, Field, field_validator, model_validator
 
 from .base_agent import BaseAgentConfig
 
 
+class CheckpointRetentionConfig(BaseModel):
+    """Cleanup of old checkpoints, run in the background by the engine.
+
+    LangGraph writes a checkpoint on every super-step and never deletes any.
+    With retention enabled the engine periodically deletes checkpoints beyond
+    the last ``keep_last`` of each thread, whole threads idle for longer than
+    ``thread_ttl_seconds`` and pending writes no run can resume from.
+    """
+
+    enabled: bool = Field(default=False, description="Run the cleanup task.")
+    keep_last: int | None = Field(
+        default=None,
+        ge=1,
+        description="Checkpoints kept per thread and namespace. None keeps all.",
+    )
+    thread_ttl_seconds: float | None = Field(
+        default=None,
+        gt=0,
+        description="Threads whose last checkpoint is older than this are deleted.",
+    )
+    compact_writes: bool = Field(
+        default=True,
+        description="Delete pending writes of checkpoints that are not the latest of their thread.",
+    )
+    interval_seconds: float = Field(
+        default=3600.0, gt=0, description="Time between two cleanup runs."
+    )
+    batch_size: int = Field(
+        default=500, ge=1, description="Rows or threads deleted per statement."
+    )
+    batch_pause_ms: float = Field(
+        default=50.0,
+        ge=0,
+        description="Pause between two delete batches, to spread the load.",
+    )
+
+
+class CheckpointSerializerConfig(BaseModel):
+    """Compression of serialized checkpoints, blobs and pending writes.
+
+    Compressed values are tagged with their codec, so rows written before
+    compression was enabled, or with another codec, are still read. With
+    ``message_deltas``, list channels such as ``messages`` are stored as the
+    items added since the parent checkpoint.
+    """
+
+    compression: Literal["none", "zstd", "zlib"] = Field(
+        default="none", description="Codec for new checkpoint data."
+    )
+    level: int = Field(
+        default=3,
+        ge=1,
+        le=22,
+        description="Compression level. zstd takes 1-22, zlib 1-9.",
+    )
+    dictionary_path: str | None = Field(
+        default=None,
+        description="Trained zstd dictionary file. Rows written with it can only be read with it.",
+    )
+    min_size_bytes: int = Field(
+        default=256,
+        ge=0,
+        description="Values smaller than this are stored uncompressed.",
+    )
+    message_deltas: bool = Field(
+        default=False,
+        description="Store list channels as deltas against the parent checkpoint. Not allowed with keep_last or retention.",
+    )
+    delta_snapshot_interval: int = Field(
+        default=20,
+        ge=1,
+        description="With message_deltas, lists are stored in full every this many checkpoints.",
+    )
+    delta_cache_threads: int = Field(
+        default=1000,
+        ge=1,
+        description="Threads whose last written lists are kept in memory to write deltas against.",
+    )
+
+    @model_validator(mode="after")
+    def _validate_codec(self) -> "CheckpointSerializerConfig":
+        """Ensure the level and dictionary fit the codec."""
+        if self.compression == "zlib" and self.level > 9:
+            raise ValueError("zlib compression level must be between 1 and 9")
+        if self.dictionary_path is not None and self.compression != "zstd":
+            raise ValueError("dictionary_path requires zstd compression")
+        return self
+
+
+class SqliteConcurrencyConfig(BaseModel):
+    """High-concurrency mode of the SQLite checkpointer.
+
+    Reads use a pool of read-only connections under WAL journaling, and
+    writes from concurrent runs are committed together in shared transactions.
+    """
+
+    enabled: bool = Field(
+        default=False,
+        description="Use WAL, a reader pool and batched writes instead of one connection.",
+    )
+    read_connections: int = Field(
+        default=4, ge=1, description="Read-only connections serving checkpoint reads."
+    )
+    max_write_batch: int = Field(
+        default=64, ge=1, description="Most writes committed in one transaction."
+    )
+    max_write_delay_ms: float = Field(
+        default=2.0,
+        ge=0,
+        le=1000,
+        description="Longest a write waits for others to share its commit.",
+    )
+    synchronous: Literal["OFF", "NORMAL", "FULL", "EXTRA"] = Field(
+        default="NORMAL",
+        description="SQLite synchronous pragma. NORMAL is durable across crashes of the engine under WAL.",
+    )
+    mmap_size_mb: int = Field(
+        default=256,
+        ge=0,
+        description="Memory-mapped I/O size per connection. 0 turns it off.",
+    )
+    busy_timeout_ms: int = Field(
+        default=5000,
+        ge=0,
+        description="How long a connection waits for a lock held by another process.",
+    )
+
+
 class SqliteCheckpointConfig(BaseModel):
     """Configuration for SQLite checkpointer."""
 
     type: Literal["sqlite"]
     db_url: str
+    concurrency: SqliteConcurrencyConfig = Field(
+        default_factory=SqliteConcurrencyConfig
+    )
+    retention: CheckpointRetentionConfig = Field(
+        default_factory=CheckpointRetentionConfig
+    )
+    serializer: CheckpointSerializerConfig = Field(
+        default_factory=CheckpointSerializerConfig
+    )
 
     @field_validator("db_url")
     @classmethod
@@ -27,6 +164,13 @@ class SqliteCheckpointConfig(BaseModel):
             raise ValueError("SQLite DB URL must start with 'sqlite:///'")
         return v
 
+    @model_validator(mode="after")
+    def _validate_message_deltas(self) -> "SqliteCheckpointConfig":
+        """Ensure retention can't delete checkpoints deltas refer to."""
+        if self.serializer.message_deltas and self.retention.enabled:
+            raise ValueError("serializer.message_deltas can't be used with retention")
+        return self
+
     @property
     def db_path(self) -> str:
         """Return filesystem path component derived from the sqlite URL."""
@@ -37,9 +181,86 @@ class SqliteCheckpointConfig(BaseModel):
 
 
 class InMemoryCheckpointConfig(BaseModel):
-    """Configuration for In-Memory checkpointer."""
+    """Configuration for In-Memory checkpointer.
+
+    Without limits every checkpoint of every thread stays in memory for the
+    life of the engine. With ``max_threads`` or ``max_size_mb`` set, the least
+    recently used threads are evicted once a limit is exceeded.
+    """
 
     type: Literal["memory"]
+    max_threads: int | None = Field(
+        default=None,
+        ge=1,
+        description="Most threads kept in memory. None keeps all.",
+    )
+    max_size_mb: float | None = Field(
+        default=None,
+        gt=0,
+        description="Most serialized checkpoint data kept in memory. None keeps all.",
+    )
+    keep_last: int | None = Field(
+        default=None,
+        ge=1,
+        description="Checkpoints kept per thread and namespace. None keeps all.",
+    )
+    serializer: CheckpointSerializerConfig = Field(
+        default_factory=CheckpointSerializerConfig
+    )
+
+    @model_validator(mode="after")
+    def _validate_message_deltas(self) -> "InMemoryCheckpointConfig":
+        """Ensure trimming can't delete checkpoints deltas refer to."""
+        if self.serializer.message_deltas and self.keep_last is not None:
+            raise ValueError("serializer.message_deltas can't be used with keep_last")
+        return self
+
+    @property
+    def bounded(self) -> bool:
+        """Whether any limit is set."""
+        return (
+            self.max_threads is not None
+            or self.max_size_mb is not None
+            or self.keep_last is not None
+        )
+
+
+class PostgresPoolConfig(BaseModel):
+    """Connection pool of the Postgres checkpointer.
+
+    Concurrent runs read and write checkpoints on separate connections
+    instead of queuing on a single one.
+    """
+
+    min_size: int = Field(
+        default=1, ge=0, description="Connections kept open while idle."
+    )
+    max_size: int = Field(
+        default=10,
+        ge=1,
+        description="Most connections open at once. Further checkpoint I/O waits.",
+    )
+    max_idle_seconds: float = Field(
+        default=300.0,
+        gt=0,
+        description="How long a connection above min_size may stay unused before it is closed.",
+    )
+    statement_timeout_ms: int | None = Field(
+        default=None,
+        ge=1,
+        description="Postgres statement_timeout for checkpoint queries. None keeps the server default.",
+    )
+    prepared_statements: bool = Field(
+        default=True,
+        description="Use server-side prepared statements. Turn off behind PgBouncer in transaction mode.",
+    )
+
+    @model_validator(mode="after")
+    def _validate_sizes(self) -> "PostgresPoolConfig":
+        """Ensure the pool can hold its minimum number of connections."""
+        if self.max_size < self.min_size:
+            raise ValueError("max_size must be at least min_size")
+        return self
 
 
 class PostgresCheckpointConfig(BaseModel):
@@ -47,6 +268,13 @@ class PostgresCheckpointConfig(BaseModel):
 
     type: Literal["postgres"]
     db_url: str
+    pool: PostgresPoolConfig = Field(default_factory=PostgresPoolConfig)
+    retention: CheckpointRetentionConfig = Field(
+        default_factory=CheckpointRetentionConfig
+    )
+    serializer: CheckpointSerializerConfig = Field(
+        default_factory=CheckpointSerializerConfig
+    )
 
     @field_validator("db_url")
     @classmethod
@@ -63,6 +291,13 @@ class PostgresCheckpointConfig(BaseModel):
             )
         return v
 
+    @model_validator(mode="after")
+    def _validate_message_deltas(self) -> "PostgresCheckpointConfig":
+        """Ensure retention can't delete checkpoints deltas refer to."""
+        if self.serializer.message_deltas and self.retention.enabled:
+            raise ValueError("serializer.message_deltas can't be used with retention")
+        return self
+
 
 CheckpointConfig = (
     SqliteCheckpointConfig | InMemoryCheckpointConfig | PostgresCheckpointConfig
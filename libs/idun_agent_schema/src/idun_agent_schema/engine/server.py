@@ -1,15 +1,302 @@
 """Server configuration models (engine)."""
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 
 
 class ServerAPIConfig(BaseModel):
     """API server configuration."""
 
     port: int = 8000
+    workers: int = Field(
+        default=1,
+        ge=1,
+        description="Number of uvicorn worker processes. Each worker initializes its own agent.",
+    )
+
+
+class ThreadLockConfig(BaseModel):
+    """Per-thread run serialization settings.
+
+    Runs that target the same thread_id are executed one at a time so they do
+    not read the same checkpoint and race to write the next one.
+    """
+
+    enabled: bool = True
+    wait_timeout_seconds: float = Field(
+        default=30.0,
+        gt=0,
+        description="How long a run may wait for its thread before it is rejected.",
+    )
+    max_queue_depth: int = Field(
+        default=8,
+        ge=0,
+        description="Runs allowed to wait on a busy thread. Further runs are rejected.",
+    )
+
+
+class AdmissionConfig(BaseModel):
+    """Global admission control for agent executions.
+
+    Caps how many agent runs execute at once across /agent/run, /agent/invoke
+    and integration webhooks. Excess requests wait in a bounded queue and are
+    rejected quickly, with a Retry-After hint, once it is full or their wait
+    exceeds the deadline.
+    """
+
+    max_in_flight: int | None = Field(
+        default=None,
+        ge=1,
+        description="Maximum concurrent agent runs. None disables admission control.",
+    )
+    max_queue: int = Field(
+        default=100,
+        ge=0,
+        description="Requests allowed to wait for a slot. Further requests get 429.",
+    )
+    queue_timeout_seconds: float = Field(
+        default=10.0,
+        gt=0,
+        description="How long a request may wait for a slot before it gets 503.",
+    )
+
+
+class ReloadConfig(BaseModel):
+    """Settings for swapping in a new agent on POST /reload."""
+
+    drain_timeout_seconds: float = Field(
+        default=300.0,
+        gt=0,
+        description="How long the previous agent may keep serving in-flight requests before it is closed.",
+    )
+
+
+class GuardrailBatchingConfig(BaseModel):
+    """Micro-batching of guardrail checks across concurrent requests.
+
+    Texts sent to the same guard within ``max_wait_ms`` of each other are
+    passed to its ``validate_batch`` in one call. Guards without batch
+    inference, such as guardrails hub validators, are not batched.
+    """
+
+    enabled: bool = False
+    max_batch_size: int = Field(
+        default=16,
+        ge=1,
+        description="Texts per batch. A full batch is validated without waiting.",
+    )
+    max_wait_ms: float = Field(
+        default=5.0,
+        ge=0,
+        description="How long the first text of a batch waits for others to join it.",
+    )
+
+
+class GuardrailVerdictCacheConfig(BaseModel):
+    """Cache of guardrail verdicts for repeated texts.
+
+    Keyed by guard id, guard config hash and normalized text hash, so a guard
+    whose config changed never reuses an old verdict.
+    """
+
+    enabled: bool = True
+    max_entries: int = Field(
+        default=10_000,
+        ge=1,
+        description="Verdicts kept. The least recently used are evicted first.",
+    )
+    ttl_seconds: float = Field(
+        default=600.0,
+        gt=0,
+        description="How long a verdict may be reused.",
+    )
+
+
+class OutputStreamGuardrailConfig(BaseModel):
+    """How output guardrails check a streamed response.
+
+    Text deltas are held back and collected into windows that close at a
+    sentence end, or at ``max_window_chars``. Each window is validated while
+    the agent keeps streaming, and released once it passes. The delay output
+    guardrails add is therefore bounded by one window and its validation.
+    """
+
+    window_chars: int = Field(
+        default=200,
+        ge=1,
+        description="Characters collected before a window may close at a sentence end.",
+    )
+    max_window_chars: int = Field(
+        default=600,
+        ge=1,
+        description="A window closes at this length even mid-sentence.",
+    )
+    context_chars: int = Field(
+        default=200,
+        ge=0,
+        description=(
+            "Tail of the previous window validated again with the next one, so "
+            "content split across windows is still caught."
+        ),
+    )
+    max_pending_windows: int = Field(
+        default=4,
+        ge=1,
+        description="Windows awaiting a verdict before reading from the agent pauses.",
+    )
+
+    @model_validator(mode="after")
+    def _check_window(self) -> "OutputStreamGuardrailConfig":
+        if self.max_window_chars < self.window_chars:
+            raise ValueError("max_window_chars must be at least window_chars")
+        return self
+
+
+class GuardrailExecutionConfig(BaseModel):
+    """How guardrail validators run.
+
+    Validators execute in a worker pool so that model inference never blocks
+    the event loop. The guards for one position run concurrently and the
+    check stops at the first rejection.
+    """
+
+    max_workers: int = Field(
+        default=4,
+        ge=1,
+        description="Worker threads running validators. Further checks wait for a free worker.",
+    )
+    timeout_seconds: float = Field(
+        default=10.0,
+        gt=0,
+        description=(
+            "Deadline for one guard, including the wait for a worker. "
+            "A guard that misses it rejects the request."
+        ),
+    )
+    batching: GuardrailBatchingConfig = Field(default_factory=GuardrailBatchingConfig)
+    verdict_cache: GuardrailVerdictCacheConfig = Field(
+        default_factory=GuardrailVerdictCacheConfig
+    )
+    output_stream: OutputStreamGuardrailConfig = Field(
+        default_factory=OutputStreamGuardrailConfig
+    )
+
+
+class DeltaCoalescingConfig(BaseModel):
+    """Merging of text deltas on the /agent/run event stream.
+
+    Consecutive TEXT_MESSAGE_CONTENT deltas of one message are sent as one
+    event once ``max_chars`` characters are buffered, ``max_delay_ms`` after
+    the first of them, or as soon as any other event arrives. RAW and CUSTOM
+    events are sent after the merged delta instead of ending it. Clients can
+    turn it on or off and tune it per request.
+    """
+
+    enabled: bool = Field(
+        default=False,
+        description="Coalesce deltas for requests that don't choose for themselves.",
+    )
+    max_chars: int = Field(
+        default=512,
+        ge=1,
+        description="Buffered characters at which the merged delta is sent.",
+    )
+    max_delay_ms: float = Field(
+        default=20.0,
+        gt=0,
+        le=1000,
+        description="How long the first buffered delta may wait for others to join it.",
+    )
+
+
+class RunReplayConfig(BaseModel):
+    """Resumable /agent/run streams.
+
+    Each run writes its events to a log and keeps going when the client
+    disconnects. A client that reconnects with ``Last-Event-ID`` is sent the
+    events it missed, then the rest of the run.
+    """
+
+    enabled: bool = False
+    max_buffered_events: int = Field(
+        default=1000,
+        ge=1,
+        description="Events of a run kept in memory for replay.",
+    )
+    spill_dir: str | None = Field(
+        default=None,
+        description=(
+            "Directory where events evicted from memory are written, so a "
+            "reconnect can replay a whole run. None drops them."
+        ),
+    )
+    retention_seconds: float = Field(
+        default=300.0,
+        gt=0,
+        description="How long a finished run can still be resumed.",
+    )
+
+
+class StreamingConfig(BaseModel):
+    """Settings for the /agent/run event stream."""
+
+    coalescing: DeltaCoalescingConfig = Field(default_factory=DeltaCoalescingConfig)
+    replay: RunReplayConfig = Field(default_factory=RunReplayConfig)
+
+
+class BackgroundRunsConfig(BaseModel):
+    """Runs started with POST /agent/runs, decoupled from any HTTP connection.
+
+    Background runs have their own concurrency limit, so long batch-style
+    runs never take the execution slots of interactive /agent/run traffic.
+    """
+
+    max_concurrent: int = Field(
+        default=4,
+        ge=1,
+        description="Background runs executing at once. Further runs wait in a queue.",
+    )
+    max_queued: int = Field(
+        default=100,
+        ge=0,
+        description="Runs allowed to wait for a slot. Further submissions get 429.",
+    )
+    result_ttl_seconds: float = Field(
+        default=3600.0,
+        gt=0,
+        description="How long the status, result and events of a finished run are kept.",
+    )
+    max_buffered_events: int = Field(
+        default=10_000,
+        ge=1,
+        description="Events of a run kept for GET /agent/runs/{run_id}/events.",
+    )
+
+
+class BatchInvokeConfig(BaseModel):
+    """Limits for POST /agent/batch, which runs many invoke requests at once."""
+
+    max_concurrency: int = Field(
+        default=8,
+        ge=1,
+        description="Items of one batch invoked at once. Requests may ask for fewer.",
+    )
+    max_items: int = Field(
+        default=1000,
+        ge=1,
+        description="Most items a single batch may contain. Larger batches get 413.",
+    )
 
 
 class ServerConfig(BaseModel):
     """Configuration for the Engine's universal settings."""
 
     api: ServerAPIConfig = Field(default_factory=ServerAPIConfig)
+    thread_lock: ThreadLockConfig = Field(default_factory=ThreadLockConfig)
+    admission: AdmissionConfig = Field(default_factory=AdmissionConfig)
+    reload: ReloadConfig = Field(default_factory=ReloadConfig)
+    guardrail_execution: GuardrailExecutionConfig = Field(
+        default_factory=GuardrailExecutionConfig
+    )
+    streaming: StreamingConfig = Field(default_factory=StreamingConfig)
+    background_runs: BackgroundRunsConfig = Field(default_factory=BackgroundRunsConfig)
+    batch: BatchInvokeConfig = Field(default_factory=BatchInvokeConfig)